@@ -0,0 +1,82 @@
+"""
+Hot-path latency and CPU: chromedriver (Selenium) against the direct DevTools channel (cdp=True), on the
+offline mock ChatGPT page.
+
+For each transport, check_response_status() and return_last_response() are called CALLS times on a
+finished response, then PROMPTS prompts are sent with send_prompt_to_chatgpt() + wait_for_response().
+CPU is the user + system time of this process, chromedriver and the Chrome process tree.
+
+Requires a local Chrome (CHROME_PATH), psutil and websocket-client.
+
+    python -m benchmarks.bench_cdp
+"""
+import time
+import psutil
+from benchmarks.bench_lean_launch import tree
+from tests.mock_chatgpt import MockChatGPTServer, local_chrome, mock_session, close_mock_session
+
+CALLS = 200
+PROMPTS = 20
+
+
+def cpu_time(processes):
+    total = 0.0
+    for process in processes:
+        try:
+            times = process.cpu_times()
+            total += times.user + times.system
+        except psutil.NoSuchProcess:
+            pass
+    return total
+
+
+def measure(automation, processes, label):
+    def send_and_wait():
+        automation.send_prompt_to_chatgpt("Benchmark prompt")
+        automation.wait_for_response(timeout=30)
+
+    automation.ask("Warm up", timeout=30)
+    rows = []
+    for name, call, count in (
+        ("check_response_status", automation.check_response_status, CALLS),
+        ("return_last_response", automation.return_last_response, CALLS),
+        ("send + wait", send_and_wait, PROMPTS),
+    ):
+        cpu_before = cpu_time(processes())
+        started = time.perf_counter()
+        for _ in range(count):
+            call()
+        elapsed = time.perf_counter() - started
+        cpu = cpu_time(processes()) - cpu_before
+        rows.append((label, name, elapsed / count * 1000, cpu / count * 1000))
+    return rows
+
+
+def main():
+    if local_chrome() is None:
+        print("Chrome not found, skipping the DevTools channel benchmark.")
+        return
+
+    with MockChatGPTServer(first_token_ms=20, stream_delay_ms=5, chunk_chars=50, response_chars=400) as server:
+        automation = mock_session(server)
+        try:
+            chrome = psutil.Process(automation.chrome_process.pid)
+            chromedriver = psutil.Process(automation.driver.service.process.pid)
+            processes = lambda: [psutil.Process()] + [chromedriver] + tree(chrome)
+
+            rows = measure(automation, processes, "selenium")
+            automation.cdp = automation.open_cdp()
+            if automation.cdp is None:
+                print("DevTools channel unavailable.")
+                return
+            rows += measure(automation, processes, "cdp")
+        finally:
+            close_mock_session(automation)
+
+    print(f"{'transport':<10} {'operation':<22} {'ms/call':>9} {'CPU ms/call':>12}")
+    for label, name, latency, cpu in rows:
+        print(f"{label:<10} {name:<22} {latency:>9.2f} {cpu:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
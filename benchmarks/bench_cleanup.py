@@ -0,0 +1,50 @@
+"""
+Chat cleanup: del_current_chat() on one chat at a time (open the chat, three clicks through the menu and
+the confirmation dialog) against delete_chats() removing CHATS chats in one pass, on the offline mock
+ChatGPT page.
+
+Prints the time per chat and the chats deleted per minute of both.
+
+Requires a local Chrome (CHROME_PATH).
+
+    python -m benchmarks.bench_cleanup
+"""
+import time
+from tests.mock_chatgpt import MockChatGPTServer, local_chrome, mock_session, close_mock_session
+
+ONE_BY_ONE = 10
+CHATS = 2000
+
+
+def main():
+    if local_chrome() is None:
+        print("Chrome not found, skipping the chat cleanup benchmark.")
+        return
+
+    with MockChatGPTServer(first_token_ms=0, stream_delay_ms=0, chunk_chars=10000, delete_ms=50) as server:
+        automation = mock_session(server)
+        try:
+            elapsed = 0.0
+            for index in range(ONE_BY_ONE):
+                automation.open_new_chat()
+                automation.ask(f"Throwaway {index}", timeout=30)
+                started = time.perf_counter()
+                automation.del_current_chat()
+                elapsed += time.perf_counter() - started
+
+            server.add_conversations(CHATS, title="Batch job", age=7200)
+            report = automation.delete_chats(older_than=3600, title="^Batch job")
+        finally:
+            close_mock_session(automation)
+
+    print(f"{'method':<18} {'chats':>6} {'seconds':>8} {'ms/chat':>8} {'chats/min':>10}")
+    rows = (
+        ("del_current_chat", ONE_BY_ONE, elapsed),
+        ("delete_chats", report["deleted"], report["seconds"]),
+    )
+    for name, chats, seconds in rows:
+        print(f"{name:<18} {chats:>6} {seconds:>8.2f} {seconds / chats * 1000:>8.1f} {chats * 60 / seconds:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
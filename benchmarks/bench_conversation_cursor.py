@@ -0,0 +1,87 @@
+"""
+Per-poll cost of reading the conversation as it grows: the previous full scan (find_elements plus one
+`.text` round-trip per turn) against ConversationCursor (one bulk execute_script per poll).
+
+Every WebDriver command is simulated with a fixed latency, so the numbers reflect round-trips rather
+than browser work.
+
+    python -m benchmarks.bench_conversation_cursor
+"""
+import time
+from chatgpt_automation.chatgpt_automation import ChatGPTLocators
+from chatgpt_automation.conversation import ConversationCursor
+from tests.fakes import FakeDriver, FakeElement
+
+COMMAND_LATENCY = 0.0005
+TURN_COUNTS = [10, 50, 100, 200, 400]
+POLLS = 20
+
+
+class LatencyDriver(FakeDriver):
+    in_page = False
+
+    def find_elements(self, by, value):
+        time.sleep(COMMAND_LATENCY)
+        return super().find_elements(by, value)
+
+    def execute_script(self, script, *args):
+        time.sleep(COMMAND_LATENCY)
+        self.in_page = True
+        try:
+            return super().execute_script(script, *args)
+        finally:
+            self.in_page = False
+
+
+class RemoteElement(FakeElement):
+    """
+    Element whose `.text` costs a WebDriver round-trip, as with a real WebElement, unless it is read
+    by a script running in the page.
+    """
+
+    def __init__(self, driver, text, message_id):
+        super().__init__(message_id=message_id)
+        self.driver = driver
+        self._text = text
+
+    @property
+    def text(self):
+        if not self.driver.in_page:
+            self.driver.commands += 1
+            time.sleep(COMMAND_LATENCY)
+        return self._text
+
+    @text.setter
+    def text(self, value):
+        self._text = value
+
+
+def full_scan(driver):
+    elements = driver.find_elements(*ChatGPTLocators.CHAT_GPT_CONVERSION)
+    return [element.text for element in elements]
+
+
+def measure(poll, driver):
+    driver.commands = 0
+    start = time.perf_counter()
+    for _ in range(POLLS):
+        poll()
+    return (time.perf_counter() - start) / POLLS * 1000, driver.commands / POLLS
+
+
+def main():
+    print(f"{'turns':>6} {'scan ms':>9} {'scan cmds':>10} {'cursor ms':>10} {'cursor cmds':>12}")
+    for turn_count in TURN_COUNTS:
+        driver = LatencyDriver()
+        nodes = [RemoteElement(driver, f"turn {i} " * 20, f"m{i}") for i in range(turn_count)]
+        driver.set_elements(ChatGPTLocators.CHAT_GPT_CONVERSION, nodes)
+        cursor = ConversationCursor(driver, ChatGPTLocators.CHAT_GPT_CONVERSION)
+        cursor.refresh()
+
+        scan_ms, scan_cmds = measure(lambda: full_scan(driver), driver)
+        cursor_ms, cursor_cmds = measure(cursor.refresh, driver)
+        print(f"{turn_count:>6} {scan_ms:>9.2f} {scan_cmds:>10.0f} {cursor_ms:>10.2f} {cursor_cmds:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Import cost of the package, in fresh interpreters: the median wall time of importing each module, whether
+the import loaded selenium.webdriver, and whether it configured logging (handlers on the root logger, a
+chatgpt_automation.log file in the working directory). selenium.webdriver alone is the reference.
+
+Short-lived tools (batch jobs, pool workers, scripts that only read a PromptCache) pay this on every
+start. No browser is needed.
+
+    python -m benchmarks.bench_import
+"""
+import os
+import sys
+import json
+import shutil
+import statistics
+import subprocess
+import tempfile
+
+MODULES = (
+    "selenium.webdriver",
+    "chatgpt_automation.cache",
+    "chatgpt_automation.batch",
+    "chatgpt_automation.chatgpt_automation",
+    "chatgpt_automation.session_pool",
+)
+RUNS = 7
+
+PROBE = """
+import os, sys, json, time, logging
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    "ms": elapsed * 1000,
+    "webdriver": "selenium.webdriver" in sys.modules,
+    "root_handlers": len(logging.getLogger().handlers),
+    "log_file": os.path.exists("chatgpt_automation.log"),
+}}))
+"""
+
+
+def probe(module, work_dir):
+    """
+    Imports the module in a new interpreter started in work_dir and returns the measurements.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, (root, os.environ.get("PYTHONPATH")))))
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module)],
+        cwd=work_dir,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output)
+
+
+def main():
+    print(f"{'module':<40} {'median ms':>10} {'min ms':>8} {'webdriver':>10} {'logging':>8}")
+    for module in MODULES:
+        runs = []
+        for _ in range(RUNS):
+            work_dir = tempfile.mkdtemp()
+            try:
+                runs.append(probe(module, work_dir))
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+        times = [run["ms"] for run in runs]
+        configured = any(run["root_handlers"] or run["log_file"] for run in runs)
+        print(
+            f"{module:<40} {statistics.median(times):>10.1f} {min(times):>8.1f} "
+            f"{'loaded' if runs[0]['webdriver'] else '-':>10} {'yes' if configured else '-':>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Prompt injection from 1KB to 1MB: the legacy path (value set from a script, then Enter) against the
+PromptInjector methods (synthetic paste, DevTools Input.insertText, native value setter), on the offline
+mock ChatGPT page.
+
+For every size and method, send_prompt_to_chatgpt() is timed until the prompt is accepted as a new turn,
+and the user turn rendered by the page is compared with the prompt to detect lost text.
+
+Requires a local Chrome (CHROME_PATH).
+
+    python -m benchmarks.bench_injection
+"""
+import time
+from unittest import mock
+from chatgpt_automation.injection import PromptInjector
+from tests.mock_chatgpt import MockChatGPTServer, local_chrome, mock_session, close_mock_session
+
+SIZES = (1024, 10 * 1024, 100 * 1024, 1024 * 1024)
+ROUNDS = 3
+METHODS = ("legacy", "paste", "insert_text", "value")
+
+
+def prompt_of(size):
+    line = "The quick brown fox jumps over the lazy dog 0123456789.\n"
+    return (line * (size // len(line) + 1))[:size]
+
+
+def run(automation, method, prompt):
+    automation.open_new_chat()
+    if method == "legacy":
+        automation.injector = None
+        patch = mock.patch.object(PromptInjector, "LARGE_PROMPT_CHARS", float("inf"))
+    else:
+        automation.injector = PromptInjector(method=method)
+        patch = mock.patch.object(PromptInjector, "LARGE_PROMPT_CHARS", PromptInjector.LARGE_PROMPT_CHARS)
+    with patch:
+        started = time.perf_counter()
+        automation.send_prompt_to_chatgpt(prompt)
+        elapsed = time.perf_counter() - started
+    automation.wait_for_response(timeout=60)
+    sent = automation.conversation.texts()[-2]
+    return elapsed, prompt.replace("\n", "") in sent.replace("\n", "")
+
+
+def main():
+    if local_chrome() is None:
+        print("Chrome not found, skipping the prompt injection benchmark.")
+        return
+
+    with MockChatGPTServer(first_token_ms=0, stream_delay_ms=0, chunk_chars=10000, response_chars=100) as server:
+        automation = mock_session(server)
+        try:
+            print(f"{'size':>8} {'method':<12} {'ms':>9} {'MB/s':>8} {'intact':>7}")
+            for size in SIZES:
+                prompt = prompt_of(size)
+                for method in METHODS:
+                    timings, intact = [], True
+                    for _ in range(ROUNDS):
+                        try:
+                            elapsed, delivered = run(automation, method, prompt)
+                        except Exception as e:
+                            print(f"{size:>8} {method:<12} failed: {e}")
+                            intact = False
+                            break
+                        timings.append(elapsed)
+                        intact &= delivered
+                    if timings:
+                        best = min(timings)
+                        print(f"{size:>8} {method:<12} {best * 1000:>9.1f} {size / best / 2 ** 20:>8.2f} {str(intact):>7}")
+        finally:
+            close_mock_session(automation)
+
+
+if __name__ == "__main__":
+    main()
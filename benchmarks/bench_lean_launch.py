@@ -0,0 +1,73 @@
+"""
+RSS and CPU per session: the default launch against the lean profile (LeanProfile), both driving the
+offline mock ChatGPT page through the same workload (page load, PROMPTS prompts, new chat).
+
+RSS is summed over the Chrome process tree after the workload, CPU is the user + system time consumed by
+the tree during it. The default launch is made headless too so it can run on worker hosts; a headed
+Chrome costs more still.
+
+Requires a local Chrome (CHROME_PATH) and psutil.
+
+    python -m benchmarks.bench_lean_launch
+"""
+import time
+import psutil
+from chatgpt_automation.lean import LeanProfile
+from tests.mock_chatgpt import MockChatGPTServer, local_chrome, mock_session, close_mock_session
+
+PROMPTS = 10
+
+
+def tree(process):
+    processes = [process]
+    try:
+        processes += process.children(recursive=True)
+    except psutil.NoSuchProcess:
+        pass
+    return processes
+
+
+def usage(process):
+    rss = cpu = 0.0
+    count = 0
+    for child in tree(process):
+        try:
+            rss += child.memory_info().rss
+            times = child.cpu_times()
+            cpu += times.user + times.system + times.children_user + times.children_system
+            count += 1
+        except psutil.NoSuchProcess:
+            pass
+    return rss, cpu, count
+
+
+def measure(server, lean):
+    automation = mock_session(server, lean=lean)
+    try:
+        process = psutil.Process(automation.chrome_process.pid)
+        _, cpu_before, _ = usage(process)
+        started = time.perf_counter()
+        for index in range(PROMPTS):
+            automation.ask(f"Prompt {index}", timeout=60)
+        automation.open_new_chat()
+        elapsed = time.perf_counter() - started
+        rss, cpu_after, processes = usage(process)
+        return rss, cpu_after - cpu_before, processes, elapsed
+    finally:
+        close_mock_session(automation)
+
+
+def main():
+    if local_chrome() is None:
+        print("Chrome not found, skipping the lean launch benchmark.")
+        return
+
+    with MockChatGPTServer(first_token_ms=50, stream_delay_ms=10, response_chars=1000) as server:
+        print(f"{'launch':<10} {'RSS MB':>9} {'CPU s':>8} {'processes':>10} {'workload s':>11}")
+        for label, lean in (("default", None), ("lean", LeanProfile())):
+            rss, cpu, processes, elapsed = measure(server, lean)
+            print(f"{label:<10} {rss / 2 ** 20:>9.1f} {cpu:>8.2f} {processes:>10} {elapsed:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Markdown extraction of the last response: the in-page converter used by return_last_response_md
+against the previous clipboard path (click the copy button, sleep RETURN_LAST_RESPONSE_DELAY, paste).
+
+The converter is timed on the fixture corpus under node (pure conversion cost) and, when a local Chrome
+is available, through execute_script in headless Chrome (full round-trip). The previous path cannot run
+headless; its floor is the fixed delay plus three WebDriver/clipboard calls.
+
+    python -m benchmarks.bench_markdown
+"""
+import time
+import shutil
+from chatgpt_automation import scripts
+from chatgpt_automation.chatgpt_automation import ChatGPTAutomation
+from tests.test_markdown import load_corpus, run_converter
+
+REPEAT = 200
+
+
+def bench_node(corpus):
+    _, elapsed_ms = run_converter([html for _, html, _ in corpus], repeat=REPEAT)
+    print(f"{'converter under node, per response':<45} {elapsed_ms / REPEAT / len(corpus):>9.3f} ms")
+
+
+def bench_chrome(corpus):
+    from selenium import webdriver
+
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    driver = webdriver.Chrome(options=options)
+    try:
+        total = 0.0
+        for _, html, _ in corpus:
+            driver.execute_script(
+                "document.body.innerHTML = '<div class=\"text-base\">' + arguments[0] + '</div>';", html
+            )
+            start = time.perf_counter()
+            for _ in range(REPEAT // 10):
+                driver.execute_script(scripts.LAST_RESPONSE_MARKDOWN, "div.text-base")
+            total += (time.perf_counter() - start) / (REPEAT // 10)
+        print(f"{'execute_script in headless Chrome, per call':<45} {total / len(corpus) * 1000:>9.3f} ms")
+    finally:
+        driver.quit()
+
+
+def main():
+    corpus = load_corpus()
+    if shutil.which("node"):
+        bench_node(corpus)
+    else:
+        print("node not found, skipping the node timing.")
+    if ChatGPTAutomation.get_chrome_path():
+        bench_chrome(corpus)
+    else:
+        print("Chrome not found, skipping the browser timing.")
+    delay = ChatGPTAutomation.DelayTimes.RETURN_LAST_RESPONSE_DELAY
+    print(f"{'previous clipboard path, fixed delay alone':<45} {delay * 1000:>9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Overhead of the instrumentation per public method call: check_response_status() on a fake driver
+(no browser latency at all, so the overhead is as large as it can be relative to the call) without
+metrics, and with metrics recording every call and counting every WebDriver command.
+
+    python -m benchmarks.bench_metrics
+"""
+import timeit
+from chatgpt_automation.metrics import Metrics
+from tests.fakes import make_automation
+
+CALLS = 20000
+
+
+def per_call(automation):
+    return min(timeit.repeat(automation.check_response_status, number=CALLS, repeat=5)) / CALLS
+
+
+def main():
+    disabled = make_automation()
+    enabled = make_automation()
+    enabled.metrics = Metrics()
+    enabled.metrics.instrument_driver(enabled.driver)
+
+    baseline = per_call(disabled)
+    instrumented = per_call(enabled)
+    print(f"{'metrics disabled':<20} {baseline * 1e6:>8.2f} us/call")
+    print(f"{'metrics enabled':<20} {instrumented * 1e6:>8.2f} us/call "
+          f"(+{(instrumented - baseline) * 1e6:.2f} us for 2 operations and 2 commands)")
+
+
+if __name__ == "__main__":
+    main()
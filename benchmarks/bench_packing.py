@@ -0,0 +1,55 @@
+"""
+Prompt packing: PROMPTS short prompts sent one ask() at a time against PromptPacker.run() sending up to
+PACK_SIZE of them per message, in the numbered and the JSON format, on the offline mock ChatGPT page. The
+mock leaves out every SKIP-th slot of a packed answer, so the re-sent slots are part of the cost.
+
+Prints the messages sent, the slots sent again and the effective prompts per minute of each.
+
+Requires a local Chrome (CHROME_PATH).
+
+    python -m benchmarks.bench_packing
+"""
+import time
+from chatgpt_automation.packing import PromptPacker
+from tests.mock_chatgpt import MockChatGPTServer, local_chrome, mock_session, close_mock_session
+
+PROMPTS = 40
+PACK_SIZE = 20
+SKIP = 15
+
+
+def main():
+    if local_chrome() is None:
+        print("Chrome not found, skipping the prompt packing benchmark.")
+        return
+
+    prompts = [f"Sentiment of review {index}: arrived late but works fine" for index in range(PROMPTS)]
+    rows = []
+    with MockChatGPTServer(first_token_ms=300, stream_delay_ms=20, chunk_chars=40, pack_skip=SKIP) as server:
+        automation = mock_session(server)
+        try:
+            automation.open_new_chat()
+            started = time.perf_counter()
+            for prompt in prompts:
+                automation.ask(prompt, timeout=30)
+            rows.append(("one at a time", PROMPTS, 0, time.perf_counter() - started))
+
+            for fmt in ("numbered", "json"):
+                automation.open_new_chat()
+                packer = PromptPacker(max_prompts=PACK_SIZE, fmt=fmt)
+                packer.run(automation, prompts, timeout=30)
+                stats = packer.stats()
+                rows.append((f"packed {fmt}", stats["messages"], stats["requeued"], stats["seconds"]))
+        finally:
+            close_mock_session(automation)
+
+    print(f"{'method':<16} {'prompts':>8} {'messages':>9} {'requeued':>9} {'seconds':>8} {'prompts/min':>12}")
+    for name, messages, requeued, seconds in rows:
+        print(
+            f"{name:<16} {PROMPTS:>8} {messages:>9} {requeued:>9} {seconds:>8.2f} "
+            f"{PROMPTS * 60 / seconds:>12.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Latency drift over a long session: PROMPTS prompts in a single conversation against the same prompts
+with a RotationPolicy, on the offline mock ChatGPT page (responses streamed instantly, so only the cost of
+driving the page is measured).
+
+Every WINDOW prompts the mean ask() latency and the page footprint (turns, DOM nodes, JS heap) are
+printed. Without rotation they grow with the conversation; with rotation they stay flat.
+
+Requires a local Chrome (CHROME_PATH).
+
+    python -m benchmarks.bench_rotation
+"""
+import time
+from chatgpt_automation.rotation import RotationPolicy
+from tests.mock_chatgpt import MockChatGPTServer, local_chrome, mock_session, close_mock_session
+
+PROMPTS = 600
+WINDOW = 100
+
+
+def run(server, rotation):
+    automation = mock_session(server, rotation=rotation)
+    try:
+        started = time.perf_counter()
+        for index in range(1, PROMPTS + 1):
+            automation.ask(f"Prompt {index}", timeout=30)
+            if index % WINDOW == 0:
+                elapsed = time.perf_counter() - started
+                footprint = automation.page_footprint()
+                heap = footprint["heap_mb"]
+                print(
+                    f"{'rotation' if rotation else 'single':<10} {index:>7} {elapsed / WINDOW * 1000:>10.1f} "
+                    f"{footprint['turns']:>6} {footprint['dom_nodes']:>9} "
+                    f"{heap if heap is not None else float('nan'):>8.1f} {automation.rotations:>9}"
+                )
+                started = time.perf_counter()
+    finally:
+        close_mock_session(automation)
+
+
+def main():
+    if local_chrome() is None:
+        print("Chrome not found, skipping the rotation benchmark.")
+        return
+
+    with MockChatGPTServer(first_token_ms=0, stream_delay_ms=0, chunk_chars=10000, response_chars=1000) as server:
+        print(f"{'mode':<10} {'prompts':>7} {'ms/ask':>10} {'turns':>6} {'DOM nodes':>9} {'heap MB':>8} {'rotations':>9}")
+        run(server, None)
+        run(server, RotationPolicy(max_turns=2 * WINDOW))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Session start-up cost, step by step:
+
+- ChromeDriver resolution: ChromeDriverManager().install() against the on-disk cache.
+- Chrome launch until the DevTools endpoint answers (previously a fixed CONSTRUCTOR_DELAY sleep).
+- Attaching WebDriver to the running browser, i.e. the whole cost of attach_or_launch on a warm port.
+
+Requires a local Chrome. A throw-away profile is used.
+
+    python -m benchmarks.bench_startup
+"""
+import time
+import shutil
+import tempfile
+from chatgpt_automation.chatgpt_automation import ChatGPTAutomation
+from chatgpt_automation.driver_cache import resolve_chrome_driver
+
+
+def timed(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<45} {(time.perf_counter() - start) * 1000:>9.1f} ms")
+    return result
+
+
+def main():
+    chrome_path = ChatGPTAutomation.get_chrome_path()
+    if chrome_path is None:
+        print("Chrome not found, skipping the start-up benchmark.")
+        return
+
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    timed("ChromeDriverManager().install()", lambda: ChromeDriverManager().install())
+    resolve_chrome_driver(chrome_path)
+    driver_path = timed("resolve_chrome_driver (cached)", lambda: resolve_chrome_driver(chrome_path))
+
+    profile_dir = tempfile.mkdtemp()
+    automation = ChatGPTAutomation.__new__(ChatGPTAutomation)
+    automation.chrome_path = chrome_path
+    automation.chrome_driver_path = driver_path
+    automation.user_data = {"path": profile_dir, "profile": "Default"}
+    port = automation.find_available_port()
+    try:
+        timed(
+            "launch Chrome until DevTools answers",
+            lambda: automation.launch_chrome_with_remote_debugging(port, "about:blank"),
+        )
+        driver = timed("attach WebDriver (warm port)", lambda: automation.setup_webdriver(port))
+        driver.quit()
+        print(f"{'previous fixed CONSTRUCTOR_DELAY':<45} {ChatGPTAutomation.DelayTimes.CONSTRUCTOR_DELAY * 1000:>9.1f} ms")
+    finally:
+        if automation.chrome_process:
+            automation.chrome_process.terminate()
+            automation.chrome_process.wait()
+        shutil.rmtree(profile_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
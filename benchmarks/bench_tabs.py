@@ -0,0 +1,79 @@
+"""
+Throughput per GB of RAM: K conversations as K tabs of one Chrome (TabMultiplexer) against K Chrome
+processes (ChatGPTSessionPool), both driving the offline mock ChatGPT page through PROMPTS_PER_SESSION
+prompts per conversation.
+
+RSS is summed over the Chrome process trees once the workload is done. The mock answers with a fixed
+time to first token and streaming rate, so the comparison isolates the cost of driving several
+conversations from one WebDriver session against running one browser per conversation.
+
+Requires a local Chrome (CHROME_PATH) and psutil.
+
+    python -m benchmarks.bench_tabs
+"""
+import time
+import psutil
+from chatgpt_automation.session_pool import ChatGPTSessionPool
+from chatgpt_automation.tabs import BACKGROUND_TAB_ARGS, TabMultiplexer
+from benchmarks.bench_lean_launch import usage
+from tests.mock_chatgpt import MockChatGPTServer, local_chrome, mock_session, close_mock_session
+
+CONVERSATIONS = (1, 2, 4, 8)
+PROMPTS_PER_SESSION = 5
+
+
+def run_tabs(server, conversations):
+    automation = mock_session(server, chrome_args=BACKGROUND_TAB_ARGS)
+    try:
+        multiplexer = TabMultiplexer(tabs=conversations, automation=automation, timeout=60)
+        prompts = [f"Prompt {index}" for index in range(conversations * PROMPTS_PER_SESSION)]
+        started = time.perf_counter()
+        list(multiplexer.map(prompts))
+        elapsed = time.perf_counter() - started
+        rss = usage(psutil.Process(automation.chrome_process.pid))[0]
+        multiplexer.shutdown()
+        return elapsed, rss
+    finally:
+        close_mock_session(automation)
+
+
+def run_processes(server, conversations):
+    sessions = []
+
+    def factory(user_data):
+        sessions.append(mock_session(server))
+        return sessions[-1]
+
+    try:
+        pool = ChatGPTSessionPool([{}] * conversations, session_factory=factory, timeout=60)
+        prompts = [f"Prompt {index}" for index in range(conversations * PROMPTS_PER_SESSION)]
+        started = time.perf_counter()
+        list(pool.map(prompts))
+        elapsed = time.perf_counter() - started
+        rss = sum(usage(psutil.Process(session.chrome_process.pid))[0] for session in sessions)
+        pool.shutdown()
+        return elapsed, rss
+    finally:
+        for session in sessions:
+            close_mock_session(session)
+
+
+def main():
+    if local_chrome() is None:
+        print("Chrome not found, skipping the tab multiplexing benchmark.")
+        return
+
+    with MockChatGPTServer(first_token_ms=500, stream_delay_ms=20, response_chars=400) as server:
+        print(f"{'mode':<10} {'K':>3} {'RSS MB':>9} {'prompts/min':>12} {'prompts/min/GB':>15}")
+        for conversations in CONVERSATIONS:
+            for label, run in (("processes", run_processes), ("tabs", run_tabs)):
+                elapsed, rss = run(server, conversations)
+                throughput = conversations * PROMPTS_PER_SESSION * 60 / elapsed
+                print(
+                    f"{label:<10} {conversations:>3} {rss / 2 ** 20:>9.1f} {throughput:>12.1f} "
+                    f"{throughput / (rss / 2 ** 30):>15.1f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
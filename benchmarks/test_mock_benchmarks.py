@@ -0,0 +1,151 @@
+"""
+Benchmarks of every public ChatGPTAutomation method against the offline mock ChatGPT page, with
+pytest-benchmark. The mock streams with fixed, known timings, so the numbers measure the overhead of
+the library (round-trips, polling, sleeps) rather than the model.
+
+- startup: constructor on a fresh profile, and attach_or_launch on a warm port.
+- round-trip: ask(), send_prompt_to_chatgpt() + wait_for_response(), time to first token via iter_ask().
+- polling: one check_response_status() / return_last_response() call on a long conversation.
+- export: return_chatgpt_conversation(), save_conversation() in every format, return_last_response_md().
+- navigation: open_new_chat(), del_current_chat(), upload_file_for_prompt().
+
+Requires a local Chrome (CHROME_PATH) and pytest-benchmark; skipped otherwise.
+
+    python -m pytest benchmarks/test_mock_benchmarks.py --benchmark-columns=min,median,max,rounds
+"""
+import os
+import time
+import pytest
+from tests.mock_chatgpt import MockChatGPTServer, local_chrome, mock_session, close_mock_session
+from chatgpt_automation.chatgpt_automation import ChatGPTAutomation
+
+pytest.importorskip("pytest_benchmark")
+pytestmark = pytest.mark.skipif(local_chrome() is None, reason="requires a local Chrome (set CHROME_PATH)")
+
+CONVERSATION_TURNS = 50
+TIMINGS = {"first_token_ms": 50, "stream_delay_ms": 10, "chunk_chars": 20, "response_chars": 400}
+
+
+@pytest.fixture(scope="module")
+def server():
+    with MockChatGPTServer(**TIMINGS) as server:
+        yield server
+
+
+@pytest.fixture(scope="module")
+def session(server):
+    automation = mock_session(server)
+    yield automation
+    close_mock_session(automation)
+
+
+@pytest.fixture(scope="module")
+def long_conversation(server, session):
+    """
+    A conversation of CONVERSATION_TURNS prompts, streamed instantly.
+    """
+    server.configure(first_token_ms=0, stream_delay_ms=0, chunk_chars=10000)
+    session.open_new_chat()
+    for index in range(CONVERSATION_TURNS):
+        session.ask(f"Prompt number {index}", timeout=30)
+    server.configure(**TIMINGS)
+    return session
+
+
+@pytest.fixture
+def new_chat(session):
+    session.open_new_chat()
+    return session
+
+
+def test_constructor(benchmark, server):
+    benchmark.pedantic(lambda: close_mock_session(mock_session(server)), rounds=3)
+
+
+def test_attach_or_launch_warm_port(benchmark, session):
+    def attach():
+        attached = ChatGPTAutomation.attach_or_launch(
+            session.user_data,
+            session.port,
+            chrome_path=session.chrome_path,
+            chrome_driver_path=session.chrome_driver_path,
+            url=session.url,
+        )
+        attached.driver.quit()
+
+    benchmark.pedantic(attach, rounds=5)
+
+
+def test_ask_round_trip(benchmark, new_chat):
+    benchmark.pedantic(lambda: new_chat.ask("Benchmark prompt", timeout=30), rounds=10)
+
+
+def test_send_and_wait_round_trip(benchmark, new_chat):
+    def send_and_wait():
+        new_chat.send_prompt_to_chatgpt("Benchmark prompt")
+        new_chat.wait_for_response(timeout=30)
+
+    benchmark.pedantic(send_and_wait, rounds=10)
+
+
+def test_time_to_first_token(benchmark, new_chat):
+    def first_token():
+        started = time.perf_counter()
+        deltas = new_chat.iter_ask("Benchmark prompt", timeout=30)
+        next(deltas)
+        elapsed = time.perf_counter() - started
+        for _ in deltas:
+            pass
+        return elapsed
+
+    benchmark.extra_info["mock_first_token_ms"] = TIMINGS["first_token_ms"]
+    benchmark.pedantic(first_token, rounds=10)
+
+
+def test_check_response_status(benchmark, long_conversation):
+    assert benchmark(long_conversation.check_response_status)
+
+
+def test_return_last_response(benchmark, long_conversation):
+    assert benchmark(long_conversation.return_last_response)
+
+
+def test_return_chatgpt_conversation(benchmark, long_conversation):
+    long_conversation.conversation.reset()
+    result = benchmark(long_conversation.return_chatgpt_conversation)
+    assert len(result) == CONVERSATION_TURNS
+
+
+def test_return_last_response_md(benchmark, long_conversation):
+    assert benchmark(long_conversation.return_last_response_md)
+
+
+@pytest.mark.parametrize("fmt", ["text", "jsonl", "markdown"])
+def test_save_conversation(benchmark, long_conversation, tmp_path, monkeypatch, fmt):
+    monkeypatch.chdir(tmp_path)
+    count = benchmark(long_conversation.save_conversation, f"export.{fmt}", fmt)
+    assert count == 2 * CONVERSATION_TURNS
+    benchmark.extra_info["turns"] = count
+    benchmark.extra_info["bytes"] = os.path.getsize(os.path.join("conversations", f"export.{fmt}"))
+
+
+def test_open_new_chat(benchmark, session):
+    benchmark.pedantic(session.open_new_chat, rounds=10)
+
+
+def test_del_current_chat(benchmark, server, session):
+    def setup():
+        server.configure(first_token_ms=0, stream_delay_ms=0, chunk_chars=10000)
+        session.open_new_chat()
+        session.ask("Chat to delete", timeout=30)
+        server.configure(**TIMINGS)
+
+    benchmark.pedantic(session.del_current_chat, setup=setup, rounds=5)
+
+
+def test_upload_file_for_prompt(benchmark, new_chat, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "attachment.txt").write_text("attachment")
+    benchmark.pedantic(
+        new_chat.upload_file_for_prompt, args=("attachment.txt",), setup=new_chat.open_new_chat, rounds=5
+    )
@@ -0,0 +1,4 @@
+import logging
+
+# The application decides where the records go, see logs.configure_logging()
+logging.getLogger(__name__).addHandler(logging.NullHandler())
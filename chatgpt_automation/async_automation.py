@@ -0,0 +1,236 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import WebDriverException
+from .chatgpt_automation import ChatGPTAutomation
+from .readiness import async_wait_until, element_absent, element_clickable
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncChatGPTAutomation:
+    """
+    asyncio front-end for ChatGPTAutomation.
+
+    Every WebDriver command runs on a single worker thread dedicated to this session (a WebDriver session
+    must not be used from several threads at once), and every wait is an awaitable readiness condition.
+    The worker thread is therefore only busy for the duration of individual commands, never for sleeps,
+    and one event loop can drive many sessions concurrently.
+
+    Example:
+        bot = await AsyncChatGPTAutomation.create(user_data=user_data)
+        await bot.send_prompt_to_chatgpt("Hello, ChatGPT!")
+        await bot.wait_for_response()
+        print(await bot.return_last_response())
+    """
+
+    def __init__(self, automation, executor=None):
+        """
+        Wraps an existing ChatGPTAutomation instance.
+
+        :param automation: The synchronous ChatGPTAutomation session to drive.
+        :param executor: Executor running the WebDriver commands. Defaults to a dedicated single thread.
+        """
+        self.automation = automation
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="chatgpt-automation"
+        )
+        self.Timeouts = automation.Timeouts
+
+    @classmethod
+    async def create(cls, *args, **kwargs):
+        """
+        Launches Chrome and constructs the underlying ChatGPTAutomation without blocking the event loop.
+        Takes the same arguments as ChatGPTAutomation.
+        """
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chatgpt-automation")
+        loop = asyncio.get_running_loop()
+        automation = await loop.run_in_executor(
+            executor, lambda: ChatGPTAutomation(*args, **kwargs)
+        )
+        return cls(automation, executor)
+
+    @property
+    def driver(self):
+        return self.automation.driver
+
+    async def _call(self, func, *args):
+        """
+        Runs a blocking callable on the session's worker thread.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, lambda: func(*args))
+
+    async def wait_for(self, condition, timeout, message=""):
+        """
+        Awaits a readiness condition, evaluating it on the session's worker thread.
+
+        Raises:
+            ReadinessTimeout: If the condition does not hold within the timeout.
+        """
+        return await async_wait_until(
+            condition,
+            timeout,
+            message=message,
+            max_interval=self.Timeouts.MAX_POLL_INTERVAL,
+            executor=self.executor,
+        )
+
+    async def send_prompt_to_chatgpt(self, prompt):
+        """
+        Async equivalent of ChatGPTAutomation.send_prompt_to_chatgpt.
+
+        Raises:
+            WebDriverException: If there is an issue interacting with the web elements or sending the prompt.
+        """
+        throttle = self.automation.throttle
+        while throttle is not None:
+            # Wait for message budget without holding the session's worker thread
+            wait = throttle.try_acquire(self.automation._account(), self.automation.model)
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait)
+        try:
+            # Admitted above: rotation, chat cleanup and the turn count are shared with the sync front-end
+            turn_count = await self._call(self.automation._start_prompt, prompt, False)
+            await self.wait_for(
+                self.automation._prompt_accepted(turn_count),
+                self.Timeouts.SEND_PROMPT_TIMEOUT,
+                "prompt accepted",
+            )
+        except NoSuchElementException:
+            if await self._call(self.automation.check_message_sent):
+                return
+            logger.error(
+                "Send message button does not found. if you see this error please create an issue in github!"
+            )
+            raise
+        except Exception as e:
+            logger.error(f"Failed to send prompt to ChatGPT: {e}")
+            raise WebDriverException(f"Error sending prompt to ChatGPT: {e}")
+
+    async def check_response_status(self):
+        """
+        Async equivalent of ChatGPTAutomation.check_response_status.
+        """
+        return await self._call(self.automation.check_response_status)
+
+    async def wait_for_response(self, timeout=None):
+        """
+        Awaits until the response to the last prompt is complete.
+
+        Raises:
+            ReadinessTimeout: If the response is not complete within the timeout.
+        """
+        if timeout is None:
+            timeout = self.Timeouts.RESPONSE_TIMEOUT
+        return await self.wait_for(
+            self.automation.check_response_status, timeout, "response complete"
+        )
+
+    async def return_last_response(self):
+        """
+        Async equivalent of ChatGPTAutomation.return_last_response.
+        """
+        return await self._call(self.automation.return_last_response)
+
+    async def upload_file_for_prompt(self, file_name):
+        """
+        Async equivalent of ChatGPTAutomation.upload_file_for_prompt.
+
+        Raises:
+            FileNotFoundError: If the specified file does not exist in the current working directory.
+            WebDriverException: If there is an issue interacting with the file upload element on the web page.
+        """
+        await self.upload_files_for_prompt([file_name])
+
+    async def upload_files_for_prompt(self, paths):
+        """
+        Async equivalent of ChatGPTAutomation.upload_files_for_prompt.
+
+        Raises:
+            FileNotFoundError: If one of the files does not exist; nothing is uploaded then.
+            WebDriverException: If there is an issue interacting with the file upload element on the web page,
+                                or if the upload of a file failed.
+        """
+        try:
+            chip_count, uploads, results = await self._call(self.automation._start_file_upload, paths)
+            if not uploads:
+                return results
+            states = await self.wait_for(
+                self.automation._uploads_settled(chip_count, len(uploads)),
+                self.Timeouts.UPLOAD_FILE_TIMEOUT,
+                "file upload finished",
+            )
+            return self.automation._finish_file_upload(uploads, states, results)
+        except FileNotFoundError as e:
+            logger.error(f"File not found for upload: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Failed to upload file to ChatGPT: {e}")
+            raise WebDriverException(f"Error uploading file to ChatGPT: {e}")
+
+    async def open_new_chat(self):
+        """
+        Async equivalent of ChatGPTAutomation.open_new_chat.
+
+        Raises:
+            WebDriverException: If there is an issue navigating to the ChatGPT page.
+        """
+        try:
+            await self._call(self.automation._load_new_chat)
+            await self.wait_for(
+                self.automation._page_ready(),
+                self.Timeouts.OPEN_NEW_CHAT_TIMEOUT,
+                "new chat ready",
+            )
+            print("New chat opened")
+        except Exception as e:
+            logger.error(f"Failed to open new chat: {e}")
+            raise WebDriverException(f"Error opening new chat: {e}")
+
+    async def del_current_chat(self):
+        """
+        Async equivalent of ChatGPTAutomation.del_current_chat. Falls back to opening a new chat
+        if the delete controls cannot be found.
+
+        Raises:
+            WebDriverException: If there are issues in deleting the chat or in navigating to start a new chat.
+        """
+        try:
+            elements = self.automation.elements
+            for locator in (
+                elements.locator("FIRST_DELETE_BTN"),
+                elements.locator("SECOND_DELETE_BTN"),
+                elements.locator("THIRD_DELETE_BTN"),
+            ):
+                button = await self.wait_for(
+                    element_clickable(self.driver, locator),
+                    self.Timeouts.DEL_CURRENT_CHAT_TIMEOUT,
+                    f"{locator[1]} clickable",
+                )
+                await self._call(button.click)
+
+            await self.wait_for(
+                element_absent(self.driver, elements.locator("THIRD_DELETE_BTN")),
+                self.Timeouts.DEL_CURRENT_CHAT_TIMEOUT,
+                "chat deleted",
+            )
+            print("Current chat deleted")
+
+        except TimeoutException:
+            print("Timeout: Elements not found within the specified time.")
+            await self.open_new_chat()
+
+        except Exception as e:
+            logger.error(f"Error encountered while deleting chat: {e}")
+            await self.open_new_chat()
+
+    async def quit(self):
+        """
+        Closes the browser, terminates the WebDriver session and stops the worker thread.
+        """
+        await self._call(self.automation.quit)
+        self.executor.shutdown(wait=False)
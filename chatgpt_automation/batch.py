@@ -0,0 +1,382 @@
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+from selenium.common.exceptions import WebDriverException
+from .logs import DEFAULT_LOG_FILE, configure_logging
+from .packing import FORMATS, PromptPacker
+
+logger = logging.getLogger(__name__)
+
+
+class BatchStats:
+    """
+    Running statistics of a batch. Latencies are kept in a fixed-size reservoir sample, so memory stays
+    bounded however many rows are processed.
+    """
+
+    RESERVOIR_SIZE = 10000
+
+    def __init__(self):
+        self.rows = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.retries = 0
+        self.skipped = 0
+        self.messages = 0
+        self.packed = 0
+        self.requeued = 0
+        self.started_at = time.monotonic()
+        self.latencies = []
+
+    def record(self, latency, retries, succeeded):
+        self.rows += 1
+        self.retries += retries
+        if succeeded:
+            self.succeeded += 1
+        else:
+            self.failed += 1
+        if len(self.latencies) < self.RESERVOIR_SIZE:
+            self.latencies.append(latency)
+        else:
+            slot = random.randrange(self.rows)
+            if slot < self.RESERVOIR_SIZE:
+                self.latencies[slot] = latency
+
+    def percentile(self, percent):
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(int(round(percent / 100 * (len(ordered) - 1))), len(ordered) - 1)
+        return ordered[index]
+
+    def summary(self):
+        elapsed = time.monotonic() - self.started_at
+        return {
+            "rows": self.rows,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "retries": self.retries,
+            "messages": self.messages,
+            "packed": self.packed,
+            "requeued": self.requeued,
+            "elapsed": elapsed,
+            "throughput_per_minute": self.rows * 60 / elapsed if elapsed else 0.0,
+            "latency_p50": self.percentile(50),
+            "latency_p90": self.percentile(90),
+            "latency_p99": self.percentile(99),
+        }
+
+
+class BatchRunner:
+    """
+    Streams prompts from a JSONL file through a ChatGPT session and appends the results to a JSONL file.
+
+    Each input line is an object with a "prompt" and optionally an "id" and a list of "attachments"
+    (file paths passed to ask(), which uploads them before the prompt is sent). A plain JSON string is
+    accepted as a prompt as well. Each output line holds the id, the input line number, the response or
+    error, the latency and the number of retries.
+
+    The input is read one line at a time and every result is flushed to disk as soon as it is available.
+    After each row a checkpoint with the input offset is written atomically, so a crashed run can be
+    resumed without re-sending the prompts that already completed.
+
+    With a PromptPacker, consecutive rows without attachments are sent several to a message (see
+    packing.PromptPacker); the rows whose answer is missing from the packed response are sent again on
+    their own. The checkpoint then advances once the results of a whole pack are written.
+    """
+
+    def __init__(self, session, input_path, output_path, max_retries=2, timeout=None, packer=None):
+        """
+        :param session: ChatGPTAutomation, or any object with a compatible ask() method.
+        :param input_path: Path of the JSONL prompt file.
+        :param output_path: Path of the JSONL result file. Results are appended to it.
+        :param max_retries: Number of times a failed prompt is retried before its error is recorded.
+        :param timeout: Per-prompt timeout passed to ask(). Defaults to the session's own timeout.
+        :param packer: Optional PromptPacker sending several rows per message.
+        """
+        self.session = session
+        self.input_path = input_path
+        self.output_path = output_path
+        self.checkpoint_path = f"{output_path}.checkpoint"
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.packer = packer
+        self.stats = BatchStats()
+
+    def run(self):
+        """
+        Processes every row not yet recorded in the checkpoint.
+
+        Returns:
+            dict: Summary with row counts, retries, throughput and latency percentiles.
+        """
+        line_number, offset = self._resume()
+        with open(self.input_path, "rb") as source, open(
+            self.output_path, "a", encoding="utf8"
+        ) as sink:
+            source.seek(offset)
+            # Rows waiting to be sent as one message: (line number, row, offset after the row)
+            pending = []
+            while True:
+                raw = source.readline()
+                if not raw:
+                    break
+                line_number += 1
+                offset += len(raw)
+                if not raw.strip():
+                    self.stats.skipped += 1
+                    if not pending:
+                        self._write_checkpoint(line_number, offset)
+                    continue
+                row = self._packable(raw)
+                if row is not None:
+                    prompts = [item[1]["prompt"] for item in pending] + [row["prompt"]]
+                    if not self.packer.fits(prompts):
+                        self._flush(pending, sink)
+                    pending.append((line_number, row, offset))
+                    continue
+                # Results are written in input order, for _resume()
+                self._flush(pending, sink)
+                self._write(sink, self._process(line_number, raw))
+                self._write_checkpoint(line_number, offset)
+            self._flush(pending, sink)
+            self._write_checkpoint(line_number, offset)
+
+        summary = self.stats.summary()
+        with open(f"{self.output_path}.stats.json", "w", encoding="utf8") as file:
+            json.dump(summary, file, indent=2)
+        return summary
+
+    def _write(self, sink, result):
+        sink.write(json.dumps(result, ensure_ascii=False) + "\n")
+        sink.flush()
+        os.fsync(sink.fileno())
+
+    def _packable(self, raw):
+        """
+        Returns the row of an input line that can share a message with other rows: a prompt without
+        attachments that fits in a message. None without a packer.
+        """
+        if self.packer is None:
+            return None
+        try:
+            row = json.loads(raw)
+        except ValueError:
+            return None
+        if isinstance(row, str):
+            row = {"prompt": row}
+        if not isinstance(row, dict) or not isinstance(row.get("prompt"), str) or row.get("attachments"):
+            return None
+        if not self.packer.fits([row["prompt"], ""]):
+            return None
+        return row
+
+    def _flush(self, pending, sink):
+        """
+        Sends the pending rows as one message and writes their results. The rows missing from the response
+        (or all of them, if the message fails) are sent again one at a time.
+        """
+        if not pending:
+            return
+        rows = list(pending)
+        pending.clear()
+        started = time.monotonic()
+        if len(rows) == 1:
+            answers = [None]
+        else:
+            try:
+                self.stats.messages += 1
+                prompts = [row["prompt"] for _, row, _ in rows]
+                answers = self.packer.ask_pack(self.session, prompts, timeout=self.timeout)
+            except (WebDriverException, RuntimeError) as e:
+                logger.warning(f"Pack of {len(rows)} rows failed ({e}), sending them one at a time")
+                answers = [None] * len(rows)
+        latency = time.monotonic() - started
+        for (line_number, row, offset), answer in zip(rows, answers):
+            if answer is None:
+                if len(rows) > 1:
+                    self.stats.requeued += 1
+                result = self._ask(line_number, row, started)
+            else:
+                self.stats.packed += 1
+                self.stats.record(latency, 0, succeeded=True)
+                result = {"id": row.get("id", line_number), "line": line_number, "response": answer, "error": None,
+                          "latency": latency, "retries": 0}
+            self._write(sink, result)
+            self._write_checkpoint(line_number, offset)
+
+    def _process(self, line_number, raw):
+        try:
+            row = json.loads(raw)
+        except ValueError as e:
+            logger.error(f"Invalid JSON on line {line_number} of {self.input_path}: {e}")
+            self.stats.record(0.0, 0, succeeded=False)
+            return {"id": None, "line": line_number, "response": None, "error": f"Invalid JSON: {e}",
+                    "latency": 0.0, "retries": 0}
+        if isinstance(row, str):
+            row = {"prompt": row}
+        if not isinstance(row, dict):
+            return self._invalid(line_number, None, f"expected an object or a string, got {type(row).__name__}")
+        if "prompt" not in row:
+            return self._invalid(line_number, row.get("id", line_number), 'missing "prompt"')
+        if not isinstance(row["prompt"], str):
+            return self._invalid(
+                line_number, row.get("id", line_number), f'"prompt" must be a string, got {type(row["prompt"]).__name__}'
+            )
+        return self._ask(line_number, row, time.monotonic())
+
+    def _invalid(self, line_number, row_id, reason):
+        """
+        Records a row that cannot be sent as failed and returns its result.
+        """
+        logger.error(f"Invalid row on line {line_number} of {self.input_path}: {reason}")
+        self.stats.record(0.0, 0, succeeded=False)
+        return {"id": row_id, "line": line_number, "response": None, "error": f"Invalid row: {reason}",
+                "latency": 0.0, "retries": 0}
+
+    def _ask(self, line_number, row, started):
+        """
+        Sends the prompt of a row on its own, retrying up to max_retries times, and returns its result.
+        """
+        row_id = row.get("id", line_number)
+        retries = 0
+        while True:
+            try:
+                self.stats.messages += 1
+                response = self.session.ask(
+                    row["prompt"], timeout=self.timeout, attachments=row.get("attachments")
+                )
+                error = None
+                break
+            except (WebDriverException, RuntimeError) as e:
+                if retries >= self.max_retries:
+                    logger.error(f"Prompt {row_id} failed after {retries} retries: {e}")
+                    response, error = None, str(e)
+                    break
+                retries += 1
+                logger.warning(f"Prompt {row_id} failed ({e}), retrying ({retries}/{self.max_retries})")
+            except (KeyError, FileNotFoundError) as e:
+                logger.error(f"Invalid row {row_id}: {e}")
+                response, error = None, f"Invalid row: {e!r}"
+                break
+
+        latency = time.monotonic() - started
+        self.stats.record(latency, retries, succeeded=error is None)
+        return {"id": row_id, "line": line_number, "response": response, "error": error,
+                "latency": latency, "retries": retries}
+
+    def _resume(self):
+        """
+        Returns the (line number, byte offset) to resume from. A result written after the last checkpoint
+        (crash between the two writes) advances the checkpoint, and a partially written result line is
+        removed, so no prompt is sent twice and the output stays valid JSONL.
+        """
+        try:
+            with open(self.checkpoint_path, encoding="utf8") as file:
+                checkpoint = json.load(file)
+            line_number, offset = checkpoint["line"], checkpoint["offset"]
+        except (OSError, ValueError, KeyError):
+            line_number, offset = 0, 0
+
+        last = self._repair_output()
+        if last is not None and last.get("line", 0) > line_number:
+            with open(self.input_path, "rb") as source:
+                source.seek(offset)
+                while line_number < last["line"]:
+                    raw = source.readline()
+                    if not raw:
+                        break
+                    line_number += 1
+                    offset += len(raw)
+            self._write_checkpoint(line_number, offset)
+
+        if line_number:
+            logger.info(f"Resuming {self.input_path} after line {line_number}")
+        return line_number, offset
+
+    def _repair_output(self):
+        """
+        Truncates a partially written last line of the output and returns the last complete result.
+        """
+        if not os.path.exists(self.output_path):
+            return None
+        with open(self.output_path, "rb+") as file:
+            size = file.seek(0, os.SEEK_END)
+            position = size
+            tail = b""
+            while position > 0 and tail.count(b"\n") < 2:
+                step = min(4096, position)
+                position -= step
+                file.seek(position)
+                tail = file.read(step) + tail
+            if tail and not tail.endswith(b"\n"):
+                keep = tail.rfind(b"\n") + 1
+                file.truncate(position + keep)
+                tail = tail[:keep]
+        lines = tail.rstrip(b"\n").split(b"\n")
+        try:
+            return json.loads(lines[-1]) if lines[-1] else None
+        except ValueError:
+            return None
+
+    def _write_checkpoint(self, line_number, offset):
+        temp_path = f"{self.checkpoint_path}.tmp"
+        with open(temp_path, "w", encoding="utf8") as file:
+            json.dump({"line": line_number, "offset": offset}, file)
+        os.replace(temp_path, self.checkpoint_path)
+
+
+def main(argv=None):
+    """
+    Command line entry point: chatgpt-automation-batch INPUT OUTPUT --profile-path PATH [options]
+    """
+    parser = argparse.ArgumentParser(
+        description="Send the prompts of a JSONL file to ChatGPT and write the responses to a JSONL file."
+    )
+    parser.add_argument("input", help="JSONL file with one prompt per line")
+    parser.add_argument("output", help="JSONL file the results are appended to")
+    parser.add_argument("--profile-path", required=True, help="Chrome user-data-dir")
+    parser.add_argument("--profile", default="Default", help="Chrome profile directory")
+    parser.add_argument("--chrome-path", help="Path of the Chrome executable")
+    parser.add_argument("--chrome-driver-path", help="Path of the ChromeDriver executable")
+    parser.add_argument("--port", type=int, help="Remote debugging port to attach to or launch on")
+    parser.add_argument("--timeout", type=float, help="Per-prompt timeout in seconds")
+    parser.add_argument("--max-retries", type=int, default=2, help="Retries per failed prompt")
+    parser.add_argument("--lean", action="store_true", help="Launch a headless, resource-lean Chrome")
+    parser.add_argument("--log-file", default=DEFAULT_LOG_FILE, help="File the log is appended to")
+    parser.add_argument("--pack-size", type=int, default=0, help="Prompts packed per message (0: no packing)")
+    parser.add_argument("--pack-chars", type=int, default=6000, help="Characters per packed message")
+    parser.add_argument("--pack-format", choices=FORMATS, default="numbered", help="Slots of a packed message")
+    args = parser.parse_args(argv)
+
+    from .chatgpt_automation import ChatGPTAutomation
+
+    configure_logging(args.log_file)
+
+    session = ChatGPTAutomation(
+        user_data={"path": args.profile_path, "profile": args.profile},
+        chrome_path=args.chrome_path,
+        chrome_driver_path=args.chrome_driver_path,
+        port=args.port,
+        lean=args.lean,
+    )
+    try:
+        packer = None
+        if args.pack_size > 1:
+            packer = PromptPacker(max_prompts=args.pack_size, max_chars=args.pack_chars, fmt=args.pack_format)
+        runner = BatchRunner(session, args.input, args.output, args.max_retries, args.timeout, packer=packer)
+        summary = runner.run()
+    finally:
+        session.quit()
+    json.dump(summary, sys.stdout, indent=2)
+    print()
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
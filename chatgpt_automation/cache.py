@@ -0,0 +1,259 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_prompt(prompt):
+    """
+    Normalizes a prompt for hashing: Unicode NFC, line endings as "\n" and surrounding whitespace removed,
+    so trivially different spellings of the same prompt share a cache entry. Inner whitespace is kept, since
+    indentation and spacing can change the answer (code, tables, poems).
+    """
+    prompt = unicodedata.normalize("NFC", prompt)
+    return prompt.replace("\r\n", "\n").replace("\r", "\n").strip()
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """
+    Returns the SHA-256 hex digest of a file, read in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def prompt_key(prompt, model=None, attachment_hashes=()):
+    """
+    Returns the cache key of a prompt: a SHA-256 over the normalized prompt, the selected model and
+    the content hashes of the attached files (order independent).
+    """
+    material = json.dumps(
+        [normalize_prompt(prompt), model, sorted(attachment_hashes)], ensure_ascii=False
+    )
+    return hashlib.sha256(material.encode("utf8")).hexdigest()
+
+
+class MemoryLRUCache:
+    """
+    In-memory LRU tier with an optional time-to-live.
+    """
+
+    def __init__(self, max_entries=1024, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, created = entry
+            if self.ttl is not None and time.time() - created > self.ttl:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def put(self, key, value, created=None):
+        with self.lock:
+            self.entries[key] = (value, created or time.time())
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class SQLiteCache:
+    """
+    On-disk tier stored in a SQLite database, with a time-to-live and a size limit. When the stored
+    responses exceed max_bytes, the least recently used entries are evicted.
+    """
+
+    def __init__(self, path, ttl=None, max_bytes=256 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL, "
+                "accessed REAL NOT NULL, size INTEGER NOT NULL)"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)"
+            )
+
+    def get(self, key):
+        """
+        Returns (value, created) for a live entry, or None.
+        """
+        now = time.time()
+        with self.lock, self.connection:
+            row = self.connection.execute(
+                "SELECT value, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if self.ttl is not None and now - row[1] > self.ttl:
+                self.connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self.connection.execute(
+                "UPDATE responses SET accessed = ? WHERE key = ?", (now, key)
+            )
+            return row
+
+    def put(self, key, value):
+        now = time.time()
+        size = len(value.encode("utf8"))
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created, accessed, size) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, now, now, size),
+            )
+            self._evict(now)
+
+    def _evict(self, now):
+        if self.ttl is not None:
+            self.connection.execute(
+                "DELETE FROM responses WHERE created < ?", (now - self.ttl,)
+            )
+        total = self.connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        freed = 0
+        evicted = []
+        for key, size in self.connection.execute(
+            "SELECT key, size FROM responses ORDER BY accessed"
+        ):
+            evicted.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self.connection.executemany("DELETE FROM responses WHERE key = ?", evicted)
+        logger.info(f"Evicted {len(evicted)} cached responses ({freed} bytes)")
+
+    def clear(self):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM responses")
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    def __len__(self):
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+
+class PromptCache:
+    """
+    Two-tier prompt-response cache placed in front of the send-and-wait path of ChatGPTAutomation.ask().
+
+    Lookups go to the in-memory LRU tier first, then to the optional on-disk SQLite tier (a disk hit is
+    promoted to memory). Every hit saves one browser round-trip; stats() reports the counters.
+
+    Example:
+        cache = PromptCache(path="~/.cache/chatgpt_automation/responses.sqlite", ttl=24 * 3600)
+        chat_bot = ChatGPTAutomation(user_data=user_data, cache=cache)
+    """
+
+    def __init__(self, memory_entries=1024, path=None, ttl=None, max_bytes=256 * 1024 * 1024):
+        """
+        :param memory_entries: Maximum number of responses kept in memory.
+        :param path: Path of the SQLite database of the disk tier. No disk tier if None.
+        :param ttl: Time-to-live of an entry in seconds, for both tiers. No expiry if None.
+        :param max_bytes: Size limit of the responses stored in the disk tier.
+        """
+        self.memory = MemoryLRUCache(memory_entries, ttl)
+        self.disk = SQLiteCache(os.path.expanduser(path), ttl, max_bytes) if path else None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.lock = threading.Lock()
+
+    def key(self, prompt, model=None, attachments=()):
+        """
+        Returns the cache key of a prompt, hashing the content of the attached files.
+        """
+        return prompt_key(prompt, model, [file_sha256(path) for path in attachments])
+
+    def get(self, key):
+        """
+        Returns the cached response for the key, or None.
+        """
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("memory_hits")
+            return value
+        if self.disk is not None:
+            row = self.disk.get(key)
+            if row is not None:
+                self.memory.put(key, row[0], row[1])
+                self._count("disk_hits")
+                return row[0]
+        self._count("misses")
+        return None
+
+    def put(self, key, value):
+        self.memory.put(key, value)
+        if self.disk is not None:
+            self.disk.put(key, value)
+        self._count("stores")
+
+    def stats(self):
+        """
+        Returns the hit and miss counters. "hits" is the number of browser round-trips saved.
+        """
+        with self.lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "hits": hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "memory_entries": len(self.memory),
+            }
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
+
+    def _count(self, counter):
+        with self.lock:
+            setattr(self, counter, getattr(self, counter) + 1)
@@ -0,0 +1,181 @@
+import json
+import threading
+from selenium.common.exceptions import JavascriptException, TimeoutException, WebDriverException
+from .devtools import devtools_targets
+
+
+class CDPError(Exception):
+    """
+    Raised when a DevTools command fails or the evaluated script throws.
+    """
+
+
+class CDPUnavailable(CDPError):
+    """
+    Raised when a command cannot be sent because the channel is closed or broken. Nothing reached the page,
+    so the command can be sent again through chromedriver.
+    """
+
+
+class CDPConnectionLost(CDPError, WebDriverException):
+    """
+    Raised when the channel breaks after a command was sent. The command may have run in the page.
+    """
+
+
+class CDPTimeout(CDPError, TimeoutException):
+    """
+    Raised when the answer to a command does not come in time. The command may have run in the page.
+    """
+
+
+class CDPScriptError(CDPError, JavascriptException):
+    """
+    Raised when the evaluated script throws, like the JavascriptException of execute_script().
+    """
+
+
+def _import_websocket():
+    try:
+        import websocket
+    except ImportError:
+        raise ImportError(
+            "The DevTools transport requires the websocket-client package: "
+            "pip install ChatGPTAutomation[cdp]"
+        )
+    return websocket
+
+
+class CDPConnection:
+    """
+    Persistent DevTools protocol websocket to one tab of the Chrome instance.
+
+    Chrome already listens on the remote debugging port, so the page can be driven without chromedriver:
+    a command is one websocket message each way, instead of an HTTP request to chromedriver relayed to
+    Chrome. call() and call_async() run the same page scripts as execute_script() and
+    execute_async_script(), so every script of the scripts module works over both transports.
+
+    Example:
+        connection = CDPConnection.attach(port, driver.current_window_handle)
+        title = connection.call("return document.title;")
+    """
+
+    def __init__(self, websocket_url, timeout=30):
+        """
+        :param websocket_url: The webSocketDebuggerUrl of the tab.
+        :param timeout: Default number of seconds to wait for the answer to a command.
+        """
+        websocket = _import_websocket()
+        self.websocket_url = websocket_url
+        self.timeout = timeout
+        self.timeout_errors = (websocket.WebSocketTimeoutException, TimeoutError)
+        # Chrome rejects websocket clients sending an Origin that is not allowed by --remote-allow-origins
+        self.socket = websocket.create_connection(websocket_url, timeout=timeout, suppress_origin=True)
+        self.lock = threading.Lock()
+        self.next_id = 0
+        self.commands = 0
+
+    @classmethod
+    def attach(cls, port, target_id=None, host="127.0.0.1", timeout=30):
+        """
+        Connects to a tab of the Chrome instance listening on the remote debugging port.
+
+        Args:
+            port (int): The remote debugging port.
+            target_id (str): Id of the tab. Chromedriver uses the target ids as window handles, so this is
+                             usually driver.current_window_handle. Defaults to the first page.
+            host (str): The host Chrome listens on.
+            timeout (float): Default number of seconds to wait for the answer to a command.
+
+        Raises:
+            CDPError: If the tab is not found.
+        """
+        pages = [
+            target for target in devtools_targets(port, host)
+            if target.get("type") == "page" and target.get("webSocketDebuggerUrl")
+        ]
+        for target in pages:
+            if target_id is None or target["id"].upper() == target_id.upper():
+                return cls(target["webSocketDebuggerUrl"], timeout)
+        raise CDPError(f"No DevTools page target {target_id or ''} on port {port}")
+
+    def send(self, method, params=None, timeout=None):
+        """
+        Sends a DevTools command and waits for its result. Events received meanwhile are dropped.
+
+        Returns:
+            dict: The result of the command.
+
+        Raises:
+            CDPError: If Chrome answers with an error.
+            CDPUnavailable: If the command cannot be sent.
+            CDPTimeout: If the answer does not come in time.
+            CDPConnectionLost: If the channel breaks before the answer comes.
+        """
+        with self.lock:
+            self.next_id += 1
+            self.commands += 1
+            message_id = self.next_id
+            try:
+                self.socket.settimeout(self.timeout if timeout is None else timeout)
+                self.socket.send(json.dumps({"id": message_id, "method": method, "params": params or {}}))
+            except Exception as e:
+                raise CDPUnavailable(f"{method} not sent: {e}") from e
+            try:
+                while True:
+                    message = json.loads(self.socket.recv())
+                    if message.get("id") == message_id:
+                        break
+            except self.timeout_errors as e:
+                # A late answer is skipped by the next command, which waits for its own id
+                raise CDPTimeout(f"No answer to {method} in time") from e
+            except Exception as e:
+                raise CDPConnectionLost(f"Channel lost waiting for {method}: {e}") from e
+        if "error" in message:
+            raise CDPError(f"{method} failed: {message['error'].get('message')}")
+        return message.get("result", {})
+
+    def evaluate(self, expression, await_promise=False, timeout=None):
+        """
+        Evaluates a JavaScript expression in the page with Runtime.evaluate.
+
+        Returns:
+            The JSON value of the expression (None for undefined).
+
+        Raises:
+            CDPScriptError: If the expression throws.
+        """
+        result = self.send(
+            "Runtime.evaluate",
+            {"expression": expression, "returnByValue": True, "awaitPromise": await_promise},
+            timeout,
+        )
+        if "exceptionDetails" in result:
+            details = result["exceptionDetails"]
+            description = details.get("exception", {}).get("description") or details.get("text")
+            raise CDPScriptError(f"Script error: {description}")
+        return result.get("result", {}).get("value")
+
+    def call(self, script, *args, timeout=None):
+        """
+        Runs a script written for execute_script(): the body of a function reading its JSON-serializable
+        arguments from `arguments` and returning its result.
+        """
+        return self.evaluate(f"(function () {{ {script} }}).apply(null, {json.dumps(args)})", timeout=timeout)
+
+    def call_async(self, script, *args, timeout=None):
+        """
+        Runs a script written for execute_async_script(), which reports its result through the callback
+        passed as the last argument. The page notifies the result as soon as the callback is called.
+        """
+        expression = (
+            "new Promise(function (resolve) { "
+            f"(function () {{ {script} }}).apply(null, {json.dumps(args)}.concat([resolve])); }})"
+        )
+        return self.evaluate(expression, await_promise=True, timeout=timeout)
+
+    def close(self):
+        try:
+            self.socket.close()
+        except Exception:
+            pass
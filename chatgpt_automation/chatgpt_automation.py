@@ -1,28 +1,51 @@
-from selenium import webdriver
-from selenium.webdriver.common.keys import Keys
 import time
 import socket
 import threading
+import subprocess
 import uuid
 import os
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import StaleElementReferenceException
 from selenium.common.exceptions import WebDriverException
-from selenium.webdriver.common.action_chains import ActionChains
 import logging
 import platform
-import pyperclip
-from webdriver_manager.chrome import ChromeDriverManager
-
-# Configure logging
-logging.basicConfig(
-    filename="chatgpt_automation.log",
-    level=logging.INFO,
-    format="%(asctime)s:%(levelname)s:%(message)s",
+from .readiness import (
+    ReadinessTimeout,
+    wait_until,
+    element_present,
+    element_absent,
+    any_element_present,
+    element_count_changed,
+    element_clickable,
+    document_ready,
+    all_of,
 )
+from . import scripts
+from .conversation import ConversationCursor, SENTINEL_INSTRUCTION
+from .exporter import ConversationExporter
+from .devtools import devtools_version, wait_for_devtools
+from .driver_cache import resolve_chrome_driver
+from .metrics import instrumented, timed_sleep
+from .locators import By, ElementLocator, load_locator_overrides
+from .lean import LeanProfile
+from .cdp import CDPConnection, CDPConnectionLost, CDPUnavailable
+from .rotation import RotationPolicy
+from .injection import PromptInjector
+from .cache import file_sha256
+from .throttle import RateLimiter, RateLimited, BANNER_PATTERNS, THROTTLING, classify_banner
+from .recovery import RecoveryPolicy, GenerationError, classify_failure
+from .login import (
+    SESSION_STATE_VERSION,
+    Credentials,
+    LoginRequired,
+    cookie_params,
+    load_session_state,
+    save_session_state,
+)
+
+# No logging is configured here: records go to the "chatgpt_automation" logger, see logs.configure_logging()
+logger = logging.getLogger(__name__)
 
 
 class ChatGPTLocators:
@@ -32,9 +55,28 @@ class ChatGPTLocators:
     SEND_MSG_BTN = (By.CSS_SELECTOR, 'button[data-testid="send-button"]')
 
     GPT4_FILE_INPUT = (By.CSS_SELECTOR, "input.hidden")
+    FILE_CHIP = (By.CSS_SELECTOR, "div.group.relative.inline-block")
+    FILE_UPLOAD_SPINNER = (
+        By.CSS_SELECTOR,
+        "div.group.relative.inline-block svg.animate-spin",
+    )
+    FILE_UPLOAD_ERROR = (By.CSS_SELECTOR, "div.group.relative.inline-block .text-red-500")
 
     CHAT_GPT_CONVERSION = (By.CSS_SELECTOR, "div.text-base")
+    # Shown instead of the send button while a response is generated
+    STOP_BTN = (By.CSS_SELECTOR, 'button[data-testid="stop-button"]')
+    # Action bar the assistant turn gets once its response is complete
+    RESPONSE_ACTIONS = (By.CSS_SELECTOR, 'button[data-testid="copy-turn-action-button"]')
+    ERROR_MESSAGE = (
+        By.XPATH,
+        "//div[@class='mb-3 text-center text-xs' and text()='There was an error generating a response']",
+    )
     REGENERATE_BTN = (By.CSS_SELECTOR, 'button[as="button"]')
+    # Containers of the usage cap, rate limit, network error and generation error banners
+    ALERT_BANNER = (
+        By.CSS_SELECTOR,
+        '[role="alert"], div.text-token-text-error, div.border-red-500, div.mb-3.text-center.text-xs',
+    )
 
     FIRST_DELETE_BTN = (By.CSS_SELECTOR, 'button[data-state="closed"]')
     SECOND_DELETE_BTN = (By.CSS_SELECTOR, 'div[role="menuitem"].text-red-500')
@@ -48,7 +90,7 @@ class ChatGPTLocators:
 
     NEW_CHAT_BTN = (By.CSS_SELECTOR, "button.text-token-text-primary")
 
-    LOGIN_BTN = (By.XPATH, '//button[//div[text()="Log in"]]')
+    LOGIN_BTN = (By.XPATH, '//button[.//div[text()="Log in"]]')
     CONTINUE_BTN = (By.XPATH, '//button[text()="Continue"]')
     USERNAME_INPUT = (By.ID, "username")
     PASSWORD_INPUT = (By.ID, "password")
@@ -75,6 +117,51 @@ class ChatGPTLocators:
     GMAIL_PASSWORD_NEXT_BTN = (By.ID, "passwordNext")
     ADD_NEW_GMAIL_BTN = (By.XPATH, '//li[contains(.,"Use another account")]')
 
+    # Alternative strategies tried in order when the selector above does not match (see ElementLocator)
+    FALLBACKS = {
+        "MSG_BOX_INPUT": [MSG_BOX_INPUT2],
+        "SEND_MSG_BTN": [
+            (By.CSS_SELECTOR, 'button[aria-label="Send prompt"]'),
+            (By.CSS_SELECTOR, 'button[aria-label="Send message"]'),
+        ],
+        "GPT4_FILE_INPUT": [(By.CSS_SELECTOR, 'input[type="file"]')],
+        "CHAT_GPT_CONVERSION": [(By.CSS_SELECTOR, 'div[data-testid^="conversation-turn-"]')],
+        "REGENERATE_BTN": [(By.CSS_SELECTOR, 'button[aria-label="Regenerate"]')],
+        "STOP_BTN": [(By.CSS_SELECTOR, 'button[aria-label="Stop generating"]')],
+        "RESPONSE_ACTIONS": [(By.CSS_SELECTOR, 'button[aria-label="Copy"]')],
+        "FIRST_DELETE_BTN": [(By.CSS_SELECTOR, 'button[data-testid="conversation-options-button"]')],
+        "SECOND_DELETE_BTN": [(By.CSS_SELECTOR, '[data-testid="delete-chat-menu-item"]')],
+        "THIRD_DELETE_BTN": [(By.CSS_SELECTOR, 'button[data-testid="delete-conversation-confirm-button"]')],
+        "NEW_CHAT_BTN": [(By.CSS_SELECTOR, 'a[href="/"]')],
+        "LOGIN_BTN": [(By.CSS_SELECTOR, 'button[data-testid="login-button"]')],
+        "CHATGPT_SWITCH_HOVER_BTN": [
+            (By.CSS_SELECTOR, 'button[data-testid="model-switcher-dropdown-button"]')
+        ],
+        "COPY_LAST_RESPONSE_BTN": [
+            (By.CSS_SELECTOR, 'button[data-testid="copy-turn-action-button"]'),
+            (By.CSS_SELECTOR, 'button[aria-label="Copy"]'),
+        ],
+    }
+
+
+def unescape_path(path):
+    """
+    Removes the shell escaping of spaces ("Application\\ Support") from a path, since Chrome is
+    launched without a shell.
+    """
+    return path.replace("\\ ", " ")
+
+
+def strip_sentinel(text, sentinel):
+    """
+    Removes the uuid sentinel (and surrounding whitespace) from the end of a response. Returns the text
+    unchanged if the sentinel is empty.
+    """
+    stripped = text.rstrip()
+    if sentinel and stripped.endswith(sentinel):
+        return stripped[: -len(sentinel)].rstrip()
+    return text
+
 
 class ChatGPTAutomation:
     class DelayTimes:
@@ -94,23 +181,136 @@ class ChatGPTAutomation:
         GMAIL_NEXT_CLICK_DELAY = 5
         GMAIL_PASSWORD_NEXT_CLICK_DELAY = 11
 
+    # Sessions created without a Metrics object are not instrumented
+    metrics = None
+    locator_overrides = None
+    lean = None
+    cdp = None
+    rotation = None
+    injector = None
+    throttle = None
+    janitor = None
+    recovery = None
+    breaker = None
+    credentials = None
+    sentinel = False
+    # Chrome launched by the session, None when it attached to a running one
+    chrome_process = None
+    # Turns in the conversation before the last prompt was submitted
+    prompt_turn_count = None
+    rotations = 0
+    _prompts_since_check = 0
+
+    class Timeouts:
+        """
+        Upper bounds (in seconds) for the readiness conditions used instead of the fixed DelayTimes.
+        Operations return as soon as their condition holds; these values only cap the wait.
+        """
+
+        CONSTRUCTOR_TIMEOUT = 30
+        CHROME_LAUNCH_TIMEOUT = 30
+        CHROME_QUIT_TIMEOUT = 10
+        SEND_PROMPT_TIMEOUT = 10
+        UPLOAD_FILE_TIMEOUT = 120
+        OPEN_NEW_CHAT_TIMEOUT = 30
+        DEL_CURRENT_CHAT_TIMEOUT = 10
+        RESPONSE_TIMEOUT = 300
+        MAX_POLL_INTERVAL = 1.0
+        STREAM_WAIT = 10
+        CLEANUP_TIMEOUT = 300
+        LOGIN_STEP_TIMEOUT = 30
+        LOGIN_TIMEOUT = 60
+
     def __init__(
         self,
         user_data,
         chrome_path=None,
         chrome_driver_path=None,
+        use_fixed_delays=False,
+        port=None,
+        cache=None,
+        url="https://chat.openai.com",
+        chrome_args=(),
+        metrics=None,
+        locator_overrides=None,
+        lean=None,
+        cdp=False,
+        rotation=None,
+        injector=None,
+        throttle=None,
+        janitor=None,
+        recovery=None,
+        sentinel=False,
+        credentials=None,
+        session_state=None,
     ):
         """
         This constructor automates the following steps:
         1. Open a Chrome browser with remote debugging enabled at a specified URL.
-        2. Prompt the user to complete the log-in/registration/human verification, if required.
-        3. Connect a Selenium WebDriver to the browser instance after human verification is completed.
+        2. Connect a Selenium WebDriver to the browser instance.
+        3. If credentials or a session state are given and the login page is shown, restore the session
+           state or log in (see ensure_logged_in()).
 
         :param user_data: Dictionary containing the path of all the user profiles and the profile to use in the chrome session.
         :param chrome_path: file path to chrome
         :param chrome_driver_path: file path to chrome
+        :param use_fixed_delays: Compatibility mode. If True, sleep for the fixed DelayTimes instead of
+                                 waiting on readiness conditions bounded by Timeouts.
+        :param port: Remote debugging port. If a Chrome instance is already listening on it, the session
+                     attaches to it instead of launching a new browser. Defaults to a free port.
+        :param cache: Optional PromptCache consulted by ask() and iter_ask() before sending a prompt.
+        :param url: Address of the chat page, e.g. the local mock page used by the tests and benchmarks.
+        :param chrome_args: Extra command line switches passed to Chrome when it is launched.
+        :param metrics: Optional Metrics recording the latency, sleeps and WebDriver commands of every
+                        public method, and the time to first token and to completion of every prompt.
+        :param locator_overrides: JSON file path (or dict) replacing the selector chains of ChatGPTLocators
+                                  by name, see load_locator_overrides(). Defaults to the file named by the
+                                  CHATGPT_AUTOMATION_LOCATORS environment variable, if set.
+        :param lean: True or a LeanProfile to launch a headless, resource-lean Chrome (GPU off, memory caps)
+                     and block images, media, fonts and trackers on the tab. The tab settings are also
+                     applied when attaching to a running Chrome.
+        :param cdp: Run the hot path (prompt injection, completion detection and reading the responses) over
+                    a DevTools websocket to the tab instead of through chromedriver. Requires the
+                    websocket-client package. Selenium is used if the channel cannot be opened or fails.
+        :param rotation: True or a RotationPolicy to rotate to a fresh chat between prompts once the
+                         conversation, the DOM or the JS heap of the tab grows past its limits.
+        :param injector: True or a PromptInjector typing every prompt like a paste (or with DevTools
+                         Input.insertText) and checking it before sending. Prompts longer than
+                         PromptInjector.LARGE_PROMPT_CHARS always go through an injector.
+        :param throttle: True or a RateLimiter holding every send until the account (user_data profile) has
+                         message budget left, and backing off after a usage cap or rate limit banner. Share
+                         one RateLimiter between the sessions of a pool.
+        :param janitor: A ChatJanitor deleting old or throwaway chats in bulk between prompts.
+        :param recovery: True or a RecoveryPolicy retrying the prompts of ask() after a generation error, a
+                         stale DOM, a crashed tab or a timeout, by regenerating the response, resending the
+                         prompt or moving to a new chat. The session gets its own circuit breaker.
+        :param sentinel: Also ask the model to end every response with a uuid, and only consider a response
+                         complete once it does, like earlier versions. By default completion is read from
+                         the page: the stop button is gone and the response has its action bar (or the send
+                         button is back), which costs no tokens and does not depend on the model. The uuid
+                         is stripped from the responses.
+        :param credentials: Credentials used to log in when the login page is shown. The CHATGPT_EMAIL and
+                            CHATGPT_PASSWORD environment variables are used if a session_state is given
+                            without credentials.
+        :param session_state: Path of a session state file (cookies and localStorage, see
+                              export_session_state()). A logged out session restores it instead of logging
+                              in, and saves it after logging in.
         """
-        self.lock = threading.Lock()
+        locator_overrides = locator_overrides or os.environ.get("CHATGPT_AUTOMATION_LOCATORS")
+        self._configure(
+            use_fixed_delays=use_fixed_delays,
+            cache=cache,
+            metrics=metrics,
+            locator_overrides=load_locator_overrides(locator_overrides) if locator_overrides else None,
+            lean=lean,
+            rotation=rotation,
+            injector=injector,
+            throttle=throttle,
+            janitor=janitor,
+            recovery=recovery,
+            sentinel=sentinel,
+            credentials=credentials,
+        )
         if chrome_path is None:
             chrome_path = self.get_chrome_path()
             if chrome_path is None:
@@ -121,33 +321,519 @@ class ChatGPTAutomation:
 
         if chrome_driver_path is None:
             try:
-                chrome_driver_path = ChromeDriverManager().install()
+                chrome_driver_path = resolve_chrome_driver(chrome_path)
             except Exception as e:
                 raise RuntimeError(
                     f"An unexpected error occurred while installing ChromeDriver: {e}"
                 )
 
-        self.chrome_path = f'"{chrome_path}"'
+        self.chrome_path = chrome_path
         self.chrome_driver_path = chrome_driver_path
         self.user_data = user_data
+        self.chrome_args = list(chrome_args)
+        self.chrome_process = None
 
-        self.url = r"https://chat.openai.com"
-        free_port = self.find_available_port()
-        self.launch_chrome_with_remote_debugging(free_port, self.url)
+        self.url = url.rstrip("/")
+        if port is not None and devtools_version(port):
+            logger.info(f"Attaching to the Chrome instance listening on port {port}")
+        else:
+            port = port or self.find_available_port()
+            self.launch_chrome_with_remote_debugging(port, self.url)
+        self.port = port
         # self.wait_for_human_verification()
-        self.driver = self.setup_webdriver(free_port)
+        self.driver = self.setup_webdriver(port)
+        if self.metrics is not None:
+            self.metrics.instrument_driver(self.driver)
+        if self.lean is not None:
+            self.lean.apply(self.driver)
+        if cdp:
+            self.cdp = self.open_cdp()
+
+        self._wait_page_loaded("chat page loaded")
+        if credentials is not None or session_state is not None:
+            self.ensure_logged_in(credentials, session_state)
+
+    def _configure(
+        self,
+        use_fixed_delays=False,
+        cache=None,
+        metrics=None,
+        locator_overrides=None,
+        lean=None,
+        rotation=None,
+        injector=None,
+        throttle=None,
+        janitor=None,
+        recovery=None,
+        sentinel=False,
+        credentials=None,
+    ):
+        """
+        Sets the options of the session (see the constructor, locator_overrides already loaded) and resets
+        the state of its conversation. Shared with the tabs of a TabMultiplexer, which take the options of
+        the session owning the browser.
+        """
+        self.lock = threading.Lock()
+        self.use_fixed_delays = use_fixed_delays
+        self.cache = cache
+        self.metrics = metrics
+        self.locator_overrides = locator_overrides
+        self.lean = LeanProfile() if lean is True else lean or None
+        self.rotation = RotationPolicy() if rotation is True else rotation or None
+        self.injector = PromptInjector() if injector is True else injector or None
+        self.throttle = RateLimiter() if throttle is True else throttle or None
+        self.janitor = janitor
+        self.recovery = RecoveryPolicy() if recovery is True else recovery or None
+        self.breaker = self.recovery.new_breaker() if self.recovery is not None else None
+        self.sentinel = sentinel
+        self.credentials = credentials
+        self.prompt_sent_at = None
+        self.model = None
+        self.pending_attachments = []
+        # SHA-256 of the files attached in the current conversation, to their path
+        self.attached_files = {}
+
+    def _wait_page_loaded(self, message):
+        """
+        Waits until the page is loaded and shows either the chat input box or the login button.
+        """
+        self.wait_for(
+            all_of(
+                document_ready(self.driver),
+                any_element_present(
+                    self.driver, *self.elements.strategies("MSG_BOX_INPUT"), *self.elements.strategies("LOGIN_BTN")
+                ),
+            ),
+            delay=self.DelayTimes.CONSTRUCTOR_DELAY,
+            timeout=self.Timeouts.CONSTRUCTOR_TIMEOUT,
+            message=message,
+        )
+
+    def wait_for(self, condition, delay, timeout, message=""):
+        """
+        Waits until an operation is complete. By default this polls the readiness condition with an
+        adaptive interval and returns as soon as it holds. In compatibility mode (use_fixed_delays=True)
+        it ignores the condition and sleeps for the fixed delay instead.
+
+        Args:
+            condition (callable): Zero-argument callable that returns a truthy value when the operation is complete.
+            delay (float): Fixed delay in seconds used in compatibility mode.
+            timeout (float): Maximum number of seconds to wait for the condition.
+            message (str): Description of the condition, used in logs and timeout errors.
+
+        Returns:
+            The value returned by the condition, or None in compatibility mode.
+
+        Raises:
+            ReadinessTimeout: If the condition does not hold within the timeout.
+        """
+        if self.use_fixed_delays:
+            timed_sleep(delay)
+            return None
+        return wait_until(
+            condition,
+            timeout,
+            message=message,
+            max_interval=self.Timeouts.MAX_POLL_INTERVAL,
+        )
+
+    @classmethod
+    def attach_or_launch(cls, user_data, port, **kwargs):
+        """
+        Attaches to the Chrome instance already listening on the remote debugging port, or launches one
+        on that port if nothing is listening. Reusing a warm browser skips the Chrome start-up entirely.
+
+        :param user_data: Dictionary containing the path of all the user profiles and the profile to use in the chrome session.
+        :param port: The remote debugging port to attach to or launch on.
+        :param kwargs: Other ChatGPTAutomation constructor arguments.
+        """
+        return cls(user_data, port=port, **kwargs)
+
+    @property
+    def conversation(self):
+        """
+        Incremental reader of the current conversation, bound to the current driver.
+        """
+        cursor = getattr(self, "_conversation", None)
+        if cursor is None or cursor.driver is not self.driver:
+            cursor = ConversationCursor(
+                self.driver, self.conversation_locator(), execute_script=self._run_script
+            )
+            self._conversation = cursor
+        cursor.sentinel = self.sentinel
+        return cursor
+
+    @property
+    def elements(self):
+        """
+        Locator engine of the page elements (fallback strategies and cached handles), bound to the
+        current driver.
+        """
+        locator = getattr(self, "_elements", None)
+        if locator is None or locator.driver is not self.driver:
+            locator = ElementLocator(self.driver, ChatGPTLocators, self.locator_overrides)
+            self._elements = locator
+        return locator
+
+    def open_cdp(self):
+        """
+        Opens the DevTools channel to the tab controlled by the WebDriver.
 
-        time.sleep(self.DelayTimes.CONSTRUCTOR_DELAY)
+        Returns:
+            CDPConnection: The channel, or None if it cannot be opened (the session then uses Selenium).
+
+        Raises:
+            ImportError: If websocket-client is not installed.
+        """
+        try:
+            connection = CDPConnection.attach(self.port, self.driver.current_window_handle)
+        except ImportError:
+            raise
+        except Exception as e:
+            logger.warning(f"DevTools channel unavailable, using Selenium only: {e}")
+            return None
+        if self.metrics is not None:
+            self.metrics.instrument_cdp(connection)
+        return connection
+
+    def _drop_cdp(self, error):
+        logger.warning(f"DevTools channel failed, falling back to Selenium: {error}")
+        self.cdp.close()
+        self.cdp = None
+
+    def _run_script(self, script, *args):
+        """
+        Runs a page script (see the scripts module) over the DevTools channel if there is one, through
+        execute_script otherwise. Arguments must be JSON-serializable.
+
+        Only a script that never reached the page is run again through Selenium. Errors of the script, and
+        failures after it was sent, are raised: scripts that submit, paste or delete must not run twice.
+        """
+        if self.cdp is not None:
+            try:
+                return self.cdp.call(script, *args)
+            except CDPUnavailable as e:
+                self._drop_cdp(e)
+            except CDPConnectionLost as e:
+                self._drop_cdp(e)
+                raise
+        return self.driver.execute_script(script, *args)
 
+    def _run_async_script(self, script, *args, timeout):
+        """
+        Runs an asynchronous page script over the DevTools channel if there is one, through
+        execute_async_script otherwise. Falls back to Selenium like _run_script().
+        """
+        if self.cdp is not None:
+            try:
+                return self.cdp.call_async(script, *args, timeout=timeout)
+            except CDPUnavailable as e:
+                self._drop_cdp(e)
+            except CDPConnectionLost as e:
+                self._drop_cdp(e)
+                raise
+        self.driver.set_script_timeout(timeout)
+        return self.driver.execute_async_script(script, *args)
+
+    def conversation_locator(self):
+        """
+        Returns the CSS locator of the conversation turns used by the page scripts.
+        """
+        return (By.CSS_SELECTOR, self.elements.css("CHAT_GPT_CONVERSION"))
+
+    @instrumented
     def check_login_page(self) -> bool:
         """
-        Checks whether the login page is accessible by attempting to locate the login button.
+        Checks whether the login page is shown by locating the login button and checking that it is
+        rendered, in a single round-trip.
 
-        :return: True if the login button is found, indicating the presence of the login page; False otherwise.
+        :return: True if the login button is shown, indicating the presence of the login page; False otherwise.
         """
-        return bool(self.driver.find_elements(*ChatGPTLocators.LOGIN_BTN))
+        return self._login_visible()
+
+    def _login_visible(self):
+        return bool(self._run_script(scripts.LOGIN_VISIBLE, self.elements.strategies("LOGIN_BTN")))
 
+    def _chat_page_shown(self):
+        """
+        Readiness condition: the chat page is loaded, with its input box and without the login button.
+        """
+        page_ready = self._page_ready()
+        return lambda: page_ready() and not self._login_visible()
 
+    def _cdp_command(self, method, params=None):
+        """
+        Sends a DevTools command over the DevTools channel if there is one, through chromedriver otherwise.
+        """
+        if self.cdp is not None:
+            try:
+                return self.cdp.send(method, params or {})
+            except CDPUnavailable as e:
+                self._drop_cdp(e)
+        return self.driver.execute_cdp_cmd(method, params or {})
+
+    @instrumented
+    def ensure_logged_in(self, credentials=None, state_path=None, interactive=False):
+        """
+        Makes sure the session is logged in, taking the cheapest way:
+
+        1. "session": the login page is not shown, nothing to do.
+        2. "restored": the session state saved at state_path is restored (cookies and localStorage).
+        3. "login": the session logs in with the credentials, then saves its state to state_path.
+
+        Args:
+            credentials (Credentials): The account. Defaults to the credentials of the constructor, then to
+                Credentials.from_env().
+            state_path (str): Session state file to restore, and to save after logging in.
+            interactive (bool): Without credentials, wait for the user to log in by hand
+                (wait_for_human_verification()) instead of raising LoginRequired.
+
+        Returns:
+            str: "session", "restored" or "login".
+
+        Raises:
+            LoginRequired: If the session cannot log in.
+        """
+        if not self.check_login_page():
+            return "session"
+        if state_path is not None and os.path.exists(state_path):
+            try:
+                if self.import_session_state(state_path):
+                    logger.info(f"Session state restored from {state_path}")
+                    return "restored"
+                logger.warning(f"Session state {state_path} is stale, logging in")
+            except ValueError as e:
+                logger.warning(f"Session state {state_path} not restored: {e}")
+
+        credentials = credentials or self.credentials or Credentials.from_env()
+        if credentials is None:
+            if not interactive:
+                raise LoginRequired(
+                    "The login page is shown and no credentials are given (CHATGPT_EMAIL is not set)"
+                )
+            self.wait_for_human_verification()
+            if self.check_login_page():
+                raise LoginRequired("The login page is still shown")
+        else:
+            self.login(credentials)
+        if state_path is not None:
+            self.export_session_state(state_path)
+        return "login"
+
+    @instrumented
+    def login(self, credentials=None):
+        """
+        Logs in through the ChatGPT login form ("password" credentials) or the Google sign-in form
+        ("google" credentials), if the login page is shown. Every step waits for the next field or button
+        to be clickable, bounded by Timeouts.LOGIN_STEP_TIMEOUT; in compatibility mode it sleeps for the
+        fixed DelayTimes instead.
+
+        Args:
+            credentials (Credentials): The account. Defaults to the credentials of the constructor, then to
+                Credentials.from_env().
+
+        Returns:
+            bool: True if the session logged in, False if the login page was not shown.
+
+        Raises:
+            LoginRequired: If there are no credentials or the login does not reach the chat page.
+        """
+        if not self.check_login_page():
+            return False
+        credentials = credentials or self.credentials or Credentials.from_env()
+        if credentials is None:
+            raise LoginRequired("The login page is shown and no credentials are given (CHATGPT_EMAIL is not set)")
+        if credentials.method == "password" and not credentials.password:
+            raise LoginRequired(f"No password given for {credentials.email}")
+
+        logger.info(f"Logging in as {credentials.email} with {credentials.method}")
+        try:
+            self._wait_clickable(self._login_fields("LOGIN_BTN"), 0, "login button")[1].click()
+            if credentials.method == "google":
+                self._login_with_google(credentials)
+                delay = self.DelayTimes.GMAIL_PASSWORD_NEXT_CLICK_DELAY
+            else:
+                self._login_with_password(credentials)
+                delay = self.DelayTimes.AFTER_LOGIN_CLICK_DELAY
+            self.wait_for(
+                self._chat_page_shown(),
+                delay=delay,
+                timeout=self.Timeouts.LOGIN_TIMEOUT,
+                message="chat page after login",
+            )
+        except (ReadinessTimeout, NoSuchElementException) as e:
+            raise LoginRequired(f"Login as {credentials.email} failed: {e}")
+        self.elements.invalidate()
+        self.conversation.reset()
+        if self._login_visible():
+            raise LoginRequired(f"Login as {credentials.email} failed: the login page is still shown")
+        logger.info(f"Logged in as {credentials.email}")
+        return True
+
+    def _login_with_password(self, credentials):
+        email_field = self._wait_clickable(
+            self._login_fields("USERNAME_INPUT"), self.DelayTimes.AFTER_LOGIN_CLICK_DELAY, "email field"
+        )[1]
+        email_field.send_keys(credentials.email)
+        self._wait_clickable(self._login_fields("CONTINUE_BTN"), 0, "continue button")[1].click()
+        password_field = self._wait_clickable(
+            self._login_fields("PASSWORD_INPUT"), self.DelayTimes.AFTER_LOGIN_CLICK_DELAY, "password field"
+        )[1]
+        password_field.send_keys(credentials.password)
+        self._wait_clickable(self._login_fields("CONTINUE_BTN"), 0, "continue button")[1].click()
+
+    def _login_with_google(self, credentials):
+        self._wait_clickable(
+            self._login_fields("LOGIN_WITH_GMAIL_BTN"), self.DelayTimes.LOGIN_USING_GMAIL_CLICK_DELAY, "Google login button"
+        )[1].click()
+        # Accounts already signed in the browser profile are listed; otherwise Google asks for the email
+        account = {
+            "GMAIL_BTN": [(by, value.format(credentials.email)) for by, value in self.elements.strategies("GMAIL_BTN")]
+        }
+        step, element = self._wait_clickable(
+            {**account, **self._login_fields("GMAIL_INPUT", "ADD_NEW_GMAIL_BTN")},
+            self.DelayTimes.GMAIL_SELECT_DELAY,
+            "Google account chooser",
+        )
+        if step == "GMAIL_BTN":
+            element.click()
+            if not credentials.password:
+                return
+            # Google may still ask for the password of a listed account
+            password_field = self._clickable(self._login_fields("GMAIL_PASSWORD_INPUT"))
+            chat_page = self._chat_page_shown()
+            found = self.wait_for(
+                lambda: password_field() or chat_page(),
+                delay=self.DelayTimes.GMAIL_NEXT_CLICK_DELAY,
+                timeout=self.Timeouts.LOGIN_TIMEOUT,
+                message="Google password field or chat page",
+            )
+            if found is None:
+                found = password_field()
+            if isinstance(found, tuple):
+                self._enter_google_password(found[1], credentials)
+            return
+
+        if step == "ADD_NEW_GMAIL_BTN":
+            element.click()
+            element = self._wait_clickable(
+                self._login_fields("GMAIL_INPUT"), self.DelayTimes.ADD_GMAIL_CLICK_DELAY, "Google email field"
+            )[1]
+        element.send_keys(credentials.email)
+        self._wait_clickable(self._login_fields("GMAIL_NEXT_BTN"), 0, "Google next button")[1].click()
+        password_field = self._wait_clickable(
+            self._login_fields("GMAIL_PASSWORD_INPUT"), self.DelayTimes.GMAIL_NEXT_CLICK_DELAY, "Google password field"
+        )[1]
+        self._enter_google_password(password_field, credentials)
+
+    def _enter_google_password(self, password_field, credentials):
+        if not credentials.password:
+            raise LoginRequired(f"Google asks for the password of {credentials.email} and none is given")
+        password_field.send_keys(credentials.password)
+        self._wait_clickable(self._login_fields("GMAIL_PASSWORD_NEXT_BTN"), 0, "Google password next button")[1].click()
+
+    def _login_fields(self, *names):
+        return {name: self.elements.strategies(name) for name in names}
+
+    def _clickable(self, choices):
+        """
+        Condition that returns (name, element) for the first of the {name: strategies} choices matching a
+        visible and enabled element.
+        """
+
+        def condition():
+            for name, strategies in choices.items():
+                for strategy in strategies:
+                    try:
+                        element = element_clickable(self.driver, strategy)()
+                    except (NoSuchElementException, StaleElementReferenceException):
+                        continue
+                    if element:
+                        return name, element
+            return None
+
+        return condition
+
+    def _wait_clickable(self, choices, delay, message):
+        """
+        Waits until one of the {name: strategies} choices matches a visible and enabled element, in order of
+        preference, and returns (name, element). In compatibility mode the choices are looked up once the
+        fixed delay has elapsed.
+
+        Raises:
+            ReadinessTimeout: If none of them is clickable within Timeouts.LOGIN_STEP_TIMEOUT.
+            NoSuchElementException: If none of them is clickable after the fixed delay.
+        """
+        condition = self._clickable(choices)
+        found = self.wait_for(
+            condition, delay=delay, timeout=self.Timeouts.LOGIN_STEP_TIMEOUT, message=message
+        )
+        if found is None:
+            found = condition()
+        if not found:
+            raise NoSuchElementException(f"{message} not found with any of {list(choices)}")
+        return found
+
+    @instrumented
+    def export_session_state(self, path=None):
+        """
+        Returns the state that keeps the session logged in: the cookies of the chat page (including the
+        HttpOnly ones, read over DevTools) and its localStorage. Another session, in another profile or
+        browser, starts logged in after import_session_state().
+
+        Args:
+            path (str): Also save the state to this file, readable by the owner only.
+
+        Returns:
+            dict: {"version", "url", "saved_at", "cookies", "local_storage"}.
+        """
+        urls = [self.url + "/"]
+        current_url = self.driver.current_url
+        if current_url and current_url.startswith("http") and current_url not in urls:
+            urls.append(current_url)
+        state = {
+            "version": SESSION_STATE_VERSION,
+            "url": self.url,
+            "saved_at": time.time(),
+            "cookies": self._cdp_command("Network.getCookies", {"urls": urls})["cookies"],
+            "local_storage": self._run_script(scripts.READ_LOCAL_STORAGE),
+        }
+        if path is not None:
+            save_session_state(state, path)
+            logger.info(f"Session state with {len(state['cookies'])} cookies saved to {path}")
+        return state
+
+    @instrumented
+    def import_session_state(self, state):
+        """
+        Restores a state returned by export_session_state(): sets its cookies, opens the chat page, writes its
+        localStorage and reloads the page.
+
+        Args:
+            state (dict or str): The state, or the path of a file saved by export_session_state().
+
+        Returns:
+            bool: True if the page is logged in afterwards, False if the state is stale.
+
+        Raises:
+            ValueError: If the file is not a supported session state.
+        """
+        if not isinstance(state, dict):
+            state = load_session_state(state)
+        url = state.get("url") or self.url
+        self._cdp_command("Network.setCookies", {"cookies": cookie_params(state["cookies"])})
+        # localStorage belongs to the origin of the page, so the page is opened before writing it
+        self.driver.get(url + "/")
+        if state.get("local_storage"):
+            self._run_script(scripts.WRITE_LOCAL_STORAGE, state["local_storage"])
+            self.driver.get(url + "/")
+        self.conversation.reset()
+        self.elements.invalidate()
+        self._wait_page_loaded("chat page loaded with the session state")
+        return not self._login_visible()
+
+
+    @instrumented
     def find_available_port(self):
         """
         Finds and returns an available port number on the local machine.
@@ -175,22 +861,24 @@ class ChatGPTAutomation:
                 available_port = s.getsockname()[1]
 
                 # Log the found available port
-                logging.info(f"Available port found: {available_port}")
+                logger.info(f"Available port found: {available_port}")
 
                 # Return the found port
                 return available_port
 
         except socket.error as e:
             # Log the error in case of a socket exception
-            logging.error(f"Failed to find an available port: {e}")
+            logger.error(f"Failed to find an available port: {e}")
 
             # Raise a new exception for the calling code to handle
             raise Exception("Failed to find an available port") from e
 
+    @instrumented
     def launch_chrome_with_remote_debugging(self, port, url):
         """
         Launches a new Chrome browser instance with remote debugging enabled. This method allows for
-        Selenium WebDriver to connect to a pre-existing Chrome session.
+        Selenium WebDriver to connect to a pre-existing Chrome session. It returns as soon as the
+        DevTools endpoint answers on the port, instead of waiting for a fixed delay.
 
         Args:
             port (int): The port number to use for remote debugging.
@@ -199,30 +887,36 @@ class ChatGPTAutomation:
         Raises:
             RuntimeError: If there is an error in launching the Chrome browser.
         """
-
-        def open_chrome():
-            try:
-                # Construct the command to launch Chrome with specified debugging port and URL
-                chrome_cmd = f"{self.chrome_path} --remote-debugging-port={port} --user-data-dir={self.user_data['path']} --profile-directory={self.user_data['profile']} {url}"
-                # Execute the command in the system shell
-                os.system(chrome_cmd)
-            except Exception as e:
-                # Log and raise an exception if there's an error in launching Chrome
-                logging.error(f"Failed to launch Chrome: {e}")
-                raise RuntimeError(
-                    f"Failed to launch Chrome with remote debugging: {e}"
-                )
-
+        chrome_cmd = [
+            self.chrome_path,
+            f"--remote-debugging-port={port}",
+            f"--user-data-dir={unescape_path(self.user_data['path'])}",
+            f"--profile-directory={self.user_data['profile']}",
+            *(self.lean.chrome_args() if self.lean is not None else ()),
+            *self.chrome_args,
+            url,
+        ]
         try:
-            # Create a new thread to run the Chrome launch command
-            chrome_thread = threading.Thread(target=open_chrome)
-            # Start the thread
-            chrome_thread.start()
+            self.chrome_process = subprocess.Popen(
+                chrome_cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
         except Exception as e:
-            # Log and raise an exception if there's an error in starting the thread
-            logging.error(f"Failed to start Chrome launch thread: {e}")
-            raise RuntimeError(f"Failed to start thread for launching Chrome: {e}")
+            # Log and raise an exception if there's an error in launching Chrome
+            logger.error(f"Failed to launch Chrome: {e}")
+            raise RuntimeError(f"Failed to launch Chrome with remote debugging: {e}")
 
+        try:
+            wait_for_devtools(port, self.Timeouts.CHROME_LAUNCH_TIMEOUT)
+        except ReadinessTimeout as e:
+            logger.error(f"Chrome did not open the remote debugging port {port}: {e}")
+            raise RuntimeError(
+                f"Chrome did not open the remote debugging port {port}. "
+                "Make sure no other Chrome instance is using the same profile."
+            )
+
+    @instrumented
     def setup_webdriver(self, port):
         """
         Initializes and returns a Selenium WebDriver instance that is connected to an existing
@@ -239,6 +933,9 @@ class ChatGPTAutomation:
             WebDriverException: If there is an issue initializing the WebDriver.
         """
 
+        # Imported here: selenium.webdriver takes longer to import than the rest of the package
+        from selenium import webdriver
+
         try:
             # Setting up Chrome options for WebDriver
             chrome_options = webdriver.ChromeOptions()
@@ -256,10 +953,11 @@ class ChatGPTAutomation:
             return driver
         except Exception as e:
             # Log the exception if WebDriver initialization fails
-            logging.error(f"Failed to initialize WebDriver: {e}")
+            logger.error(f"Failed to initialize WebDriver: {e}")
             # Raising a WebDriverException to indicate failure in WebDriver setup
             raise WebDriverException(f"Error initializing WebDriver: {e}")
 
+    @instrumented
     def send_prompt_to_chatgpt(self, prompt):
         """
         Sends a message to ChatGPT via the web interface and waits for a response. This function
@@ -270,107 +968,316 @@ class ChatGPTAutomation:
 
         Raises:
             WebDriverException: If there is an issue interacting with the web elements or sending the prompt.
+                Its subclasses (ReadinessTimeout, RateLimited, CircuitOpen...) are raised unchanged.
         """
 
         try:
-            # Locate the input box element on the webpage
-            input_box = self.driver.find_element(*ChatGPTLocators.MSG_BOX_INPUT)
-            self.uuid = uuid.uuid4()
-            unique_message_prompt = f"Do not respond or mention this sentence, respond and only respont to the following one after the dot, you must add the following uuid to the end of the message {self.uuid} and make sure, no matter what, the uuid is the last thing you print in the message. {prompt}"
-            self.driver.execute_script(
-                "arguments[0].value = arguments[1];", input_box, unique_message_prompt
+            turn_count = self._start_prompt(prompt)
+            # Wait until the prompt shows up as a new turn in the conversation
+            self.wait_for(
+                self._prompt_accepted(turn_count),
+                delay=self.DelayTimes.SEND_PROMPT_DELAY,
+                timeout=self.Timeouts.SEND_PROMPT_TIMEOUT,
+                message="prompt accepted",
             )
-            # Simulate the key press action to send the prompt
-            input_box.send_keys(Keys.RETURN)
-            # Locate and click the send button to submit the prompt
-            send_button = self.driver.find_element(*ChatGPTLocators.SEND_MSG_BTN)
-            send_button.click()
-            # Wait for the response to be generated (20 seconds)
-            time.sleep(self.DelayTimes.SEND_PROMPT_DELAY)
         except NoSuchElementException:
             if self.check_message_sent():
                 return
             else:
-                logging.ERROR(
+                logger.error(
                     "Send message button does not found. if you see this error please create an issue in github!"
                 )
                 raise
+        except WebDriverException as e:
+            # Raised as is, so callers and the recovery policy can tell the failures apart
+            logger.error(f"Failed to send prompt to ChatGPT: {e}")
+            raise
         except Exception as e:
             # Log the exception if any step in the process fails
-            logging.error(f"Failed to send prompt to ChatGPT: {e}")
+            logger.error(f"Failed to send prompt to ChatGPT: {e}")
             # Raising a WebDriverException to indicate failure in sending the prompt
             raise WebDriverException(f"Error sending prompt to ChatGPT: {e}")
 
+    def _start_prompt(self, prompt, admit=True):
+        """
+        Does the bookkeeping due between prompts, then submits the prompt: rotates the conversation, lets the
+        janitor delete old chats, waits for the rate limiter (unless admit is False, for callers that were
+        admitted already) and keeps the turn count of the prompt for check_response_status().
+
+        Returns:
+            int: The number of conversation turns before the prompt was submitted.
+        """
+        self.prompt_turn_count = None
+        # Files uploaded for this prompt would be lost with the conversation
+        if not self.pending_attachments:
+            self._maybe_rotate()
+        self._maybe_clean()
+        if admit:
+            self._admit()
+        self.prompt_turn_count = self._submit_prompt(prompt)
+        return self.prompt_turn_count
+
+    def _sent_turn_count(self):
+        """
+        Returns the number of turns before the prompt just sent, counted after a rotation of the
+        conversation, if any. If the prompt was found sent without its count, it is the last turn.
+        """
+        if self.prompt_turn_count is not None:
+            return self.prompt_turn_count
+        return max(self._count_turns() - 1, 0)
+
+    def _submit_prompt(self, prompt):
+        """
+        Types the prompt (wrapped with the uuid sentinel instruction in sentinel mode) into the input box and
+        submits it.
+
+        Returns:
+            int: The number of conversation turns before the prompt was submitted.
+        """
+        self.uuid = uuid.uuid4()
+        unique_message_prompt = prompt
+        if self.sentinel:
+            unique_message_prompt = SENTINEL_INSTRUCTION.format(uuid=self.uuid) + prompt
+
+        injector = self.injector
+        if injector is None and len(unique_message_prompt) > PromptInjector.LARGE_PROMPT_CHARS:
+            injector = PromptInjector()
+        if injector is not None:
+            injector.inject(self, unique_message_prompt)
+            turn_count = injector.submit(self)
+            self.prompt_sent_at = time.perf_counter()
+            self.pending_attachments = []
+            return turn_count
+
+        if self.cdp is not None:
+            # Count the turns, type and send in a single round-trip
+            result = self._run_script(
+                scripts.SUBMIT_PROMPT,
+                self.elements.css("CHAT_GPT_CONVERSION"),
+                self.elements.strategies("MSG_BOX_INPUT"),
+                self.elements.strategies("SEND_MSG_BTN"),
+                unique_message_prompt,
+            )
+            if "missing" in result:
+                raise NoSuchElementException(f"{result['missing']} not found")
+            self.prompt_sent_at = time.perf_counter()
+            self.pending_attachments = []
+            return result["count"]
+
+        from selenium.webdriver.common.keys import Keys
+
+        turn_count = self._count_turns()
+
+        def type_prompt(input_box):
+            self.driver.execute_script(
+                "arguments[0].value = arguments[1];", input_box, unique_message_prompt
+            )
+            # Simulate the key press action to send the prompt
+            input_box.send_keys(Keys.RETURN)
+
+        # The input box handle is cached across prompts and only looked up again once it goes stale
+        self.elements.act("MSG_BOX_INPUT", type_prompt)
+        # Locate and click the send button to submit the prompt
+        self.elements.act("SEND_MSG_BTN", lambda send_button: send_button.click())
+        self.prompt_sent_at = time.perf_counter()
+        self.pending_attachments = []
+        return turn_count
+
+    def _count_turns(self):
+        """
+        Returns the number of turns rendered in the conversation.
+        """
+        if self.cdp is not None:
+            return self._run_script(scripts.COUNT_ELEMENTS, self.elements.css("CHAT_GPT_CONVERSION"))
+        return len(self.elements.find_all("CHAT_GPT_CONVERSION"))
+
+    def _prompt_accepted(self, turn_count):
+        """
+        Readiness condition: the submitted prompt shows up as a new conversation turn.
+        """
+        if self.cdp is not None:
+            return lambda: self._count_turns() != turn_count
+        return element_count_changed(
+            self.driver, self.elements.locator("CHAT_GPT_CONVERSION"), turn_count
+        )
+
+    def _uploads_settled(self, chip_count, expected):
+        """
+        Readiness condition: the chips of the expected number of new uploads are rendered and none of them
+        is still uploading. Holds the UPLOAD_STATUS states of the new chips.
+        """
+
+        def settled():
+            states = self._run_script(
+                scripts.UPLOAD_STATUS,
+                self.elements.css("FILE_CHIP"),
+                self.elements.css("FILE_UPLOAD_SPINNER"),
+                self.elements.css("FILE_UPLOAD_ERROR"),
+                chip_count,
+            )
+            if len(states) < expected or any(item["state"] == "uploading" for item in states):
+                return None
+            return states
+
+        return settled
+
+    def _page_ready(self):
+        """
+        Readiness condition: the page is loaded and the input box is available.
+        """
+        return all_of(
+            document_ready(self.driver),
+            element_present(self.driver, self.elements.locator("MSG_BOX_INPUT")),
+        )
+
+    @instrumented
     def check_message_sent(self):
-        try:
-            self.driver.find_element(*ChatGPTLocators.SEND_MSG_BTN)
-            return False
-        except:
-            return True
+        return not self.elements.present("SEND_MSG_BTN")
 
+    @instrumented
     def upload_file_for_prompt(self, file_name):
         """
         Uploads a file to ChatGPT via the web interface. This function automates the process of
         selecting a file for upload through the ChatGPT's file input element.
 
         Args:
-            file_name (str): The name of the file to be uploaded.
+            file_name (str): The name of the file to be uploaded, relative to the current working directory,
+                             or an absolute path.
 
         Raises:
             FileNotFoundError: If the specified file does not exist in the current working directory.
             WebDriverException: If there is an issue interacting with the file upload element on the web page.
         """
-        try:
-            # Construct the full file path using the current working directory
-            file_path = os.path.join(os.getcwd(), file_name)
+        self.upload_files_for_prompt([file_name])
 
-            # Check if the file exists before attempting to upload
-            if not os.path.exists(file_path):
-                raise FileNotFoundError(f"The file '{file_path}' does not exist.")
+    @instrumented
+    def upload_files_for_prompt(self, paths):
+        """
+        Uploads several files to ChatGPT in a single interaction with the file input element, and waits
+        until the upload chip of every file shows it is done or failed.
 
-            # Locate the file input element on the webpage
-            try:
-                file_input = self.driver.find_element(*ChatGPTLocators.GPT4_FILE_INPUT)
-            except NoSuchElementException:
-                raise Exception(
-                    "You must using gpt4 for upload the files for switch you can using 'switch_model' function!"
-                )
-            # Send the file path to the file input element, initiating the upload
-            file_input.send_keys(file_path)
-            # Wait for the upload process to complete (10 seconds)
-            time.sleep(self.DelayTimes.UPLOAD_FILE_DELAY)
+        A file whose content is already attached in the current conversation (by SHA-256, whatever its
+        name) is not uploaded again, nor is a second copy of a file in the same call.
+
+        Args:
+            paths (list): File names relative to the current working directory, or absolute paths.
+
+        Returns:
+            dict: "uploaded" or "skipped" for the absolute path of every file.
+
+        Raises:
+            FileNotFoundError: If one of the files does not exist; nothing is uploaded then.
+            WebDriverException: If there is an issue interacting with the file upload element on the web page,
+                                or if the upload of a file failed.
+        """
+        try:
+            chip_count, uploads, results = self._start_file_upload(paths)
+            if not uploads:
+                return results
+            # Wait until a chip is rendered for every file and none of them is spinning
+            states = self.wait_for(
+                self._uploads_settled(chip_count, len(uploads)),
+                delay=self.DelayTimes.UPLOAD_FILE_DELAY * len(uploads),
+                timeout=self.Timeouts.UPLOAD_FILE_TIMEOUT,
+                message="file upload finished",
+            )
+            return self._finish_file_upload(uploads, states, results)
         except FileNotFoundError as e:
             # Log the exception if the file is not found
-            logging.error(f"File not found for upload: {e}")
+            logger.error(f"File not found for upload: {e}")
             # Re-raise the exception to be handled by the calling code
             raise
         except Exception as e:
             # Log any other exception that occurs during the file upload process
-            logging.error(f"Failed to upload file to ChatGPT: {e}")
+            logger.error(f"Failed to upload file to ChatGPT: {e}")
             # Raising a WebDriverException to indicate failure in file upload
             raise WebDriverException(f"Error uploading file to ChatGPT: {e}")
 
+    def _start_file_upload(self, paths):
+        """
+        Sends the files not attached yet to the file input element, all at once.
+
+        Returns:
+            tuple: The number of upload chips before the upload started, the (path, SHA-256) of the files sent
+                   and the results of upload_files_for_prompt() so far, "skipped" for the files not sent.
+        """
+        # Resolve the names against the current working directory and check every file before uploading any
+        files = [os.path.abspath(path) for path in paths]
+        for file_path in files:
+            if not os.path.isfile(file_path):
+                raise FileNotFoundError(f"The file '{file_path}' does not exist.")
+
+        uploads, results, hashes = [], {}, set(self.attached_files)
+        for file_path in files:
+            digest = file_sha256(file_path)
+            if digest in hashes:
+                logger.info(f"{file_path} is already attached to the conversation, not uploading it again")
+                results.setdefault(file_path, "skipped")
+                continue
+            hashes.add(digest)
+            uploads.append((file_path, digest))
+        if not uploads:
+            return 0, uploads, results
+
+        # Locate the file input element on the webpage
+        try:
+            file_input = self.elements.find("GPT4_FILE_INPUT", cached=False)
+        except NoSuchElementException:
+            raise Exception(
+                "You must using gpt4 for upload the files for switch you can using 'switch_model' function!"
+            )
+        chip_count = len(self.elements.find_all("FILE_CHIP"))
+        # A multiple file input takes one path per line
+        file_input.send_keys("\n".join(file_path for file_path, _ in uploads))
+        self.pending_attachments.extend(file_path for file_path, _ in uploads)
+        return chip_count, uploads, results
+
+    def _finish_file_upload(self, uploads, states, results):
+        """
+        Records the files whose chip is done as attached to the conversation, and raises if any upload failed.
+        The chips are rendered in the order the files were sent. In compatibility mode there are no states
+        and every file is taken as uploaded.
+        """
+        failed = []
+        for index, (file_path, digest) in enumerate(uploads):
+            if states is not None and states[index]["state"] == "failed":
+                failed.append(file_path)
+                self.pending_attachments.remove(file_path)
+                continue
+            self.attached_files[digest] = file_path
+            results[file_path] = "uploaded"
+        if failed:
+            raise WebDriverException(f"Upload failed for {', '.join(failed)}")
+        return results
+
+    @instrumented
     def return_chatgpt_conversation(self):
         """
         :return: returns a list of items, even items are the submitted questions (prompts) and odd items are chatgpt response
         """
 
-        elements = self.driver.find_elements(*ChatGPTLocators.CHAT_GPT_CONVERSION)
-        del elements[::2]
-        chat_texts = [element.text for element in elements]
+        chat_texts = self.conversation.texts()
+        del chat_texts[::2]
         return chat_texts
 
-    def save_conversation(self, file_name):
+    @instrumented
+    def save_conversation(self, file_name, fmt="text"):
         """
-        Saves the entire conversation from the ChatGPT interface into a text file. The conversation is formatted
-        with prompts and responses, separated by a custom delimiter.
+        Saves the entire conversation from the ChatGPT interface into a file in the "conversations" directory.
+        The turns are streamed to disk page by page, so long conversations are saved with bounded memory.
+        The file is appended to if it already exists.
 
         Args:
             file_name (str): The name of the file where the conversation will be saved.
+            fmt (str): "text" (prompts and responses separated by a custom delimiter), "jsonl" or "markdown".
+                       The last two keep the role, index and timestamp of every turn.
+
+        Returns:
+            int: The number of turns saved.
 
         Raises:
             IOError: If there is an issue writing to the file.
-            IndexError: If the conversation elements are not found or are in an unexpected format.
+            ValueError: If the format is not supported.
         """
 
         try:
@@ -378,27 +1285,23 @@ class ChatGPTAutomation:
             if not os.path.exists(directory_name):
                 os.makedirs(directory_name)
 
-            delimiter = "----------------------------------------"
-            chatgpt_conversation = self.return_chatgpt_conversation()
-            del chatgpt_conversation[::2]
-
-            with open(os.path.join(directory_name, file_name), "a") as file:
-                for i in range(0, len(chatgpt_conversation)):
-                    file.write(f"{chatgpt_conversation[i].text}\n\n{delimiter}\n\n")
+            exporter = ConversationExporter(self.driver, self.conversation_locator(), sentinel=self.sentinel)
+            return exporter.export(os.path.join(directory_name, file_name), fmt, mode="a")
 
         except FileNotFoundError as e:
-            logging.error(f"File not found: {e}")
+            logger.error(f"File not found: {e}")
             raise
         except PermissionError as e:
-            logging.error(f"Permission denied: {e}")
+            logger.error(f"Permission denied: {e}")
             raise
         except IOError as e:
-            logging.error(f"IO error occurred: {e}")
+            logger.error(f"IO error occurred: {e}")
             raise
         except Exception as e:
-            logging.error(f"Unexpected error in saving conversation: {e}")
+            logger.error(f"Unexpected error in saving conversation: {e}")
             raise
 
+    @instrumented
     def return_last_response(self):
         """
         Retrieves the text of the last ChatGPT response from a web interface using Selenium WebDriver.
@@ -412,38 +1315,47 @@ class ChatGPTAutomation:
         """
 
         try:
-            response = self.driver.find_elements(*ChatGPTLocators.CHAT_GPT_CONVERSION)[
-                -1
-            ]
+            response = self.conversation.last()
+            if response is None:
+                raise NoSuchElementException("No conversation turn found")
 
-            return response.text
+            return strip_sentinel(response.text, str(getattr(self, "uuid", "")))
 
         except NoSuchElementException:
             # Handle the case where the element is not found
-            logging.error("Element not found in return_last_response")
+            logger.error("Element not found in return_last_response")
             return "Element not found."
         except Exception as e:
             # Handle any other exceptions
-            logging.error(f"Unexpected error in return_last_response: {str(e)}")
+            logger.error(f"Unexpected error in return_last_response: {str(e)}")
             return f"An unexpected error occurred: {str(e)}"
 
+    @instrumented
     def return_last_response_md(self):
+        """
+        Returns the last ChatGPT response as Markdown.
+
+        The rendered response is serialized to Markdown inside the page (code blocks with their language,
+        nested lists, tables, block quotes and math) with a single script call (over the DevTools channel if
+        there is one), so no clipboard, copy button or delay is involved and concurrent sessions cannot
+        interfere with each other.
+
+        :return: The Markdown of the last response, or an error message if it cannot be retrieved.
+        """
         try:
-            copy_btns = self.driver.find_elements(
-                *ChatGPTLocators.COPY_LAST_RESPONSE_BTN
+            markdown = self._run_script(
+                scripts.LAST_RESPONSE_MARKDOWN, self.elements.css("CHAT_GPT_CONVERSION")
             )
-            if copy_btns:
-                copy_btns[0].click()
-                time.sleep(self.DelayTimes.RETURN_LAST_RESPONSE_DELAY)
-                return pyperclip.paste()
-            else:
-                logging.warning("No copy button found.")
-                return "No copy button found."
+            if markdown is None:
+                logger.warning("No response found.")
+                return "No response found."
+            return strip_sentinel(markdown, self._sentinel())
 
         except Exception as e:
-            logging.error(f"Unexpected error in return_last_response_md: {str(e)}")
+            logger.error(f"Unexpected error in return_last_response_md: {str(e)}")
             return f"An unexpected error occurred: {str(e)}"
 
+    @instrumented
     def wait_for_human_verification(self):
         """
         Pauses the automation process and waits for the user to manually complete tasks such as log-in
@@ -479,12 +1391,13 @@ class ChatGPTAutomation:
                     break  # Break the loop to continue with automation
                 elif user_input == "n":
                     print("Waiting for you to complete the human verification...")
-                    time.sleep(5)  # Waiting for a specified time before asking again
+                    timed_sleep(5)  # Waiting for a specified time before asking again
                 else:
                     print(
                         "Invalid input. Please enter 'y' or 'n'."
                     )  # Handle invalid input
 
+    @instrumented
     def write_last_answer_custom_file(self, filename):
         """
         Retrieves the latest response from ChatGPT and writes it to a specified file. The file is saved
@@ -507,18 +1420,19 @@ class ChatGPTAutomation:
             print(f"Last answer saved in the file: {filename}")
 
         except FileNotFoundError as e:
-            logging.error(f"File not found: {e}")
+            logger.error(f"File not found: {e}")
             raise
         except PermissionError as e:
-            logging.error(f"Permission denied: {e}")
+            logger.error(f"Permission denied: {e}")
             raise
         except IOError as e:
-            logging.error(f"IO error occurred: {e}")
+            logger.error(f"IO error occurred: {e}")
             raise
         except Exception as e:
-            logging.error(f"Unexpected error in writing last answer: {e}")
+            logger.error(f"Unexpected error in writing last answer: {e}")
             raise
 
+    @instrumented
     def open_new_chat(self):
         """
         Navigates to the ChatGPT page using the WebDriver, effectively starting a new chat session. This function
@@ -528,18 +1442,33 @@ class ChatGPTAutomation:
             WebDriverException: If there is an issue navigating to the ChatGPT page.
         """
         try:
-            # Navigate to the ChatGPT URL to start a new chat session
-            self.driver.get(self.url + "/")
+            self._load_new_chat()
+            # Wait until the page is loaded and the input box is ready
+            self.wait_for(
+                self._page_ready(),
+                delay=self.DelayTimes.OPEN_NEW_CHAT_DELAY,
+                timeout=self.Timeouts.OPEN_NEW_CHAT_TIMEOUT,
+                message="new chat ready",
+            )
             # Print confirmation message
             print("New chat opened")
-            # Wait for the page to load completely (10 seconds)
-            time.sleep(self.DelayTimes.OPEN_NEW_CHAT_DELAY)
         except Exception as e:
             # Log the exception if navigation fails
-            logging.error(f"Failed to open new chat: {e}")
+            logger.error(f"Failed to open new chat: {e}")
             # Raising a WebDriverException to indicate failure in navigation
             raise WebDriverException(f"Error opening new chat: {e}")
 
+    def _load_new_chat(self):
+        """
+        Navigates to the ChatGPT URL to start a new chat session, and forgets what was known about the
+        previous one: its turns, the files uploaded to it and the cached elements of its page.
+        """
+        self.driver.get(self.url + "/")
+        self.conversation.reset()
+        self.attached_files = {}
+        self.elements.invalidate()
+
+    @instrumented
     def del_current_chat(self):
         """
         Deletes the current chat session in the ChatGPT interface. This function interacts with specific UI elements
@@ -552,47 +1481,40 @@ class ChatGPTAutomation:
         Raises:
             WebDriverException: If there are issues in deleting the chat or in navigating to start a new chat.
         """
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+
         try:
             # Wait and click the first delete button
             del_chat_btn1 = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable(
-                    (
-                        ChatGPTLocators.FIRST_DELETE_BTN[0],
-                        ChatGPTLocators.FIRST_DELETE_BTN[1],
-                    )
-                )
+                EC.element_to_be_clickable(self.elements.locator("FIRST_DELETE_BTN"))
             )
             del_chat_btn1.click()
-            time.sleep(
-                self.DelayTimes.DEL_CURRENT_CHAT_OPEN_MENU_DELAY
-            )  # Wait for UI response
+            if self.use_fixed_delays:
+                timed_sleep(
+                    self.DelayTimes.DEL_CURRENT_CHAT_OPEN_MENU_DELAY
+                )  # Wait for UI response
 
             # Wait and click the second delete button
             del_chat_btn = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable(
-                    (
-                        ChatGPTLocators.SECOND_DELETE_BTN[0],
-                        ChatGPTLocators.SECOND_DELETE_BTN[1],
-                    )
-                )
+                EC.element_to_be_clickable(self.elements.locator("SECOND_DELETE_BTN"))
             )
             del_chat_btn.click()
 
             # Wait and click the third delete button to confirm deletion
             del_chat_btn = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable(
-                    (
-                        ChatGPTLocators.THIRD_DELETE_BTN[0],
-                        ChatGPTLocators.THIRD_DELETE_BTN[1],
-                    )
-                )
+                EC.element_to_be_clickable(self.elements.locator("THIRD_DELETE_BTN"))
             )
             del_chat_btn.click()
 
+            # Wait for the confirmation dialog to close, i.e. the chat is deleted
+            self.wait_for(
+                element_absent(self.driver, self.elements.locator("THIRD_DELETE_BTN")),
+                delay=self.DelayTimes.DEL_CURRENT_CHAT_AFTER_DELETE_DELAY,
+                timeout=self.Timeouts.DEL_CURRENT_CHAT_TIMEOUT,
+                message="chat deleted",
+            )
             print("Current chat deleted")
-            time.sleep(
-                self.DelayTimes.DEL_CURRENT_CHAT_AFTER_DELETE_DELAY
-            )  # Wait for the chat to be completely deleted
 
         except TimeoutException:
             # Handle timeout exception when elements are not found within the specified time
@@ -600,99 +1522,575 @@ class ChatGPTAutomation:
             try:
                 self.open_new_chat()
             except Exception as e:
-                logging.error(f"Failed to open new chat after timeout: {e}")
+                logger.error(f"Failed to open new chat after timeout: {e}")
                 raise WebDriverException(
                     f"Error navigating to start a new chat after timeout: {e}"
                 )
 
         except Exception as e:
             # Handle any other exceptions that might occur
-            logging.error(f"Error encountered while deleting chat: {e}")
+            logger.error(f"Error encountered while deleting chat: {e}")
             try:
-                time.sleep(self.DelayTimes.DEL_CURRENT_CHAT_BEFORE_OPEN_NEW_CHAT_DELAY)
+                if self.use_fixed_delays:
+                    timed_sleep(
+                        self.DelayTimes.DEL_CURRENT_CHAT_BEFORE_OPEN_NEW_CHAT_DELAY
+                    )
                 self.open_new_chat()
             except Exception as e:
-                logging.error(f"Failed to open new chat after error: {e}")
+                logger.error(f"Failed to open new chat after error: {e}")
                 raise WebDriverException(
                     f"Error navigating to start a new chat after deletion error: {e}"
                 )
 
+    @instrumented
+    def delete_chats(self, older_than=None, title=None, delete_all=False, limit=None, keep=()):
+        """
+        Deletes many chats of the account in one pass, without opening them. The page calls the backend
+        endpoints of the web app with the session's access token, several chats at a time, the way the
+        sidebar and the settings do. The open chat and the chats in keep are kept.
+
+        Args:
+            older_than (float): Delete the chats not updated for this many seconds.
+            title (str): Delete the chats whose title matches this regular expression (case-insensitive).
+            delete_all (bool): Delete every chat but the open one, like "Delete all chats" in the settings
+                               (in one request when no chat is open). Cannot be combined with the filters.
+            limit (int): Maximum number of chats deleted.
+            keep (iterable): Ids of other chats to keep, e.g. the chats open in other tabs.
+
+        Returns:
+            dict: {"scanned": chats listed, "deleted": chats deleted, "failed": deletions that failed,
+                   "seconds": time taken}
+
+        Raises:
+            ValueError: If no filter is given without delete_all, or filters are given with it.
+            WebDriverException: If the chats cannot be listed or deleted.
+        """
+        if delete_all == (older_than is not None or title is not None):
+            raise ValueError("Pass older_than and/or title, or delete_all=True alone.")
+        started = time.perf_counter()
+        report = self._run_async_script(
+            scripts.CLEAN_CONVERSATIONS,
+            older_than,
+            title,
+            delete_all,
+            limit,
+            100,
+            8,
+            list(keep),
+            timeout=self.Timeouts.CLEANUP_TIMEOUT,
+        )
+        if report is None or "error" in report:
+            error = report["error"] if report else "no report"
+            logger.error(f"Failed to delete chats: {error}")
+            raise WebDriverException(f"Error deleting chats: {error}")
+        report["seconds"] = time.perf_counter() - started
+        logger.info(
+            f"Deleted {report['deleted']} of {report['scanned']} chats in {report['seconds']:.1f}s"
+            f" ({report['failed']} failed)"
+        )
+        return report
+
+    @instrumented
+    def page_footprint(self):
+        """
+        Measures the page in one round-trip: the number of conversation turns, of DOM elements and the JS
+        heap used by the tab. The heap comes from performance.memory, or from the DevTools protocol where
+        it is not available.
+
+        Returns:
+            dict: {"turns": int, "dom_nodes": int, "heap_mb": float or None}
+        """
+        result = self._run_script(scripts.PAGE_FOOTPRINT, self.elements.css("CHAT_GPT_CONVERSION"))
+        heap = result["heap"]
+        if heap is None:
+            try:
+                heap = self._cdp_command("Runtime.getHeapUsage")["usedSize"]
+            except Exception as e:
+                logger.info(f"JS heap size unavailable: {e}")
+        return {
+            "turns": result["turns"],
+            "dom_nodes": result["nodes"],
+            "heap_mb": heap / 2 ** 20 if heap is not None else None,
+        }
+
+    @instrumented
+    def rotate_conversation(self, reason="requested"):
+        """
+        Replaces the current conversation with a fresh chat. If the session has a RotationPolicy, the old
+        conversation is first exported and/or deleted as the policy says.
+
+        Args:
+            reason (str): Why the conversation is rotated, for the logs.
+        """
+        policy = self.rotation
+        logger.info(f"Rotating the conversation: {reason}")
+        self.rotations += 1
+        if policy is not None and policy.export_format is not None:
+            self.save_conversation(policy.export_name(self.rotations), policy.export_format)
+        if policy is not None and policy.delete:
+            self.del_current_chat()
+        # A page load releases the DOM and the JS heap of the old conversation
+        self.open_new_chat()
+        self._prompts_since_check = 0
+
+    def _maybe_rotate(self):
+        """
+        Rotates the conversation if the rotation policy says so. Called between prompts.
+        """
+        if self.rotation is None:
+            return
+        self._prompts_since_check += 1
+        if self._prompts_since_check < self.rotation.check_every:
+            return
+        self._prompts_since_check = 0
+        reason = self.rotation.reason(self.page_footprint())
+        if reason is not None:
+            self.rotate_conversation(reason)
+
+    def _maybe_clean(self):
+        """
+        Lets the janitor delete old chats if its interval has elapsed. Called between prompts; a failure is
+        logged and never stops the prompt.
+        """
+        if self.janitor is None or not self.janitor.due():
+            return
+        try:
+            self.janitor.run(self)
+        except Exception as e:
+            logger.warning(f"Chat cleanup failed: {e}")
+
+    def _account(self):
+        """
+        Returns the key of the account in the RateLimiter: the Chrome profile of the session.
+        """
+        if not self.user_data:
+            return "default"
+        return os.path.join(self.user_data.get("path", ""), self.user_data.get("profile", ""))
+
+    def _admit(self):
+        """
+        Waits until the rate limiter lets the next message of the account through.
+        """
+        if self.throttle is not None:
+            self.throttle.acquire(self._account(), self.model)
+
+    def _note_banner(self, kind, text):
+        """
+        Backs off the account after a usage cap or rate limit banner.
+
+        Returns:
+            float: The number of seconds the account is blocked for, or None.
+        """
+        if kind in THROTTLING and self.throttle is not None:
+            return self.throttle.penalize(self._account(), self.model, kind, text)
+        return None
+
+    def _raise_for_alert(self, state):
+        """
+        Raises if a stream state (see _read_stream) reports a new banner that stops the response:
+        RateLimited for a usage cap or a rate limit, GenerationError for a generation error and
+        WebDriverException for a network error. Banners already shown at the baseline are ignored.
+        """
+        alert = state.get("alert")
+        if not alert or alert == state.get("baseline"):
+            return
+        known = set((state.get("baseline") or "").split("\n"))
+        alert = "\n".join(line for line in alert.split("\n") if line not in known)
+        kind = classify_banner(alert)
+        if kind is None:
+            logger.info(f"Ignoring alert: {alert}")
+            return
+        if kind in THROTTLING:
+            retry_in = self._note_banner(kind, alert)
+            raise RateLimited(f"{kind} banner: {alert}", kind=kind, retry_in=retry_in)
+        if kind == "generation_error":
+            raise GenerationError(alert)
+        raise WebDriverException(f"{kind} banner: {alert}")
+
+    @instrumented
+    def detect_banner(self):
+        """
+        Looks for an error banner on the page in one round-trip: the generation error message, or an alert
+        matching throttle.BANNER_PATTERNS (usage cap, rate limit, network error).
+
+        Returns:
+            dict: {"kind": "generation_error", "usage_cap", "rate_limit" or "network", "text": str}, or None.
+        """
+        return self._run_script(
+            scripts.DETECT_BANNER,
+            [ChatGPTLocators.ERROR_MESSAGE],
+            self.elements.css("ALERT_BANNER"),
+            [list(pattern) for pattern in BANNER_PATTERNS],
+        )
+
+    @instrumented
     def check_error(self, regenerate=False):
         """
         Checks if there is an error message displayed on the webpage, indicating a problem with response generation.
 
-        This method attempts to locate a specific error message element on the webpage using an XPath expression.
-        If an error is found and the 'regenerate' flag is True, it triggers a response regeneration.
+        This method looks for the generation error message and for the usage cap, rate limit and network
+        error banners (see detect_banner). A usage cap or rate limit makes the session's RateLimiter back off
+        the account. If an error is found and the 'regenerate' flag is True, it triggers a response regeneration.
         Logs the occurrence of an error for debugging purposes.
 
         :param regenerate: A boolean flag indicating whether to regenerate the response if an error is found.
         :return: True if an error is detected, False otherwise.
+        :raises NoSuchElementException: If regenerate is set and the response has no regenerate button.
+        :raises ReadinessTimeout: If regenerate is set and the new response does not start in time.
         """
         try:
-            # Locate the error message element using XPath
-            error_element = self.driver.find_element(
-                By.XPATH,
-                "//div[@class='mb-3 text-center text-xs' and text()='There was an error generating a response']",
-            )
-            logging.info("Error detected: Responding error!")
-
-            # Regenerate response if the flag is set
-            if regenerate:
-                self.regenerate()
-
-            return True
-        except NoSuchElementException:
-            # Log that no error was found
-            logging.info("No error detected.")
-            return False
+            # Look for the error message and the banners in one script
+            banner = self.detect_banner()
         except Exception as e:
             # Log any other exceptions that may occur
-            logging.error(f"An unexpected error occurred: {e}")
+            logger.error(f"An unexpected error occurred: {e}")
+            return False
+        if banner is None:
+            # Log that no error was found
+            logger.info("No error detected.")
             return False
+        logger.info(f"Error detected: {banner['kind']}: {banner['text']}")
+        self._note_banner(banner["kind"], banner["text"])
+
+        # Regenerate response if the flag is set; a failed regeneration is not a recovery
+        if regenerate:
+            self.regenerate()
+
+        return True
+
+    @instrumented
+    def regenerate(self):
+        """
+        Clicks the regenerate button of the last response, which replaces it with a new one in the same turn.
+
+        Raises:
+            NoSuchElementException: If the last response has no regenerate button, e.g. while it is generated.
+        """
+        buttons = self.elements.find_all("REGENERATE_BTN")
+        if not buttons:
+            raise NoSuchElementException("No regenerate button on the last response")
+        previous = self.conversation.last()
+        buttons[-1].click()
+        self.prompt_sent_at = time.perf_counter()
+        logger.info("Regenerating the last response")
+        if previous is not None and previous.id is not None:
+            # Until the page handles the click, the failed response still looks complete
+            self.wait_for(
+                self._response_replaced(previous.id),
+                delay=self.DelayTimes.SEND_PROMPT_DELAY,
+                timeout=self.Timeouts.SEND_PROMPT_TIMEOUT,
+                message="response regenerating",
+            )
+
+    def _response_replaced(self, message_id):
+        """
+        Readiness condition: the last response is being generated again, or has a new message id.
+        """
+
+        def condition():
+            if self.elements.present("STOP_BTN"):
+                return True
+            last = self.conversation.last()
+            return last is None or last.id != message_id
+
+        return condition
 
+    @instrumented
     def check_response_status(self):
         """
         Checks the status of the response on the webpage.
 
         This method checks for three conditions:
         1. If there is an error on the page, indicated by the check_error method.
-        2. If the 'send' button is available, indicating that the response is ready to be sent.
-        3. That the uuid stored in the object is at the end of the response from ChatGPT
+        2. That nothing is generated anymore: the 'stop' button is gone. In sentinel mode, the 'send'
+           button must be available instead.
+        3. That the last turn is the answer to the last prompt. In sentinel mode, that the uuid stored in
+           the object is at the end of the response from ChatGPT.
 
 
         :return: False if an error is detected, True if the response is ready
         """
+        if self.cdp is not None:
+            status = self._run_script(
+                scripts.RESPONSE_STATUS,
+                [ChatGPTLocators.ERROR_MESSAGE],
+                self.elements.strategies("SEND_MSG_BTN"),
+                self.elements.css("CHAT_GPT_CONVERSION"),
+                self._sentinel(),
+                self.elements.strategies("STOP_BTN"),
+                self.elements.css("RESPONSE_ACTIONS"),
+                self.prompt_turn_count,
+            )
+            if status["error"]:
+                logger.info("Response Status: Error detected.")
+                return False
+            return status["ready"] and status["complete"]
+
         if self.check_error(False):
-            logging.info("Response Status: Error detected.")
+            logger.info("Response Status: Error detected.")
             return False
 
-        try:
+        if self.sentinel:
             # Check if the 'send' button is available, indicating the response is ready
-            self.driver.find_element(*ChatGPTLocators.SEND_MSG_BTN)
-            logging.info("Response Status: Ready to send.")
-        except NoSuchElementException:
+            if not self.elements.present("SEND_MSG_BTN"):
+                return False
+            logger.info("Response Status: Ready to send.")
+        elif self.elements.present("STOP_BTN"):
             return False
 
         # Check that there is an answer for the last prompt sent
         try:
-            response = self.driver.find_elements(*ChatGPTLocators.CHAT_GPT_CONVERSION)[
-                -1
-            ]
-
-            return response.text.endswith(str(self.uuid))
+            response = self.conversation.last()
+            if response is None:
+                raise NoSuchElementException("No conversation turn found")
+
+            if self.sentinel:
+                return response.text.rstrip().endswith(str(self.uuid))
+            # The last turn must follow the prompt, not be the prompt itself
+            if response.role == "user" or (
+                self.prompt_turn_count is not None and response.index <= self.prompt_turn_count
+            ):
+                return False
+            return bool(response.text.strip())
 
         except NoSuchElementException:
             # Handle the case where the element is not found
-            logging.error("Element not found in return_last_response")
+            logger.error("Element not found in return_last_response")
             return False
         except Exception as e:
             # Handle any other exceptions
-            logging.error(f"Unexpected error in return_last_response: {str(e)}")
+            logger.error(f"Unexpected error in return_last_response: {str(e)}")
             return False
 
         return True
 
+    @instrumented
+    def wait_for_response(self, timeout=None):
+        """
+        Blocks until the response to the last prompt is complete (see check_response_status). Polls check_response_status with an adaptive interval instead
+        of a fixed delay.
+
+        Args:
+            timeout (float): Maximum number of seconds to wait. Defaults to Timeouts.RESPONSE_TIMEOUT.
+
+        Returns:
+            bool: True once the response is complete.
 
+        Raises:
+            ReadinessTimeout: If the response is not complete within the timeout.
+        """
+        if timeout is None:
+            timeout = self.Timeouts.RESPONSE_TIMEOUT
+        complete = wait_until(
+            self.check_response_status,
+            timeout,
+            message="response complete",
+            initial_interval=0.2,
+            max_interval=self.Timeouts.MAX_POLL_INTERVAL,
+        )
+        if self.metrics is not None and self.prompt_sent_at is not None:
+            self.metrics.observe_prompt("completion", time.perf_counter() - self.prompt_sent_at)
+        return complete
+
+    @instrumented
+    def ask(self, prompt, timeout=None, attachments=None):
+        """
+        Sends a prompt to ChatGPT and blocks until the complete response is rendered.
+
+        If the session has a cache, the response is looked up first (keyed by the prompt, the model
+        selected with switch_model and the content of the attachments) and nothing is sent on a hit.
+
+        Args:
+            prompt (str): The message or prompt to be sent to ChatGPT.
+            timeout (float): Maximum number of seconds to wait. Defaults to Timeouts.RESPONSE_TIMEOUT.
+            attachments (list): Files uploaded with upload_file_for_prompt before the prompt is sent.
+
+        Returns:
+            str: The text of the response, without the uuid sentinel.
+
+        Raises:
+            ReadinessTimeout: If the response is not complete within the timeout.
+            GenerationError: If the page reports an error generating the response.
+            CircuitOpen: If the session has a RecoveryPolicy and its circuit breaker is open.
+            WebDriverException: If the prompt cannot be sent.
+        """
+        if self.recovery is not None:
+            return self.recovery.run(self, prompt, timeout, attachments)
+        return self._attempt(None, prompt, timeout, attachments)
+
+    def _attempt(self, action, prompt, timeout=None, attachments=None, deadline=None):
+        """
+        Gets the complete response to the prompt, after a recovery action: None for the first attempt,
+        "regenerate", "resend" or "new_chat" (see RecoveryPolicy). The deadline (time.monotonic()) defaults
+        to timeout seconds from now.
+        """
+        if action == "regenerate":
+            # The new response replaces the failed one, in the turn after the prompt
+            turn_count = self.prompt_turn_count
+            if turn_count is None:
+                turn_count = max(self._count_turns() - 2, 0)
+            self.regenerate()
+            stream = self._read_response(turn_count, timeout, deadline)
+        else:
+            if action == "new_chat":
+                self.open_new_chat()
+            stream = self._stream_response(prompt, timeout, attachments, deadline)
+        response = ""
+        for response in stream:
+            pass
+        return response
+
+    @instrumented
+    def iter_ask(self, prompt, timeout=None, attachments=None):
+        """
+        Sends a prompt to ChatGPT and yields the response text incrementally while it is rendered.
+
+        Only the last assistant turn is watched, through a MutationObserver injected in the page, so every
+        WebDriver round-trip returns as soon as new text is available instead of polling on a fixed interval.
+        The generator stops once the page shows the response is complete; in sentinel mode once the uuid
+        sentinel appears, which is never yielded.
+
+        Args:
+            prompt (str): The message or prompt to be sent to ChatGPT.
+            timeout (float): Maximum number of seconds to wait. Defaults to Timeouts.RESPONSE_TIMEOUT.
+            attachments (list): Files uploaded with upload_file_for_prompt before the prompt is sent.
+
+        Yields:
+            str: Text appended to the response since the previous item.
+
+        Raises:
+            ReadinessTimeout: If the response is not complete within the timeout.
+            GenerationError: If the page reports an error generating the response.
+            CircuitOpen: If the session has a RecoveryPolicy and its circuit breaker is open.
+            WebDriverException: If the prompt cannot be sent.
+        """
+        # Text already yielded cannot be taken back, so failures are counted by the breaker but not retried
+        if self.breaker is not None:
+            self.breaker.check()
+        emitted = 0
+        try:
+            for response in self._stream_response(prompt, timeout, attachments):
+                if len(response) > emitted:
+                    yield response[emitted:]
+                    emitted = len(response)
+        except Exception as e:
+            if self.breaker is not None and classify_failure(e) is not None:
+                self.breaker.record_failure()
+            raise
+        if self.breaker is not None:
+            self.breaker.record_success()
+
+    def _stream_response(self, prompt, timeout=None, attachments=None, deadline=None):
+        """
+        Sends the prompt and yields successive snapshots of the response text, ending with the complete text.
+        A cached response is yielded at once without sending anything. The deadline (time.monotonic())
+        defaults to timeout seconds from now.
+        """
+        attachments = list(attachments or [])
+        key = None
+        # Files uploaded by hand are already in the composer, so such a prompt must be sent
+        if self.cache is not None and not self.pending_attachments:
+            key = self.cache.key(prompt, self.model, attachments)
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        if timeout is None:
+            timeout = self.Timeouts.RESPONSE_TIMEOUT
+        if deadline is None:
+            deadline = time.monotonic() + timeout
+        if attachments and not self.pending_attachments:
+            self._maybe_rotate()
+        if attachments:
+            self.upload_files_for_prompt(attachments)
+        self.send_prompt_to_chatgpt(prompt)
+        # Counted by the send, since sending may rotate the conversation first
+        yield from self._read_response(self._sent_turn_count(), timeout, deadline, key)
+
+    def _read_response(self, turn_count, timeout=None, deadline=None, key=None):
+        """
+        Yields successive snapshots of the response that follows the first turn_count turns, ending with the
+        complete text, which is stored in the cache under key if given. The deadline (time.monotonic())
+        defaults to timeout seconds from now.
+        """
+        if timeout is None:
+            timeout = self.Timeouts.RESPONSE_TIMEOUT
+        if deadline is None:
+            deadline = time.monotonic() + timeout
+        sentinel = self._sentinel()
+
+        text = ""
+        # Any banner shown while the response is awaited means it is not coming
+        known_alert = ""
+        first_token = True
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning(f"Response not complete after {timeout}s")
+                raise ReadinessTimeout(
+                    f"Response not complete within {timeout} seconds"
+                )
+            state = self._read_stream(
+                turn_count, sentinel, len(text), min(remaining, self.Timeouts.STREAM_WAIT), known_alert
+            )
+            self._raise_for_alert(state)
+            known_alert = state.get("alert")
+            text = state["text"]
+            if self.metrics is not None and first_token and text:
+                first_token = False
+                self.metrics.observe_prompt("first_token", time.perf_counter() - self.prompt_sent_at)
+            if state["done"]:
+                if self.metrics is not None:
+                    self.metrics.observe_prompt("completion", time.perf_counter() - self.prompt_sent_at)
+                response = strip_sentinel(text, str(self.uuid))
+                if self.throttle is not None:
+                    self.throttle.succeeded(self._account(), self.model)
+                if key is not None:
+                    self.cache.put(key, response)
+                yield response
+                return
+            # Hold back a possibly partial sentinel at the end of the text
+            yield text[: max(len(text) - len(sentinel), 0)]
+
+    def _sentinel(self):
+        """
+        Returns the uuid the last response must end with in sentinel mode, otherwise an empty string.
+        """
+        if not self.sentinel or getattr(self, "uuid", None) is None:
+            return ""
+        return str(self.uuid)
+
+    def _read_stream(self, turn_count, sentinel, known_length, max_wait, known_alert=None):
+        """
+        Returns the state ({"text", "done", "alert", "baseline"}) of the response that follows the first
+        turn_count turns, as soon as it differs from the known_length characters already read or an alert
+        other than known_alert shows up, or after max_wait seconds.
+        """
+        return self._run_async_script(
+            scripts.STREAM_LAST_RESPONSE,
+            *self._stream_args(turn_count, sentinel, known_length, max_wait, known_alert),
+            timeout=max_wait + 5,
+        )
+
+    def _stream_args(self, turn_count, sentinel, known_length, max_wait, known_alert):
+        """
+        Returns the arguments of scripts.STREAM_LAST_RESPONSE.
+        """
+        return (
+            self.elements.css("CHAT_GPT_CONVERSION"),
+            self.elements.css("SEND_MSG_BTN"),
+            sentinel,
+            known_length,
+            int(max_wait * 1000),
+            turn_count,
+            self.elements.css("ALERT_BANNER"),
+            known_alert,
+            self.elements.css("STOP_BTN"),
+            self.elements.css("RESPONSE_ACTIONS"),
+        )
+
+    @instrumented
     def switch_model(self, model_name: float):
         """
         Switches between different ChatGPT models in the application's user interface.
@@ -702,9 +2100,10 @@ class ChatGPTAutomation:
         :return: None
         :raises: Exception if an unsupported model_name is provided.
         """
-        menu_element = self.driver.find_element(
-            *ChatGPTLocators.CHATGPT_SWITCH_HOVER_BTN
-        )
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+
+        menu_element = self.elements.find("CHATGPT_SWITCH_HOVER_BTN", cached=False)
 
         # Hover over the menu to activate it
         menu_element.click()
@@ -731,6 +2130,7 @@ class ChatGPTAutomation:
 
         # Click on the submenu item
         submenu_element.click()
+        self.model = model_name
 
     @staticmethod
     def get_chrome_path() -> str:
@@ -757,15 +2157,16 @@ class ChatGPTAutomation:
                         return path
 
         except PermissionError as e:
-            logging.error(f"Permission error when trying to find Chrome: {e}")
+            logger.error(f"Permission error when trying to find Chrome: {e}")
         except OSError as e:
-            logging.error(f"OS error when trying to find Chrome: {e}")
+            logger.error(f"OS error when trying to find Chrome: {e}")
         except Exception as e:
-            logging.error(f"Unexpected error when trying to find Chrome: {e}")
+            logger.error(f"Unexpected error when trying to find Chrome: {e}")
 
         return None
 
 
+    @instrumented
     def quit(self):
         """
         Closes the browser and terminates the WebDriver session.
@@ -773,7 +2174,12 @@ class ChatGPTAutomation:
         This method first attempts to close the current window of the browser using the `close` method.
         Then it calls the `quit` method to effectively end the entire WebDriver session.
         Error handling is implemented to catch any exceptions that might occur during this process.
+        A Chrome launched by this session is then stopped, which frees its profile; a Chrome the session
+        attached to keeps running.
         """
+        if self.cdp is not None:
+            self.cdp.close()
+            self.cdp = None
         try:
             # Attempt to close the current browser window
             print("Closing the browser...")
@@ -781,9 +2187,27 @@ class ChatGPTAutomation:
 
             # Terminate the WebDriver session
             self.driver.quit()
-            logging.info(
+            logger.info(
                 "Browser closed successfully and WebDriver session terminated."
             )
         except Exception as e:
             # Log any exceptions that occur during the quit process
-            logging.error(f"An error occurred while closing the browser: {e}")
+            logger.error(f"An error occurred while closing the browser: {e}")
+        finally:
+            self._stop_chrome()
+
+    def _stop_chrome(self):
+        """
+        Terminates the Chrome process launched by this session and waits for it to exit, killing it if it
+        does not exit within Timeouts.CHROME_QUIT_TIMEOUT.
+        """
+        process = self.chrome_process
+        if process is None or process.poll() is not None:
+            return
+        process.terminate()
+        try:
+            process.wait(self.Timeouts.CHROME_QUIT_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            logger.warning(f"Chrome (pid {process.pid}) did not exit, killing it")
+            process.kill()
+            process.wait()
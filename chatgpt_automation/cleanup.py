@@ -0,0 +1,75 @@
+import time
+
+
+class ChatJanitor:
+    """
+    Deletes old or throwaway chats of a long-running session, a batch at a time, between prompts.
+
+    Workers that open a chat per job accumulate thousands of them. Deleting them one at a time through
+    the chat menu costs three clicks and several seconds each. The janitor deletes them in bulk instead,
+    from inside the page, through the same backend endpoints the sidebar uses (see
+    ChatGPTAutomation.delete_chats()). It runs at most once per `interval` seconds, only between two
+    prompts, and deletes at most `max_per_run` chats per run, so it never delays a response and its cost
+    per prompt stays bounded.
+
+    Example:
+        chat_bot = ChatGPTAutomation(
+            user_data=user_data, janitor=ChatJanitor(older_than=3600, title=r"^Batch job", interval=600)
+        )
+    """
+
+    def __init__(self, older_than=3600, title=None, interval=600, max_per_run=200, clock=time.monotonic):
+        """
+        :param older_than: Delete chats not updated for this many seconds. No age limit if None.
+        :param title: Regular expression (case-insensitive) the title of a chat must contain to be deleted.
+                      Any title if None.
+        :param interval: Minimum number of seconds between two runs.
+        :param max_per_run: Maximum number of chats deleted per run.
+        :param clock: Monotonic clock, replaced in the tests.
+        """
+        if older_than is None and title is None:
+            raise ValueError("A janitor needs an age or a title filter; use delete_chats(delete_all=True) to delete everything.")
+        self.older_than = older_than
+        self.title = title
+        self.interval = interval
+        self.max_per_run = max_per_run
+        self.clock = clock
+        self.last_run = None
+        self.runs = 0
+        self.deleted = 0
+        self.seconds = 0.0
+        self.last_report = None
+
+    def due(self):
+        """
+        Returns True if the interval since the last run has elapsed.
+        """
+        return self.last_run is None or self.clock() - self.last_run >= self.interval
+
+    def run(self, automation):
+        """
+        Deletes the chats matching the filters from the session's account.
+
+        Returns:
+            dict: The report of delete_chats().
+        """
+        self.last_run = self.clock()
+        report = automation.delete_chats(
+            older_than=self.older_than, title=self.title, limit=self.max_per_run
+        )
+        self.runs += 1
+        self.deleted += report["deleted"]
+        self.seconds += report["seconds"]
+        self.last_report = report
+        return report
+
+    def stats(self):
+        """
+        Returns the totals of the janitor: runs, chats deleted and seconds spent.
+        """
+        return {
+            "runs": self.runs,
+            "deleted": self.deleted,
+            "seconds": self.seconds,
+            "last_report": self.last_report,
+        }
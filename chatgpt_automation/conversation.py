@@ -0,0 +1,123 @@
+import re
+from collections import namedtuple
+from . import scripts
+
+Turn = namedtuple("Turn", ["index", "id", "role", "text", "timestamp"], defaults=[None])
+
+UUID = r"[0-9a-f]{8}(?:-[0-9a-f]{4}){3}-[0-9a-f]{12}"
+
+# The uuid a response ends with in sentinel mode; every prompt is sent with a new one
+SENTINEL_SUFFIX = re.compile(r"\s*\b" + UUID + r"\s*$")
+
+# Instruction every prompt starts with in sentinel mode, formatted with the uuid of the prompt
+SENTINEL_INSTRUCTION = (
+    "Do not respond or mention this sentence, respond and only respont to the following one after the dot, you "
+    "must add the following uuid to the end of the message {uuid} and make sure, no matter what, the uuid is "
+    "the last thing you print in the message. "
+)
+SENTINEL_PREFIX = re.compile(
+    r"^\s*" + UUID.join(re.escape(part) for part in SENTINEL_INSTRUCTION.split("{uuid}"))
+)
+
+
+def strip_sentinels(text):
+    """
+    Removes a uuid sentinel (and surrounding whitespace) from the end of a response, whichever prompt it
+    was asked for. Returns the text unchanged if it does not end with one.
+    """
+    return SENTINEL_SUFFIX.sub("", text)
+
+
+def strip_sentinel_instruction(text):
+    """
+    Removes the sentinel instruction from the start of a prompt sent in sentinel mode, whichever uuid it
+    asked for. Returns the text unchanged if it does not start with one.
+    """
+    return SENTINEL_PREFIX.sub("", text, count=1)
+
+
+class ConversationCursor:
+    """
+    Incremental reader for the turns of the current conversation.
+
+    Turns that were already read are cached by index (and checked by message id). On every refresh only
+    the last cached turn, which may still be streaming, and the turns added after it are fetched, with a
+    single execute_script call that returns their text in bulk. The cost of a refresh therefore stays flat
+    as the conversation grows, instead of one WebDriver round-trip per turn.
+    """
+
+    def __init__(self, driver, locator, execute_script=None, sentinel=False):
+        """
+        :param driver: The Selenium WebDriver controlling the ChatGPT page.
+        :param locator: CSS locator tuple matching one element per conversation turn.
+        :param execute_script: Callable running the page script, e.g. over a DevTools channel.
+                               Defaults to driver.execute_script.
+        :param sentinel: The prompts start with the sentinel instruction and the responses end with a uuid
+                         (sentinel mode); texts() leaves both out.
+        """
+        self.driver = driver
+        self.locator = locator
+        self.execute_script = execute_script or driver.execute_script
+        self.sentinel = sentinel
+        self.turns = []
+
+    def reset(self):
+        """
+        Forgets every cached turn, e.g. after navigating to another conversation.
+        """
+        self.turns = []
+
+    def refresh(self):
+        """
+        Fetches the new and still-changing turns.
+
+        Returns:
+            list[Turn]: The turns that were added or whose text changed since the previous refresh.
+        """
+        start = max(len(self.turns) - 1, 0)
+        result = self._read(start)
+        if result["reset"]:
+            self.reset()
+            start = 0
+            result = self._read(start)
+
+        changed = []
+        for offset, data in enumerate(result["turns"]):
+            turn = Turn(
+                start + offset, data["id"], data["role"], data["text"], data.get("timestamp")
+            )
+            if turn.index < len(self.turns):
+                if self.turns[turn.index] != turn:
+                    self.turns[turn.index] = turn
+                    changed.append(turn)
+            else:
+                self.turns.append(turn)
+                changed.append(turn)
+        del self.turns[result["count"]:]
+        return changed
+
+    def texts(self):
+        """
+        Refreshes the cursor and returns the text of every turn, without the sentinels in sentinel mode.
+        """
+        self.refresh()
+        if not self.sentinel:
+            return [turn.text for turn in self.turns]
+        return [
+            strip_sentinel_instruction(turn.text) if turn.role == "user" or SENTINEL_PREFIX.match(turn.text)
+            else strip_sentinels(turn.text)
+            for turn in self.turns
+        ]
+
+    def last(self):
+        """
+        Refreshes the cursor and returns the last turn, or None if the conversation is empty.
+        """
+        self.refresh()
+        return self.turns[-1] if self.turns else None
+
+    def _read(self, start):
+        anchor_id = self.turns[start - 1].id if start > 0 else None
+        return self.execute_script(
+            scripts.READ_TURNS, self.locator[1], start, anchor_id
+        )
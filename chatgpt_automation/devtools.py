@@ -0,0 +1,64 @@
+import json
+from .readiness import wait_until
+
+
+def devtools_version(port, host="127.0.0.1", timeout=1.0):
+    """
+    Queries the DevTools HTTP endpoint of a Chrome instance started with --remote-debugging-port.
+
+    Args:
+        port (int): The remote debugging port.
+        host (str): The host Chrome listens on.
+        timeout (float): Socket timeout in seconds for the request.
+
+    Returns:
+        dict: The parsed /json/version payload (Browser, webSocketDebuggerUrl, ...), or None if
+              nothing is listening on the port yet.
+    """
+    return _get_json(f"http://{host}:{port}/json/version", timeout)
+
+
+def wait_for_devtools(port, timeout, host="127.0.0.1"):
+    """
+    Waits until the DevTools endpoint on the given port answers.
+
+    Returns:
+        dict: The parsed /json/version payload.
+
+    Raises:
+        ReadinessTimeout: If Chrome does not answer within the timeout.
+    """
+    return wait_until(
+        lambda: devtools_version(port, host),
+        timeout,
+        message=f"DevTools listening on port {port}",
+        initial_interval=0.02,
+        max_interval=0.25,
+    )
+
+
+def devtools_targets(port, host="127.0.0.1", timeout=1.0):
+    """
+    Lists the targets (tabs, workers, ...) of a Chrome instance started with --remote-debugging-port.
+
+    Returns:
+        list: The parsed /json/list payload (id, type, url, webSocketDebuggerUrl, ...), or an empty list
+              if nothing is listening on the port.
+    """
+    targets = _get_json(f"http://{host}:{port}/json/list", timeout)
+    return [] if targets is None else targets
+
+
+def _get_json(url, timeout):
+    """
+    Returns the parsed JSON body of a DevTools HTTP endpoint, or None if nothing answers.
+    """
+    # Imported here: urllib.request loads http.client and ssl, which most imports of the package never use
+    import urllib.request
+    import urllib.error
+
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return json.loads(response.read().decode("utf8"))
+    except (urllib.error.URLError, ConnectionError, OSError, ValueError):
+        return None
@@ -0,0 +1,116 @@
+import os
+import re
+import json
+import logging
+import platform
+import subprocess
+import threading
+
+logger = logging.getLogger(__name__)
+
+VERSION_PATTERN = re.compile(r"(\d+\.\d+\.\d+\.\d+)")
+
+_lock = threading.Lock()
+
+
+def default_cache_dir():
+    """
+    Returns the directory where resolved ChromeDriver paths are cached. Can be overridden with the
+    CHATGPT_AUTOMATION_CACHE_DIR environment variable.
+    """
+    return os.environ.get(
+        "CHATGPT_AUTOMATION_CACHE_DIR",
+        os.path.join(os.path.expanduser("~"), ".cache", "chatgpt_automation"),
+    )
+
+
+def get_chrome_version(chrome_path):
+    """
+    Returns the full version of the Chrome executable (e.g. "120.0.6099.109"), or None if it cannot
+    be determined.
+
+    On Windows chrome.exe does not print its version, so the versioned directory installed next to
+    the executable is used instead.
+    """
+    if platform.system() == "Windows":
+        try:
+            for entry in os.listdir(os.path.dirname(chrome_path)):
+                match = VERSION_PATTERN.fullmatch(entry)
+                if match:
+                    return match.group(1)
+        except OSError as e:
+            logger.error(f"Failed to read the Chrome version directory: {e}")
+        return None
+
+    try:
+        output = subprocess.run(
+            [chrome_path, "--version"],
+            capture_output=True,
+            text=True,
+            timeout=10,
+        ).stdout
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.error(f"Failed to read the Chrome version: {e}")
+        return None
+    match = VERSION_PATTERN.search(output)
+    return match.group(1) if match else None
+
+
+def resolve_chrome_driver(chrome_path, cache_dir=None, install=None):
+    """
+    Returns the path of a ChromeDriver matching the installed Chrome, installing it only the first time
+    a Chrome version is seen. The resolved path is cached on disk keyed by the Chrome version, so later
+    constructions skip ChromeDriverManager (and its network requests) entirely.
+
+    Args:
+        chrome_path (str): Path of the Chrome executable.
+        cache_dir (str): Directory of the cache index. Defaults to default_cache_dir().
+        install (callable): Zero-argument callable returning a freshly installed driver path.
+                            Defaults to ChromeDriverManager().install().
+
+    Returns:
+        str: The ChromeDriver executable path.
+    """
+    if install is None:
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        install = lambda: ChromeDriverManager().install()
+
+    version = get_chrome_version(chrome_path)
+    if version is None:
+        return install()
+
+    cache_dir = cache_dir or default_cache_dir()
+    index_path = os.path.join(cache_dir, "drivers.json")
+
+    with _lock:
+        index = _read_index(index_path)
+        driver_path = index.get(version)
+        if driver_path and os.path.isfile(driver_path):
+            logger.info(f"Using cached ChromeDriver for Chrome {version}: {driver_path}")
+            return driver_path
+
+        driver_path = install()
+        index[version] = driver_path
+        _write_index(index_path, index)
+        logger.info(f"Cached ChromeDriver for Chrome {version}: {driver_path}")
+        return driver_path
+
+
+def _read_index(index_path):
+    try:
+        with open(index_path, encoding="utf8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_index(index_path, index):
+    try:
+        os.makedirs(os.path.dirname(index_path), exist_ok=True)
+        temp_path = f"{index_path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf8") as file:
+            json.dump(index, file, indent=2)
+        os.replace(temp_path, index_path)
+    except OSError as e:
+        logger.error(f"Failed to write the ChromeDriver cache: {e}")
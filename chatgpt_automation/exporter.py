@@ -0,0 +1,115 @@
+import json
+import logging
+import datetime
+from . import scripts
+from .conversation import Turn, strip_sentinel_instruction, strip_sentinels
+
+logger = logging.getLogger(__name__)
+
+
+class ConversationExporter:
+    """
+    Streams the turns of the current conversation to a file.
+
+    Turns are read in pages with one execute_script call per page (instead of one round-trip per turn)
+    and written as soon as they are read, so memory is bounded by the page size whatever the length of
+    the conversation. Supported formats are "text" (the layout of save_conversation), "jsonl" and
+    "markdown" (turns converted in the page like return_last_response_md); role, index and timestamp
+    metadata is kept in the last two.
+    """
+
+    FORMATS = ("text", "jsonl", "markdown")
+    DELIMITER = "----------------------------------------"
+
+    def __init__(self, driver, locator, page_size=50, sentinel=False):
+        """
+        :param driver: The Selenium WebDriver controlling the ChatGPT page.
+        :param locator: CSS locator tuple matching one element per conversation turn.
+        :param page_size: Number of turns fetched per execute_script call.
+        :param sentinel: The prompts start with the sentinel instruction and the responses end with a uuid
+                         (sentinel mode); both are left out.
+        """
+        self.driver = driver
+        self.locator = locator
+        self.page_size = page_size
+        self.sentinel = sentinel
+
+    def iter_turns(self, markdown=False):
+        """
+        Yields every turn of the conversation, one page of turns in memory at a time.
+
+        Args:
+            markdown (bool): If True, the text of each turn is serialized to Markdown in the page, with
+                             the same converter as return_last_response_md.
+
+        Raises:
+            RuntimeError: If the conversation is replaced while it is being read.
+        """
+        start = 0
+        anchor_id = None
+        while True:
+            result = self.driver.execute_script(
+                scripts.READ_TURNS_MARKDOWN if markdown else scripts.READ_TURNS,
+                self.locator[1],
+                start,
+                anchor_id,
+                self.page_size,
+                markdown,
+            )
+            if result["reset"]:
+                raise RuntimeError("The conversation changed while it was being exported.")
+            page = result["turns"]
+            for offset, data in enumerate(page):
+                text = data["text"]
+                if self.sentinel and data["role"] == "user":
+                    text = strip_sentinel_instruction(text)
+                elif self.sentinel:
+                    text = strip_sentinels(text)
+                yield Turn(start + offset, data["id"], data["role"], text, data.get("timestamp"))
+            if not page or start + len(page) >= result["count"]:
+                return
+            start += len(page)
+            anchor_id = page[-1]["id"]
+
+    def export(self, path, fmt="text", mode="w"):
+        """
+        Writes the conversation to a file.
+
+        Args:
+            path (str): Destination file.
+            fmt (str): One of "text", "jsonl" or "markdown".
+            mode (str): File mode, "w" to overwrite or "a" to append.
+
+        Returns:
+            int: The number of turns written.
+
+        Raises:
+            ValueError: If the format is not supported.
+            RuntimeError: If the conversation is replaced while it is being read.
+        """
+        if fmt not in self.FORMATS:
+            raise ValueError(f"Unsupported export format '{fmt}', use one of {self.FORMATS}")
+
+        write_turn = getattr(self, f"_write_{fmt}")
+        exported_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        count = 0
+        with open(path, mode, encoding="utf8") as file:
+            if fmt == "markdown" and file.tell() == 0:
+                file.write(f"# ChatGPT conversation\n\n_Exported {exported_at}_\n\n")
+            for turn in self.iter_turns(markdown=fmt == "markdown"):
+                write_turn(file, turn, exported_at)
+                count += 1
+        logger.info(f"Exported {count} turns to {path} as {fmt}")
+        return count
+
+    def _write_text(self, file, turn, exported_at):
+        file.write(f"{turn.text}\n\n{self.DELIMITER}\n\n")
+
+    def _write_jsonl(self, file, turn, exported_at):
+        record = dict(turn._asdict(), exported_at=exported_at)
+        file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def _write_markdown(self, file, turn, exported_at):
+        role = (turn.role or "turn").capitalize()
+        timestamp = f" · {turn.timestamp}" if turn.timestamp else ""
+        file.write(f"## {role} {turn.index}{timestamp}\n\n{turn.text}\n\n")
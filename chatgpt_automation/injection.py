@@ -0,0 +1,152 @@
+import re
+import zlib
+import logging
+from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import WebDriverException
+from . import scripts
+
+logger = logging.getLogger(__name__)
+
+# Characters ignored when checking the content of the input box, as in scripts.INPUT_DIGEST
+WHITESPACE = re.compile("[ \t\n\r\f\v\u00a0]+")
+
+
+class PromptInjector:
+    """
+    Types bulk text into the prompt input box the way a paste does, and checks that it arrived.
+
+    Setting the value of the input box from a script does not fire the events the page's framework listens
+    to, and sending keys is slow and lossy for long prompts. The injector focuses and empties the input box,
+    then delivers the text in chunks either as synthetic paste events (a DataTransfer in a ClipboardEvent)
+    or with the DevTools Input.insertText command, which inserts at the caret like an IME. Before the prompt
+    is submitted, the length and CRC-32 of the input box content are compared with the prompt (whitespace
+    aside, since editors turn line breaks into paragraphs); on a mismatch the content is set again through
+    the native value setter, and the prompt is not submitted if it still does not match.
+
+    Example:
+        chat_bot = ChatGPTAutomation(user_data=user_data, injector=PromptInjector(method="insert_text"))
+    """
+
+    METHODS = ("auto", "paste", "insert_text", "value")
+
+    # Prompts longer than this are always typed through an injector
+    LARGE_PROMPT_CHARS = 4096
+
+    def __init__(self, method="auto", chunk_chars=65536, verify=True):
+        """
+        :param method: "paste" (synthetic paste events), "insert_text" (DevTools Input.insertText),
+                       "value" (native value setter and an input event) or "auto": insert_text when the
+                       session has a DevTools channel, paste otherwise.
+        :param chunk_chars: Maximum number of characters delivered per paste or insertText command.
+        :param verify: Compare the content of the input box with the prompt before submitting it.
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"Unsupported injection method {method!r}, expected one of {self.METHODS}")
+        if chunk_chars < 1:
+            raise ValueError("chunk_chars must be positive.")
+        self.method = method
+        self.chunk_chars = chunk_chars
+        self.verify = verify
+
+    @staticmethod
+    def digest(text):
+        """
+        Returns the {"length", "crc"} of the text without whitespace, computed like scripts.INPUT_DIGEST
+        (over UTF-16 code units) so it can be compared with the content of the input box.
+        """
+        data = WHITESPACE.sub("", text).encode("utf-16-le", "surrogatepass")
+        return {"length": len(data) // 2, "crc": zlib.crc32(data)}
+
+    def chunks(self, text):
+        """
+        Splits the text in chunks of at most chunk_chars characters, never between the two halves of a
+        surrogate pair.
+        """
+        start = 0
+        while start < len(text):
+            end = min(start + self.chunk_chars, len(text))
+            if end < len(text) and "\ud800" <= text[end - 1] <= "\udbff":
+                # Keep the pair together: shorter chunk, or longer when the chunk is a single character
+                end = end - 1 if end - 1 > start else end + 1
+            yield text[start:end]
+            start = end
+
+    def inject(self, automation, text):
+        """
+        Types the text into the input box of the session's page.
+
+        Args:
+            automation (ChatGPTAutomation): The session whose page receives the text.
+            text (str): The complete prompt.
+
+        Raises:
+            NoSuchElementException: If the input box is not found.
+            WebDriverException: If the input box content does not match the text.
+        """
+        inputs = automation.elements.strategies("MSG_BOX_INPUT")
+        method = self.method
+        if method == "auto":
+            method = "insert_text" if automation.cdp is not None else "paste"
+
+        if not automation._run_script(scripts.PREPARE_INPUT, inputs):
+            raise NoSuchElementException("Prompt input box not found")
+        if method == "value":
+            self._run_input_script(automation, scripts.SET_INPUT_VALUE, inputs, text)
+        else:
+            for chunk in self.chunks(text):
+                if method == "insert_text":
+                    self._insert_text(automation, chunk)
+                else:
+                    self._run_input_script(automation, scripts.PASTE_TEXT, inputs, chunk)
+
+        if not self.verify:
+            return
+        expected = self.digest(text)
+        actual = automation._run_script(scripts.READ_INPUT_DIGEST, inputs)
+        if actual == expected:
+            return
+        logger.warning(
+            f"Prompt typed with {method} does not match ({actual} instead of {expected}), setting it again"
+        )
+        self._run_input_script(automation, scripts.SET_INPUT_VALUE, inputs, text)
+        actual = automation._run_script(scripts.READ_INPUT_DIGEST, inputs)
+        if actual != expected:
+            raise WebDriverException(
+                f"The input box does not hold the prompt: {actual} instead of {expected}"
+            )
+
+    def submit(self, automation):
+        """
+        Clicks the send button, or presses Enter in the input box if there is none.
+
+        Returns:
+            int: The number of conversation turns before the prompt was submitted.
+
+        Raises:
+            NoSuchElementException: If neither the send button nor the input box is found.
+        """
+        result = self._run_input_script(
+            automation,
+            scripts.CLICK_SEND,
+            automation.elements.css("CHAT_GPT_CONVERSION"),
+            automation.elements.strategies("MSG_BOX_INPUT"),
+            automation.elements.strategies("SEND_MSG_BTN"),
+        )
+        return result["count"]
+
+    @staticmethod
+    def _run_input_script(automation, script, *args):
+        """
+        Runs one of the input box scripts, raising NoSuchElementException when it reports {missing: ...}.
+        """
+        result = automation._run_script(script, *args)
+        if isinstance(result, dict) and "missing" in result:
+            raise NoSuchElementException(f"{result['missing']} not found")
+        return result
+
+    @staticmethod
+    def _insert_text(automation, chunk):
+        if automation.cdp is not None:
+            automation.cdp.send("Input.insertText", {"text": chunk})
+        else:
+            automation.driver.execute_cdp_cmd("Input.insertText", {"text": chunk})
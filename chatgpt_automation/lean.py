@@ -0,0 +1,122 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+IMAGE_PATTERNS = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.ico", "*.svg"]
+MEDIA_PATTERNS = ["*.mp4", "*.webm", "*.mp3", "*.m4a", "*.ogg", "*.wav"]
+FONT_PATTERNS = ["*.woff", "*.woff2", "*.ttf", "*.otf"]
+TRACKER_PATTERNS = [
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*browser-intake-datadoghq.com*",
+    "*intercomcdn.com*",
+    "*widget.intercom.io*",
+    "*segment.io*",
+    "*cdn.segment.com*",
+]
+
+
+class LeanProfile:
+    """
+    Resource-lean Chrome launch profile for worker hosts.
+
+    Chrome is started in the new headless mode with the GPU, extensions, audio and background services
+    disabled, and with per-session memory caps: the V8 heap of each renderer is limited and the number of
+    renderer processes is capped. Once the WebDriver is attached, images, media, fonts and known trackers
+    are blocked on the tab through the DevTools protocol, and the tab is kept "focused and active" so
+    that timers are not throttled, without turning throttling off for every other tab.
+
+    Example:
+        chat_bot = ChatGPTAutomation(user_data=user_data, lean=LeanProfile(js_heap_mb=256))
+    """
+
+    def __init__(
+        self,
+        headless=True,
+        block_images=True,
+        block_media=True,
+        block_fonts=True,
+        block_trackers=True,
+        blocked_urls=(),
+        js_heap_mb=512,
+        renderer_process_limit=2,
+        disk_cache_mb=32,
+    ):
+        """
+        :param headless: Start Chrome with --headless=new.
+        :param block_images: Block image requests.
+        :param block_media: Block audio and video requests.
+        :param block_fonts: Block web font requests.
+        :param block_trackers: Block known analytics and tracking hosts.
+        :param blocked_urls: Extra URL patterns to block ("*" wildcards).
+        :param js_heap_mb: Maximum V8 old-space heap per renderer, in MB. No cap if None.
+        :param renderer_process_limit: Maximum number of renderer processes. No cap if None.
+        :param disk_cache_mb: Size of the HTTP disk cache, in MB. Chrome's default if None.
+        """
+        self.headless = headless
+        self.block_images = block_images
+        self.block_media = block_media
+        self.block_fonts = block_fonts
+        self.block_trackers = block_trackers
+        self.extra_blocked_urls = list(blocked_urls)
+        self.js_heap_mb = js_heap_mb
+        self.renderer_process_limit = renderer_process_limit
+        self.disk_cache_mb = disk_cache_mb
+
+    def chrome_args(self):
+        """
+        Returns the command line switches added to the Chrome launch.
+        """
+        args = [
+            "--disable-gpu",
+            "--disable-extensions",
+            "--disable-component-update",
+            "--disable-background-networking",
+            "--disable-default-apps",
+            "--disable-sync",
+            "--mute-audio",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "--autoplay-policy=user-gesture-required",
+        ]
+        if self.headless:
+            args.insert(0, "--headless=new")
+        if self.js_heap_mb:
+            args.append(f"--js-flags=--max-old-space-size={self.js_heap_mb}")
+        if self.renderer_process_limit:
+            args.append(f"--renderer-process-limit={self.renderer_process_limit}")
+        if self.disk_cache_mb is not None:
+            args.append(f"--disk-cache-size={self.disk_cache_mb * 1024 * 1024}")
+        return args
+
+    def blocked_urls(self):
+        """
+        Returns the URL patterns blocked on the tab.
+        """
+        patterns = []
+        if self.block_images:
+            patterns += IMAGE_PATTERNS
+        if self.block_media:
+            patterns += MEDIA_PATTERNS
+        if self.block_fonts:
+            patterns += FONT_PATTERNS
+        if self.block_trackers:
+            patterns += TRACKER_PATTERNS
+        return patterns + self.extra_blocked_urls
+
+    def apply(self, driver):
+        """
+        Applies the DevTools settings to the tab the WebDriver controls. Must be called again for every
+        tab the session switches to.
+        """
+        try:
+            patterns = self.blocked_urls()
+            if patterns:
+                driver.execute_cdp_cmd("Network.enable", {})
+                driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+            # Keep the driven tab out of background throttling, whatever the window focus
+            driver.execute_cdp_cmd("Emulation.setFocusEmulationEnabled", {"enabled": True})
+            driver.execute_cdp_cmd("Page.setWebLifecycleState", {"state": "active"})
+        except Exception as e:
+            logger.error(f"Failed to apply the lean profile to the tab: {e}")
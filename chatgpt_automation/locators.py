@@ -0,0 +1,224 @@
+import os
+import json
+import logging
+import threading
+from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import StaleElementReferenceException
+
+logger = logging.getLogger(__name__)
+
+
+class By:
+    """
+    The locator strategies of selenium.webdriver.common.by.By. Importing that module loads the whole
+    selenium.webdriver package, so the locators use these values instead; they are the same strings.
+    """
+
+    ID = "id"
+    XPATH = "xpath"
+    LINK_TEXT = "link text"
+    PARTIAL_LINK_TEXT = "partial link text"
+    NAME = "name"
+    TAG_NAME = "tag name"
+    CLASS_NAME = "class name"
+    CSS_SELECTOR = "css selector"
+
+
+BY_VALUES = {
+    value for name, value in vars(By).items() if not name.startswith("_") and isinstance(value, str)
+}
+
+
+def load_locator_overrides(source):
+    """
+    Reads selector overrides, so a UI change can be worked around without a release.
+
+    The source is a dict or the path of a JSON file mapping locator names of ChatGPTLocators to an
+    ordered list of [by, value] strategies (a single [by, value] pair is accepted too), e.g.:
+
+        {"MSG_BOX_INPUT": [["css selector", "div#prompt-textarea"], ["tag name", "textarea"]]}
+
+    Args:
+        source (str | dict): JSON file path or already parsed overrides.
+
+    Returns:
+        dict: Locator name -> list of (by, value) tuples.
+
+    Raises:
+        ValueError: If a strategy is malformed or uses an unknown "by".
+    """
+    if isinstance(source, str):
+        with open(os.path.expanduser(source), encoding="utf8") as file:
+            source = json.load(file)
+
+    overrides = {}
+    for name, strategies in source.items():
+        if strategies and isinstance(strategies[0], str):
+            strategies = [strategies]
+        chain = []
+        for strategy in strategies:
+            if len(strategy) != 2 or strategy[0] not in BY_VALUES:
+                raise ValueError(
+                    f"Invalid strategy {strategy!r} for {name}, expected [by, value] with by in {sorted(BY_VALUES)}"
+                )
+            chain.append(tuple(strategy))
+        if not chain:
+            raise ValueError(f"No strategy given for {name}")
+        overrides[name] = chain
+    return overrides
+
+
+class ElementLocator:
+    """
+    Locates the elements of the ChatGPT page through ordered fallback strategies.
+
+    Each element name of the locators class (e.g. "MSG_BOX_INPUT") resolves to a chain: the selector
+    defined on the class, then the alternatives listed in its FALLBACKS, unless overrides replace the
+    whole chain. The first strategy that matches is remembered for the session and tried first from then
+    on, so a selector broken by a UI change costs one extra lookup once instead of an outage.
+
+    Element handles returned by find() are cached and reused without any lookup; they are only looked up
+    again when using them raises StaleElementReferenceException (see act()) or after invalidate().
+    """
+
+    def __init__(self, driver, locators, overrides=None):
+        """
+        :param driver: The Selenium WebDriver controlling the ChatGPT page.
+        :param locators: Class holding the (by, value) locator tuples and their FALLBACKS.
+        :param overrides: Optional dict from load_locator_overrides() replacing chains by name.
+        """
+        self.driver = driver
+        self.locators = locators
+        self.overrides = overrides or {}
+        self.winners = {}
+        self.handles = {}
+        self.lookups = 0
+        self.cache_hits = 0
+        self.fallbacks = 0
+        self.lock = threading.Lock()
+
+    def strategies(self, name):
+        """
+        Returns the ordered strategies of an element, the one that last matched first.
+        """
+        chain = self.overrides.get(name)
+        if chain is None:
+            chain = [getattr(self.locators, name)] + list(
+                getattr(self.locators, "FALLBACKS", {}).get(name, ())
+            )
+        winner = self.winners.get(name)
+        if winner is not None and winner != chain[0]:
+            chain = [winner] + [strategy for strategy in chain if strategy != winner]
+        return chain
+
+    def locator(self, name):
+        """
+        Returns the (by, value) tuple of the strategy currently preferred for an element, for APIs
+        taking a locator such as the readiness conditions.
+        """
+        return self.strategies(name)[0]
+
+    def css(self, name):
+        """
+        Returns the CSS selector preferred for an element, for the scripts run in the page.
+
+        Raises:
+            ValueError: If none of the element's strategies is a CSS selector.
+        """
+        for by, value in self.strategies(name):
+            if by == By.CSS_SELECTOR:
+                return value
+        raise ValueError(f"{name} has no CSS selector strategy")
+
+    def find(self, name, cached=True):
+        """
+        Returns the first element matched by the element's strategies, trying them in order.
+
+        Args:
+            name (str): Element name, e.g. "MSG_BOX_INPUT".
+            cached (bool): Reuse the handle found by a previous call, without any WebDriver command.
+
+        Raises:
+            NoSuchElementException: If no strategy matches.
+        """
+        if cached:
+            handle = self.handles.get(name)
+            if handle is not None:
+                self.cache_hits += 1
+                return handle
+
+        chain = self.strategies(name)
+        for index, strategy in enumerate(chain):
+            self.lookups += 1
+            elements = self.driver.find_elements(*strategy)
+            if elements:
+                self._remember(name, strategy, index, chain)
+                self.handles[name] = elements[0]
+                return elements[0]
+        raise NoSuchElementException(f"{name} not found with any of {chain}")
+
+    def find_all(self, name):
+        """
+        Returns all the elements matched by the preferred strategy, or by the first strategy of the chain
+        that matches anything. Meant for counting and presence checks while polling: once a strategy has
+        matched, an absent element costs a single lookup.
+        """
+        chain = self.strategies(name)
+        if name in self.winners:
+            chain = chain[:1]
+        for index, strategy in enumerate(chain):
+            self.lookups += 1
+            elements = self.driver.find_elements(*strategy)
+            if elements:
+                self._remember(name, strategy, index, chain)
+                return elements
+        return []
+
+    def present(self, name):
+        return bool(self.find_all(name))
+
+    def act(self, name, action):
+        """
+        Calls action(element) with the cached handle of an element, looking the element up again and
+        retrying once if the handle has gone stale.
+
+        Returns:
+            The value returned by the action.
+        """
+        try:
+            return action(self.find(name))
+        except StaleElementReferenceException:
+            logger.info(f"Cached {name} element went stale, looking it up again")
+            self.invalidate(name)
+            return action(self.find(name, cached=False))
+
+    def invalidate(self, name=None):
+        """
+        Drops the cached handle of an element, or of every element (e.g. after navigating). The winning
+        strategies are kept.
+        """
+        if name is None:
+            self.handles.clear()
+        else:
+            self.handles.pop(name, None)
+
+    def stats(self):
+        """
+        Returns the lookup counters and the strategy each element resolved to.
+        """
+        return {
+            "lookups": self.lookups,
+            "cache_hits": self.cache_hits,
+            "fallbacks": self.fallbacks,
+            "winners": {name: list(strategy) for name, strategy in self.winners.items()},
+        }
+
+    def _remember(self, name, strategy, index, chain):
+        with self.lock:
+            if self.winners.get(name) == strategy:
+                return
+            self.winners[name] = strategy
+        primary = self.overrides[name][0] if name in self.overrides else getattr(self.locators, name)
+        if strategy != primary:
+            self.fallbacks += 1
+            logger.warning(f"{name} located with fallback strategy {strategy} (position {index} of {chain})")
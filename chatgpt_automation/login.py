@@ -0,0 +1,120 @@
+import os
+import json
+import time
+import threading
+from selenium.common.exceptions import WebDriverException
+
+# Version of the session state files written by save_session_state()
+SESSION_STATE_VERSION = 1
+
+# Fields of a DevTools Network.Cookie that Network.setCookies accepts back
+COOKIE_PARAM_FIELDS = (
+    "name",
+    "value",
+    "domain",
+    "path",
+    "secure",
+    "httpOnly",
+    "sameSite",
+    "expires",
+    "priority",
+    "sourceScheme",
+    "sourcePort",
+    "partitionKey",
+)
+
+LOGIN_METHODS = ("password", "google")
+
+
+class LoginRequired(WebDriverException):
+    """
+    Raised when the session is not logged in and cannot log in by itself: no credentials, a stale session
+    state, or a login that does not reach the chat page.
+    """
+
+
+class Credentials:
+    """
+    Account used by ChatGPTAutomation.login(): an email and a password entered either in the ChatGPT login
+    form ("password") or in the Google sign-in form ("google").
+
+    Example:
+        chat_bot = ChatGPTAutomation(user_data=user_data, credentials=Credentials.from_env())
+    """
+
+    def __init__(self, email, password=None, method="password"):
+        """
+        :param email: Email of the account.
+        :param password: Password of the account. Not needed for a Google account already signed in the
+                         browser profile.
+        :param method: "password" or "google".
+        """
+        if method not in LOGIN_METHODS:
+            raise ValueError(f"Unknown login method {method!r}, expected one of {LOGIN_METHODS}")
+        self.email = email
+        self.password = password
+        self.method = method
+
+    @classmethod
+    def from_env(cls, environ=None):
+        """
+        Returns the credentials named by the CHATGPT_EMAIL, CHATGPT_PASSWORD and CHATGPT_LOGIN_METHOD
+        environment variables, or None if CHATGPT_EMAIL is not set.
+        """
+        environ = os.environ if environ is None else environ
+        email = environ.get("CHATGPT_EMAIL")
+        if not email:
+            return None
+        return cls(
+            email, environ.get("CHATGPT_PASSWORD"), environ.get("CHATGPT_LOGIN_METHOD") or "password"
+        )
+
+    def __repr__(self):
+        return f"Credentials({self.email!r}, password={'***' if self.password else None}, method={self.method!r})"
+
+
+def cookie_params(cookies, now=None):
+    """
+    Converts the cookies returned by the DevTools Network.getCookies command to the parameters of
+    Network.setCookies. Session cookies stay session cookies and expired cookies are dropped.
+    """
+    now = time.time() if now is None else now
+    params = []
+    for cookie in cookies:
+        expires = cookie.get("expires", -1)
+        if expires is not None and 0 <= expires < now:
+            continue
+        param = {key: cookie[key] for key in COOKIE_PARAM_FIELDS if key in cookie}
+        if expires is None or expires < 0 or cookie.get("session"):
+            param.pop("expires", None)
+        params.append(param)
+    return params
+
+
+def save_session_state(state, path):
+    """
+    Writes a session state (see ChatGPTAutomation.export_session_state()) to a JSON file readable by the
+    owner only, since its cookies give access to the account.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    # Sessions of a pool may save the same file at once: each writes its own file and replaces the target
+    temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    descriptor = os.open(temporary, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(descriptor, "w", encoding="utf8") as file:
+        json.dump(state, file)
+    os.replace(temporary, path)
+
+
+def load_session_state(path):
+    """
+    Reads a session state written by save_session_state().
+
+    Raises:
+        ValueError: If the file is not a session state of a supported version.
+    """
+    with open(path, encoding="utf8") as file:
+        state = json.load(file)
+    if not isinstance(state, dict) or state.get("version") != SESSION_STATE_VERSION:
+        raise ValueError(f"{path} is not a version {SESSION_STATE_VERSION} session state")
+    return state
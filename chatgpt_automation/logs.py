@@ -0,0 +1,104 @@
+import queue
+import atexit
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+# Parent of the loggers of every module of the package
+LOGGER_NAME = "chatgpt_automation"
+LOG_FORMAT = "%(asctime)s:%(levelname)s:%(message)s"
+DEFAULT_LOG_FILE = "chatgpt_automation.log"
+
+_lock = threading.Lock()
+_installed = None
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler that never blocks the logging thread: when the queue is full the record is dropped and
+    counted in `dropped`, instead of waiting for the listener or reporting an error.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self):
+        # Waits for room instead of failing when stop() is called while the queue is full
+        self.queue.put(self._sentinel)
+
+
+def configure_logging(filename=DEFAULT_LOG_FILE, level=logging.INFO, handlers=None, fmt=LOG_FORMAT, queue_size=10000):
+    """
+    Sends the records of the package's loggers to a file (or to the given handlers) from a background
+    thread. The thread that logs only puts the record on a bounded queue, so a slow disk never delays a
+    WebDriver call; a QueueListener thread formats and writes the records. Records are dropped, not
+    waited for, when the queue is full.
+
+    Importing the package configures no logging: its records go to the "chatgpt_automation" logger and
+    propagate to the handlers of the application, if any. Calling this again replaces the previous
+    configuration. The root logger is never touched.
+
+    Example:
+        configure_logging("worker.log", level=logging.WARNING)
+
+    Args:
+        filename (str): File the records are appended to, if no handlers are given.
+        level (int): Level of the "chatgpt_automation" logger.
+        handlers (list): Handlers the listener writes the records to, instead of the file.
+        fmt (str): Format of the records written to the file.
+        queue_size (int): Records held before new ones are dropped.
+
+    Returns:
+        DroppingQueueHandler: The handler added to the logger; its `dropped` counts the dropped records.
+    """
+    global _installed
+    owned = []
+    if handlers is None:
+        file_handler = logging.FileHandler(filename, encoding="utf8", delay=True)
+        file_handler.setFormatter(logging.Formatter(fmt))
+        handlers = owned = [file_handler]
+    log_queue = queue.Queue(queue_size)
+    handler = DroppingQueueHandler(log_queue)
+    listener = _Listener(log_queue, *handlers, respect_handler_level=True)
+
+    logger = logging.getLogger(LOGGER_NAME)
+    with _lock:
+        _stop(_installed)
+        logger.addHandler(handler)
+        logger.setLevel(level)
+        listener.start()
+        _installed = (handler, listener, owned)
+    return handler
+
+
+def stop_logging():
+    """
+    Writes the queued records and removes the handler added by configure_logging(). Runs at exit.
+    """
+    global _installed
+    with _lock:
+        _stop(_installed)
+        _installed = None
+
+
+def _stop(installed):
+    if installed is None:
+        return
+    handler, listener, owned = installed
+    logging.getLogger(LOGGER_NAME).removeHandler(handler)
+    listener.stop()
+    # The handlers given by the application stay open
+    for target in owned:
+        target.close()
+
+
+atexit.register(stop_logging)
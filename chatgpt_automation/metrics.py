@@ -0,0 +1,415 @@
+import json
+import time
+import bisect
+import inspect
+import logging
+import threading
+import functools
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the latency buckets, in seconds
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0,
+)
+# Upper bounds of the WebDriver command count buckets
+COMMAND_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000)
+
+_local = threading.local()
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram. Recording a value is a bisect and a few additions, and memory does not grow
+    with the number of observations. Percentiles are estimated as the upper bound of their bucket.
+    """
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def percentile(self, percent):
+        if not self.count:
+            return None
+        rank = percent / 100 * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                return self.buckets[index] if index < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+        }
+
+    def cumulative(self):
+        """
+        Yields (upper bound, cumulative count) pairs, ending with "+Inf", as in the Prometheus format.
+        """
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield bound, total
+        yield "+Inf", self.count
+
+
+class OperationStats:
+    """
+    Histograms of one operation: wall time, time spent sleeping and WebDriver commands per call.
+    """
+
+    def __init__(self):
+        self.errors = 0
+        self.wall = Histogram(LATENCY_BUCKETS)
+        self.sleep = Histogram(LATENCY_BUCKETS)
+        self.commands = Histogram(COMMAND_BUCKETS)
+
+    def snapshot(self):
+        return {
+            "calls": self.wall.count,
+            "errors": self.errors,
+            "wall": self.wall.snapshot(),
+            "sleep": self.sleep.snapshot(),
+            "commands": self.commands.snapshot(),
+        }
+
+
+class _Frame:
+    __slots__ = ("sleep", "commands")
+
+    def __init__(self):
+        self.sleep = 0.0
+        self.commands = 0
+
+
+def _current_frame():
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if stack else None
+
+
+def _push(frame):
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    stack.append(frame)
+
+
+def _pop():
+    """
+    Pops the current frame and adds its sleep time and command count to the enclosing operation.
+    """
+    stack = _local.stack
+    frame = stack.pop()
+    if stack:
+        stack[-1].sleep += frame.sleep
+        stack[-1].commands += frame.commands
+    return frame
+
+
+def timed_sleep(seconds):
+    """
+    time.sleep() whose duration is charged to the operation being measured on this thread, if any.
+    """
+    if not getattr(_local, "stack", None):
+        time.sleep(seconds)
+        return
+    started = time.perf_counter()
+    time.sleep(seconds)
+    _local.stack[-1].sleep += time.perf_counter() - started
+
+
+class Metrics:
+    """
+    Per-operation instrumentation of ChatGPTAutomation sessions.
+
+    For every public method call it records the wall time, the time spent in sleeps (fixed delays and
+    readiness polling) and the number of WebDriver commands issued; for every prompt the time to the
+    first token and to completion. Values go to fixed-bucket histograms, so recording is cheap and
+    memory stays constant. Nested calls (ask() uploading files and sending the prompt) are recorded
+    under their own name and also counted in the enclosing call.
+
+    A Metrics object can be shared by several sessions (e.g. all the sessions of a pool). Sessions
+    created without one are not instrumented at all: public methods run as-is, and the WebDriver is
+    not wrapped.
+
+    Example:
+        metrics = Metrics()
+        chat_bot = ChatGPTAutomation(user_data=user_data, metrics=metrics)
+        chat_bot.ask("Hello")
+        print(metrics.stats()["operations"]["ask"]["wall"]["p50"])
+        metrics.serve(9464)  # Prometheus text endpoint on http://127.0.0.1:9464/metrics
+    """
+
+    PROMPT_PHASES = ("first_token", "completion")
+
+    def __init__(self, prefix="chatgpt_automation"):
+        """
+        :param prefix: Prefix of the metric names in the Prometheus output.
+        """
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.operations = {}
+        self.prompts = {phase: Histogram(LATENCY_BUCKETS) for phase in self.PROMPT_PHASES}
+        self.commands_total = 0
+        self.started_at = time.time()
+        self.server = None
+
+    def measure(self, name, func, *args, **kwargs):
+        """
+        Calls func and records it as one call of the operation name.
+        """
+        frame = _Frame()
+        _push(frame)
+        started = time.perf_counter()
+        failed = True
+        try:
+            result = func(*args, **kwargs)
+            failed = False
+            return result
+        finally:
+            _pop()
+            self._record(name, time.perf_counter() - started, frame, failed)
+
+    def measure_generator(self, name, generator):
+        """
+        Iterates a generator and records it as one call of the operation name, from creation until it
+        is exhausted. Only the time spent inside the generator is charged with its sleeps and commands.
+        """
+        frame = _Frame()
+        started = time.perf_counter()
+        failed = True
+        try:
+            while True:
+                _push(frame)
+                try:
+                    item = next(generator)
+                except StopIteration:
+                    failed = False
+                    return
+                finally:
+                    _local.stack.pop()
+                yield item
+        except GeneratorExit:
+            # Closed early by the consumer, not a failure
+            failed = False
+            raise
+        finally:
+            generator.close()
+            self._record(name, time.perf_counter() - started, frame, failed)
+
+    def observe_prompt(self, phase, seconds):
+        """
+        Records the time to the first token ("first_token") or to the complete response ("completion").
+        """
+        with self.lock:
+            self.prompts[phase].observe(seconds)
+
+    def instrument_driver(self, driver):
+        """
+        Counts every command sent by the WebDriver (and by its elements), by wrapping driver.execute.
+        """
+        execute = driver.execute
+
+        def counted_execute(driver_command, params=None):
+            frame = _current_frame()
+            if frame is not None:
+                frame.commands += 1
+            with self.lock:
+                self.commands_total += 1
+            return execute(driver_command, params)
+
+        driver.execute = counted_execute
+        return driver
+
+    def instrument_cdp(self, connection):
+        """
+        Counts the commands sent over a DevTools channel (CDPConnection) like WebDriver commands.
+        """
+        send = connection.send
+
+        def counted_send(method, params=None, timeout=None):
+            frame = _current_frame()
+            if frame is not None:
+                frame.commands += 1
+            with self.lock:
+                self.commands_total += 1
+            return send(method, params, timeout)
+
+        connection.send = counted_send
+        return connection
+
+    def stats(self):
+        """
+        Returns a snapshot of every histogram as a JSON-serializable dict.
+        """
+        with self.lock:
+            return {
+                "started_at": self.started_at,
+                "uptime": time.time() - self.started_at,
+                "webdriver_commands": self.commands_total,
+                "operations": {
+                    name: operation.snapshot() for name, operation in sorted(self.operations.items())
+                },
+                "prompts": {phase: histogram.snapshot() for phase, histogram in self.prompts.items()},
+            }
+
+    def dump_json(self, path):
+        """
+        Writes the stats() snapshot to a JSON file.
+        """
+        with open(path, "w", encoding="utf8") as file:
+            json.dump(self.stats(), file, indent=2)
+
+    def prometheus(self):
+        """
+        Returns the metrics in the Prometheus text exposition format.
+        """
+        prefix = self.prefix
+        lines = []
+        with self.lock:
+            for metric, attribute, help_text in (
+                ("operation_seconds", "wall", "Wall time of ChatGPTAutomation calls."),
+                ("operation_sleep_seconds", "sleep", "Time spent sleeping during ChatGPTAutomation calls."),
+                ("operation_webdriver_commands", "commands", "WebDriver commands issued per call."),
+            ):
+                lines.append(f"# HELP {prefix}_{metric} {help_text}")
+                lines.append(f"# TYPE {prefix}_{metric} histogram")
+                for name, operation in sorted(self.operations.items()):
+                    self._histogram_lines(lines, f"{prefix}_{metric}", f'operation="{name}"',
+                                          getattr(operation, attribute))
+
+            lines.append(f"# HELP {prefix}_operation_errors_total Calls that raised an exception.")
+            lines.append(f"# TYPE {prefix}_operation_errors_total counter")
+            for name, operation in sorted(self.operations.items()):
+                lines.append(f'{prefix}_operation_errors_total{{operation="{name}"}} {operation.errors}')
+
+            lines.append(f"# HELP {prefix}_prompt_seconds Time from sending a prompt to its first token or completion.")
+            lines.append(f"# TYPE {prefix}_prompt_seconds histogram")
+            for phase, histogram in self.prompts.items():
+                self._histogram_lines(lines, f"{prefix}_prompt_seconds", f'phase="{phase}"', histogram)
+
+            lines.append(f"# HELP {prefix}_webdriver_commands_total WebDriver commands issued.")
+            lines.append(f"# TYPE {prefix}_webdriver_commands_total counter")
+            lines.append(f"{prefix}_webdriver_commands_total {self.commands_total}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port=0, host="127.0.0.1"):
+        """
+        Starts a background HTTP server exposing prometheus() on /metrics and stats() on /stats.
+
+        Returns:
+            int: The port the server listens on.
+        """
+        from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body = metrics.prometheus().encode("utf8")
+                    content_type = "text/plain; version=0.0.4; charset=utf-8"
+                elif self.path == "/stats":
+                    body = json.dumps(metrics.stats()).encode("utf8")
+                    content_type = "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        port = self.server.server_address[1]
+        logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+        return port
+
+    def close(self):
+        """
+        Stops the HTTP server started by serve().
+        """
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def reset(self):
+        with self.lock:
+            self.operations = {}
+            self.prompts = {phase: Histogram(LATENCY_BUCKETS) for phase in self.PROMPT_PHASES}
+            self.commands_total = 0
+            self.started_at = time.time()
+
+    def _record(self, name, wall, frame, failed):
+        with self.lock:
+            operation = self.operations.get(name)
+            if operation is None:
+                operation = self.operations[name] = OperationStats()
+            operation.wall.observe(wall)
+            operation.sleep.observe(frame.sleep)
+            operation.commands.observe(frame.commands)
+            if failed:
+                operation.errors += 1
+
+    @staticmethod
+    def _histogram_lines(lines, metric, labels, histogram):
+        for bound, count in histogram.cumulative():
+            lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {count}')
+        lines.append(f"{metric}_sum{{{labels}}} {histogram.sum}")
+        lines.append(f"{metric}_count{{{labels}}} {histogram.count}")
+
+
+def instrumented(method):
+    """
+    Decorator recording a ChatGPTAutomation method in the session's Metrics. When the session has no
+    metrics the method is called directly, at the cost of one attribute lookup.
+    """
+    name = method.__name__
+
+    if inspect.isgeneratorfunction(method):
+        @functools.wraps(method)
+        def generator_wrapper(self, *args, **kwargs):
+            metrics = self.metrics
+            if metrics is None:
+                return method(self, *args, **kwargs)
+            return metrics.measure_generator(name, method(self, *args, **kwargs))
+
+        return generator_wrapper
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        metrics = self.metrics
+        if metrics is None:
+            return method(self, *args, **kwargs)
+        return metrics.measure(name, method, self, *args, **kwargs)
+
+    return wrapper
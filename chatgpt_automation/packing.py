@@ -0,0 +1,219 @@
+import re
+import json
+import time
+import logging
+from selenium.common.exceptions import WebDriverException
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("numbered", "json")
+
+NUMBERED_INSTRUCTION = (
+    "Answer each of the {count} numbered prompts below on its own, independently of the others. Reply with "
+    "exactly {count} answers in the same order, each on a new line starting with the number of its prompt "
+    "in square brackets, like [1], and nothing else."
+)
+JSON_INSTRUCTION = (
+    "Answer each of the {count} prompts of the JSON array below on its own, independently of the others. "
+    'Reply with only a JSON object mapping the "id" of every prompt to its answer as a string, like '
+    '{{"1": "answer"}}, and nothing else.'
+)
+
+# Start of a numbered answer: "[3]" at the start of a line, possibly in bold or a list item
+SLOT_MARKER = re.compile(r"^[ \t*_>-]*\[(\d+)\][ \t*_:]*", re.MULTILINE)
+
+
+class PromptPacker:
+    """
+    Sends many short prompts in one message and splits the response back into one answer per prompt.
+
+    Every message costs a full round of typing, generation start-up and completion polling, however short
+    the prompt; for short classification or extraction prompts that overhead is most of the time. The
+    packer groups up to `max_prompts` prompts, within a budget of `max_chars` characters per message, into
+    numbered slots ("[1] ...") or a JSON array of {"id", "prompt"}, and asks for the answers in the same
+    shape. Answers are matched to their prompts by slot number; a slot that is missing or empty in the
+    response is sent again on its own, as are the prompts of a pack whose message fails.
+
+    Example:
+        packer = PromptPacker(max_prompts=20, max_chars=6000)
+        answers = packer.run(chat_bot, ["Sentiment of: great product", "Sentiment of: broke in a day"])
+        print(packer.stats()["prompts_per_minute"])
+    """
+
+    def __init__(self, max_prompts=20, max_chars=6000, fmt="numbered", clock=time.monotonic):
+        """
+        :param max_prompts: Prompts per message.
+        :param max_chars: Characters per message, instruction included. A prompt that does not fit with the
+                          instruction is sent on its own.
+        :param fmt: "numbered" slots or "json".
+        :param clock: Monotonic clock, replaced in the tests.
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown packing format {fmt!r}, expected one of {FORMATS}")
+        if max_prompts < 1:
+            raise ValueError("max_prompts must be at least 1")
+        self.max_prompts = max_prompts
+        self.max_chars = max_chars
+        self.fmt = fmt
+        self.clock = clock
+        self.prompts = 0
+        self.messages = 0
+        self.packed = 0
+        self.requeued = 0
+        self.seconds = 0.0
+
+    def render(self, prompts):
+        """
+        Returns the message asking for the answers of the prompts. A single prompt is sent as it is.
+        """
+        if len(prompts) == 1:
+            return prompts[0]
+        if self.fmt == "json":
+            slots = [{"id": str(number), "prompt": prompt} for number, prompt in enumerate(prompts, 1)]
+            body = json.dumps(slots, ensure_ascii=False)
+            instruction = JSON_INSTRUCTION
+        else:
+            body = "\n".join(f"[{number}] {prompt}" for number, prompt in enumerate(prompts, 1))
+            instruction = NUMBERED_INSTRUCTION
+        return f"{instruction.format(count=len(prompts))}\n\n{body}"
+
+    def fits(self, prompts):
+        """
+        Returns True if the prompts can be sent as one message: within max_prompts and max_chars. A single
+        prompt always fits, since it is sent as it is.
+        """
+        if len(prompts) <= 1:
+            return True
+        return len(prompts) <= self.max_prompts and len(self.render(prompts)) <= self.max_chars
+
+    def packs(self, prompts):
+        """
+        Splits the prompts, in order, into the groups sent as one message each.
+
+        Returns:
+            list: Lists of indexes into prompts.
+        """
+        groups = []
+        current = []
+        for index, prompt in enumerate(prompts):
+            if current and not self.fits([prompts[i] for i in current] + [prompt]):
+                groups.append(current)
+                current = []
+            current.append(index)
+        if current:
+            groups.append(current)
+        return groups
+
+    def parse(self, response, count):
+        """
+        Splits the response to a message of `count` prompts into their answers.
+
+        Returns:
+            list: The answer of every slot, in order; None for a slot missing or empty in the response.
+        """
+        if count == 1:
+            return [response.strip() or None]
+        if self.fmt == "json":
+            return self._parse_json(response, count)
+        answers = [None] * count
+        markers = list(SLOT_MARKER.finditer(response))
+        for position, marker in enumerate(markers):
+            number = int(marker.group(1))
+            end = markers[position + 1].start() if position + 1 < len(markers) else len(response)
+            text = response[marker.end():end].strip()
+            # The first answer given for a slot wins
+            if 1 <= number <= count and answers[number - 1] is None and text:
+                answers[number - 1] = text
+        return answers
+
+    def _parse_json(self, response, count):
+        answers = [None] * count
+        start, end = response.find("{"), response.rfind("}")
+        if start < 0 or end < start:
+            return answers
+        try:
+            slots = json.loads(response[start:end + 1])
+        except ValueError:
+            return answers
+        if not isinstance(slots, dict):
+            return answers
+        for number in range(1, count + 1):
+            answer = slots.get(str(number))
+            if isinstance(answer, (dict, list)):
+                answer = json.dumps(answer, ensure_ascii=False)
+            elif answer is not None:
+                answer = str(answer).strip()
+            answers[number - 1] = answer or None
+        return answers
+
+    def ask_pack(self, session, prompts, timeout=None):
+        """
+        Sends the prompts as one message and returns their answers, None for the slots that could not be
+        parsed.
+
+        Raises:
+            WebDriverException: If the message fails.
+        """
+        self.messages += 1
+        response = session.ask(self.render(prompts), timeout=timeout)
+        answers = self.parse(response, len(prompts))
+        if len(prompts) > 1:
+            missing = answers.count(None)
+            self.packed += len(prompts) - missing
+            if missing:
+                logger.warning(f"{missing} of {len(prompts)} packed answers missing from the response")
+        return answers
+
+    def run(self, session, prompts, timeout=None):
+        """
+        Answers the prompts with as few messages as the budget allows. The prompts of the slots that could
+        not be parsed, or of a pack whose message failed, are sent again one at a time.
+
+        Args:
+            session: ChatGPTAutomation, or any object with a compatible ask() method.
+            prompts (list): The prompts.
+            timeout (float): Timeout of every message, passed to ask().
+
+        Returns:
+            list: The answer of every prompt, in order.
+
+        Raises:
+            WebDriverException: If a prompt sent on its own fails.
+        """
+        started = self.clock()
+        answers = [None] * len(prompts)
+        requeue = []
+        for group in self.packs(prompts):
+            try:
+                pack_answers = self.ask_pack(session, [prompts[index] for index in group], timeout)
+            except (WebDriverException, RuntimeError) as e:
+                if len(group) == 1:
+                    raise
+                logger.warning(f"Pack of {len(group)} prompts failed ({e}), sending them one at a time")
+                pack_answers = [None] * len(group)
+            for index, answer in zip(group, pack_answers):
+                answers[index] = answer
+                if answer is None and len(group) > 1:
+                    requeue.append(index)
+        for index in requeue:
+            self.requeued += 1
+            self.messages += 1
+            answers[index] = session.ask(prompts[index], timeout=timeout)
+        self.prompts += len(prompts)
+        self.seconds += self.clock() - started
+        return answers
+
+    def stats(self):
+        """
+        Returns the prompts answered by run(), the messages sent for them, the prompts answered from a pack
+        and re-sent alone, and the effective prompts per minute.
+        """
+        return {
+            "prompts": self.prompts,
+            "messages": self.messages,
+            "packed": self.packed,
+            "requeued": self.requeued,
+            "prompts_per_message": self.prompts / self.messages if self.messages else 0.0,
+            "seconds": self.seconds,
+            "prompts_per_minute": self.prompts * 60 / self.seconds if self.seconds else 0.0,
+        }
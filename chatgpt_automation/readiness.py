@@ -0,0 +1,187 @@
+import time
+import logging
+from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import StaleElementReferenceException
+from .metrics import timed_sleep
+
+logger = logging.getLogger(__name__)
+
+
+class ReadinessTimeout(TimeoutException):
+    """
+    Raised when a readiness condition does not hold before its timeout expires.
+    Subclasses Selenium's TimeoutException so existing handlers keep working.
+    """
+
+
+class PollInterval:
+    """
+    Adaptive poll interval. Starts short so fast operations return almost immediately,
+    then backs off geometrically so long waits do not flood the WebDriver with commands.
+    """
+
+    def __init__(self, initial=0.05, maximum=1.0, factor=1.5):
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.current = initial
+
+    def next(self):
+        """
+        Returns the interval to sleep now and grows the interval for the following call.
+        """
+        interval = self.current
+        self.current = min(self.current * self.factor, self.maximum)
+        return interval
+
+    def reset(self):
+        self.current = self.initial
+
+
+IGNORED_EXCEPTIONS = (NoSuchElementException, StaleElementReferenceException)
+
+
+def wait_until(
+    condition,
+    timeout,
+    message="",
+    initial_interval=0.05,
+    max_interval=1.0,
+    ignored_exceptions=IGNORED_EXCEPTIONS,
+):
+    """
+    Polls a condition until it returns a truthy value or the timeout expires.
+
+    Args:
+        condition (callable): Zero-argument callable evaluated on every poll.
+        timeout (float): Maximum number of seconds to wait.
+        message (str): Description of the awaited condition, used in the timeout error.
+        initial_interval (float): First poll interval in seconds.
+        max_interval (float): Upper bound of the adaptive poll interval in seconds.
+        ignored_exceptions (tuple): Exceptions treated as "not ready yet" instead of failures.
+
+    Returns:
+        The truthy value returned by the condition.
+
+    Raises:
+        ReadinessTimeout: If the condition does not hold within the timeout.
+    """
+    interval = PollInterval(initial_interval, max_interval)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            value = condition()
+            if value:
+                return value
+        except ignored_exceptions:
+            pass
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            logger.warning(f"Readiness timeout after {timeout}s: {message}")
+            raise ReadinessTimeout(
+                f"Condition not met within {timeout} seconds: {message}"
+            )
+        timed_sleep(min(interval.next(), remaining))
+
+
+async def async_wait_until(
+    condition,
+    timeout,
+    message="",
+    initial_interval=0.05,
+    max_interval=1.0,
+    ignored_exceptions=IGNORED_EXCEPTIONS,
+    executor=None,
+):
+    """
+    Awaitable counterpart of wait_until. The condition is evaluated in the given executor, so the
+    blocking WebDriver call never runs on the event loop, and the loop is free between polls.
+
+    Args:
+        condition (callable): Zero-argument callable evaluated on every poll.
+        timeout (float): Maximum number of seconds to wait.
+        message (str): Description of the awaited condition, used in the timeout error.
+        initial_interval (float): First poll interval in seconds.
+        max_interval (float): Upper bound of the adaptive poll interval in seconds.
+        ignored_exceptions (tuple): Exceptions treated as "not ready yet" instead of failures.
+        executor (concurrent.futures.Executor): Executor running the condition. Defaults to the loop's executor.
+
+    Returns:
+        The truthy value returned by the condition.
+
+    Raises:
+        ReadinessTimeout: If the condition does not hold within the timeout.
+    """
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    interval = PollInterval(initial_interval, max_interval)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            value = await loop.run_in_executor(executor, condition)
+            if value:
+                return value
+        except ignored_exceptions:
+            pass
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            logger.warning(f"Readiness timeout after {timeout}s: {message}")
+            raise ReadinessTimeout(
+                f"Condition not met within {timeout} seconds: {message}"
+            )
+        await asyncio.sleep(min(interval.next(), remaining))
+
+
+def element_present(driver, locator):
+    """
+    Condition that holds when at least one element matches the locator.
+    """
+    return lambda: bool(driver.find_elements(*locator))
+
+
+def element_absent(driver, locator):
+    """
+    Condition that holds when no element matches the locator.
+    """
+    return lambda: not driver.find_elements(*locator)
+
+
+def any_element_present(driver, *locators):
+    """
+    Condition that holds when any of the locators matches an element.
+    """
+    return lambda: any(driver.find_elements(*locator) for locator in locators)
+
+
+def element_count_changed(driver, locator, previous_count):
+    """
+    Condition that holds when the number of elements matching the locator differs from previous_count.
+    """
+    return lambda: len(driver.find_elements(*locator)) != previous_count
+
+
+def document_ready(driver):
+    """
+    Condition that holds when the page has finished loading.
+    """
+    return lambda: driver.execute_script("return document.readyState") == "complete"
+
+
+def element_clickable(driver, locator):
+    """
+    Condition that returns the element matching the locator once it is visible and enabled.
+    """
+    from selenium.webdriver.support import expected_conditions as EC
+
+    return lambda: EC.element_to_be_clickable(locator)(driver)
+
+
+def all_of(*conditions):
+    """
+    Condition that holds when every given condition holds.
+    """
+    return lambda: all(condition() for condition in conditions)
@@ -0,0 +1,328 @@
+import time
+import logging
+import threading
+from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import WebDriverException
+from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import NoSuchWindowException
+from selenium.common.exceptions import InvalidSessionIdException
+from selenium.common.exceptions import StaleElementReferenceException
+from .metrics import timed_sleep
+from .throttle import RateLimited
+
+logger = logging.getLogger(__name__)
+
+FAILURE_KINDS = ("generation_error", "stale_dom", "tab_crash", "timeout")
+
+# Messages of the WebDriverExceptions raised when the renderer or the browser behind the tab is gone
+TAB_CRASH_MESSAGES = (
+    "tab crashed",
+    "page crash",
+    "target crashed",
+    "target frame detached",
+    "target window already closed",
+    "no such window",
+    "chrome not reachable",
+    "disconnected",
+    "invalid session id",
+)
+
+# Actions tried for each kind of failure, one per retry; the last one is repeated
+DEFAULT_ACTIONS = {
+    "generation_error": ("regenerate", "regenerate", "new_chat"),
+    "stale_dom": ("resend", "new_chat"),
+    "tab_crash": ("new_chat",),
+    "timeout": ("regenerate", "new_chat"),
+}
+ACTIONS = ("regenerate", "resend", "new_chat")
+
+
+class GenerationError(WebDriverException):
+    """
+    Raised when the page shows "There was an error generating a response" instead of a complete response.
+    """
+
+
+class CircuitOpen(WebDriverException):
+    """
+    Raised instead of sending a prompt while the circuit breaker of the session is open.
+    """
+
+    def __init__(self, msg=None, retry_in=None):
+        super().__init__(msg)
+        self.retry_in = retry_in
+
+
+def classify_failure(error):
+    """
+    Returns the kind of failure ("generation_error", "stale_dom", "tab_crash" or "timeout") an exception
+    raised while sending a prompt or waiting for its response belongs to, or None if it is not recoverable.
+    Rate limits are not failures of the session and are never retried.
+    """
+    if isinstance(error, (RateLimited, CircuitOpen)):
+        return None
+    if isinstance(error, GenerationError):
+        return "generation_error"
+    if isinstance(error, TimeoutException):
+        return "timeout"
+    if isinstance(error, (NoSuchWindowException, InvalidSessionIdException)):
+        return "tab_crash"
+    if isinstance(error, (StaleElementReferenceException, NoSuchElementException)):
+        return "stale_dom"
+    if isinstance(error, WebDriverException):
+        message = str(error).lower()
+        if any(text in message for text in TAB_CRASH_MESSAGES):
+            return "tab_crash"
+        if "stale element" in message or "no such element" in message:
+            return "stale_dom"
+    return None
+
+
+class CircuitBreaker:
+    """
+    Per-session circuit breaker. After `failure_threshold` failures in a row the circuit opens and prompts
+    fail fast with CircuitOpen; after `reset_timeout` seconds it is half-open and lets prompts through
+    again: the first success closes it, a failure opens it for another `reset_timeout`.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=60.0, clock=time.monotonic):
+        """
+        :param failure_threshold: Failures in a row that open the circuit.
+        :param reset_timeout: Seconds the circuit stays open before a prompt is tried again.
+        :param clock: Monotonic clock, replaced in the tests.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.failures = 0
+        self.trips = 0
+        self.opened_at = None
+
+    @property
+    def state(self):
+        with self.lock:
+            return self._state()
+
+    def _state(self):
+        if self.opened_at is None:
+            return self.CLOSED
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allows(self):
+        """
+        Returns True if a prompt may be sent: the circuit is closed or half-open.
+        """
+        return self.state != self.OPEN
+
+    def retry_in(self):
+        """
+        Returns the number of seconds until the open circuit lets a prompt through, 0 if it does already.
+        """
+        with self.lock:
+            if self.opened_at is None:
+                return 0.0
+            return max(self.opened_at + self.reset_timeout - self.clock(), 0.0)
+
+    def check(self):
+        """
+        Raises:
+            CircuitOpen: If the circuit is open.
+        """
+        retry_in = self.retry_in()
+        if retry_in > 0:
+            raise CircuitOpen(
+                f"Circuit open after {self.failures} failures, retry in {retry_in:.0f}s", retry_in=retry_in
+            )
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        """
+        Counts a failure and opens the circuit once the threshold is reached, or at once when half-open.
+
+        Returns:
+            bool: True if this failure opened the circuit.
+        """
+        with self.lock:
+            self.failures += 1
+            state = self._state()
+            if state == self.OPEN:
+                return False
+            if state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+                self.trips += 1
+                return True
+            return False
+
+    def stats(self):
+        with self.lock:
+            return {"state": self._state(), "failures": self.failures, "trips": self.trips}
+
+
+class RetryBudget:
+    """
+    Caps the retries at a fraction of the prompts, so that a broken page or account does not multiply the
+    load with retries. Every prompt deposits `ratio` of a retry; every retry withdraws one. `reserve`
+    retries are always allowed, for the first prompts.
+    """
+
+    def __init__(self, ratio=0.2, reserve=5):
+        """
+        :param ratio: Retries allowed per prompt, on average.
+        :param reserve: Retries allowed on top of the earned ones.
+        """
+        self.ratio = ratio
+        self.reserve = reserve
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+
+    def record_request(self):
+        with self.lock:
+            self.requests += 1
+
+    def try_spend(self):
+        """
+        Withdraws a retry if the budget has one left.
+
+        Returns:
+            bool: True if the retry may go ahead.
+        """
+        with self.lock:
+            if self.retries + 1 > self.reserve + self.requests * self.ratio:
+                return False
+            self.retries += 1
+            return True
+
+    def remaining(self):
+        with self.lock:
+            return max(self.reserve + self.requests * self.ratio - self.retries, 0.0)
+
+
+class RecoveryPolicy:
+    """
+    Retries the prompts of ask() that fail with a recoverable error (see classify_failure): a generation
+    error, a stale DOM, a crashed tab or a timeout. Every kind of failure has its own sequence of actions,
+    one per retry:
+
+    - "regenerate": clicks the regenerate button of the failed response and waits for the new one.
+    - "resend": sends the prompt again in the same chat.
+    - "new_chat": opens a new chat (reloading the tab) and sends the prompt there.
+
+    Retries are bounded per prompt by `max_retries` and across prompts by a RetryBudget. Every session gets
+    its own CircuitBreaker from the policy (see new_breaker), so one RecoveryPolicy can be shared by the
+    sessions of a pool, which then routes the prompts around the sessions whose circuit is open.
+
+    Example:
+        policy = RecoveryPolicy(max_retries=3, actions={"timeout": ("new_chat",)})
+        chat_bot = ChatGPTAutomation(user_data=user_data, recovery=policy)
+    """
+
+    def __init__(
+        self,
+        max_retries=2,
+        actions=None,
+        budget=None,
+        backoff=1.0,
+        failure_threshold=5,
+        reset_timeout=60.0,
+        clock=time.monotonic,
+        sleep=timed_sleep,
+    ):
+        """
+        :param max_retries: Retries of one prompt, on top of the first attempt.
+        :param actions: {kind: (action, ...)} replacing the actions of DEFAULT_ACTIONS by kind of failure.
+                        An empty sequence makes that kind fail at once.
+        :param budget: RetryBudget shared by the prompts of the policy. Defaults to RetryBudget().
+        :param backoff: Seconds slept before the first retry of a prompt, doubled for every further retry.
+        :param failure_threshold: Failures in a row that open the circuit of a session.
+        :param reset_timeout: Seconds an open circuit waits before letting a prompt through.
+        :param clock: Monotonic clock of the circuit breakers, replaced in the tests.
+        :param sleep: Sleep function, replaced in the tests.
+        """
+        self.actions = dict(DEFAULT_ACTIONS)
+        self.actions.update(actions or {})
+        for kind, sequence in self.actions.items():
+            if kind not in FAILURE_KINDS:
+                raise ValueError(f"Unknown failure kind {kind!r}, expected one of {FAILURE_KINDS}")
+            unknown = set(sequence) - set(ACTIONS)
+            if unknown:
+                raise ValueError(f"Unknown recovery actions {sorted(unknown)}, expected some of {ACTIONS}")
+        self.max_retries = max_retries
+        self.budget = budget if budget is not None else RetryBudget()
+        self.backoff = backoff
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.sleep = sleep
+
+    def new_breaker(self):
+        """
+        Returns a CircuitBreaker for a new session.
+        """
+        return CircuitBreaker(self.failure_threshold, self.reset_timeout, self.clock)
+
+    def next_action(self, kind, retries):
+        """
+        Returns the action of the retry following `retries` earlier retries of the kind, or None.
+        """
+        sequence = self.actions.get(kind) or ()
+        if not sequence:
+            return None
+        return sequence[min(retries, len(sequence) - 1)]
+
+    def run(self, automation, prompt, timeout=None, attachments=None):
+        """
+        Sends the prompt with the automation and returns the complete response, retrying the recoverable
+        failures. The timeout (default: the RESPONSE_TIMEOUT of the automation) covers every attempt and the
+        backoff between them. The circuit breaker of the automation counts every failed attempt.
+
+        Raises:
+            CircuitOpen: If the circuit of the session is open.
+            Exception: The last failure, once the retries, the budget or the circuit are exhausted.
+        """
+        breaker = automation.breaker
+        breaker.check()
+        self.budget.record_request()
+        if timeout is None:
+            timeout = automation.Timeouts.RESPONSE_TIMEOUT
+        deadline = time.monotonic() + timeout
+        action = None
+        retries = 0
+        by_kind = {}
+        while True:
+            try:
+                response = automation._attempt(action, prompt, timeout, attachments, deadline)
+            except Exception as e:
+                kind = classify_failure(e)
+                if kind is None:
+                    raise
+                breaker.record_failure()
+                action = self.next_action(kind, by_kind.get(kind, 0))
+                if action is None or retries >= self.max_retries or not breaker.allows():
+                    raise
+                delay = self.backoff * 2 ** retries
+                if time.monotonic() + delay >= deadline:
+                    logger.warning(f"No time left within {timeout}s, not retrying the {kind}")
+                    raise
+                if not self.budget.try_spend():
+                    logger.warning(f"Retry budget exhausted, not retrying the {kind}")
+                    raise
+                by_kind[kind] = by_kind.get(kind, 0) + 1
+                retries += 1
+                logger.warning(f"{kind} ({e}), retry {retries}/{self.max_retries} with {action} in {delay:.1f}s")
+                if delay > 0:
+                    self.sleep(delay)
+            else:
+                breaker.record_success()
+                return response
@@ -0,0 +1,76 @@
+import datetime
+
+EXTENSIONS = {"text": "txt", "jsonl": "jsonl", "markdown": "md"}
+
+
+class RotationPolicy:
+    """
+    Decides when a long-running session replaces its conversation with a fresh chat.
+
+    Every turn stays in the DOM and in the JS heap of the tab, so a conversation that keeps growing makes
+    every lookup and page script slower and the tab heavier. Between two prompts, the session measures the
+    page (see ChatGPTAutomation.page_footprint()) and rotates to a new chat once the number of turns, the
+    number of DOM nodes or the used JS heap crosses its limit. The page is reloaded, which releases the
+    heap of the old conversation. The old conversation can be exported and deleted first.
+
+    Example:
+        chat_bot = ChatGPTAutomation(
+            user_data=user_data, rotation=RotationPolicy(max_turns=100, export_format="jsonl", delete=True)
+        )
+    """
+
+    def __init__(
+        self,
+        max_turns=200,
+        max_dom_nodes=150000,
+        max_heap_mb=768,
+        check_every=1,
+        export_format=None,
+        export_prefix="rotated",
+        delete=False,
+    ):
+        """
+        :param max_turns: Rotate once the conversation has this many turns (prompts and responses). No
+                          limit if None.
+        :param max_dom_nodes: Rotate once the page has this many elements. No limit if None.
+        :param max_heap_mb: Rotate once the tab uses this many MB of JS heap. No limit if None.
+        :param check_every: Measure the page every this many prompts, to save the round-trip.
+        :param export_format: Save the old conversation in this format ("text", "jsonl" or "markdown")
+                              before rotating, with save_conversation(). Not saved if None.
+        :param export_prefix: Prefix of the export file names.
+        :param delete: Delete the old conversation before rotating.
+        """
+        if export_format is not None and export_format not in EXTENSIONS:
+            raise ValueError(f"Unsupported export format {export_format!r}, expected one of {sorted(EXTENSIONS)}")
+        self.max_turns = max_turns
+        self.max_dom_nodes = max_dom_nodes
+        self.max_heap_mb = max_heap_mb
+        self.check_every = max(int(check_every), 1)
+        self.export_format = export_format
+        self.export_prefix = export_prefix
+        self.delete = delete
+
+    def reason(self, footprint):
+        """
+        Returns why the conversation must be rotated, or None if it is within every limit.
+
+        Args:
+            footprint (dict): The measurements returned by ChatGPTAutomation.page_footprint().
+        """
+        limits = (
+            ("turns", self.max_turns),
+            ("dom_nodes", self.max_dom_nodes),
+            ("heap_mb", self.max_heap_mb),
+        )
+        for name, limit in limits:
+            value = footprint.get(name)
+            if limit is not None and value is not None and value >= limit:
+                return f"{name} {value:g} >= {limit:g}"
+        return None
+
+    def export_name(self, count):
+        """
+        Returns the file name of the export of the count-th rotated conversation.
+        """
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        return f"{self.export_prefix}-{stamp}-{count}.{EXTENSIONS[self.export_format]}"
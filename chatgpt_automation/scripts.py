@@ -0,0 +1,711 @@
+# JavaScript snippets executed in the ChatGPT page through execute_script / execute_async_script.
+
+# Waits (asynchronously) until the last assistant turn changes, then reports its text.
+# Only the last turn is read on every mutation, so the cost does not grow with the conversation.
+# The response is done once it has text, nothing is generated anymore (no stop button) and either the
+# send button is back or the turn has its action bar; with a sentinel, the text must also end with it.
+# Also returns as soon as the text of the alerts (rate limit, usage cap, network and generation error
+# banners, one per line) differs from the known one; without a known alert, the alert shown when the script starts is the baseline.
+# Reports {text, done, alert, baseline}.
+# arguments: turn selector, send button selector, sentinel or "", known text length,
+#            max wait in milliseconds, number of turns before the prompt was sent,
+#            alert selector or null, known alert text or null, stop button selector or null,
+#            action bar selector or null, callback
+STREAM_LAST_RESPONSE = """
+var turnSelector = arguments[0], sendSelector = arguments[1], sentinel = arguments[2],
+    knownLength = arguments[3], maxWait = arguments[4], baseline = arguments[5],
+    alertSelector = arguments[6] || null, knownAlert = arguments[7],
+    stopSelector = arguments[8] || null, actionsSelector = arguments[9] || null,
+    callback = arguments[arguments.length - 1];
+
+function alertText() {
+    var alerts = alertSelector ? document.querySelectorAll(alertSelector) : [], texts = [];
+    for (var i = 0; i < alerts.length; i++) {
+        var text = (alerts[i].innerText || "").trim();
+        if (text) {
+            texts.push(text);
+        }
+    }
+    return texts.join("\\n");
+}
+
+var baselineAlert = typeof knownAlert === "string" ? knownAlert : alertText();
+
+function idle(turn) {
+    if (stopSelector && document.querySelector(stopSelector) !== null) {
+        return false;
+    }
+    if (document.querySelector(sendSelector) !== null) {
+        return true;
+    }
+    var scope = turn.closest('[data-testid^="conversation-turn-"]') || turn;
+    return actionsSelector !== null && scope.querySelector(actionsSelector) !== null;
+}
+
+function snapshot() {
+    var turns = document.querySelectorAll(turnSelector);
+    var turn = turns.length >= baseline + 2 ? turns[turns.length - 1] : null;
+    var text = turn ? turn.innerText : "";
+    var done = text.length > 0 && idle(turn) && (!sentinel || text.trim().endsWith(sentinel));
+    return {text: text, done: done, alert: alertText(), baseline: baselineAlert};
+}
+
+function changed(current) {
+    return current.done || current.text.length !== knownLength || current.alert !== baselineAlert;
+}
+
+var state = snapshot();
+if (changed(state)) {
+    callback(state);
+    return;
+}
+
+var finished = false, timer = null;
+var observer = new MutationObserver(function () {
+    var current = snapshot();
+    if (changed(current)) {
+        finish(current);
+    }
+});
+
+function finish(current) {
+    if (finished) {
+        return;
+    }
+    finished = true;
+    observer.disconnect();
+    clearTimeout(timer);
+    callback(current || snapshot());
+}
+
+observer.observe(document.body, {childList: true, subtree: true, characterData: true});
+timer = setTimeout(function () { finish(null); }, maxWait);
+"""
+
+# Defines toMarkdown(node), which serializes a rendered ChatGPT message to Markdown: headings, emphasis,
+# links, code blocks (with language), nested lists, tables, block quotes and KaTeX math (from the TeX
+# annotation). Only nodeType, tagName, childNodes, textContent and getAttribute are used.
+MARKDOWN_CONVERTER = r"""
+function toMarkdown(root) {
+    var codeBlocks = [];
+
+    function tag(node) {
+        return node.nodeType === 1 ? node.tagName.toLowerCase() : "";
+    }
+
+    function hasClass(node, name) {
+        var classes = node.nodeType === 1 ? (node.getAttribute("class") || "") : "";
+        return (" " + classes + " ").indexOf(" " + name + " ") >= 0;
+    }
+
+    function find(node, predicate) {
+        var children = node.childNodes || [];
+        for (var i = 0; i < children.length; i++) {
+            var child = children[i];
+            if (child.nodeType === 1) {
+                if (predicate(child)) {
+                    return child;
+                }
+                var found = find(child, predicate);
+                if (found) {
+                    return found;
+                }
+            }
+        }
+        return null;
+    }
+
+    function elements(node, names) {
+        var result = [];
+        var children = node.childNodes || [];
+        for (var i = 0; i < children.length; i++) {
+            if (names.indexOf(tag(children[i])) >= 0) {
+                result.push(children[i]);
+            }
+        }
+        return result;
+    }
+
+    function backticks(content, minimum) {
+        var longest = 0, runs = content.match(/`+/g) || [];
+        for (var i = 0; i < runs.length; i++) {
+            longest = Math.max(longest, runs[i].length);
+        }
+        return new Array(Math.max(minimum, longest + 1) + 1).join("`");
+    }
+
+    function block(content) {
+        return "\n\n" + content.trim() + "\n\n";
+    }
+
+    function tex(node) {
+        var annotation = find(node, function (n) {
+            return tag(n) === "annotation" && n.getAttribute("encoding") === "application/x-tex";
+        });
+        return annotation ? annotation.textContent.trim() : node.textContent.trim();
+    }
+
+    function children(node, context) {
+        var out = "";
+        var nodes = node.childNodes || [];
+        for (var i = 0; i < nodes.length; i++) {
+            out += convert(nodes[i], context);
+        }
+        return out;
+    }
+
+    function list(node, context) {
+        var ordered = tag(node) === "ol";
+        var number = parseInt(node.getAttribute("start") || "1", 10);
+        var items = elements(node, ["li"]);
+        var lines = [];
+        for (var i = 0; i < items.length; i++) {
+            var prefix = ordered ? (number + i) + ". " : "- ";
+            var content = children(items[i], context).trim()
+                .replace(/[ \t]+\n/g, "\n").replace(/\n{2,}/g, "\n");
+            var indent = new Array(prefix.length + 1).join(" ");
+            lines.push(prefix + content.split("\n").join("\n" + indent));
+        }
+        return "\n\n" + lines.join("\n") + "\n\n";
+    }
+
+    function table(node, context) {
+        var rows = [];
+        (function collect(parent) {
+            var nodes = parent.childNodes || [];
+            for (var i = 0; i < nodes.length; i++) {
+                var name = tag(nodes[i]);
+                if (name === "tr") {
+                    rows.push(nodes[i]);
+                } else if (name === "thead" || name === "tbody" || name === "tfoot") {
+                    collect(nodes[i]);
+                }
+            }
+        })(node);
+        if (!rows.length) {
+            return "";
+        }
+        var lines = [];
+        for (var r = 0; r < rows.length; r++) {
+            var cells = elements(rows[r], ["th", "td"]).map(function (cell) {
+                return children(cell, context).replace(/\s*\n\s*/g, " ").trim().replace(/\|/g, "\\|");
+            });
+            lines.push("| " + cells.join(" | ") + " |");
+            if (r === 0) {
+                lines.push("|" + cells.map(function () { return " --- "; }).join("|") + "|");
+            }
+        }
+        return "\n\n" + lines.join("\n") + "\n\n";
+    }
+
+    function convert(node, context) {
+        if (node.nodeType === 3) {
+            return node.textContent.replace(/\s+/g, " ");
+        }
+        if (node.nodeType !== 1) {
+            return "";
+        }
+        if (hasClass(node, "katex-display")) {
+            return block("$$\n" + tex(node) + "\n$$");
+        }
+        if (hasClass(node, "katex")) {
+            return "$" + tex(node) + "$";
+        }
+
+        var name = tag(node);
+        switch (name) {
+            case "script": case "style": case "button": case "svg":
+                return "";
+            case "br":
+                return "\n";
+            case "hr":
+                return "\n\n---\n\n";
+            case "p":
+                return block(children(node, context));
+            case "h1": case "h2": case "h3": case "h4": case "h5": case "h6":
+                return block(new Array(parseInt(name[1], 10) + 1).join("#") + " " + children(node, context).trim());
+            case "strong": case "b":
+                var strong = children(node, context).trim();
+                return strong ? "**" + strong + "**" : "";
+            case "em": case "i":
+                var emphasis = children(node, context).trim();
+                return emphasis ? "*" + emphasis + "*" : "";
+            case "del": case "s":
+                return "~~" + children(node, context).trim() + "~~";
+            case "a":
+                var href = node.getAttribute("href");
+                var label = children(node, context).trim();
+                return href ? "[" + label + "](" + href + ")" : label;
+            case "img":
+                return "![" + (node.getAttribute("alt") || "") + "](" + (node.getAttribute("src") || "") + ")";
+            case "code":
+                var code = node.textContent;
+                var ticks = backticks(code, 1);
+                var pad = code[0] === "`" || code[code.length - 1] === "`" ? " " : "";
+                return ticks + pad + code + pad + ticks;
+            case "pre":
+                var codeNode = find(node, function (n) { return tag(n) === "code"; }) || node;
+                var language = ((codeNode.getAttribute("class") || "").match(/language-([\w+#.-]+)/) || [])[1] || "";
+                var source = codeNode.textContent.replace(/\n$/, "");
+                var marker = backticks(source, 3);
+                codeBlocks.push(marker + language + "\n" + source + "\n" + marker);
+                return "\n\n\u0000" + (codeBlocks.length - 1) + "\u0000\n\n";
+            case "ul": case "ol":
+                return list(node, context);
+            case "table":
+                return table(node, context);
+            case "blockquote":
+                var quoted = children(node, context).trim().replace(/\n{3,}/g, "\n\n");
+                return block(quoted.split("\n").map(function (line) {
+                    return line ? "> " + line : ">";
+                }).join("\n"));
+            default:
+                return children(node, context);
+        }
+    }
+
+    var markdown = convert(root, {})
+        .replace(/[ \t]+\n/g, "\n")
+        .replace(/\n{3,}/g, "\n\n")
+        .trim();
+    return markdown.replace(/\u0000(\d+)\u0000/g, function (match, index) {
+        return codeBlocks[parseInt(index, 10)];
+    });
+}
+"""
+
+# Reads conversation turns in bulk, starting at a given index.
+# The node just before the start index is checked against the id the caller has cached for it;
+# a mismatch (or fewer nodes than the start index) means the conversation was replaced.
+# arguments: turn selector, start index, expected id of the turn before start (or null),
+#            optional maximum number of turns to return, optional flag to return Markdown instead of text
+#            (only with READ_TURNS_MARKDOWN, which bundles the converter; READ_TURNS stays small for polling)
+READ_TURNS = r"""
+var turnSelector = arguments[0], start = arguments[1], anchorId = arguments[2];
+var limit = arguments.length > 3 && arguments[3] !== null ? arguments[3] : Infinity;
+var asMarkdown = arguments.length > 4 && arguments[4] === true && typeof toMarkdown === "function";
+var nodes = document.querySelectorAll(turnSelector);
+
+function messageId(node) {
+    var message = node.matches("[data-message-id]") ? node : node.querySelector("[data-message-id]");
+    return message ? message.getAttribute("data-message-id") : null;
+}
+
+function messageRole(node) {
+    var message = node.matches("[data-message-author-role]") ? node : node.querySelector("[data-message-author-role]");
+    return message ? message.getAttribute("data-message-author-role") : null;
+}
+
+function messageTimestamp(node) {
+    var time = node.querySelector("time[datetime]");
+    return time ? time.getAttribute("datetime") : null;
+}
+
+if (nodes.length < start || (start > 0 && anchorId !== null && messageId(nodes[start - 1]) !== anchorId)) {
+    return {reset: true, count: nodes.length, turns: []};
+}
+
+var turns = [];
+for (var i = start; i < nodes.length && turns.length < limit; i++) {
+    turns.push({
+        id: messageId(nodes[i]),
+        role: messageRole(nodes[i]),
+        timestamp: messageTimestamp(nodes[i]),
+        text: asMarkdown ? toMarkdown(nodes[i].querySelector(".markdown") || nodes[i]) : nodes[i].innerText
+    });
+}
+return {reset: false, count: nodes.length, turns: turns};
+"""
+
+READ_TURNS_MARKDOWN = MARKDOWN_CONVERTER + READ_TURNS
+
+# Returns the Markdown of the last conversation turn, or null if there is none.
+# arguments: turn selector
+LAST_RESPONSE_MARKDOWN = MARKDOWN_CONVERTER + r"""
+var turns = document.querySelectorAll(arguments[0]);
+if (!turns.length) {
+    return null;
+}
+var last = turns[turns.length - 1];
+return toMarkdown(last.querySelector(".markdown") || last);
+"""
+
+# Defines findFirst(strategies), which returns the first element matched by a list of Selenium
+# [by, value] strategies (css selector, tag name, id, name, class name or xpath), or null.
+FIND_FIRST = r"""
+function findFirst(strategies) {
+    for (var i = 0; i < strategies.length; i++) {
+        var by = strategies[i][0], value = strategies[i][1], element = null;
+        if (by === "xpath") {
+            element = document.evaluate(value, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        } else if (by === "id") {
+            element = document.getElementById(value);
+        } else if (by === "name") {
+            element = document.getElementsByName(value)[0] || null;
+        } else if (by === "class name") {
+            element = document.getElementsByClassName(value)[0] || null;
+        } else {
+            element = document.querySelector(value);
+        }
+        if (element) {
+            return element;
+        }
+    }
+    return null;
+}
+"""
+
+# Types the prompt into the input box the way the page's framework notices (native value setter, or the
+# text of a contenteditable, then an input event) and submits it with the send button, or Enter.
+# Returns {count: turns before the prompt} or {missing: "input"}.
+# arguments: turn selector, input box strategies, send button strategies, prompt
+SUBMIT_PROMPT = FIND_FIRST + r"""
+var turnSelector = arguments[0], inputStrategies = arguments[1], sendStrategies = arguments[2], prompt = arguments[3];
+var input = findFirst(inputStrategies);
+if (!input) {
+    return {missing: "input"};
+}
+var count = document.querySelectorAll(turnSelector).length;
+if (input.isContentEditable) {
+    input.textContent = prompt;
+} else {
+    Object.getOwnPropertyDescriptor(Object.getPrototypeOf(input), "value").set.call(input, prompt);
+}
+input.dispatchEvent(new Event("input", {bubbles: true}));
+var send = findFirst(sendStrategies);
+if (send) {
+    send.click();
+} else {
+    input.dispatchEvent(new KeyboardEvent("keydown", {key: "Enter", code: "Enter", keyCode: 13, bubbles: true}));
+}
+return {count: count};
+"""
+
+# Reports whether the page shows a generation error, whether nothing is generated anymore (no stop button,
+# and the send button is back or the last turn has its action bar), and whether the last turn is a
+# response to the last prompt (following the turns before it, if known) that ends with the sentinel if
+# one is given, in one round-trip.
+# arguments: error message strategies, send button strategies, turn selector, sentinel or "",
+#            stop button strategies, action bar selector, number of turns before the prompt or null
+RESPONSE_STATUS = FIND_FIRST + r"""
+var errorStrategies = arguments[0], sendStrategies = arguments[1], turnSelector = arguments[2], sentinel = arguments[3],
+    stopStrategies = arguments[4] || [], actionsSelector = arguments[5] || null, promptTurns = arguments[6];
+var turns = document.querySelectorAll(turnSelector);
+var turn = turns.length ? turns[turns.length - 1] : null;
+var answered = turn !== null && (typeof promptTurns !== "number" || turns.length >= promptTurns + 2);
+var text = answered ? turn.innerText : "";
+var scope = turn ? turn.closest('[data-testid^="conversation-turn-"]') || turn : null;
+var ready = findFirst(stopStrategies) === null && (findFirst(sendStrategies) !== null ||
+    (scope !== null && actionsSelector !== null && scope.querySelector(actionsSelector) !== null));
+return {
+    error: findFirst(errorStrategies) !== null,
+    ready: ready,
+    complete: sentinel ? text.trim().endsWith(sentinel) : text.trim().length > 0
+};
+"""
+
+# Counts the elements matching a CSS selector.
+# arguments: selector
+COUNT_ELEMENTS = """
+return document.querySelectorAll(arguments[0]).length;
+"""
+
+# Measures the page: conversation turns, DOM elements and used JS heap in bytes (null where
+# performance.memory is not available).
+# arguments: turn selector
+PAGE_FOOTPRINT = """
+return {
+    turns: document.querySelectorAll(arguments[0]).length,
+    nodes: document.getElementsByTagName("*").length,
+    heap: window.performance && performance.memory ? performance.memory.usedJSHeapSize : null
+};
+"""
+
+# Defines inputText(input) and digest(text), the text of the prompt input box (textarea or
+# contenteditable editor) and its {length, crc} once whitespace is removed, so that editors turning line
+# breaks into paragraphs still match. The CRC-32 runs over the UTF-16LE code units, like
+# PromptInjector.digest() in Python.
+INPUT_DIGEST = r"""
+function inputText(input) {
+    return input.isContentEditable ? input.innerText : input.value;
+}
+
+function digest(text) {
+    text = text.replace(/[ \t\n\r\f\v\u00a0]+/g, "");
+    var table = window.__crc32Table;
+    if (!table) {
+        table = window.__crc32Table = [];
+        for (var n = 0; n < 256; n++) {
+            var c = n;
+            for (var k = 0; k < 8; k++) {
+                c = c & 1 ? 0xEDB88320 ^ (c >>> 1) : c >>> 1;
+            }
+            table.push(c >>> 0);
+        }
+    }
+    var crc = 0xFFFFFFFF;
+    for (var i = 0; i < text.length; i++) {
+        var unit = text.charCodeAt(i);
+        crc = table[(crc ^ unit) & 0xFF] ^ (crc >>> 8);
+        crc = table[(crc ^ (unit >>> 8)) & 0xFF] ^ (crc >>> 8);
+    }
+    return {length: text.length, crc: (crc ^ 0xFFFFFFFF) >>> 0};
+}
+"""
+
+# Focuses the prompt input box and empties it. Returns false if the input box is not found.
+# arguments: input box strategies
+PREPARE_INPUT = FIND_FIRST + r"""
+var input = findFirst(arguments[0]);
+if (!input) {
+    return false;
+}
+input.focus();
+if (input.isContentEditable) {
+    document.execCommand("selectAll", false, null);
+    document.execCommand("delete", false, null);
+} else {
+    Object.getOwnPropertyDescriptor(Object.getPrototypeOf(input), "value").set.call(input, "");
+    input.dispatchEvent(new Event("input", {bubbles: true}));
+}
+return true;
+"""
+
+# Pastes text at the end of the prompt input box like a user would: a paste event carrying the text in a
+# DataTransfer. If the page does not handle the paste itself, the text is inserted the way the browser
+# would (execCommand on editors, setRangeText on textareas) so that input events still fire.
+# Returns {missing: "input"} if the input box is not found.
+# arguments: input box strategies, text
+PASTE_TEXT = FIND_FIRST + r"""
+var input = findFirst(arguments[0]), text = arguments[1];
+if (!input) {
+    return {missing: "input"};
+}
+var data = new DataTransfer();
+data.setData("text/plain", text);
+var paste = new ClipboardEvent("paste", {clipboardData: data, bubbles: true, cancelable: true});
+if (input.dispatchEvent(paste)) {
+    if (input.isContentEditable) {
+        document.execCommand("insertText", false, text);
+    } else {
+        input.setRangeText(text, input.value.length, input.value.length, "end");
+        input.dispatchEvent(new InputEvent("input", {bubbles: true, inputType: "insertFromPaste", data: text}));
+    }
+}
+"""
+
+# Replaces the content of the prompt input box through the native value setter (or the text of an
+# editor) followed by an input event. Fallback when pasting did not deliver the text.
+# Returns {missing: "input"} if the input box is not found.
+# arguments: input box strategies, text
+SET_INPUT_VALUE = FIND_FIRST + r"""
+var input = findFirst(arguments[0]), text = arguments[1];
+if (!input) {
+    return {missing: "input"};
+}
+if (input.isContentEditable) {
+    input.textContent = text;
+} else {
+    Object.getOwnPropertyDescriptor(Object.getPrototypeOf(input), "value").set.call(input, text);
+}
+input.dispatchEvent(new Event("input", {bubbles: true}));
+"""
+
+# Returns the digest of the prompt input box content, or null if it is not found.
+# arguments: input box strategies
+READ_INPUT_DIGEST = FIND_FIRST + INPUT_DIGEST + r"""
+var input = findFirst(arguments[0]);
+return input ? digest(inputText(input)) : null;
+"""
+
+# Submits the prompt with the send button, or Enter on the input box if there is no send button.
+# Returns {count: turns before the prompt} or {missing: "send button or input"}.
+# arguments: turn selector, input box strategies, send button strategies
+CLICK_SEND = FIND_FIRST + r"""
+var count = document.querySelectorAll(arguments[0]).length;
+var send = findFirst(arguments[2]);
+if (send) {
+    send.click();
+} else {
+    var input = findFirst(arguments[1]);
+    if (!input) {
+        return {missing: "send button or input"};
+    }
+    input.dispatchEvent(new KeyboardEvent("keydown", {key: "Enter", code: "Enter", keyCode: 13, bubbles: true}));
+}
+return {count: count};
+"""
+
+# Reports the upload chips rendered from a given index on: the file name and "uploading" while the chip
+# holds a spinner, "failed" once it holds an error, "done" otherwise.
+# arguments: chip selector, spinner selector, upload error selector, index of the first chip
+UPLOAD_STATUS = """
+var spinners = Array.prototype.slice.call(document.querySelectorAll(arguments[1]));
+var errors = Array.prototype.slice.call(document.querySelectorAll(arguments[2]));
+function holds(chip, elements) {
+    return elements.some(function (element) { return chip.contains(element); });
+}
+var chips = document.querySelectorAll(arguments[0]), states = [];
+for (var i = arguments[3]; i < chips.length; i++) {
+    states.push({
+        name: chips[i].innerText.trim(),
+        state: holds(chips[i], errors) ? "failed" : holds(chips[i], spinners) ? "uploading" : "done"
+    });
+}
+return states;
+"""
+
+# Deletes chats of the account through the backend endpoints of the web app, with the session's access
+# token: either every chat (at once, like "Delete all chats" in the settings, when no chat is open), or the
+# chats whose last update is older than a given age and/or whose title matches a pattern, several requests
+# at a time. The open chat and the listed ones are kept. Only the deletions the backend confirmed are
+# counted. Reports {scanned, deleted, failed} or {error}.
+# arguments: minimum age in seconds or null, title pattern or null, delete all, maximum number of chats
+#            deleted or null, list page size, concurrent requests, ids of the chats to keep, callback
+CLEAN_CONVERSATIONS = r"""
+var olderThan = arguments[0], titlePattern = arguments[1], deleteAll = arguments[2], limit = arguments[3],
+    pageSize = arguments[4], concurrency = arguments[5], keep = arguments[6],
+    callback = arguments[arguments.length - 1];
+var match = location.pathname.match(/\/c\/([^\/]+)/), current = match ? match[1] : null;
+var title = titlePattern ? new RegExp(titlePattern, "i") : null, now = Date.now();
+
+function request(method, path, body, token) {
+    var headers = {"Content-Type": "application/json"};
+    if (token) {
+        headers.Authorization = "Bearer " + token;
+    }
+    return fetch(path, {
+        method: method, credentials: "include", headers: headers, body: body ? JSON.stringify(body) : undefined
+    }).then(function (response) {
+        if (!response.ok) {
+            throw new Error(method + " " + path + ": HTTP " + response.status);
+        }
+        return response.json();
+    });
+}
+
+function millis(time) {
+    return typeof time === "number" ? time * 1000 : Date.parse(time);
+}
+
+function selected(item) {
+    if (item.id === current || keep.indexOf(item.id) >= 0) {
+        return false;
+    }
+    if (olderThan !== null && now - millis(item.update_time || item.create_time) < olderThan * 1000) {
+        return false;
+    }
+    return title === null || title.test(item.title || "");
+}
+
+// The backend answers {success: false} for a deletion it did not do
+function succeeded(result) {
+    return !(result && result.success === false);
+}
+
+function clean(token) {
+    if (deleteAll && current === null && keep.length === 0) {
+        // No chat to keep: one request hides every chat
+        return request("GET", "/backend-api/conversations?offset=0&limit=1", null, token).then(function (page) {
+            return request("PATCH", "/backend-api/conversations", {is_visible: false}, token).then(function (result) {
+                var ok = succeeded(result);
+                return {scanned: page.total, deleted: ok ? page.total : 0, failed: ok ? 0 : page.total};
+            });
+        });
+    }
+    // List every page first, since deleting chats shifts the offsets
+    var items = [];
+    function list(offset) {
+        var path = "/backend-api/conversations?offset=" + offset + "&limit=" + pageSize + "&order=updated";
+        return request("GET", path, null, token).then(function (page) {
+            items = items.concat(page.items);
+            if (page.items.length === pageSize && items.length < page.total) {
+                return list(offset + pageSize);
+            }
+        });
+    }
+    return list(0).then(function () {
+        var targets = items.filter(selected), deleted = 0, failed = 0, next = 0, workers = [];
+        if (limit !== null) {
+            targets = targets.slice(0, limit);
+        }
+        function work() {
+            if (next >= targets.length) {
+                return Promise.resolve();
+            }
+            var path = "/backend-api/conversation/" + targets[next++].id;
+            return request("PATCH", path, {is_visible: false}, token).then(function (result) {
+                if (succeeded(result)) {
+                    deleted++;
+                } else {
+                    failed++;
+                }
+            }, function () { failed++; }).then(work);
+        }
+        for (var i = 0; i < Math.min(concurrency, targets.length); i++) {
+            workers.push(work());
+        }
+        return Promise.all(workers).then(function () {
+            return {scanned: items.length, deleted: deleted, failed: failed};
+        });
+    });
+}
+
+request("GET", "/api/auth/session").then(function (session) {
+    return clean(session && session.accessToken);
+}).then(callback, function (error) {
+    callback({error: String(error)});
+});
+"""
+
+# Finds the first error banner: the generation error message, or an alert whose text matches one of the
+# banner patterns (case-insensitive). Returns {kind, text} or null.
+# arguments: generation error strategies, alert selector, [[kind, pattern], ...]
+DETECT_BANNER = FIND_FIRST + r"""
+var error = findFirst(arguments[0]);
+if (error) {
+    return {kind: "generation_error", text: error.innerText.trim()};
+}
+var alerts = document.querySelectorAll(arguments[1]), patterns = arguments[2];
+for (var i = 0; i < alerts.length; i++) {
+    var text = (alerts[i].innerText || "").trim();
+    for (var j = 0; j < patterns.length; j++) {
+        if (new RegExp(patterns[j][1], "i").test(text)) {
+            return {kind: patterns[j][0], text: text};
+        }
+    }
+}
+return null;
+"""
+
+# Reports whether the login button is shown: found by one of the strategies and rendered (a button
+# hidden with display: none, or inside a hidden container, has no client rects).
+# arguments: login button strategies
+LOGIN_VISIBLE = FIND_FIRST + r"""
+var button = findFirst(arguments[0]);
+return button !== null && button.getClientRects().length > 0;
+"""
+
+# Returns the localStorage of the page as {key: value}.
+READ_LOCAL_STORAGE = """
+var items = {};
+for (var i = 0; i < localStorage.length; i++) {
+    var key = localStorage.key(i);
+    items[key] = localStorage.getItem(key);
+}
+return items;
+"""
+
+# Stores the given {key: value} items in the localStorage of the page, keeping the other keys.
+# Returns the number of items stored.
+# arguments: items
+WRITE_LOCAL_STORAGE = """
+var items = arguments[0], count = 0;
+for (var key in items) {
+    if (Object.prototype.hasOwnProperty.call(items, key)) {
+        localStorage.setItem(key, items[key]);
+        count++;
+    }
+}
+return count;
+"""
@@ -0,0 +1,286 @@
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import WebDriverException
+from .chatgpt_automation import ChatGPTAutomation
+from .throttle import RateLimited
+from .recovery import CircuitOpen, GenerationError
+
+logger = logging.getLogger(__name__)
+
+
+class PooledSession:
+    """
+    One browser session owned by a ChatGPTSessionPool, together with its work queue and counters.
+    """
+
+    def __init__(self, index, user_data):
+        self.index = index
+        self.user_data = user_data
+        self.automation = None
+        self.queue = queue.Queue()
+        self.outstanding = 0
+        self.completed = 0
+        self.failed = 0
+        self.recycled = 0
+        self.rerouted = 0
+        self.busy_time = 0.0
+        self.thread = None
+
+    @property
+    def breaker(self):
+        """
+        The circuit breaker of the session (see RecoveryPolicy), or None.
+        """
+        return getattr(self.automation, "breaker", None)
+
+    def healthy(self):
+        """
+        Returns False while the circuit breaker of the session is open.
+        """
+        breaker = self.breaker
+        return breaker is None or breaker.allows()
+
+    def stats(self, elapsed):
+        """
+        Returns a snapshot of the session counters.
+
+        Args:
+            elapsed (float): Seconds since the pool started, used to compute the throughput.
+        """
+        return {
+            "session": self.index,
+            "profile": self.user_data.get("profile") if self.user_data else None,
+            "outstanding": self.outstanding,
+            "completed": self.completed,
+            "failed": self.failed,
+            "recycled": self.recycled,
+            "rerouted": self.rerouted,
+            "circuit": self.breaker.state if self.breaker is not None else None,
+            "busy_time": self.busy_time,
+            "throughput_per_minute": self.completed * 60 / elapsed if elapsed else 0.0,
+        }
+
+
+class ChatGPTSessionPool:
+    """
+    Runs prompts in parallel across several ChatGPTAutomation sessions, one per Chrome profile.
+
+    Work is assigned to the session with the fewest outstanding requests. A session whose browser crashes
+    is quit, relaunched from the same profile and the prompt is retried, so the remaining queue keeps flowing.
+    With a RecoveryPolicy (recovery=...), sessions whose circuit breaker is open get no new prompts and hand
+    their queued prompts to the healthy sessions, until the breaker lets a prompt through again.
+
+    Example:
+        with ChatGPTSessionPool(profiles) as pool:
+            future = pool.submit("Hello, ChatGPT!")
+            answers = list(pool.map(["First prompt", "Second prompt"]))
+    """
+
+    def __init__(
+        self,
+        profiles,
+        session_factory=None,
+        max_retries=1,
+        timeout=None,
+        **automation_kwargs,
+    ):
+        """
+        Launches one session per profile and starts a worker thread for each of them.
+
+        :param profiles: List of user_data dictionaries, one per session. Chrome cannot share a profile
+                         between processes, so every session needs its own.
+        :param session_factory: Callable taking a user_data dictionary and returning a session object with
+                                ask() and quit() methods. Defaults to constructing ChatGPTAutomation.
+        :param max_retries: Number of times a prompt is retried on a recycled session after a crash.
+        :param timeout: Per-prompt timeout passed to ask(). Defaults to the session's own timeout.
+        :param automation_kwargs: Extra keyword arguments for ChatGPTAutomation when no factory is given.
+        """
+        if not profiles:
+            raise ValueError("At least one profile is required to create a session pool.")
+
+        if session_factory is None:
+            session_factory = lambda user_data: ChatGPTAutomation(
+                user_data=user_data, **automation_kwargs
+            )
+
+        self.session_factory = session_factory
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.started_at = time.monotonic()
+        self._shutdown = False
+
+        self.sessions = [
+            PooledSession(index, user_data) for index, user_data in enumerate(profiles)
+        ]
+        for session in self.sessions:
+            session.automation = self.session_factory(session.user_data)
+            session.thread = threading.Thread(
+                target=self._worker, args=(session,), daemon=True
+            )
+            session.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+    def submit(self, prompt):
+        """
+        Queues a prompt on the least loaded session whose circuit breaker is not open (on the least loaded
+        session if every circuit is open).
+
+        Args:
+            prompt (str): The message or prompt to be sent to ChatGPT.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the response text.
+
+        Raises:
+            RuntimeError: If the pool has been shut down.
+        """
+        future = Future()
+        with self.lock:
+            if self._shutdown:
+                raise RuntimeError("Cannot submit prompts after the pool has been shut down.")
+            candidates = [s for s in self.sessions if s.healthy()] or self.sessions
+            session = min(candidates, key=lambda s: s.outstanding)
+            session.outstanding += 1
+            # Queued with the check, so the prompt is ahead of the stop sentinel of shutdown()
+            session.queue.put((prompt, future))
+        return future
+
+    def map(self, prompts, timeout=None):
+        """
+        Submits every prompt and yields the responses in the order of the prompts.
+
+        Args:
+            prompts (iterable): Prompts to send.
+            timeout (float): Maximum number of seconds to wait for each response.
+
+        Yields:
+            str: The response to each prompt.
+        """
+        futures = [self.submit(prompt) for prompt in prompts]
+        for future in futures:
+            yield future.result(timeout)
+
+    def stats(self):
+        """
+        Returns a list with the counters and throughput of every session.
+        """
+        elapsed = time.monotonic() - self.started_at
+        with self.lock:
+            return [session.stats(elapsed) for session in self.sessions]
+
+    def shutdown(self, wait=True):
+        """
+        Stops accepting prompts, lets the queued ones finish and quits every browser session.
+
+        Args:
+            wait (bool): If True, block until all queued prompts are processed.
+        """
+        with self.lock:
+            if self._shutdown:
+                return
+            self._shutdown = True
+        for session in self.sessions:
+            session.queue.put(None)
+        if wait:
+            for session in self.sessions:
+                session.thread.join()
+
+    def _worker(self, session):
+        while True:
+            item = session.queue.get()
+            if item is None:
+                self._quit_session(session)
+                return
+            if not session.healthy() and self._reroute(session, item):
+                continue
+            prompt, future = item
+            if not future.set_running_or_notify_cancel():
+                self._finish(session, failed=False, completed=False)
+                continue
+
+            started = time.monotonic()
+            try:
+                response = self._ask(session, prompt)
+            except Exception as e:
+                session.busy_time += time.monotonic() - started
+                self._finish(session, failed=True)
+                future.set_exception(e)
+            else:
+                session.busy_time += time.monotonic() - started
+                self._finish(session, completed=True)
+                future.set_result(response)
+
+    def _ask(self, session, prompt):
+        attempt = 0
+        while True:
+            try:
+                if self.timeout is None:
+                    return session.automation.ask(prompt)
+                return session.automation.ask(prompt, timeout=self.timeout)
+            except (TimeoutException, RateLimited, GenerationError, CircuitOpen):
+                raise
+            except WebDriverException as e:
+                if attempt >= self.max_retries:
+                    raise
+                attempt += 1
+                logger.warning(
+                    f"Session {session.index} crashed ({e}), recycling and retrying the prompt"
+                )
+                self._recycle(session)
+
+    def _reroute(self, session, item):
+        """
+        Moves a queued prompt of a session with an open circuit to the least loaded healthy session.
+
+        Returns:
+            bool: False if no other session is healthy or the pool is shutting down.
+        """
+        with self.lock:
+            targets = [s for s in self.sessions if s is not session and s.healthy()]
+            if self._shutdown or not targets:
+                return False
+            target = min(targets, key=lambda s: s.outstanding)
+            session.outstanding -= 1
+            session.rerouted += 1
+            target.outstanding += 1
+            # Queued with the check, so the prompt is ahead of the stop sentinel of shutdown()
+            target.queue.put(item)
+        logger.info(f"Session {session.index} circuit open, moving a prompt to session {target.index}")
+        return True
+
+    def _recycle(self, session):
+        self._quit_session(session)
+        session.automation = self.session_factory(session.user_data)
+        with self.lock:
+            session.recycled += 1
+
+    def _quit_session(self, session):
+        """
+        Quits the session and makes sure the Chrome it launched has exited, so its profile is free for the
+        next session launched on it.
+        """
+        try:
+            session.automation.quit()
+        except Exception as e:
+            logger.error(f"Failed to quit session {session.index}: {e}")
+        process = getattr(session.automation, "chrome_process", None)
+        if process is not None and process.poll() is None:
+            logger.warning(f"Chrome of session {session.index} (pid {process.pid}) still running, killing it")
+            process.kill()
+            process.wait()
+
+    def _finish(self, session, completed=False, failed=False):
+        with self.lock:
+            session.outstanding -= 1
+            session.completed += int(completed)
+            session.failed += int(failed)
@@ -0,0 +1,500 @@
+import re
+import time
+import logging
+import threading
+import functools
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import Future
+from . import scripts
+from .chatgpt_automation import ChatGPTAutomation, strip_sentinel
+from .metrics import timed_sleep
+from .readiness import ReadinessTimeout, all_of, any_element_present, document_ready
+
+logger = logging.getLogger(__name__)
+
+# Chrome throttles the timers and rendering of background tabs, which would stall the responses being
+# generated in every tab but the driven one
+BACKGROUND_TAB_ARGS = (
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+    "--disable-backgrounding-occluded-windows",
+)
+
+# Id of the chat open at a chat page address, as read by scripts.CLEAN_CONVERSATIONS
+CHAT_ID = re.compile(r"/c/([^/?#]+)")
+
+
+def _driven(method):
+    """
+    Runs a ChatGPTAutomation method with the WebDriver switched to the tab, holding the multiplexer's
+    driver lock for the duration of the call.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.multiplexer.driving(self):
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+class ChatGPTTab(ChatGPTAutomation):
+    """
+    One conversation in its own tab of a browser shared through a TabMultiplexer.
+
+    A tab has the whole ChatGPTAutomation API. Every call switches the WebDriver to the tab first and is
+    serialized with the calls made on the other tabs, but waits (wait_for_response(), ask(), iter_ask())
+    only hold the driver while polling, so the other tabs can be driven while this one is generating.
+    """
+
+    def __init__(self, multiplexer, handle, index):
+        """
+        :param multiplexer: The TabMultiplexer owning the browser.
+        :param handle: WebDriver window handle of the tab.
+        :param index: Position of the tab in the multiplexer.
+        """
+        owner = multiplexer.automation
+        self._configure(
+            use_fixed_delays=owner.use_fixed_delays,
+            cache=owner.cache,
+            metrics=owner.metrics,
+            locator_overrides=owner.locator_overrides,
+            lean=owner.lean,
+            rotation=owner.rotation,
+            injector=owner.injector,
+            throttle=owner.throttle,
+            janitor=owner.janitor,
+            recovery=owner.recovery,
+            sentinel=owner.sentinel,
+            credentials=owner.credentials,
+        )
+        self.multiplexer = multiplexer
+        self.handle = handle
+        self.index = index
+        self.driver = owner.driver
+        self.url = owner.url
+        self.user_data = owner.user_data
+        self.port = getattr(owner, "port", None)
+        # The browser belongs to the multiplexer's session
+        self.chrome_process = None
+        self.model = owner.model
+        # Every tab is a DevTools target of its own
+        if owner.cdp is not None:
+            with multiplexer.driving(self):
+                self.cdp = self.open_cdp()
+        self.job = None
+        self.completed = 0
+        self.failed = 0
+        self.busy_time = 0.0
+
+    send_prompt_to_chatgpt = _driven(ChatGPTAutomation.send_prompt_to_chatgpt)
+    check_message_sent = _driven(ChatGPTAutomation.check_message_sent)
+    upload_file_for_prompt = _driven(ChatGPTAutomation.upload_file_for_prompt)
+    upload_files_for_prompt = _driven(ChatGPTAutomation.upload_files_for_prompt)
+    return_chatgpt_conversation = _driven(ChatGPTAutomation.return_chatgpt_conversation)
+    save_conversation = _driven(ChatGPTAutomation.save_conversation)
+    return_last_response = _driven(ChatGPTAutomation.return_last_response)
+    return_last_response_md = _driven(ChatGPTAutomation.return_last_response_md)
+    write_last_answer_custom_file = _driven(ChatGPTAutomation.write_last_answer_custom_file)
+    open_new_chat = _driven(ChatGPTAutomation.open_new_chat)
+    del_current_chat = _driven(ChatGPTAutomation.del_current_chat)
+    check_error = _driven(ChatGPTAutomation.check_error)
+    check_response_status = _driven(ChatGPTAutomation.check_response_status)
+    switch_model = _driven(ChatGPTAutomation.switch_model)
+    page_footprint = _driven(ChatGPTAutomation.page_footprint)
+    rotate_conversation = _driven(ChatGPTAutomation.rotate_conversation)
+    regenerate = _driven(ChatGPTAutomation.regenerate)
+    login = _driven(ChatGPTAutomation.login)
+    ensure_logged_in = _driven(ChatGPTAutomation.ensure_logged_in)
+    export_session_state = _driven(ChatGPTAutomation.export_session_state)
+    import_session_state = _driven(ChatGPTAutomation.import_session_state)
+    _count_turns = _driven(ChatGPTAutomation._count_turns)
+
+    def delete_chats(self, older_than=None, title=None, delete_all=False, limit=None, keep=()):
+        """
+        Deletes chats of the account like ChatGPTAutomation.delete_chats(), keeping the chats open in every
+        tab of the multiplexer.
+        """
+        keep = list(keep) + self.multiplexer.open_chats()
+        with self.multiplexer.driving(self):
+            return super().delete_chats(older_than, title, delete_all, limit, keep)
+
+    def _read_stream(self, turn_count, sentinel, known_length, max_wait, known_alert=None):
+        # Never block in the page: read the state at once and wait with the driver released
+        with self.multiplexer.driving(self):
+            state = self.driver.execute_async_script(
+                scripts.STREAM_LAST_RESPONSE, *self._stream_args(turn_count, sentinel, known_length, 0, known_alert)
+            )
+        unchanged = state.get("alert") == state.get("baseline")
+        if not state["done"] and len(state["text"]) == known_length and unchanged and max_wait > 0:
+            timed_sleep(min(self.multiplexer.poll_interval, max_wait))
+        return state
+
+    def _admit(self):
+        # Prompts of the scheduler were admitted when they were dispatched
+        if self.job is None:
+            super()._admit()
+
+    def stats(self):
+        """
+        Returns a snapshot of the tab counters.
+        """
+        return {
+            "tab": self.index,
+            "busy": self.job is not None,
+            "completed": self.completed,
+            "failed": self.failed,
+            "busy_time": self.busy_time,
+        }
+
+    def quit(self):
+        """
+        Closes the tab. The browser is closed by TabMultiplexer.shutdown().
+        """
+        self.multiplexer.close_tab(self)
+
+    def _close_cdp(self):
+        if self.cdp is not None:
+            self.cdp.close()
+            self.cdp = None
+
+
+class _TabJob:
+    """
+    A prompt being generated in a tab by the TabMultiplexer scheduler.
+    """
+
+    def __init__(self, prompt, future, deadline):
+        self.prompt = prompt
+        self.future = future
+        self.deadline = deadline
+        self.started = time.monotonic()
+        self.turn_count = 0
+        self.sentinel = None
+        self.text = ""
+        self.alert = ""
+        self.key = None
+
+
+class TabMultiplexer:
+    """
+    Runs several conversations concurrently inside a single Chrome process, one per tab.
+
+    Chrome renderers of the same site are shared between tabs, so a tab costs a fraction of the memory of
+    a separate browser. A WebDriver session drives one tab at a time: a driver lock serializes the calls
+    and switches the window handle only when another tab is driven, while the responses keep being
+    generated in the background tabs (their throttling is disabled at launch and through DevTools).
+
+    Tabs can be used directly, e.g. one thread per tab calling tabs[i].ask(), or through the scheduler:
+    submit() queues a prompt for the first idle tab and a single thread sends the prompts and polls the
+    generating tabs round-robin, with one WebDriver command per poll.
+
+    Example:
+        with TabMultiplexer(tabs=4, user_data=user_data) as multiplexer:
+            answers = list(multiplexer.map(["First prompt", "Second prompt", "Third prompt"]))
+    """
+
+    def __init__(self, tabs=2, automation=None, timeout=None, poll_interval=0.05, **automation_kwargs):
+        """
+        Opens the tabs on the chat page.
+
+        :param tabs: Number of tabs (concurrent conversations).
+        :param automation: ChatGPTAutomation whose browser is shared; its current tab becomes the first
+                           tab. Defaults to launching one with automation_kwargs and the flags that keep
+                           background tabs running.
+        :param timeout: Per-prompt timeout of the scheduler. Defaults to Timeouts.RESPONSE_TIMEOUT.
+        :param poll_interval: Seconds the scheduler waits when no tab made progress, and the polling
+                              interval of waits on a tab.
+        :param automation_kwargs: ChatGPTAutomation constructor arguments when no automation is given.
+        """
+        if tabs < 1:
+            raise ValueError("At least one tab is required.")
+
+        self._owns_automation = automation is None
+        if automation is None:
+            automation_kwargs["chrome_args"] = (
+                tuple(automation_kwargs.get("chrome_args", ())) + BACKGROUND_TAB_ARGS
+            )
+            automation = ChatGPTAutomation(**automation_kwargs)
+
+        self.automation = automation
+        self.driver = automation.driver
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.driver_lock = threading.RLock()
+        self.lock = threading.Lock()
+        self.condition = threading.Condition(self.lock)
+        self.queue = deque()
+        self.switches = 0
+        self.started_at = time.monotonic()
+        self.thread = None
+        self._shutdown = False
+
+        self.current_handle = self.driver.current_window_handle
+        self.tabs = [ChatGPTTab(self, self.current_handle, 0)]
+        if automation.lean is None:
+            self._keep_active()
+        for _ in range(tabs - 1):
+            self.open_tab()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+    @contextmanager
+    def driving(self, tab):
+        """
+        Context manager giving a tab exclusive use of the WebDriver, switched to its window.
+        """
+        with self.driver_lock:
+            self._switch(tab.handle)
+            yield
+
+    def open_tab(self):
+        """
+        Opens a new tab on the chat page and waits until it is loaded.
+
+        Returns:
+            ChatGPTTab: The new tab.
+        """
+        with self.driver_lock:
+            self.driver.switch_to.new_window("tab")
+            self.current_handle = self.driver.current_window_handle
+            with self.lock:
+                index = len(self.tabs)
+            tab = ChatGPTTab(self, self.current_handle, index)
+            # DevTools settings are per tab, and blocking must be in place before the page loads
+            if tab.lean is not None:
+                tab.lean.apply(self.driver)
+            else:
+                self._keep_active()
+            self.driver.get(tab.url + "/")
+            tab.wait_for(
+                all_of(
+                    document_ready(self.driver),
+                    any_element_present(
+                        self.driver, *tab.elements.strategies("MSG_BOX_INPUT"), *tab.elements.strategies("LOGIN_BTN")
+                    ),
+                ),
+                delay=tab.DelayTimes.CONSTRUCTOR_DELAY,
+                timeout=tab.Timeouts.CONSTRUCTOR_TIMEOUT,
+                message="chat page loaded",
+            )
+        with self.lock:
+            self.tabs.append(tab)
+        return tab
+
+    def close_tab(self, tab):
+        """
+        Closes a tab opened by the multiplexer. The last tab is kept open with the browser.
+        """
+        with self.driver_lock:
+            with self.lock:
+                if tab not in self.tabs or len(self.tabs) == 1:
+                    return
+                if tab.job is not None:
+                    raise RuntimeError(f"Tab {tab.index} is generating a response.")
+                self.tabs.remove(tab)
+            tab._close_cdp()
+            try:
+                self._switch(tab.handle)
+                self.driver.close()
+            except Exception as e:
+                logger.error(f"Failed to close tab {tab.index}: {e}")
+            # Commands fail until another window is made current
+            self.current_handle = None
+            self._switch(self.tabs[0].handle)
+
+    def submit(self, prompt):
+        """
+        Queues a prompt for the first idle tab.
+
+        Args:
+            prompt (str): The message or prompt to be sent to ChatGPT.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the response text, without the uuid sentinel.
+
+        Raises:
+            RuntimeError: If the multiplexer has been shut down.
+        """
+        future = Future()
+        with self.condition:
+            if self._shutdown:
+                raise RuntimeError("Cannot submit prompts after the multiplexer has been shut down.")
+            self.queue.append((prompt, future))
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._schedule, daemon=True)
+                self.thread.start()
+            self.condition.notify()
+        return future
+
+    def map(self, prompts, timeout=None):
+        """
+        Submits every prompt and yields the responses in the order of the prompts.
+
+        Args:
+            prompts (iterable): Prompts to send.
+            timeout (float): Maximum number of seconds to wait for each response.
+
+        Yields:
+            str: The response to each prompt.
+        """
+        futures = [self.submit(prompt) for prompt in prompts]
+        for future in futures:
+            yield future.result(timeout)
+
+    def stats(self):
+        """
+        Returns the counters of every tab, the number of window switches and the overall throughput.
+        """
+        elapsed = time.monotonic() - self.started_at
+        with self.lock:
+            tabs = [tab.stats() for tab in self.tabs]
+            queued = len(self.queue)
+        completed = sum(tab["completed"] for tab in tabs)
+        return {
+            "tabs": tabs,
+            "queued": queued,
+            "switches": self.switches,
+            "completed": completed,
+            "throughput_per_minute": completed * 60 / elapsed if elapsed else 0.0,
+        }
+
+    def shutdown(self, wait=True):
+        """
+        Stops accepting prompts, lets the queued ones finish and closes the browser if the multiplexer
+        launched it (otherwise only the tabs it opened are closed).
+
+        Args:
+            wait (bool): If True, block until all queued prompts are processed.
+        """
+        with self.condition:
+            if self._shutdown:
+                return
+            self._shutdown = True
+            self.condition.notify()
+        if self.thread is not None and wait:
+            self.thread.join()
+        for tab in self.tabs:
+            tab._close_cdp()
+        if self._owns_automation:
+            self.automation.quit()
+        else:
+            for tab in self.tabs[1:]:
+                self.close_tab(tab)
+
+    def open_chats(self):
+        """
+        Returns the ids of the chats open in the tabs, read from their addresses.
+        """
+        ids = []
+        with self.driver_lock:
+            for tab in list(self.tabs):
+                self._switch(tab.handle)
+                match = CHAT_ID.search(self.driver.current_url or "")
+                if match:
+                    ids.append(match.group(1))
+        return ids
+
+    def _switch(self, handle):
+        if self.current_handle != handle:
+            self.driver.switch_to.window(handle)
+            self.current_handle = handle
+            self.switches += 1
+
+    def _keep_active(self):
+        try:
+            self.driver.execute_cdp_cmd("Emulation.setFocusEmulationEnabled", {"enabled": True})
+            self.driver.execute_cdp_cmd("Page.setWebLifecycleState", {"state": "active"})
+        except Exception as e:
+            logger.error(f"Failed to keep the tab active: {e}")
+
+    def _schedule(self):
+        while True:
+            with self.condition:
+                while not self.queue and not any(tab.job for tab in self.tabs):
+                    if self._shutdown:
+                        return
+                    self.condition.wait()
+                tabs = list(self.tabs)
+
+            progressed = False
+            for tab in tabs:
+                try:
+                    if tab.job is None:
+                        progressed |= self._dispatch(tab)
+                    else:
+                        progressed |= self._poll(tab)
+                except Exception as e:
+                    logger.error(f"Tab {tab.index} failed: {e}")
+                    self._finish(tab, exception=e)
+                    progressed = True
+            if not progressed:
+                timed_sleep(self.poll_interval)
+
+    def _dispatch(self, tab):
+        with self.lock:
+            if not self.queue:
+                return False
+            # Leave the prompt queued while the account has no message budget
+            if tab.throttle is not None and tab.throttle.try_acquire(tab._account(), tab.model) > 0:
+                return False
+            prompt, future = self.queue.popleft()
+        if not future.set_running_or_notify_cancel():
+            return True
+
+        timeout = tab.Timeouts.RESPONSE_TIMEOUT if self.timeout is None else self.timeout
+        job = _TabJob(prompt, future, time.monotonic() + timeout)
+        tab.job = job
+        if tab.cache is not None:
+            job.key = tab.cache.key(prompt, tab.model, [])
+            cached = tab.cache.get(job.key)
+            if cached is not None:
+                self._finish(tab, response=cached)
+                return True
+
+        tab.send_prompt_to_chatgpt(prompt)
+        job.turn_count = tab._sent_turn_count()
+        job.sentinel = tab._sentinel()
+        return True
+
+    def _poll(self, tab):
+        job = tab.job
+        if time.monotonic() > job.deadline:
+            logger.warning(f"Response in tab {tab.index} not complete in time")
+            self._finish(tab, exception=ReadinessTimeout("Response not complete in time"))
+            return True
+
+        state = tab._read_stream(job.turn_count, job.sentinel, len(job.text), 0, job.alert)
+        tab._raise_for_alert(state)
+        job.alert = state.get("alert")
+        job.text = state["text"]
+        if not state["done"]:
+            return False
+        if tab.throttle is not None:
+            tab.throttle.succeeded(tab._account(), tab.model)
+        if tab.metrics is not None:
+            tab.metrics.observe_prompt("completion", time.perf_counter() - tab.prompt_sent_at)
+        response = strip_sentinel(job.text, str(tab.uuid))
+        if job.key is not None:
+            tab.cache.put(job.key, response)
+        self._finish(tab, response=response)
+        return True
+
+    def _finish(self, tab, response=None, exception=None):
+        job = tab.job
+        if job is None:
+            return
+        with self.lock:
+            tab.job = None
+            tab.busy_time += time.monotonic() - job.started
+            tab.completed += int(exception is None)
+            tab.failed += int(exception is not None)
+        if exception is None:
+            job.future.set_result(response)
+        else:
+            job.future.set_exception(exception)
@@ -0,0 +1,284 @@
+import re
+import time
+import random
+import logging
+import threading
+from selenium.common.exceptions import WebDriverException
+from .metrics import timed_sleep
+
+logger = logging.getLogger(__name__)
+
+# Banners shown by the page instead of a response, by kind, tried in order. The patterns are matched
+# case-insensitively, in Python and in the page (scripts.DETECT_BANNER), so they use the common syntax.
+BANNER_PATTERNS = (
+    ("usage_cap", r"usage cap|reached (?:the|our|your) (?:current )?(?:limit|cap)|limit of messages|message cap"),
+    ("rate_limit", r"too many requests|rate limit|too many messages|slow down"),
+    ("network", r"network error|connection (?:error|lost)|check your (?:internet|network) connection|something went wrong"),
+    ("generation_error", r"error generating a response|error occurred while generating"),
+)
+
+# Banners after which sends are held back
+THROTTLING = ("usage_cap", "rate_limit")
+
+# "Try again in 20 minutes", not the window of "too many requests in 1 hour"
+RETRY_AFTER = re.compile(r"(?:try again|retry|wait)\D{0,20}?(\d+)\s*(second|minute|hour)s?", re.IGNORECASE)
+UNITS = {"second": 1, "minute": 60, "hour": 3600}
+
+
+def classify_banner(text):
+    """
+    Returns the kind of banner ("usage_cap", "rate_limit", "network" or "generation_error") the text belongs
+    to, or None.
+    """
+    for kind, pattern in BANNER_PATTERNS:
+        if re.search(pattern, text or "", re.IGNORECASE):
+            return kind
+    return None
+
+
+def retry_after(text):
+    """
+    Returns the wait in seconds a banner asks for ("try again in 20 minutes"), or None.
+    """
+    match = RETRY_AFTER.search(text or "")
+    if match is None:
+        return None
+    return int(match.group(1)) * UNITS[match.group(2).lower()]
+
+
+class RateLimited(WebDriverException):
+    """
+    Raised when the page shows a usage-cap or rate-limit banner, or when a send cannot be admitted in time.
+    """
+
+    def __init__(self, msg=None, kind="rate_limit", retry_in=None):
+        super().__init__(msg)
+        self.kind = kind
+        self.retry_in = retry_in
+
+
+class TokenBucket:
+    """
+    Classic token bucket: `rate` tokens per `per` seconds, holding at most `burst` of them.
+    """
+
+    def __init__(self, rate, per=3600.0, burst=None, now=None):
+        if rate <= 0 or per <= 0:
+            raise ValueError("rate and per must be positive.")
+        self.rate = rate
+        self.per = per
+        self.burst = burst if burst is not None else max(rate / 10, 1)
+        self.tokens = self.burst
+        self.updated = now
+
+    def refill(self, now):
+        if self.updated is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate / self.per)
+        self.updated = now
+
+    def wait_time(self, now):
+        """
+        Returns the number of seconds until a token is available.
+        """
+        self.refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) * self.per / self.rate
+
+    def take(self, now):
+        self.refill(now)
+        self.tokens -= 1
+
+
+class AccountState:
+    """
+    Token bucket and back-off state of one account, or of one model of an account.
+    """
+
+    def __init__(self, bucket):
+        self.bucket = bucket
+        self.strikes = 0
+        self.blocked_until = 0.0
+        self.last_banner = None
+
+
+class RateLimiter:
+    """
+    Admission control for the prompts sent from one or more sessions, per account.
+
+    Every account (Chrome profile) has a token bucket refilled at `rate` messages per `per` seconds.
+    Optional per-model limits add a second bucket per account and model, keyed by the switch_model()
+    choice, e.g. a tighter cap for GPT-4. A send waits until both buckets have a token. When the page shows
+    a usage-cap or rate-limit banner, the account (or the model, for a usage cap) is blocked for an
+    exponentially growing, jittered delay, or for the delay the banner asks for if it is longer. The first
+    complete response afterwards resets the back-off.
+
+    One RateLimiter can be shared by the sessions of a pool; sessions on the same profile share the
+    account's budget.
+
+    Example:
+        limiter = RateLimiter(rate=60, per=3600, models={4: (40, 3 * 3600)})
+        chat_bot = ChatGPTAutomation(user_data=user_data, throttle=limiter)
+        print(limiter.budget())
+    """
+
+    def __init__(
+        self,
+        rate=60,
+        per=3600.0,
+        burst=None,
+        models=None,
+        backoff_base=30.0,
+        backoff_max=3600.0,
+        jitter=0.5,
+        clock=time.monotonic,
+        sleep=timed_sleep,
+    ):
+        """
+        :param rate: Messages per `per` seconds allowed per account.
+        :param per: Length of the rate window in seconds.
+        :param burst: Messages that can be sent back to back. Defaults to a tenth of the rate (at least 1).
+        :param models: Optional {model: (rate, per)} limits per account and model, model as passed to
+                       switch_model().
+        :param backoff_base: Block after the first rate-limit banner, in seconds. Doubles with every banner
+                             until a response completes.
+        :param backoff_max: Upper bound of the back-off, in seconds.
+        :param jitter: Fraction of the back-off removed at random, so that sessions blocked together do not
+                       all retry at once.
+        :param clock: Monotonic clock, replaced in the tests.
+        :param sleep: Sleep function, replaced in the tests.
+        """
+        self.rate = rate
+        self.per = per
+        self.burst = burst
+        self.models = dict(models or {})
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.clock = clock
+        self.sleep = sleep
+        self.lock = threading.Lock()
+        self.states = {}
+
+    def _state(self, account, model=None):
+        key = (account, model)
+        state = self.states.get(key)
+        if state is None:
+            if model is None:
+                rate, per = self.rate, self.per
+            else:
+                rate, per = self.models[model]
+            burst = self.burst if model is None else None
+            state = self.states[key] = AccountState(TokenBucket(rate, per, burst, now=self.clock()))
+        return state
+
+    def _scopes(self, account, model):
+        scopes = [self._state(account)]
+        if model in self.models:
+            scopes.append(self._state(account, model))
+        return scopes
+
+    def try_acquire(self, account, model=None):
+        """
+        Takes a token for a message from the account if one is available, without waiting.
+
+        Returns:
+            float: 0 if the message can be sent, otherwise the number of seconds until it can.
+        """
+        with self.lock:
+            now = self.clock()
+            scopes = self._scopes(account, model)
+            wait = max(max(state.blocked_until - now, state.bucket.wait_time(now)) for state in scopes)
+            if wait > 0:
+                return wait
+            for state in scopes:
+                state.bucket.take(now)
+            return 0.0
+
+    def acquire(self, account, model=None, timeout=None):
+        """
+        Blocks until a message can be sent from the account, then takes a token.
+
+        Args:
+            account (str): The account key, e.g. the Chrome profile.
+            model: The model selected with switch_model(), or None.
+            timeout (float): Maximum number of seconds to wait. No limit if None.
+
+        Returns:
+            float: The number of seconds waited.
+
+        Raises:
+            RateLimited: If no message can be sent within the timeout.
+        """
+        started = self.clock()
+        while True:
+            wait = self.try_acquire(account, model)
+            if wait <= 0:
+                return self.clock() - started
+            if timeout is not None and self.clock() + wait - started > timeout:
+                raise RateLimited(
+                    f"No message budget for {account} within {timeout} seconds", retry_in=wait
+                )
+            logger.info(f"Holding the next message of {account} for {wait:.1f}s")
+            self.sleep(wait)
+
+    def penalize(self, account, model=None, kind="rate_limit", text=None):
+        """
+        Blocks the account after a rate-limit signal. A usage cap on a model with its own limit blocks only
+        that model. Banners seen again while the account is blocked do not extend the back-off.
+
+        Returns:
+            float: The number of seconds the account (or model) is blocked for.
+        """
+        with self.lock:
+            now = self.clock()
+            scope = model if kind == "usage_cap" and model in self.models else None
+            state = self._state(account, scope)
+            state.last_banner = text
+            if state.blocked_until > now:
+                return state.blocked_until - now
+            state.strikes += 1
+            delay = min(self.backoff_max, self.backoff_base * 2 ** (state.strikes - 1))
+            delay *= 1 - self.jitter * random.random()
+            delay = max(delay, retry_after(text) or 0)
+            state.blocked_until = now + delay
+            state.bucket.tokens = min(state.bucket.tokens, 0)
+        logger.warning(f"{kind} banner for {account}, backing off {delay:.0f}s: {text}")
+        return delay
+
+    def succeeded(self, account, model=None):
+        """
+        Resets the back-off of the account once a response went through.
+        """
+        with self.lock:
+            for state in self._scopes(account, model):
+                state.strikes = 0
+
+    def budget(self, account=None):
+        """
+        Reports the remaining budget of every account (or of one), keyed by account, with a "models" entry
+        for the per-model limits.
+
+        Returns:
+            dict: {account: {"tokens", "rate", "per", "blocked_for", "strikes", "last_banner", "models"}}
+        """
+        with self.lock:
+            now = self.clock()
+            report = {}
+            for (key, model), state in sorted(self.states.items(), key=lambda item: repr(item[0])):
+                if account is not None and key != account:
+                    continue
+                state.bucket.refill(now)
+                entry = {
+                    "tokens": round(state.bucket.tokens, 3),
+                    "rate": state.bucket.rate,
+                    "per": state.bucket.per,
+                    "blocked_for": max(state.blocked_until - now, 0.0),
+                    "strikes": state.strikes,
+                    "last_banner": state.last_banner,
+                }
+                if model is None:
+                    report.setdefault(key, {"models": {}}).update(entry)
+                else:
+                    report.setdefault(key, {"models": {}})["models"][model] = entry
+            return report
@@ -15,6 +15,15 @@ setup(
     url='https://github.com/iamseyedalipro/ChatGPTAutomation',
     packages=find_packages(),
     install_requires=requirements,
+    extras_require={
+        'test': ['pytest', 'pytest-benchmark'],
+        'cdp': ['websocket-client'],
+    },
+    entry_points={
+        'console_scripts': [
+            'chatgpt-automation-batch=chatgpt_automation.batch:main',
+        ],
+    },
     classifiers=[
         'Development Status :: 3 - Alpha',
         'Intended Audience :: Developers',
@@ -0,0 +1,155 @@
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import NoSuchWindowException
+from chatgpt_automation import scripts
+from chatgpt_automation.chatgpt_automation import ChatGPTAutomation
+
+
+class FakeElement:
+    """
+    Minimal stand-in for a Selenium WebElement.
+    """
+
+    def __init__(self, text="", on_click=None, message_id=None, role=None):
+        self.text = text
+        self.on_click = on_click
+        self.message_id = message_id
+        self.role = role
+        self.sent_keys = []
+
+    def click(self):
+        if self.on_click:
+            self.on_click()
+
+    def send_keys(self, *values):
+        self.sent_keys.extend(values)
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+
+class FakeDriver:
+    """
+    Minimal stand-in for a Selenium WebDriver. Elements are registered per locator and scripts are
+    answered by handlers, so tests can exercise ChatGPTAutomation without a browser. The library's own
+    page scripts are emulated against the registered elements. Every call is counted in `commands` to
+    measure WebDriver round-trips, through execute() like Selenium.
+    """
+
+    def __init__(self):
+        self.elements = {}
+        self.script_handlers = []
+        self.async_script_handlers = []
+        self.commands = 0
+        self.script_timeout = None
+        self.current_window_handle = "tab-0"
+        self.windows = {"tab-0": self.elements}
+        self.switch_to = FakeSwitchTo(self)
+        self.visited = []
+
+    def execute(self, driver_command, params=None):
+        self.commands += 1
+
+    @property
+    def window_handles(self):
+        return list(self.windows)
+
+    def get(self, url):
+        self.execute("get")
+        self.visited.append((self.current_window_handle, url))
+
+    def close(self):
+        self.execute("closeWindow")
+        del self.windows[self.current_window_handle]
+
+    def set_elements(self, locator, elements):
+        self.elements[tuple(locator)] = list(elements)
+
+    def find_elements(self, by, value):
+        self.execute("findElements")
+        return list(self.elements.get((by, value), []))
+
+    def find_element(self, by, value):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"{by}={value}")
+        return elements[0]
+
+    def execute_script(self, script, *args):
+        self.execute("executeScript")
+        for handler in self.script_handlers:
+            result = handler(script, *args)
+            if result is not None:
+                return result
+        if script in (scripts.READ_TURNS, scripts.READ_TURNS_MARKDOWN):
+            return self._read_turns(*args)
+        return None
+
+    def _read_turns(self, selector, start, anchor_id, limit=None, markdown=False):
+        nodes = self.elements.get((By.CSS_SELECTOR, selector), [])
+        if len(nodes) < start or (
+            start > 0 and anchor_id is not None and nodes[start - 1].message_id != anchor_id
+        ):
+            return {"reset": True, "count": len(nodes), "turns": []}
+        end = len(nodes) if limit is None else start + limit
+        turns = [
+            {"id": node.message_id, "role": node.role, "timestamp": None, "text": node.text}
+            for node in nodes[start:end]
+        ]
+        return {"reset": False, "count": len(nodes), "turns": turns}
+
+    def execute_async_script(self, script, *args):
+        self.execute("executeAsyncScript")
+        for handler in self.async_script_handlers:
+            result = handler(script, *args)
+            if result is not None:
+                return result
+        return None
+
+    def set_script_timeout(self, timeout):
+        self.script_timeout = timeout
+
+
+class FakeSwitchTo:
+    """
+    Window switching of the FakeDriver: every window has its own registered elements.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.opened = 0
+
+    def window(self, handle):
+        self.driver.execute("switchToWindow")
+        if handle not in self.driver.windows:
+            raise NoSuchWindowException(handle)
+        self.driver.current_window_handle = handle
+        self.driver.elements = self.driver.windows[handle]
+
+    def new_window(self, type_hint=None):
+        self.driver.execute("newWindow")
+        self.opened += 1
+        handle = f"tab-{self.opened}"
+        self.driver.windows[handle] = {}
+        self.window(handle)
+
+
+def make_automation(driver=None, use_fixed_delays=False):
+    """
+    Returns a ChatGPTAutomation bound to a FakeDriver, skipping the browser launch in the constructor.
+    """
+    automation = ChatGPTAutomation.__new__(ChatGPTAutomation)
+    automation.driver = driver or FakeDriver()
+    automation.use_fixed_delays = use_fixed_delays
+    automation.url = "https://chat.openai.com"
+    automation.user_data = None
+    automation.cache = None
+    automation.metrics = None
+    automation.prompt_sent_at = None
+    automation.model = None
+    automation.pending_attachments = []
+    automation.attached_files = {}
+    return automation
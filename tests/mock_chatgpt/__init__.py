@@ -0,0 +1,2 @@
+from .server import MockChatGPTServer
+from .session import local_chrome, mock_session, close_mock_session
@@ -0,0 +1,282 @@
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.cookies import SimpleCookie
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+ACCESS_TOKEN = "mock-access-token"
+SESSION_COOKIE = "mock-session"
+# Settings that stay on the server
+SECRET_SETTINGS = ("login_email", "login_password")
+
+
+class MockChatGPTServer:
+    """
+    Serves an offline stand-in for the ChatGPT web app on localhost.
+
+    The page reproduces the DOM targeted by ChatGPTLocators (prompt textarea, send and stop buttons,
+    div.text-base turns, file input and chips, chat and model menus, delete dialog, error banner) and
+    answers every prompt with a canned response streamed in chunks. When the prompt carries the uuid
+    sentinel of send_prompt_to_chatgpt, the response ends with it, like the real model is asked to.
+
+    The timing of the page is set with keyword arguments (see DEFAULTS) and can be changed between
+    tests with configure(); it is read by the page when it loads. With `banner` set, the page shows that
+    text in an alert instead of answering, like a usage cap or rate limit. The first `fail_first`
+    responses of every page load (and a share `error_rate` of the others) stop half-way with the
+    generation error message.
+
+    Packed prompts (see chatgpt_automation.packing) get one answer per numbered or JSON slot; with
+    `pack_skip` set, every `pack_skip`-th slot is left out of the answer, like a model skipping a prompt.
+
+    The server also keeps the chat history of the account behind the backend endpoints of the web app
+    (/api/auth/session, GET and PATCH /backend-api/conversations, PATCH /backend-api/conversation/<id>).
+    The page creates a chat on its first prompt; add_conversations() seeds old ones.
+
+    With `login_required`, the page shows a "Log in" button until the browser holds a session cookie. The
+    button leads to /auth/login, an email then password form (or a Google-like one) checked against
+    `login_email` and `login_password`; a successful login sets the HttpOnly session cookie and stores the
+    email in localStorage. `logins` counts the successful logins.
+
+    Example:
+        with MockChatGPTServer(stream_delay_ms=5) as server:
+            chat_bot = ChatGPTAutomation(user_data=user_data, url=server.url)
+    """
+
+    DEFAULTS = {
+        "first_token_ms": 100,
+        "stream_delay_ms": 20,
+        "chunk_chars": 8,
+        "response_chars": 200,
+        "error_rate": 0.0,
+        "fail_first": 0,
+        "follow_sentinel": True,
+        "upload_ms": 200,
+        "upload_ms_per_mb": 0,
+        "upload_error_rate": 0.0,
+        "delete_ms": 50,
+        "latency_ms": 0,
+        "login_required": False,
+        "login_email": "user@example.com",
+        "login_password": "secret",
+        "banner": "",
+        "pack_skip": 0,
+    }
+
+    def __init__(self, host="127.0.0.1", port=0, **config):
+        """
+        :param host: Interface to listen on.
+        :param port: Port to listen on, 0 for a free port.
+        :param config: Overrides of DEFAULTS.
+        """
+        self.config = dict(self.DEFAULTS)
+        self.configure(**config)
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.thread = None
+        self.history_lock = threading.Lock()
+        self.conversations = {}
+        self.sessions = set()
+        self.logins = 0
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def configure(self, **config):
+        """
+        Updates the page settings. Pages loaded afterwards use the new values.
+
+        Raises:
+            ValueError: If a setting is unknown.
+        """
+        unknown = set(config) - set(self.DEFAULTS)
+        if unknown:
+            raise ValueError(f"Unknown mock settings: {sorted(unknown)}")
+        self.config.update(config)
+
+    def add_conversations(self, count, title="Chat", age=0):
+        """
+        Adds chats to the history, last updated `age` seconds ago.
+
+        Returns:
+            list: The ids of the new chats.
+        """
+        ids = []
+        with self.history_lock:
+            for index in range(count):
+                ids.append(self._create_conversation(f"{title} {index}", time.time() - age))
+        return ids
+
+    def visible_conversations(self):
+        """
+        Returns the chats that are not deleted, most recently updated first.
+        """
+        with self.history_lock:
+            items = [item for item in self.conversations.values() if item["is_visible"]]
+        return sorted(items, key=lambda item: item["update_time"], reverse=True)
+
+    def _create_conversation(self, title, created):
+        conversation_id = str(uuid.uuid4())
+        self.conversations[conversation_id] = {
+            "id": conversation_id,
+            "title": title,
+            "create_time": created,
+            "update_time": created,
+            "is_visible": True,
+        }
+        return conversation_id
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        logging.info(f"Mock ChatGPT serving on {self.url}")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(SimpleHTTPRequestHandler):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, directory=STATIC_DIR, **kwargs)
+
+            def do_GET(self):
+                latency = server.config["latency_ms"]
+                if latency:
+                    time.sleep(latency / 1000)
+                if self.path.startswith("/static/"):
+                    self.path = self.path[len("/static"):]
+                    return super().do_GET()
+                if self.path == "/favicon.ico":
+                    self.send_error(404)
+                    return
+                url = urlparse(self.path)
+                if url.path == "/api/auth/session":
+                    self._send_json({"accessToken": ACCESS_TOKEN})
+                    return
+                if url.path == "/backend-api/conversations":
+                    if not self._authorized():
+                        return
+                    query = parse_qs(url.query)
+                    offset = int(query.get("offset", ["0"])[0])
+                    limit = int(query.get("limit", ["28"])[0])
+                    items = server.visible_conversations()
+                    page = [
+                        {key: item[key] for key in ("id", "title", "create_time", "update_time")}
+                        for item in items[offset:offset + limit]
+                    ]
+                    self._send_json({"items": page, "total": len(items), "limit": limit, "offset": offset})
+                    return
+                if url.path.startswith(("/api/", "/backend-api/")):
+                    self.send_error(404)
+                    return
+                if url.path == "/auth/login":
+                    self._send_page("auth.html", {})
+                    return
+                config = {key: value for key, value in server.config.items() if key not in SECRET_SETTINGS}
+                config["login_required"] = config["login_required"] and not self._logged_in()
+                self._send_page("index.html", config)
+
+            def do_POST(self):
+                if self.path == "/auth/session":
+                    body = self._read_json()
+                    if (body.get("email"), body.get("password")) != (
+                        server.config["login_email"], server.config["login_password"]
+                    ):
+                        self.send_error(401)
+                        return
+                    token = str(uuid.uuid4())
+                    with server.history_lock:
+                        server.sessions.add(token)
+                        server.logins += 1
+                    self._send_json(
+                        {"email": body["email"]},
+                        {"Set-Cookie": f"{SESSION_COOKIE}={token}; Path=/; HttpOnly; SameSite=Lax; Max-Age=86400"},
+                    )
+                    return
+                if self.path == "/backend-api/conversation":
+                    if not self._authorized():
+                        return
+                    body = self._read_json()
+                    with server.history_lock:
+                        conversation_id = server._create_conversation(body.get("title", "New chat"), time.time())
+                    self._send_json({"id": conversation_id})
+                    return
+                self.send_error(404)
+
+            def do_PATCH(self):
+                if not self._authorized():
+                    return
+                body = self._read_json()
+                with server.history_lock:
+                    if self.path == "/backend-api/conversations":
+                        targets = list(server.conversations.values())
+                    else:
+                        item = server.conversations.get(self.path.rsplit("/", 1)[-1])
+                        if not self.path.startswith("/backend-api/conversation/") or item is None:
+                            self.send_error(404)
+                            return
+                        targets = [item]
+                    for item in targets:
+                        item["is_visible"] = body.get("is_visible", item["is_visible"])
+                self._send_json({"success": True})
+
+            def _authorized(self):
+                if self.headers.get("Authorization") == f"Bearer {ACCESS_TOKEN}":
+                    return True
+                self.send_error(401)
+                return False
+
+            def _logged_in(self):
+                cookie = SimpleCookie(self.headers.get("Cookie") or "")
+                token = cookie.get(SESSION_COOKIE)
+                return token is not None and token.value in server.sessions
+
+            def _read_json(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def _send_json(self, payload, headers=None):
+                body = json.dumps(payload).encode("utf8")
+                self.send_response(200)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_page(self, name, config):
+                with open(os.path.join(STATIC_DIR, name), encoding="utf8") as file:
+                    page = file.read().replace("{{CONFIG}}", json.dumps(config))
+                body = page.encode("utf8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
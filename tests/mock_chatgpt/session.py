@@ -0,0 +1,44 @@
+import os
+import shutil
+import tempfile
+from chatgpt_automation.chatgpt_automation import ChatGPTAutomation
+
+HEADLESS_ARGS = ("--headless=new", "--no-first-run", "--no-default-browser-check")
+
+
+def local_chrome():
+    """
+    Returns the Chrome executable used against the mock page: the CHROME_PATH environment variable, or
+    the path found by ChatGPTAutomation.get_chrome_path(). None if there is no local Chrome.
+    """
+    path = os.environ.get("CHROME_PATH") or ChatGPTAutomation.get_chrome_path()
+    return path if path and os.path.isfile(path) else None
+
+
+def mock_session(server, chrome_args=(), **kwargs):
+    """
+    Starts a ChatGPTAutomation on the mock page with a throw-away profile and a headless Chrome.
+    CHROME_DRIVER_PATH and CHROME_ARGS (space separated) are read from the environment. Close it with
+    close_mock_session().
+    """
+    profile_dir = tempfile.mkdtemp(prefix="chatgpt-mock-")
+    chrome_args = HEADLESS_ARGS + tuple(chrome_args) + tuple(os.environ.get("CHROME_ARGS", "").split())
+    try:
+        automation = ChatGPTAutomation(
+            user_data={"path": profile_dir, "profile": "Default"},
+            chrome_path=local_chrome(),
+            chrome_driver_path=os.environ.get("CHROME_DRIVER_PATH"),
+            url=server.url,
+            chrome_args=chrome_args,
+            **kwargs,
+        )
+    except Exception:
+        shutil.rmtree(profile_dir, ignore_errors=True)
+        raise
+    automation.mock_profile_dir = profile_dir
+    return automation
+
+
+def close_mock_session(automation):
+    automation.quit()
+    shutil.rmtree(automation.mock_profile_dir, ignore_errors=True)
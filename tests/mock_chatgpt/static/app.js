@@ -0,0 +1,253 @@
+// Offline stand-in for the ChatGPT web app. It reproduces the DOM targeted by ChatGPTLocators and streams
+// canned responses with the timing given in window.MOCK_CONFIG.
+(function () {
+    var config = window.MOCK_CONFIG;
+    var conversation = document.getElementById("conversation");
+    var textarea = document.getElementById("prompt-textarea");
+    var composerButton = document.getElementById("composer-button");
+    var fileInput = document.getElementById("file-input");
+    var fileChips = document.getElementById("file-chips");
+    var errorSlot = document.getElementById("error-slot");
+    var dialogSlot = document.getElementById("dialog-slot");
+    var chatMenu = document.getElementById("chat-menu");
+    var modelMenu = document.getElementById("model-menu");
+    var generating = false;
+    var conversationId = null;
+    var messageCounter = 0;
+    var failuresLeft = config.fail_first;
+    var sentinelPattern = /add the following uuid to the end of the message ([0-9a-f-]{36})/;
+
+    if (config.login_required) {
+        document.getElementById("login").classList.remove("hidden");
+        document.getElementById("app").classList.add("hidden");
+    }
+    document.getElementById("account").textContent = localStorage.getItem("mock-user") || "";
+
+    function showSendButton() {
+        composerButton.innerHTML = '<button data-testid="send-button" type="button">Send</button>';
+        composerButton.firstChild.addEventListener("click", submit);
+    }
+
+    function showStopButton() {
+        composerButton.innerHTML = '<button data-testid="stop-button" type="button" aria-label="Stop generating">Stop</button>';
+    }
+
+    function addTurn(role, html) {
+        var turn = document.createElement("div");
+        turn.className = "w-full text-token-text-primary";
+        turn.setAttribute("data-testid", "conversation-turn-" + conversation.children.length);
+        var id = "msg-" + (++messageCounter);
+        turn.innerHTML =
+            '<div class="text-base m-auto">' +
+            '<div data-message-author-role="' + role + '" data-message-id="' + id + '">' +
+            '<div class="' + (role === "assistant" ? "markdown prose" : "") + '">' + html + "</div>" +
+            "</div></div>";
+        conversation.appendChild(turn);
+        return turn.querySelector(".text-base");
+    }
+
+    function addActionBar(turn, answer) {
+        var bar = document.createElement("div");
+        bar.className = "mt-1 flex gap-3 empty:hidden";
+        // Icon-only buttons, like the real page, so the action bar adds no text to the turn.
+        bar.innerHTML = '<button class="rounded-md p-1" aria-label="Copy" data-testid="copy-turn-action-button">' +
+            '<svg width="16" height="16"></svg></button>' +
+            '<button class="rounded-md p-1" aria-label="Regenerate" as="button"><svg width="16" height="16"></svg></button>';
+        turn.appendChild(bar);
+        bar.querySelector('[aria-label="Regenerate"]').addEventListener("click", function () {
+            if (!generating) {
+                turn.removeChild(bar);
+                turn.querySelector("[data-message-id]").setAttribute("data-message-id", "msg-" + (++messageCounter));
+                generate(turn, answer);
+            }
+        });
+    }
+
+    // Answers of packed prompts (numbered "[n] prompt" lines or a JSON array of {id, prompt}), one per
+    // slot; with pack_skip, every pack_skip-th slot is left out. Returns null for other prompts.
+    function packedResponseFor(prompt) {
+        var kept = function (number) {
+            return !(config.pack_skip > 0 && number % config.pack_skip === 0);
+        };
+        var start = prompt.indexOf('[{"id"');
+        if (start !== -1) {
+            try {
+                var slots = JSON.parse(prompt.slice(start)), answers = {};
+                slots.forEach(function (slot) {
+                    if (kept(Number(slot.id))) {
+                        answers[slot.id] = "Mock answer to: " + slot.prompt.slice(-80);
+                    }
+                });
+                return JSON.stringify(answers);
+            } catch (e) {
+                return null;
+            }
+        }
+        if (prompt.search(/^\[\d+\] /m) === -1) {
+            return null;
+        }
+        var lines = [], pattern = /^\[(\d+)\] (.*)$/gm, match;
+        while ((match = pattern.exec(prompt)) !== null) {
+            if (kept(Number(match[1]))) {
+                lines.push("[" + match[1] + "] Mock answer to: " + match[2].slice(-80));
+            }
+        }
+        return lines.join("\n");
+    }
+
+    function responseFor(prompt) {
+        var match = prompt.match(sentinelPattern);
+        var body = packedResponseFor(prompt);
+        if (body === null) {
+            body = "Mock answer to: " + prompt.slice(-80) + " ";
+            while (body.length < config.response_chars) {
+                body += "lorem ipsum dolor sit amet ";
+            }
+            body = body.slice(0, config.response_chars);
+        }
+        if (match && config.follow_sentinel) {
+            body += " " + match[1];
+        }
+        return body;
+    }
+
+    function escapeHtml(text) {
+        var div = document.createElement("div");
+        div.textContent = text;
+        return div.innerHTML;
+    }
+
+    // Records the chat in the account history on its first prompt, and moves to its address
+    function createConversation(prompt) {
+        conversationId = "pending";
+        fetch("/api/auth/session").then(function (response) {
+            return response.json();
+        }).then(function (session) {
+            return fetch("/backend-api/conversation", {
+                method: "POST",
+                headers: {"Content-Type": "application/json", Authorization: "Bearer " + session.accessToken},
+                body: JSON.stringify({title: prompt.slice(-40)})
+            });
+        }).then(function (response) {
+            return response.json();
+        }).then(function (created) {
+            conversationId = created.id;
+            history.replaceState(null, "", "/c/" + created.id);
+        });
+    }
+
+    function submit() {
+        var prompt = textarea.value;
+        if (generating || !prompt.trim()) {
+            return;
+        }
+        textarea.value = "";
+        fileChips.innerHTML = "";
+        addTurn("user", escapeHtml(prompt));
+        if (conversationId === null) {
+            createConversation(prompt);
+        }
+        if (config.banner) {
+            // Usage cap, rate limit: an alert instead of the response
+            errorSlot.innerHTML = "";
+            setTimeout(function () {
+                errorSlot.innerHTML = '<div role="alert" class="text-token-text-error">' + escapeHtml(config.banner) + "</div>";
+            }, config.first_token_ms);
+            return;
+        }
+        generate(addTurn("assistant", "<p></p>"), responseFor(prompt));
+    }
+
+    function generate(turn, answer) {
+        var paragraph = turn.querySelector(".markdown p");
+        var fails = failuresLeft > 0 || Math.random() < config.error_rate;
+        failuresLeft = Math.max(failuresLeft - 1, 0);
+        var position = 0;
+        generating = true;
+        errorSlot.innerHTML = "";
+        paragraph.textContent = "";
+        showStopButton();
+
+        setTimeout(function stream() {
+            if (fails && position >= answer.length / 2) {
+                errorSlot.innerHTML = '<div class="mb-3 text-center text-xs">There was an error generating a response</div>';
+                finish(turn, answer);
+                return;
+            }
+            position = Math.min(answer.length, position + config.chunk_chars);
+            paragraph.textContent = answer.slice(0, position);
+            if (position < answer.length) {
+                setTimeout(stream, config.stream_delay_ms);
+            } else {
+                finish(turn, answer);
+            }
+        }, config.first_token_ms);
+    }
+
+    function finish(turn, answer) {
+        generating = false;
+        addActionBar(turn, answer);
+        showSendButton();
+    }
+
+    textarea.addEventListener("keydown", function (event) {
+        if (event.key === "Enter" && !event.shiftKey) {
+            event.preventDefault();
+            submit();
+        }
+    });
+
+    fileInput.addEventListener("change", function () {
+        Array.prototype.forEach.call(fileInput.files, function (file) {
+            var chip = document.createElement("div");
+            chip.className = "group relative inline-block text-sm";
+            chip.innerHTML = '<span class="file-name">' + escapeHtml(file.name) + "</span>" +
+                '<svg class="animate-spin" width="16" height="16"></svg>';
+            fileChips.appendChild(chip);
+            var fails = Math.random() < config.upload_error_rate;
+            setTimeout(function () {
+                var spinner = chip.querySelector("svg.animate-spin");
+                if (spinner) {
+                    spinner.parentNode.removeChild(spinner);
+                }
+                if (fails) {
+                    chip.insertAdjacentHTML("beforeend", '<span class="text-red-500">Upload failed</span>');
+                }
+            }, config.upload_ms + config.upload_ms_per_mb * file.size / 1048576);
+        });
+        fileInput.value = "";
+    });
+
+    document.getElementById("chat-options").addEventListener("click", function () {
+        chatMenu.classList.toggle("hidden");
+    });
+
+    document.getElementById("delete-chat").addEventListener("click", function () {
+        chatMenu.classList.add("hidden");
+        dialogSlot.innerHTML = '<div class="dialog" role="dialog"><p>Delete chat?</p>' +
+            '<button class="btn relative btn-danger btn btn-danger" as="button" id="confirm-delete">Delete</button></div>';
+        document.getElementById("confirm-delete").addEventListener("click", function () {
+            setTimeout(function () {
+                conversation.innerHTML = "";
+                dialogSlot.innerHTML = "";
+            }, config.delete_ms);
+        });
+    });
+
+    document.getElementById("model-switcher").addEventListener("click", function () {
+        modelMenu.classList.toggle("hidden");
+    });
+
+    Array.prototype.forEach.call(modelMenu.querySelectorAll("[data-model]"), function (item) {
+        item.addEventListener("click", function () {
+            document.getElementById("model-name").textContent = item.getAttribute("data-model");
+            modelMenu.classList.add("hidden");
+        });
+    });
+
+    document.getElementById("new-chat").addEventListener("click", function () {
+        window.location.href = "/";
+    });
+
+    showSendButton();
+})();
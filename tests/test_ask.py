@@ -0,0 +1,132 @@
+import uuid
+import unittest
+from chatgpt_automation import scripts
+from chatgpt_automation.chatgpt_automation import ChatGPTLocators, strip_sentinel
+from chatgpt_automation.readiness import ReadinessTimeout
+from tests.fakes import FakeElement, make_automation
+
+
+class TestAsk(unittest.TestCase):
+
+    def setUp(self):
+        self.automation = make_automation()
+        self.automation.sentinel = True
+        self.sentinel = uuid.UUID("12345678-1234-5678-1234-567812345678")
+
+        def send_prompt(prompt):
+            self.automation.uuid = self.sentinel
+
+        self.automation.send_prompt_to_chatgpt = send_prompt
+
+    def stream(self, *states):
+        states = list(states)
+
+        def handler(script, *args):
+            if script == scripts.STREAM_LAST_RESPONSE:
+                return states.pop(0)
+
+        self.automation.driver.async_script_handlers.append(handler)
+
+    def test_iter_ask_yields_deltas_without_sentinel(self):
+        padding = "x" * len(str(self.sentinel))
+        self.stream(
+            {"text": "Hello" + padding, "done": False},
+            {"text": "Hello world" + padding, "done": False},
+            {"text": f"Hello world, done. {self.sentinel}", "done": True},
+        )
+        self.automation.driver.set_elements(
+            ChatGPTLocators.CHAT_GPT_CONVERSION, [FakeElement("Earlier turn", message_id="1")]
+        )
+        deltas = list(self.automation.iter_ask("Hi"))
+        self.assertEqual(deltas, ["Hello", " world", ", done."])
+        self.assertEqual(self.automation.driver.commands, 4)
+
+    def test_ask_returns_complete_response(self):
+        self.stream({"text": f"Answer {self.sentinel}", "done": True})
+        self.assertEqual(self.automation.ask("Question"), "Answer")
+
+    def test_ask_times_out(self):
+        self.stream(*[{"text": "", "done": False}] * 3)
+        with self.assertRaises(ReadinessTimeout):
+            self.automation.ask("Question", timeout=0)
+
+    def test_sentinel_instruction_wraps_the_prompt(self):
+        automation = make_automation()
+        automation.sentinel = True
+        box = FakeElement()
+        automation.driver.set_elements(ChatGPTLocators.MSG_BOX_INPUT, [box])
+        automation.driver.set_elements(ChatGPTLocators.SEND_MSG_BTN, [FakeElement()])
+        typed = []
+        automation.driver.script_handlers.append(lambda script, *args: typed.append(args[1]) if len(args) == 2 else None)
+        automation._submit_prompt("Question")
+        self.assertTrue(typed[0].endswith("Question"))
+        self.assertIn(str(automation.uuid), typed[0])
+
+    def test_check_response_status_ignores_trailing_whitespace(self):
+        self.automation.uuid = self.sentinel
+        self.automation.driver.set_elements(ChatGPTLocators.SEND_MSG_BTN, [FakeElement()])
+        self.automation.driver.set_elements(
+            ChatGPTLocators.CHAT_GPT_CONVERSION,
+            [FakeElement("Question", role="user"), FakeElement(f"Answer {self.sentinel}\n", role="assistant")],
+        )
+        self.assertTrue(self.automation.check_response_status())
+
+    def test_strip_sentinel_leaves_other_text_untouched(self):
+        self.assertEqual(strip_sentinel("no sentinel here", "abc"), "no sentinel here")
+        self.assertEqual(strip_sentinel("text abc\n", "abc"), "text")
+
+
+class TestCompletionFromPageState(unittest.TestCase):
+    """
+    Without the sentinel, a response is complete once the page stops generating.
+    """
+
+    def setUp(self):
+        self.automation = make_automation()
+        self.stop = [FakeElement("Stop")]
+        self.turns = [FakeElement("Question", message_id="1", role="user")]
+        self.automation.driver.set_elements(ChatGPTLocators.STOP_BTN, self.stop)
+        self.automation.driver.set_elements(ChatGPTLocators.CHAT_GPT_CONVERSION, self.turns)
+        self.automation.prompt_turn_count = 0
+
+    def test_prompt_is_sent_as_is(self):
+        box = FakeElement()
+        self.automation.driver.set_elements(ChatGPTLocators.MSG_BOX_INPUT, [box])
+        self.automation.driver.set_elements(ChatGPTLocators.SEND_MSG_BTN, [FakeElement()])
+        typed = []
+        self.automation.driver.script_handlers.append(
+            lambda script, *args: typed.append(args[1]) if len(args) == 2 else None
+        )
+        self.automation._submit_prompt("Question")
+        self.assertEqual(typed, ["Question"])
+
+    def test_check_response_status(self):
+        # The prompt is the last turn
+        self.automation.driver.set_elements(ChatGPTLocators.STOP_BTN, [])
+        self.assertFalse(self.automation.check_response_status())
+        # Still generating
+        self.automation.driver.set_elements(ChatGPTLocators.STOP_BTN, self.stop)
+        self.turns.append(FakeElement("Partial", message_id="2", role="assistant"))
+        self.automation.driver.set_elements(ChatGPTLocators.CHAT_GPT_CONVERSION, self.turns)
+        self.assertFalse(self.automation.check_response_status())
+        self.automation.driver.set_elements(ChatGPTLocators.STOP_BTN, [])
+        self.assertTrue(self.automation.check_response_status())
+
+    def test_iter_ask_does_not_hold_back_text(self):
+        states = [{"text": "Hello", "done": False}, {"text": "Hello world", "done": True}]
+        sent = []
+
+        def stream(script, *args):
+            if script == scripts.STREAM_LAST_RESPONSE:
+                sent.append(args[2])
+                return states.pop(0)
+
+        self.automation.send_prompt_to_chatgpt = lambda prompt: setattr(self.automation, "uuid", uuid.uuid4())
+        self.automation.driver.async_script_handlers.append(stream)
+        self.assertEqual(list(self.automation.iter_ask("Hi")), ["Hello", " world"])
+        # No sentinel to wait for
+        self.assertEqual(sent, ["", ""])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+import asyncio
+import time
+import threading
+import unittest
+from chatgpt_automation.chatgpt_automation import ChatGPTLocators
+from chatgpt_automation.async_automation import AsyncChatGPTAutomation
+from chatgpt_automation.rotation import RotationPolicy
+from tests.fakes import FakeDriver, FakeElement, make_automation
+
+
+class DelayedAnswer(FakeElement):
+    """
+    Assistant turn whose text ends with the uuid sentinel once response_delay seconds have passed.
+    """
+
+    def __init__(self, automation, response_delay):
+        super().__init__()
+        self.automation = automation
+        self.ready_at = time.monotonic() + response_delay
+
+    @property
+    def text(self):
+        if time.monotonic() < self.ready_at:
+            return "partial"
+        return f"answer {self.automation.uuid}"
+
+    @text.setter
+    def text(self, value):
+        pass
+
+
+def make_session(response_delay):
+    """
+    Returns an AsyncChatGPTAutomation whose fake page answers every prompt after response_delay seconds.
+    """
+    driver = FakeDriver()
+    automation = make_automation(driver)
+    # Completion is signalled by the sentinel here; see make_page_state_session for the page state
+    automation.sentinel = True
+
+    def on_send():
+        driver.set_elements(
+            ChatGPTLocators.CHAT_GPT_CONVERSION,
+            [FakeElement("prompt"), DelayedAnswer(automation, response_delay)],
+        )
+
+    driver.set_elements(ChatGPTLocators.MSG_BOX_INPUT, [FakeElement()])
+    driver.set_elements(ChatGPTLocators.SEND_MSG_BTN, [FakeElement(on_click=on_send)])
+    return AsyncChatGPTAutomation(automation)
+
+
+def make_page_state_session(response_delay):
+    """
+    Returns an AsyncChatGPTAutomation without the sentinel, on a fake page that already holds one exchange.
+    The prompt shows up at once and its answer response_delay seconds later. The page shows no stop button
+    and no roles, so only the turn count of the prompt tells the prompt from the answer.
+    """
+    driver = FakeDriver()
+    automation = make_automation(driver)
+    history = [FakeElement("old prompt", message_id="1"), FakeElement("old answer", message_id="2")]
+    driver.set_elements(ChatGPTLocators.CHAT_GPT_CONVERSION, history)
+
+    def on_send():
+        turns = history + [FakeElement("prompt", message_id="3")]
+        driver.set_elements(ChatGPTLocators.CHAT_GPT_CONVERSION, turns)
+        answer = turns + [FakeElement("answer", message_id="4")]
+        timer = threading.Timer(response_delay, driver.set_elements, (ChatGPTLocators.CHAT_GPT_CONVERSION, answer))
+        timer.daemon = True
+        timer.start()
+
+    driver.set_elements(ChatGPTLocators.MSG_BOX_INPUT, [FakeElement()])
+    driver.set_elements(ChatGPTLocators.SEND_MSG_BTN, [FakeElement(on_click=on_send)])
+    return AsyncChatGPTAutomation(automation)
+
+
+class TestAsyncChatGPTAutomation(unittest.IsolatedAsyncioTestCase):
+
+    async def test_send_and_wait_for_response(self):
+        bot = make_session(response_delay=0.1)
+        await bot.send_prompt_to_chatgpt("Hello")
+        self.assertFalse(await bot.check_response_status())
+        self.assertTrue(await bot.wait_for_response(timeout=5))
+        self.assertTrue((await bot.return_last_response()).startswith("answer"))
+
+    async def test_completion_from_page_state(self):
+        bot = make_page_state_session(response_delay=0.2)
+        await bot.send_prompt_to_chatgpt("Hello")
+        self.assertEqual(bot.automation.prompt_turn_count, 2)
+        # Neither the prompt nor the previous answer is taken for the response
+        self.assertFalse(await bot.check_response_status())
+        self.assertTrue(await bot.wait_for_response(timeout=5))
+        self.assertEqual(await bot.return_last_response(), "answer")
+
+    async def test_prompts_rotate_and_clean_like_the_sync_front_end(self):
+        class Janitor:
+            runs = 0
+
+            def due(self):
+                return True
+
+            def run(self, automation):
+                self.runs += 1
+
+        bot = make_session(response_delay=0)
+        bot.automation.rotation = RotationPolicy(check_every=10)
+        bot.automation.janitor = Janitor()
+        await bot.send_prompt_to_chatgpt("Hello")
+        self.assertEqual(bot.automation._prompts_since_check, 1)
+        self.assertEqual(bot.automation.janitor.runs, 1)
+
+    async def test_new_chat_forgets_uploaded_files(self):
+        bot = make_session(response_delay=0)
+        bot.driver.script_handlers.append(
+            lambda script, *args: "complete" if script == "return document.readyState" else None
+        )
+        bot.automation.attached_files = {"digest": "report.pdf"}
+        await bot.open_new_chat()
+        self.assertEqual(bot.automation.attached_files, {})
+        self.assertEqual(bot.driver.visited[-1][1], "https://chat.openai.com/")
+
+    async def test_sessions_wait_concurrently_on_one_loop(self):
+        bots = [make_session(response_delay=0.3) for _ in range(5)]
+        start = time.monotonic()
+
+        async def run(bot):
+            await bot.send_prompt_to_chatgpt("Hello")
+            await bot.wait_for_response(timeout=5)
+
+        await asyncio.gather(*(run(bot) for bot in bots))
+        # Waiting sequentially would take at least 5 * 0.3 seconds.
+        self.assertLess(time.monotonic() - start, 1.2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import os
+import json
+import tempfile
+import unittest
+from selenium.common.exceptions import WebDriverException
+from chatgpt_automation.batch import BatchRunner, BatchStats
+from chatgpt_automation.packing import PromptPacker
+from tests.test_packing import PackingSession
+
+
+class FakeSession:
+
+    def __init__(self, fail_times=0, crash_after=None):
+        self.fail_times = fail_times
+        self.crash_after = crash_after
+        self.asked = []
+        self.uploaded = []
+
+    def ask(self, prompt, timeout=None, attachments=None):
+        self.uploaded.extend(attachments or [])
+        if self.crash_after is not None and len(self.asked) == self.crash_after:
+            raise KeyboardInterrupt("worker killed")
+        if self.fail_times:
+            self.fail_times -= 1
+            raise WebDriverException("error generating a response")
+        self.asked.append(prompt)
+        return prompt.upper()
+
+
+class TestBatchRunner(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.input = os.path.join(self.tmp.name, "prompts.jsonl")
+        self.output = os.path.join(self.tmp.name, "results.jsonl")
+        with open(self.input, "w") as file:
+            for i in range(5):
+                file.write(json.dumps({"id": f"p{i}", "prompt": f"prompt {i}"}) + "\n")
+
+    def results(self):
+        with open(self.output) as file:
+            return [json.loads(line) for line in file]
+
+    def test_processes_every_row(self):
+        session = FakeSession()
+        summary = BatchRunner(session, self.input, self.output).run()
+        self.assertEqual(summary["succeeded"], 5)
+        self.assertEqual([r["response"] for r in self.results()], [f"PROMPT {i}" for i in range(5)])
+        self.assertTrue(os.path.exists(self.output + ".stats.json"))
+
+    def test_resume_after_crash_does_not_resend_completed_prompts(self):
+        with self.assertRaises(KeyboardInterrupt):
+            BatchRunner(FakeSession(crash_after=2), self.input, self.output).run()
+        session = FakeSession()
+        BatchRunner(session, self.input, self.output).run()
+        self.assertEqual(session.asked, ["prompt 2", "prompt 3", "prompt 4"])
+        self.assertEqual([r["id"] for r in self.results()], [f"p{i}" for i in range(5)])
+
+    def test_result_written_after_checkpoint_is_not_resent(self):
+        BatchRunner(FakeSession(crash_after=None), self.input, self.output).run()
+        # Simulate a crash between writing the last result and the checkpoint, plus a torn line.
+        with open(self.input, "rb") as file:
+            offset = sum(len(file.readline()) for _ in range(4))
+        with open(self.output + ".checkpoint", "w") as file:
+            json.dump({"line": 4, "offset": offset}, file)
+        with open(self.output, "a") as file:
+            file.write('{"id": "torn')
+        session = FakeSession()
+        BatchRunner(session, self.input, self.output).run()
+        self.assertEqual(session.asked, [])
+        self.assertEqual(len(self.results()), 5)
+
+    def test_retries_are_counted_per_row(self):
+        BatchRunner(FakeSession(fail_times=1), self.input, self.output, max_retries=2).run()
+        self.assertEqual([r["retries"] for r in self.results()], [1, 0, 0, 0, 0])
+
+        os.remove(self.output)
+        os.remove(self.output + ".checkpoint")
+        summary = BatchRunner(FakeSession(fail_times=3), self.input, self.output, max_retries=2).run()
+        self.assertEqual(summary["failed"], 1)
+        self.assertIsNotNone(self.results()[0]["error"])
+
+    def test_attachments_are_uploaded(self):
+        with open(self.input, "w") as file:
+            file.write(json.dumps({"prompt": "Explain", "attachments": ["a.txt", "b.txt"]}) + "\n")
+        session = FakeSession()
+        BatchRunner(session, self.input, self.output).run()
+        self.assertEqual(session.uploaded, ["a.txt", "b.txt"])
+        self.assertEqual(self.results()[0]["id"], 1)
+
+    def test_rows_that_are_not_objects_fail_alone(self):
+        with open(self.input, "w") as file:
+            file.write(json.dumps(["a", "list"]) + "\n")
+            file.write("42\n")
+            file.write(json.dumps("bare prompt") + "\n")
+        session = FakeSession()
+        with self.assertLogs(level="ERROR"):
+            summary = BatchRunner(session, self.input, self.output).run()
+        self.assertEqual((summary["failed"], summary["succeeded"]), (2, 1))
+        results = self.results()
+        self.assertEqual(results[0]["error"], "Invalid row: expected an object or a string, got list")
+        self.assertEqual(results[1]["error"], "Invalid row: expected an object or a string, got int")
+        self.assertEqual(results[2]["response"], "BARE PROMPT")
+
+    def test_rows_without_a_string_prompt_fail_alone(self):
+        for packer in (None, PromptPacker(max_prompts=3)):
+            with self.subTest(packer=packer), open(self.input, "w") as file:
+                file.write(json.dumps({"id": "none"}) + "\n")
+                file.write(json.dumps({"id": "number", "prompt": 42}) + "\n")
+                file.write(json.dumps({"id": "ok", "prompt": "fine"}) + "\n")
+            for path in (self.output, f"{self.output}.checkpoint"):
+                if os.path.exists(path):
+                    os.remove(path)
+            session = FakeSession()
+            with self.assertLogs(level="ERROR"):
+                summary = BatchRunner(session, self.input, self.output, packer=packer).run()
+            self.assertEqual((summary["failed"], summary["succeeded"]), (2, 1))
+            self.assertEqual(session.asked, ["fine"])
+            results = self.results()
+            self.assertEqual([r["id"] for r in results], ["none", "number", "ok"])
+            self.assertEqual(results[0]["error"], 'Invalid row: missing "prompt"')
+            self.assertEqual(results[1]["error"], 'Invalid row: "prompt" must be a string, got int')
+
+    def test_packed_rows(self):
+        with open(self.input, "a") as file:
+            file.write(json.dumps({"id": "file", "prompt": "Explain", "attachments": ["a.txt"]}) + "\n")
+            file.write(json.dumps({"id": "p5", "prompt": "prompt 5"}) + "\n")
+        session = PackingSession(skip={2})
+        summary = BatchRunner(session, self.input, self.output, packer=PromptPacker(max_prompts=3)).run()
+        # Two packs, each followed by its second slot sent again, then the row with an attachment and the last row
+        self.assertEqual(len(session.asked), 6)
+        self.assertEqual(session.asked[1], "prompt 1")
+        self.assertEqual(session.asked[3:], ["prompt 4", "Explain", "prompt 5"])
+        self.assertEqual([r["id"] for r in self.results()], ["p0", "p1", "p2", "p3", "p4", "file", "p5"])
+        self.assertEqual([r["response"] for r in self.results()][:5], [f"PROMPT {i}" for i in range(5)])
+        self.assertEqual((summary["succeeded"], summary["messages"], summary["packed"], summary["requeued"]),
+                         (7, 6, 3, 2))
+
+    def test_latency_reservoir_is_bounded(self):
+        stats = BatchStats()
+        for i in range(BatchStats.RESERVOIR_SIZE * 2):
+            stats.record(float(i % 100), 0, succeeded=True)
+        self.assertEqual(len(stats.latencies), BatchStats.RESERVOIR_SIZE)
+        self.assertAlmostEqual(stats.percentile(50), 50, delta=5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import time
+import tempfile
+import unittest
+from unittest import mock
+from chatgpt_automation import scripts
+from chatgpt_automation.cache import MemoryLRUCache, PromptCache, SQLiteCache, prompt_key
+from tests.fakes import make_automation
+
+
+class TestPromptCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_key_normalizes_prompt_and_depends_on_model_and_attachments(self):
+        self.assertEqual(prompt_key("  Hello\r\n world \n"), prompt_key("Hello\n world"))
+        # Inner whitespace is part of the prompt
+        self.assertNotEqual(prompt_key("def f():\n    return 1"), prompt_key("def f(): return 1"))
+        self.assertNotEqual(prompt_key("a  b"), prompt_key("a b"))
+        self.assertNotEqual(prompt_key("Hello", model=4), prompt_key("Hello", model=3))
+        self.assertEqual(prompt_key("Hi", attachment_hashes=["a", "b"]),
+                         prompt_key("Hi", attachment_hashes=["b", "a"]))
+        self.assertNotEqual(prompt_key("Hi", attachment_hashes=["a"]), prompt_key("Hi"))
+
+    def test_memory_tier_evicts_least_recently_used(self):
+        cache = MemoryLRUCache(max_entries=2)
+        cache.put("a", "1")
+        cache.put("b", "2")
+        cache.get("a")
+        cache.put("c", "3")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "1")
+
+    def test_ttl_expires_entries(self):
+        cache = PromptCache(ttl=10, path=os.path.join(self.tmp.name, "cache.sqlite"))
+        self.addCleanup(cache.close)
+        cache.put("k", "v")
+        with mock.patch("time.time", return_value=time.time() + 11):
+            self.assertIsNone(cache.get("k"))
+
+    def test_disk_tier_survives_restart_and_evicts_by_size(self):
+        path = os.path.join(self.tmp.name, "cache.sqlite")
+        cache = PromptCache(path=path)
+        cache.put("k", "v")
+        cache.close()
+
+        cache = PromptCache(path=path)
+        self.addCleanup(cache.close)
+        self.assertEqual(cache.get("k"), "v")
+        self.assertEqual(cache.get("k"), "v")
+        self.assertEqual(cache.stats()["disk_hits"], 1)
+        self.assertEqual(cache.stats()["memory_hits"], 1)
+
+        disk = SQLiteCache(os.path.join(self.tmp.name, "small.sqlite"), max_bytes=10)
+        self.addCleanup(disk.close)
+        disk.put("a", "12345")
+        disk.put("b", "12345")
+        disk.put("c", "12345")
+        self.assertIsNone(disk.get("a"))
+        self.assertEqual(len(disk), 2)
+
+    def test_ask_hit_skips_browser_round_trip(self):
+        automation = make_automation()
+        automation.cache = PromptCache()
+        sent = []
+
+        def send_prompt(prompt):
+            sent.append(prompt)
+            automation.uuid = "sentinel"
+
+        automation.send_prompt_to_chatgpt = send_prompt
+        automation.driver.async_script_handlers.append(
+            lambda script, *args: {"text": "answer sentinel", "done": True}
+            if script == scripts.STREAM_LAST_RESPONSE else None
+        )
+        self.assertEqual(automation.ask("Question"), "answer")
+        self.assertEqual(automation.ask("  Question "), "answer")
+        self.assertEqual(len(sent), 1)
+        automation.model = 4
+        automation.ask("Question")
+        self.assertEqual(len(sent), 2)
+        self.assertEqual(automation.cache.stats()["hits"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
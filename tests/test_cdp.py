@@ -0,0 +1,245 @@
+import sys
+import json
+import unittest
+from unittest import mock
+from chatgpt_automation import scripts
+from chatgpt_automation.chatgpt_automation import ChatGPTLocators
+from selenium.common.exceptions import JavascriptException, TimeoutException, WebDriverException
+from chatgpt_automation.cdp import CDPConnection, CDPConnectionLost, CDPError, CDPScriptError, CDPUnavailable
+from chatgpt_automation.metrics import Metrics
+from tests.fakes import FakeElement, make_automation
+
+try:
+    import websocket
+except ImportError:
+    websocket = None
+
+
+class FakeSocket:
+    """
+    Stand-in for a websocket-client connection: answers every command with the result built by `answer`,
+    after the queued events.
+    """
+
+    def __init__(self, answer, events=()):
+        self.answer = answer
+        self.events = list(events)
+        self.sent = []
+        self.incoming = []
+        self.timeout = None
+        self.closed = False
+
+    def settimeout(self, timeout):
+        self.timeout = timeout
+
+    def send(self, payload):
+        message = json.loads(payload)
+        self.sent.append(message)
+        self.incoming += [json.dumps(event) for event in self.events]
+        self.incoming.append(json.dumps(dict(self.answer(message), id=message["id"])))
+
+    def recv(self):
+        return self.incoming.pop(0)
+
+    def close(self):
+        self.closed = True
+
+
+@unittest.skipIf(websocket is None, "requires websocket-client")
+class TestCDPConnection(unittest.TestCase):
+    def connect(self, answer, events=()):
+        self.socket = FakeSocket(answer, events)
+        with mock.patch.object(websocket, "create_connection", return_value=self.socket) as create:
+            connection = CDPConnection("ws://127.0.0.1:9222/devtools/page/ABC", timeout=5)
+        self.assertTrue(create.call_args.kwargs["suppress_origin"])
+        return connection
+
+    def test_call_wraps_the_script_and_skips_events(self):
+        connection = self.connect(
+            lambda message: {"result": {"result": {"type": "number", "value": 3}}},
+            events=[{"method": "Page.frameNavigated", "params": {}}],
+        )
+        self.assertEqual(connection.call("return arguments[0] + arguments[1];", 1, 2), 3)
+        params = self.socket.sent[0]["params"]
+        self.assertEqual(self.socket.sent[0]["method"], "Runtime.evaluate")
+        self.assertEqual(
+            params["expression"], "(function () { return arguments[0] + arguments[1]; }).apply(null, [1, 2])"
+        )
+        self.assertTrue(params["returnByValue"])
+        self.assertFalse(params["awaitPromise"])
+
+    def test_call_async_awaits_the_callback(self):
+        connection = self.connect(lambda message: {"result": {"result": {"type": "object", "value": {"done": True}}}})
+        self.assertEqual(connection.call_async("arguments[1]({done: true});", "x", timeout=12), {"done": True})
+        params = self.socket.sent[0]["params"]
+        self.assertTrue(params["awaitPromise"])
+        self.assertIn('.apply(null, ["x"].concat([resolve]))', params["expression"])
+        self.assertEqual(self.socket.timeout, 12)
+
+    def test_errors(self):
+        connection = self.connect(lambda message: {"error": {"code": -32000, "message": "No target"}})
+        with self.assertRaises(CDPError):
+            connection.send("Page.enable")
+
+        connection = self.connect(
+            lambda message: {
+                "result": {
+                    "result": {"type": "object"},
+                    "exceptionDetails": {"text": "Uncaught", "exception": {"description": "ReferenceError: x"}},
+                }
+            }
+        )
+        with self.assertRaisesRegex(CDPError, "ReferenceError"):
+            connection.call("return x;")
+
+    def test_transport_failures(self):
+        connection = self.connect(dict)
+
+        def closed(payload):
+            raise websocket.WebSocketConnectionClosedException("closed")
+
+        self.socket.send = closed
+        with self.assertRaises(CDPUnavailable):
+            connection.call("return 1;")
+
+        connection = self.connect(dict)
+        self.socket.recv = mock.Mock(side_effect=websocket.WebSocketTimeoutException("timed out"))
+        with self.assertRaises(TimeoutException):
+            connection.call("return 1;")
+        self.socket.recv = mock.Mock(side_effect=ConnectionResetError("reset"))
+        with self.assertRaises(CDPConnectionLost):
+            connection.call("return 1;")
+
+    def test_attach_finds_the_tab_of_the_window_handle(self):
+        targets = [
+            {"id": "SW1", "type": "service_worker", "webSocketDebuggerUrl": "ws://worker"},
+            {"id": "AAA", "type": "page", "webSocketDebuggerUrl": "ws://page-a"},
+            {"id": "BBB", "type": "page", "webSocketDebuggerUrl": "ws://page-b"},
+        ]
+        with mock.patch("chatgpt_automation.cdp.devtools_targets", return_value=targets), \
+                mock.patch.object(websocket, "create_connection", return_value=FakeSocket(dict)) as create:
+            CDPConnection.attach(9222, "bbb")
+            self.assertEqual(create.call_args.args[0], "ws://page-b")
+            with self.assertRaises(CDPError):
+                CDPConnection.attach(9222, "CCC")
+
+
+class TestMissingWebsocketClient(unittest.TestCase):
+    def test_import_error_names_the_extra(self):
+        with mock.patch.dict(sys.modules, {"websocket": None}):
+            with self.assertRaisesRegex(ImportError, r"ChatGPTAutomation\[cdp\]"):
+                CDPConnection("ws://127.0.0.1:9222/devtools/page/ABC")
+
+
+class FakeChannel:
+    """
+    Stand-in for a CDPConnection answering the page scripts with canned results.
+    """
+
+    def __init__(self, results=None, fail=None):
+        """
+        :param fail: Exception raised by every script, if any.
+        """
+        self.results = results or {}
+        self.fail = fail
+        self.calls = []
+        self.closed = False
+
+    def send(self, method, params=None, timeout=None):
+        return {}
+
+    def call(self, script, *args, timeout=None):
+        self.send("Runtime.evaluate")
+        self.calls.append(script)
+        if self.fail is not None:
+            raise self.fail
+        return self.results[script](*args)
+
+    def call_async(self, script, *args, timeout=None):
+        return self.call(script, *args)
+
+    def close(self):
+        self.closed = True
+
+
+class TestAutomationOverCDP(unittest.TestCase):
+    def setUp(self):
+        self.automation = make_automation()
+        self.automation.sentinel = True
+        self.automation.uuid = "sentinel"
+
+    def test_response_status_in_one_round_trip(self):
+        channel = FakeChannel({
+            scripts.RESPONSE_STATUS: lambda errors, send, turns, sentinel, *rest: {
+                "error": False, "ready": True, "complete": sentinel == "sentinel"
+            }
+        })
+        self.automation.cdp = channel
+        self.assertTrue(self.automation.check_response_status())
+        self.assertEqual(channel.calls, [scripts.RESPONSE_STATUS])
+        self.assertEqual(self.automation.driver.commands, 0)
+
+    def test_prompt_is_injected_and_turns_are_read_over_the_channel(self):
+        turns = []
+
+        def submit(turn_selector, inputs, sends, prompt):
+            self.assertEqual(tuple(inputs[0]), ChatGPTLocators.MSG_BOX_INPUT)
+            count = len(turns)
+            turns.append({"id": "1", "role": "user", "timestamp": None, "text": prompt})
+            return {"count": count}
+
+        channel = FakeChannel({
+            scripts.SUBMIT_PROMPT: submit,
+            scripts.COUNT_ELEMENTS: lambda selector: len(turns),
+            scripts.READ_TURNS: lambda selector, start, anchor: {
+                "reset": False, "count": len(turns), "turns": turns[start:]
+            },
+        })
+        self.automation.cdp = channel
+        metrics = Metrics()
+        self.automation.metrics = metrics
+        metrics.instrument_cdp(channel)
+        self.automation.send_prompt_to_chatgpt("Hello")
+        self.assertTrue(self.automation.return_last_response().endswith("Hello"))
+        self.assertEqual(self.automation.driver.commands, 0)
+        self.assertEqual(metrics.stats()["operations"]["send_prompt_to_chatgpt"]["commands"]["sum"], 2)
+
+    def test_missing_input_box(self):
+        self.automation.cdp = FakeChannel({scripts.SUBMIT_PROMPT: lambda *args: {"missing": "input"}})
+        # The send button is there, so the prompt was not sent
+        self.automation.driver.set_elements(ChatGPTLocators.SEND_MSG_BTN, [FakeElement()])
+        with self.assertRaises(Exception):
+            self.automation.send_prompt_to_chatgpt("Hello")
+
+    def test_falls_back_to_selenium_when_the_channel_fails(self):
+        channel = FakeChannel(fail=CDPUnavailable("websocket closed"))
+        self.automation.cdp = channel
+        self.automation.driver.set_elements(
+            ChatGPTLocators.CHAT_GPT_CONVERSION, [FakeElement("Answer", message_id="1")]
+        )
+        self.assertEqual(self.automation.return_last_response(), "Answer")
+        self.assertIsNone(self.automation.cdp)
+        self.assertTrue(channel.closed)
+
+    def test_scripts_that_reached_the_page_are_not_run_again(self):
+        self.automation.driver.set_elements(ChatGPTLocators.MSG_BOX_INPUT, [FakeElement()])
+        self.automation.driver.set_elements(ChatGPTLocators.SEND_MSG_BTN, [FakeElement()])
+        channel = FakeChannel(fail=CDPConnectionLost("websocket closed"))
+        self.automation.cdp = channel
+        with self.assertRaises(WebDriverException):
+            self.automation.send_prompt_to_chatgpt("Hello")
+        self.assertEqual(channel.calls, [scripts.SUBMIT_PROMPT])
+        self.assertEqual(self.automation.driver.commands, 0)
+        self.assertIsNone(self.automation.cdp)
+
+        # A script error keeps the channel and is not retried through Selenium either
+        channel = FakeChannel(fail=CDPScriptError("Script error: TypeError"))
+        self.automation.cdp = channel
+        with self.assertRaises(JavascriptException):
+            self.automation._run_script(scripts.PASTE_TEXT, [], "text")
+        self.assertIs(self.automation.cdp, channel)
+        self.assertEqual(self.automation.driver.commands, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
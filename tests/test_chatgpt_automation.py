@@ -1,62 +1,244 @@
+import os
+import shutil
+import tempfile
 import unittest
-from chatgpt_automation.chatgpt_automation import ChatGPTAutomation
+from selenium.common.exceptions import WebDriverException
+from chatgpt_automation.throttle import RateLimited
+from chatgpt_automation.recovery import RecoveryPolicy, GenerationError
+from chatgpt_automation.login import Credentials
+from chatgpt_automation.packing import PromptPacker
+from tests.mock_chatgpt import MockChatGPTServer, local_chrome, mock_session, close_mock_session
 
+
+@unittest.skipIf(local_chrome() is None, "requires a local Chrome (set CHROME_PATH)")
 class TestChatGPTAutomation(unittest.TestCase):
+    """
+    End-to-end tests against the offline mock ChatGPT page, in a headless Chrome.
+    """
 
     @classmethod
     def setUpClass(cls):
-        CHROME_DRIVER_PATH = "C:\\Program Files (x86)\\chromedriver.exe"
-        CHROME_PATH = "C:\\Program Files\\Google\\Chrome\\Application\\chrome.exe"
-        cls.automation = ChatGPTAutomation(chrome_path=CHROME_PATH,
-                                           chrome_driver_path=CHROME_DRIVER_PATH)
+        cls.server = MockChatGPTServer(first_token_ms=20, stream_delay_ms=5, upload_ms=50).start()
+        try:
+            cls.automation = mock_session(cls.server)
+        except Exception:
+            cls.server.stop()
+            raise
+        cls.work_dir = tempfile.mkdtemp()
+        cls.previous_dir = os.getcwd()
+        os.chdir(cls.work_dir)
+
     def setUp(self):
         # Print the name of the test before it starts
         print(f"Starting {self._testMethodName}")
-        
+        self.automation.open_new_chat()
+
     @classmethod
     def tearDownClass(cls):
-        cls.automation.del_current_chat()
-        cls.automation.quit()
+        os.chdir(cls.previous_dir)
+        shutil.rmtree(cls.work_dir, ignore_errors=True)
+        close_mock_session(cls.automation)
+        cls.server.stop()
 
     def test_01_send_prompt(self):
-        test_prompt = "Hello, ChatGPT!"
-        self.automation.send_prompt_to_chatgpt(test_prompt)
-        # Add assertion to check if the prompt was sent correctly
+        self.automation.send_prompt_to_chatgpt("Hello, ChatGPT!")
+        self.assertTrue(self.automation.wait_for_response(timeout=10))
+        conversation = self.automation.conversation.texts()
+        self.assertEqual(len(conversation), 2)
+        self.assertIn("Hello, ChatGPT!", conversation[0])
 
     def test_02_save_conversation(self):
         self.automation.send_prompt_to_chatgpt("Test message for saving conversation")
-        test_filename = "test_chat.txt"
-        self.automation.save_conversation(test_filename)
-        # Add assertion to check if the conversation was saved correctly
+        self.automation.wait_for_response(timeout=10)
+        count = self.automation.save_conversation("test_chat.txt")
+        self.assertEqual(count, 2)
+        with open(os.path.join("conversations", "test_chat.txt"), encoding="utf8") as file:
+            content = file.read()
+        self.assertIn("Test message for saving conversation", content)
+        self.assertIn("Mock answer to:", content)
 
     def test_03_delete_current_chat(self):
         self.automation.send_prompt_to_chatgpt("Test message before deleting chat")
+        self.automation.wait_for_response(timeout=10)
         self.automation.del_current_chat()
-        # Add assertion to verify chat deletion
+        self.assertEqual(self.automation.conversation.texts(), [])
 
     def test_04_return_last_response(self):
         self.automation.send_prompt_to_chatgpt("Hello, ChatGPT again!")
-        import time
-        time.sleep(10)  # Adjust this based on expected response time
+        self.automation.wait_for_response(timeout=10)
         last_response = self.automation.return_last_response()
-        self.assertIsNotNone(last_response, "The last response should not be None.")
-        self.assertNotEqual(last_response, "", "The last response should not be empty.")
-        # Additional specific assertions can be added based on expected content
+        self.assertTrue(last_response.startswith("Mock answer to:"))
+        self.assertNotIn(str(self.automation.uuid), last_response)
 
     def test_05_upload_file(self):
-        test_file_name = "test_file.txt"
-        self.automation.upload_file_for_prompt(test_file_name)
-        # Add assertion to verify the file upload
+        with open("test_file.txt", "w", encoding="utf8") as file:
+            file.write("attachment")
+        self.automation.upload_file_for_prompt("test_file.txt")
+        chips = self.automation.driver.find_elements("css selector", "div.group.relative.inline-block")
+        self.assertEqual(len(chips), 1)
+        self.assertIn("test_file.txt", chips[0].text)
 
     def test_06_check_response_status(self):
-        # Send a prompt to ChatGPT to initiate a response
         self.automation.send_prompt_to_chatgpt("Hello, ChatGPT! Please write a long lorem ipsum")
+        self.assertFalse(self.automation.check_response_status())
+        self.automation.wait_for_response(timeout=10)
+        self.assertTrue(self.automation.check_response_status())
+
+    def test_07_ask_strips_sentinel(self):
+        response = self.automation.ask("What is the mock?", timeout=10)
+        self.assertTrue(response.startswith("Mock answer to:"))
+        self.assertNotIn(str(self.automation.uuid), response)
+
+    def test_08_generation_error(self):
+        self.server.configure(error_rate=1.0)
+        try:
+            self.automation.open_new_chat()
+            self.automation.send_prompt_to_chatgpt("This one fails")
+            self.automation.wait_for(
+                self.automation.check_error, delay=0, timeout=10, message="error banner"
+            )
+            self.assertFalse(self.automation.check_response_status())
+        finally:
+            self.server.configure(error_rate=0.0)
+
+    def test_09_upload_files(self):
+        paths = []
+        for name in ("first.txt", "second.txt"):
+            with open(name, "w", encoding="utf8") as file:
+                file.write(name)
+            paths.append(os.path.abspath(name))
+        self.assertEqual(self.automation.upload_files_for_prompt(paths), dict.fromkeys(paths, "uploaded"))
+        chips = self.automation.driver.find_elements("css selector", "div.group.relative.inline-block")
+        self.assertEqual([chip.text for chip in chips], ["first.txt", "second.txt"])
+        # Attached already in this conversation
+        self.assertEqual(self.automation.upload_files_for_prompt(paths[:1]), {paths[0]: "skipped"})
+
+    def test_10_failed_upload(self):
+        with open("failing.txt", "w", encoding="utf8") as file:
+            file.write("failing")
+        self.server.configure(upload_error_rate=1.0)
+        try:
+            self.automation.open_new_chat()
+            with self.assertRaises(WebDriverException):
+                self.automation.upload_files_for_prompt(["failing.txt"])
+        finally:
+            self.server.configure(upload_error_rate=0.0)
+
+    def test_11_delete_chats(self):
+        self.server.add_conversations(30, title="Batch job", age=7200)
+        self.server.add_conversations(2, title="Keep me", age=7200)
+        report = self.automation.delete_chats(older_than=3600, title="^batch job")
+        self.assertEqual(report["deleted"], 30)
+        self.assertEqual(report["failed"], 0)
+        titles = [item["title"] for item in self.server.visible_conversations()]
+        self.assertFalse([title for title in titles if title.startswith("Batch job")])
+        self.assertIn("Keep me 0", titles)
+
+    def test_11_delete_all_keeps_the_open_chat(self):
+        self.server.add_conversations(5, title="Old", age=7200)
+        self.automation.open_new_chat()
+        self.automation.ask("Keep this chat", timeout=10)
+        open_id = self.automation.wait_for(
+            lambda: "/c/" in self.automation.driver.current_url and self.automation.driver.current_url,
+            delay=0,
+            timeout=10,
+            message="chat address",
+        ).rsplit("/c/", 1)[-1]
+        report = self.automation.delete_chats(delete_all=True)
+        self.assertEqual(report["failed"], 0)
+        self.assertEqual([item["id"] for item in self.server.visible_conversations()], [open_id])
+        self.assertEqual(report["deleted"], report["scanned"] - 1)
+
+    def test_12_rate_limit_banner(self):
+        self.server.configure(banner="Too many requests in 1 hour. Try again later.")
+        try:
+            self.automation.open_new_chat()
+            with self.assertRaises(RateLimited) as raised:
+                self.automation.ask("Too fast", timeout=10)
+            self.assertEqual(raised.exception.kind, "rate_limit")
+            self.assertTrue(self.automation.check_error())
+        finally:
+            self.server.configure(banner="")
+
+    def test_13_regenerate_after_generation_error(self):
+        self.server.configure(fail_first=1)
+        try:
+            self.automation.open_new_chat()
+            with self.assertRaises(GenerationError):
+                self.automation.ask("Fails half-way", timeout=10)
+            # The regenerate button of the failed response brings a complete one
+            self.automation.open_new_chat()
+            self.automation.recovery = RecoveryPolicy(backoff=0)
+            self.automation.breaker = self.automation.recovery.new_breaker()
+            response = self.automation.ask("Fails half-way", timeout=10)
+            self.assertTrue(response.startswith("Mock answer to:"))
+            self.assertEqual(self.automation._count_turns(), 2)
+            self.assertEqual(self.automation.breaker.state, "closed")
+        finally:
+            self.automation.recovery = self.automation.breaker = None
+            self.server.configure(fail_first=0)
+
+    def test_14_sentinel_mode(self):
+        self.automation.sentinel = True
+        try:
+            response = self.automation.ask("What is the mock?", timeout=10)
+            self.assertTrue(response.startswith("Mock answer to:"))
+            self.assertNotIn(str(self.automation.uuid), response)
+            prompt, answer = self.automation.conversation.texts()
+            self.assertIn(str(self.automation.uuid), prompt)
+            self.assertTrue(answer.rstrip().endswith(str(self.automation.uuid)))
+        finally:
+            self.automation.sentinel = False
+
+    def log_out(self):
+        self.automation.driver.delete_all_cookies()
+        self.automation.driver.execute_script("localStorage.clear();")
+        self.automation.open_new_chat()
+
+    def test_15_login_and_restore_the_session_state(self):
+        self.server.configure(login_required=True)
+        try:
+            self.log_out()
+            self.assertTrue(self.automation.check_login_page())
+            credentials = Credentials("user@example.com", "secret")
+            self.assertEqual(self.automation.ensure_logged_in(credentials, "state.json"), "login")
+            self.assertFalse(self.automation.check_login_page())
+            self.assertEqual(self.server.logins, 1)
+
+            # A logged out session starts logged in from the saved state, without logging in
+            self.log_out()
+            self.assertEqual(self.automation.ensure_logged_in(credentials, "state.json"), "restored")
+            self.assertEqual(self.server.logins, 1)
+            account = self.automation.driver.execute_script('return document.getElementById("account").textContent;')
+            self.assertEqual(account, "user@example.com")
+            self.assertTrue(self.automation.ask("Logged in?", timeout=10).startswith("Mock answer to:"))
+        finally:
+            self.server.configure(login_required=False)
 
-        # Calling the check_response_status method
-        response_status = self.automation.check_response_status()
+    def test_16_google_login(self):
+        self.server.configure(login_required=True, login_email="user@gmail.com")
+        try:
+            self.log_out()
+            self.assertTrue(self.automation.login(Credentials("user@gmail.com", "secret", method="google")))
+            self.assertFalse(self.automation.check_login_page())
+        finally:
+            self.server.configure(login_required=False, login_email="user@example.com")
 
-        # Assert that the response status is as expected
-        self.assertTrue(response_status, "Response status should be True indicating ready or no error.")
+    def test_17_packed_prompts(self):
+        prompts = [f"Short question {index}" for index in range(6)]
+        self.server.configure(pack_skip=4)
+        try:
+            for fmt in ("numbered", "json"):
+                self.automation.open_new_chat()
+                packer = PromptPacker(max_prompts=6, fmt=fmt)
+                answers = packer.run(self.automation, prompts, timeout=10)
+                for prompt, answer in zip(prompts, answers):
+                    self.assertTrue(answer.startswith(f"Mock answer to: {prompt}"), answer)
+                # The 4th slot is left out of the packed answer and sent again on its own
+                self.assertEqual(packer.stats()["messages"], 2)
+                self.assertEqual(packer.requeued, 1)
+        finally:
+            self.server.configure(pack_skip=0)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,82 @@
+import unittest
+from selenium.common.exceptions import WebDriverException
+from chatgpt_automation import scripts
+from chatgpt_automation.cleanup import ChatJanitor
+from tests.fakes import make_automation
+
+
+class CleanupDriverTest(unittest.TestCase):
+    def setUp(self):
+        self.automation = make_automation()
+        self.calls = []
+        self.report = {"scanned": 40, "deleted": 30, "failed": 1}
+        self.automation.driver.async_script_handlers.append(self.clean)
+
+    def clean(self, script, *args):
+        if script != scripts.CLEAN_CONVERSATIONS:
+            return None
+        self.calls.append(args)
+        return dict(self.report)
+
+
+class TestDeleteChats(CleanupDriverTest):
+    def test_filters_are_passed_to_the_page(self):
+        report = self.automation.delete_chats(older_than=3600, title="^Batch", limit=50)
+        self.assertEqual(self.calls[0][:4], (3600, "^Batch", False, 50))
+        self.assertEqual(report["deleted"], 30)
+        self.assertEqual(report["failed"], 1)
+        self.assertGreaterEqual(report["seconds"], 0)
+        # One round-trip for the whole batch
+        self.assertEqual(self.automation.driver.commands, 1)
+
+    def test_delete_all(self):
+        self.automation.delete_chats(delete_all=True)
+        self.assertEqual(self.calls[0][:4], (None, None, True, None))
+
+    def test_filters_or_delete_all(self):
+        with self.assertRaises(ValueError):
+            self.automation.delete_chats()
+        with self.assertRaises(ValueError):
+            self.automation.delete_chats(title="x", delete_all=True)
+        self.assertEqual(self.calls, [])
+
+    def test_page_error_raises(self):
+        self.report = {"error": "GET /backend-api/conversations: HTTP 401"}
+        with self.assertLogs(level="ERROR"), self.assertRaises(WebDriverException):
+            self.automation.delete_chats(older_than=0)
+
+
+class TestChatJanitor(CleanupDriverTest):
+    def setUp(self):
+        super().setUp()
+        self.now = 0.0
+        self.janitor = ChatJanitor(older_than=600, interval=60, max_per_run=25, clock=lambda: self.now)
+        self.automation.janitor = self.janitor
+
+    def test_runs_once_per_interval(self):
+        self.automation._maybe_clean()
+        self.automation._maybe_clean()
+        self.now = 61
+        self.automation._maybe_clean()
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(self.calls[0][:4], (600, None, False, 25))
+        stats = self.janitor.stats()
+        self.assertEqual(stats["runs"], 2)
+        self.assertEqual(stats["deleted"], 60)
+
+    def test_failure_does_not_stop_the_prompt(self):
+        self.report = {"error": "offline"}
+        with self.assertLogs(level="WARNING"):
+            self.automation._maybe_clean()
+        self.assertEqual(self.janitor.runs, 0)
+        # Not retried before the interval
+        self.automation._maybe_clean()
+        self.assertEqual(len(self.calls), 1)
+
+    def test_needs_a_filter(self):
+        with self.assertRaises(ValueError):
+            ChatJanitor(older_than=None)
+
+
+if __name__ == "__main__":
+    unittest.main()
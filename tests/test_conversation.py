@@ -0,0 +1,60 @@
+import unittest
+from chatgpt_automation.chatgpt_automation import ChatGPTLocators
+from chatgpt_automation.conversation import ConversationCursor
+from tests.fakes import FakeDriver, FakeElement, make_automation
+
+
+class TestConversationCursor(unittest.TestCase):
+
+    def setUp(self):
+        self.driver = FakeDriver()
+        self.nodes = []
+        self.cursor = ConversationCursor(self.driver, ChatGPTLocators.CHAT_GPT_CONVERSION)
+
+    def add_turn(self, text, message_id=None):
+        self.nodes.append(FakeElement(text, message_id=message_id or f"m{len(self.nodes)}"))
+        self.driver.set_elements(ChatGPTLocators.CHAT_GPT_CONVERSION, self.nodes)
+
+    def test_refresh_returns_new_and_changed_turns_only(self):
+        self.add_turn("question")
+        self.add_turn("ans")
+        self.assertEqual([t.text for t in self.cursor.refresh()], ["question", "ans"])
+
+        self.nodes[-1].text = "answer"
+        self.assertEqual([t.text for t in self.cursor.refresh()], ["answer"])
+        self.assertEqual(self.cursor.refresh(), [])
+
+        self.add_turn("next question")
+        self.assertEqual([t.index for t in self.cursor.refresh()], [2])
+        self.assertEqual(self.cursor.texts(), ["question", "answer", "next question"])
+
+    def test_each_refresh_is_one_round_trip(self):
+        for i in range(50):
+            self.add_turn(f"turn {i}")
+        self.cursor.refresh()
+        commands = self.driver.commands
+        self.cursor.last()
+        self.assertEqual(self.driver.commands - commands, 1)
+
+    def test_replaced_conversation_resets_cache(self):
+        self.add_turn("old question")
+        self.add_turn("old answer")
+        self.add_turn("old follow-up")
+        self.cursor.refresh()
+
+        self.nodes[:] = []
+        self.add_turn("new question", message_id="n0")
+        self.add_turn("new answer", message_id="n1")
+        self.add_turn("new follow-up", message_id="n2")
+        self.assertEqual(self.cursor.texts(), ["new question", "new answer", "new follow-up"])
+
+    def test_automation_reads_through_cursor(self):
+        automation = make_automation(self.driver)
+        self.add_turn("question")
+        self.add_turn("answer")
+        self.assertEqual(automation.return_last_response(), "answer")
+        self.assertEqual(automation.return_chatgpt_conversation(), ["answer"])
+
+
+if __name__ == '__main__':
+    unittest.main()
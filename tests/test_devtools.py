@@ -0,0 +1,47 @@
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from chatgpt_automation.devtools import devtools_targets, devtools_version, wait_for_devtools
+from chatgpt_automation.readiness import ReadinessTimeout
+
+
+class VersionHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        if self.path == "/json/list":
+            body = json.dumps([{"id": "tab", "type": "page"}]).encode()
+        else:
+            body = json.dumps({"Browser": "Chrome/120.0.6099.109"}).encode()
+        self.send_response(200 if self.path in ("/json/version", "/json/list") else 404)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestDevTools(unittest.TestCase):
+
+    def test_version_of_listening_browser(self):
+        server = HTTPServer(("127.0.0.1", 0), VersionHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        port = server.server_address[1]
+        self.assertEqual(wait_for_devtools(port, timeout=5)["Browser"], "Chrome/120.0.6099.109")
+        self.assertEqual(devtools_targets(port), [{"id": "tab", "type": "page"}])
+
+    def test_nothing_listening(self):
+        server = HTTPServer(("127.0.0.1", 0), VersionHandler)
+        port = server.server_address[1]
+        server.server_close()
+        self.assertIsNone(devtools_version(port))
+        self.assertEqual(devtools_targets(port), [])
+        with self.assertRaises(ReadinessTimeout):
+            wait_for_devtools(port, timeout=0.1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import os
+import stat
+import tempfile
+import unittest
+from unittest import mock
+from chatgpt_automation.driver_cache import get_chrome_version, resolve_chrome_driver
+
+
+class TestDriverCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.chrome = self.fake_chrome("Google Chrome 120.0.6099.109")
+        self.installs = []
+
+    def fake_chrome(self, version_line):
+        path = os.path.join(self.tmp.name, "chrome")
+        with open(path, "w") as file:
+            file.write(f"#!/bin/sh\necho '{version_line}'\n")
+        os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+        return path
+
+    def install(self):
+        path = os.path.join(self.tmp.name, f"chromedriver-{len(self.installs)}")
+        open(path, "w").close()
+        self.installs.append(path)
+        return path
+
+    @unittest.skipIf(os.name == "nt", "uses a shell script as fake Chrome")
+    def test_driver_is_installed_once_per_chrome_version(self):
+        self.assertEqual(get_chrome_version(self.chrome), "120.0.6099.109")
+        first = resolve_chrome_driver(self.chrome, self.tmp.name, self.install)
+        second = resolve_chrome_driver(self.chrome, self.tmp.name, self.install)
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.installs), 1)
+
+        self.fake_chrome("Google Chrome 121.0.6167.85")
+        self.assertNotEqual(resolve_chrome_driver(self.chrome, self.tmp.name, self.install), first)
+        self.assertEqual(len(self.installs), 2)
+
+    @unittest.skipIf(os.name == "nt", "uses a shell script as fake Chrome")
+    def test_missing_cached_driver_is_reinstalled(self):
+        first = resolve_chrome_driver(self.chrome, self.tmp.name, self.install)
+        os.remove(first)
+        resolve_chrome_driver(self.chrome, self.tmp.name, self.install)
+        self.assertEqual(len(self.installs), 2)
+
+    def test_unknown_version_falls_back_to_install(self):
+        with mock.patch("chatgpt_automation.driver_cache.get_chrome_version", return_value=None):
+            resolve_chrome_driver(self.chrome, self.tmp.name, self.install)
+            resolve_chrome_driver(self.chrome, self.tmp.name, self.install)
+        self.assertEqual(len(self.installs), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import json
+import uuid
+import tempfile
+import unittest
+from chatgpt_automation.chatgpt_automation import ChatGPTLocators
+from chatgpt_automation.conversation import SENTINEL_INSTRUCTION
+from chatgpt_automation.exporter import ConversationExporter
+from tests.fakes import FakeDriver, FakeElement, make_automation
+
+
+class TestConversationExporter(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.driver = FakeDriver()
+        self.nodes = [
+            FakeElement(f"turn {i}", message_id=f"m{i}", role="user" if i % 2 == 0 else "assistant")
+            for i in range(7)
+        ]
+        self.driver.set_elements(ChatGPTLocators.CHAT_GPT_CONVERSION, self.nodes)
+        self.exporter = ConversationExporter(
+            self.driver, ChatGPTLocators.CHAT_GPT_CONVERSION, page_size=3
+        )
+
+    def test_turns_are_read_in_pages(self):
+        turns = list(self.exporter.iter_turns())
+        self.assertEqual([t.text for t in turns], [f"turn {i}" for i in range(7)])
+        self.assertEqual(self.driver.commands, 3)
+
+    def test_jsonl_keeps_metadata(self):
+        path = os.path.join(self.tmp.name, "chat.jsonl")
+        self.assertEqual(self.exporter.export(path, "jsonl"), 7)
+        with open(path) as file:
+            records = [json.loads(line) for line in file]
+        self.assertEqual(records[1]["role"], "assistant")
+        self.assertEqual(records[1]["index"], 1)
+        self.assertEqual(records[1]["id"], "m1")
+        self.assertIn("exported_at", records[1])
+
+    def test_markdown_and_text_formats(self):
+        path = os.path.join(self.tmp.name, "chat.md")
+        self.exporter.export(path, "markdown")
+        with open(path) as file:
+            content = file.read()
+        self.assertTrue(content.startswith("# ChatGPT conversation"))
+        self.assertIn("## Assistant 1\n\nturn 1", content)
+
+        with self.assertRaises(ValueError):
+            self.exporter.export(path, "pdf")
+
+    def test_sentinels_are_left_out(self):
+        sentinels = [str(uuid.uuid4()) for _ in self.nodes]
+        for node, sentinel in zip(self.nodes, sentinels):
+            if node.role == "user":
+                node.text = SENTINEL_INSTRUCTION.format(uuid=sentinel) + node.text
+            else:
+                node.text = f"{node.text} {sentinel}\n"
+        exporter = ConversationExporter(self.driver, ChatGPTLocators.CHAT_GPT_CONVERSION, sentinel=True)
+        # Prompts start with the instruction and every response ends with the uuid of its own prompt
+        expected = [f"turn {i}" for i in range(7)]
+        self.assertEqual([turn.text for turn in exporter.iter_turns()], expected)
+
+        automation = make_automation(self.driver)
+        automation.sentinel = True
+        self.assertEqual(automation.conversation.texts(), expected)
+        self.assertEqual(automation.return_chatgpt_conversation(), ["turn 1", "turn 3", "turn 5"])
+
+    def test_conversation_replaced_during_export(self):
+        turns = self.exporter.iter_turns()
+        next(turns)
+        self.nodes[2].message_id = "other"
+        with self.assertRaises(RuntimeError):
+            list(turns)
+
+    def test_save_conversation_appends_text(self):
+        automation = make_automation(self.driver)
+        cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        self.addCleanup(os.chdir, cwd)
+        automation.save_conversation("chat.txt")
+        automation.save_conversation("chat.txt")
+        with open(os.path.join("conversations", "chat.txt")) as file:
+            content = file.read()
+        self.assertEqual(content.count(ConversationExporter.DELIMITER), 14)
+        self.assertTrue(content.startswith("turn 0\n\n"))
+
+
+if __name__ == '__main__':
+    unittest.main()
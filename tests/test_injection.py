@@ -0,0 +1,158 @@
+import json
+import shutil
+import unittest
+import subprocess
+from selenium.common.exceptions import NoSuchElementException
+from chatgpt_automation import scripts
+from chatgpt_automation.chatgpt_automation import ChatGPTLocators
+from chatgpt_automation.injection import PromptInjector
+from tests.fakes import FakeDriver, make_automation
+
+
+class InputBoxDriver(FakeDriver):
+    """
+    FakeDriver emulating the prompt input box for the injection scripts. `lossy` drops the end of every
+    pasted chunk, like an editor choking on a large paste.
+    """
+
+    def __init__(self, lossy=0):
+        super().__init__()
+        self.value = ""
+        self.lossy = lossy
+        self.cdp_commands = []
+        self.submitted = []
+        self.script_handlers.append(self.run)
+
+    def run(self, script, *args):
+        if script == scripts.PREPARE_INPUT:
+            self.value = ""
+            return True
+        if script == scripts.PASTE_TEXT:
+            self.value += args[1][: len(args[1]) - self.lossy]
+            return {}
+        if script == scripts.SET_INPUT_VALUE:
+            self.value = args[1]
+            return {}
+        if script == scripts.READ_INPUT_DIGEST:
+            return PromptInjector.digest(self.value)
+        if script == scripts.CLICK_SEND:
+            self.submitted.append(self.value)
+            return {"count": len(self.submitted) - 1}
+        return None
+
+    def execute_cdp_cmd(self, command, params):
+        self.execute("executeCdpCommand")
+        self.cdp_commands.append(command)
+        self.value += params["text"]
+        return {}
+
+
+class TestPromptInjector(unittest.TestCase):
+    def setUp(self):
+        self.driver = InputBoxDriver()
+        self.automation = make_automation(self.driver)
+
+    def test_chunks_keep_surrogate_pairs(self):
+        injector = PromptInjector(chunk_chars=3)
+        text = "ab\U0001F600cd\U0001F600"
+        chunks = list(injector.chunks(text))
+        self.assertEqual("".join(chunks), text)
+        self.assertTrue(all(len(chunk) <= 3 for chunk in chunks))
+        self.assertEqual(list(PromptInjector(chunk_chars=1).chunks("\U0001F600")), ["\U0001F600"])
+
+    def test_paste_in_chunks(self):
+        text = "x" * 2500
+        PromptInjector(method="paste", chunk_chars=1000).inject(self.automation, text)
+        self.assertEqual(self.driver.value, text)
+        # Prepare, three pastes and the check
+        self.assertEqual(self.driver.commands, 5)
+
+    def test_insert_text_through_devtools(self):
+        PromptInjector(method="insert_text", chunk_chars=4).inject(self.automation, "Hello world")
+        self.assertEqual(self.driver.value, "Hello world")
+        self.assertEqual(self.driver.cdp_commands, ["Input.insertText"] * 3)
+
+    def test_lost_text_is_set_again(self):
+        self.driver.lossy = 1
+        with self.assertLogs(level="WARNING"):
+            PromptInjector(method="paste").inject(self.automation, "Hello world")
+        self.assertEqual(self.driver.value, "Hello world")
+
+    def test_mismatch_is_not_submitted(self):
+        self.driver.script_handlers.insert(
+            0, lambda script, *args: {} if script == scripts.SET_INPUT_VALUE else None
+        )
+        self.driver.lossy = 1
+        with self.assertLogs(level="WARNING"), self.assertRaises(Exception):
+            PromptInjector(method="paste").inject(self.automation, "Hello world")
+
+    def test_digest_ignores_whitespace(self):
+        self.assertEqual(PromptInjector.digest("a b\r\n\tc"), PromptInjector.digest("abc"))
+        self.assertNotEqual(PromptInjector.digest("abc"), PromptInjector.digest("abd"))
+
+    @unittest.skipIf(shutil.which("node") is None, "node is required to run the page script outside a browser")
+    def test_digest_matches_the_page_script(self):
+        samples = ["", "Hello, world!", "line 1\n\nline 2 end", "été 中文 \U0001F600" * 50]
+        output = subprocess.run(
+            ["node", "-e", scripts.INPUT_DIGEST + "var window = {};"
+             "console.log(JSON.stringify(JSON.parse(require('fs').readFileSync(0, 'utf8')).map(digest)));"],
+            input=json.dumps(samples),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(json.loads(output.stdout), [PromptInjector.digest(sample) for sample in samples])
+
+    def test_missing_input_box_raises(self):
+        self.driver.script_handlers.insert(
+            0, lambda script, *args: {"missing": "input"} if script == scripts.PASTE_TEXT else None
+        )
+        with self.assertRaises(NoSuchElementException):
+            PromptInjector(method="paste").inject(self.automation, "Hello world")
+
+    @unittest.skipIf(shutil.which("node") is None, "node is required to run the page script outside a browser")
+    def test_input_scripts_report_a_missing_input_box(self):
+        # A page without the input box or the send button
+        page = (
+            "var document = {querySelector: function () { return null; },"
+            " querySelectorAll: function () { return []; }};"
+        )
+        strategies = [["css selector", "#prompt-textarea"]]
+        for script, args in [
+            (scripts.PASTE_TEXT, [strategies, "text"]),
+            (scripts.SET_INPUT_VALUE, [strategies, "text"]),
+            (scripts.CLICK_SEND, ["article", strategies, strategies]),
+        ]:
+            with self.subTest(script=script.strip().splitlines()[-1]):
+                output = subprocess.run(
+                    ["node", "-e", page + "var arguments_ = JSON.parse(require('fs').readFileSync(0, 'utf8'));"
+                     "console.log(JSON.stringify((function () {" + script + "}).apply(null, arguments_)));"],
+                    input=json.dumps(args),
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                )
+                self.assertIn("missing", json.loads(output.stdout))
+
+    def test_rejects_unknown_method(self):
+        with self.assertRaises(ValueError):
+            PromptInjector(method="keys")
+
+
+class TestLargePrompts(unittest.TestCase):
+    def test_large_prompts_go_through_the_injector(self):
+        driver = InputBoxDriver()
+        automation = make_automation(driver)
+        turns = []
+        driver.elements[ChatGPTLocators.CHAT_GPT_CONVERSION] = turns
+        driver.script_handlers.insert(
+            0, lambda script, *args: turns.append(object()) if script == scripts.CLICK_SEND else None
+        )
+        prompt = "p" * (PromptInjector.LARGE_PROMPT_CHARS + 1)
+        automation.send_prompt_to_chatgpt(prompt)
+        # Sent as is, without the sentinel instruction
+        self.assertEqual(driver.value, prompt)
+
+
+if __name__ == "__main__":
+    unittest.main()
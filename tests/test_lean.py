@@ -0,0 +1,73 @@
+import unittest
+from unittest import mock
+from chatgpt_automation.lean import LeanProfile, IMAGE_PATTERNS, TRACKER_PATTERNS
+from tests.fakes import FakeDriver, make_automation
+
+
+class CDPDriver(FakeDriver):
+    def __init__(self, fail=False):
+        super().__init__()
+        self.cdp_commands = []
+        self.fail = fail
+
+    def execute_cdp_cmd(self, command, params):
+        if self.fail:
+            raise RuntimeError("CDP unavailable")
+        self.cdp_commands.append((command, params))
+        return {}
+
+
+class TestLeanProfile(unittest.TestCase):
+    def test_chrome_args(self):
+        args = LeanProfile(js_heap_mb=256, renderer_process_limit=1, disk_cache_mb=8).chrome_args()
+        self.assertEqual(args[0], "--headless=new")
+        self.assertIn("--disable-gpu", args)
+        self.assertIn("--js-flags=--max-old-space-size=256", args)
+        self.assertIn("--renderer-process-limit=1", args)
+        self.assertIn(f"--disk-cache-size={8 * 1024 * 1024}", args)
+
+        headed = LeanProfile(headless=False, js_heap_mb=None, renderer_process_limit=None, disk_cache_mb=None)
+        args = headed.chrome_args()
+        self.assertNotIn("--headless=new", args)
+        self.assertFalse([arg for arg in args if arg.startswith(("--js-flags", "--renderer", "--disk"))])
+
+    def test_blocked_urls(self):
+        profile = LeanProfile(block_fonts=False, block_media=False, blocked_urls=["*example.com*"])
+        patterns = profile.blocked_urls()
+        self.assertTrue(set(IMAGE_PATTERNS + TRACKER_PATTERNS) <= set(patterns))
+        self.assertNotIn("*.woff2", patterns)
+        self.assertEqual(patterns[-1], "*example.com*")
+
+    def test_apply_blocks_requests_and_keeps_the_tab_active(self):
+        driver = CDPDriver()
+        LeanProfile().apply(driver)
+        commands = dict(driver.cdp_commands)
+        self.assertIn("Network.enable", commands)
+        self.assertIn("*.png", commands["Network.setBlockedURLs"]["urls"])
+        self.assertEqual(commands["Emulation.setFocusEmulationEnabled"], {"enabled": True})
+        self.assertEqual(commands["Page.setWebLifecycleState"], {"state": "active"})
+
+    def test_apply_failure_is_not_fatal(self):
+        with self.assertLogs(level="ERROR"):
+            LeanProfile().apply(CDPDriver(fail=True))
+
+
+class TestLeanLaunch(unittest.TestCase):
+    def test_launch_adds_lean_switches_before_custom_ones(self):
+        automation = make_automation()
+        automation.chrome_path = "chrome"
+        automation.user_data = {"path": "/tmp/profile", "profile": "Default"}
+        automation.chrome_args = ["--window-size=800,600"]
+        automation.lean = LeanProfile()
+        with mock.patch("subprocess.Popen") as popen, mock.patch(
+            "chatgpt_automation.chatgpt_automation.wait_for_devtools"
+        ):
+            automation.launch_chrome_with_remote_debugging(9222, "http://127.0.0.1:8000")
+        command = popen.call_args[0][0]
+        self.assertIn("--headless=new", command)
+        self.assertLess(command.index("--disable-gpu"), command.index("--window-size=800,600"))
+        self.assertEqual(command[-1], "http://127.0.0.1:8000")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,131 @@
+import json
+import os
+import tempfile
+import unittest
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import StaleElementReferenceException
+from chatgpt_automation.chatgpt_automation import ChatGPTLocators
+from chatgpt_automation.locators import ElementLocator, load_locator_overrides
+from tests.fakes import FakeDriver, FakeElement, make_automation
+
+
+class StaleElement(FakeElement):
+    def click(self):
+        raise StaleElementReferenceException("element is not attached to the page document")
+
+
+class TestElementLocator(unittest.TestCase):
+    def setUp(self):
+        self.driver = FakeDriver()
+        self.elements = ElementLocator(self.driver, ChatGPTLocators)
+
+    def test_falls_back_and_remembers_the_winner(self):
+        textarea = FakeElement("textarea")
+        self.driver.set_elements(ChatGPTLocators.MSG_BOX_INPUT2, [textarea])
+
+        self.assertIs(self.elements.find("MSG_BOX_INPUT", cached=False), textarea)
+        self.assertEqual(self.driver.commands, 2)
+        self.assertEqual(self.elements.locator("MSG_BOX_INPUT"), ChatGPTLocators.MSG_BOX_INPUT2)
+
+        self.driver.commands = 0
+        self.elements.find("MSG_BOX_INPUT", cached=False)
+        self.assertEqual(self.driver.commands, 1)
+        self.assertEqual(self.elements.stats()["fallbacks"], 1)
+
+    def test_moves_back_to_the_primary_when_the_winner_breaks(self):
+        self.driver.set_elements(ChatGPTLocators.MSG_BOX_INPUT2, [FakeElement()])
+        self.elements.find("MSG_BOX_INPUT")
+        self.driver.set_elements(ChatGPTLocators.MSG_BOX_INPUT2, [])
+        self.driver.set_elements(ChatGPTLocators.MSG_BOX_INPUT, [FakeElement()])
+        self.elements.find("MSG_BOX_INPUT", cached=False)
+        self.assertEqual(self.elements.locator("MSG_BOX_INPUT"), ChatGPTLocators.MSG_BOX_INPUT)
+
+    def test_missing_element_raises(self):
+        with self.assertRaises(NoSuchElementException):
+            self.elements.find("MSG_BOX_INPUT")
+
+    def test_cached_handle_is_reused_until_stale(self):
+        stale = StaleElement()
+        fresh = FakeElement()
+        clicks = []
+        fresh.on_click = lambda: clicks.append(True)
+        self.driver.set_elements(ChatGPTLocators.SEND_MSG_BTN, [stale])
+        self.elements.find("SEND_MSG_BTN")
+
+        self.driver.commands = 0
+        self.assertIs(self.elements.find("SEND_MSG_BTN"), stale)
+        self.assertEqual(self.driver.commands, 0)
+
+        self.driver.set_elements(ChatGPTLocators.SEND_MSG_BTN, [fresh])
+        self.elements.act("SEND_MSG_BTN", lambda button: button.click())
+        self.assertEqual(clicks, [True])
+        self.assertIs(self.elements.find("SEND_MSG_BTN"), fresh)
+
+    def test_find_all_uses_only_the_winner_once_known(self):
+        self.assertEqual(self.elements.find_all("SEND_MSG_BTN"), [])
+        self.assertEqual(self.driver.commands, 3)
+
+        self.driver.set_elements(ChatGPTLocators.SEND_MSG_BTN, [FakeElement()])
+        self.assertTrue(self.elements.present("SEND_MSG_BTN"))
+        self.driver.set_elements(ChatGPTLocators.SEND_MSG_BTN, [])
+        self.driver.commands = 0
+        self.assertFalse(self.elements.present("SEND_MSG_BTN"))
+        self.assertEqual(self.driver.commands, 1)
+
+    def test_overrides_replace_the_chain(self):
+        elements = ElementLocator(
+            self.driver,
+            ChatGPTLocators,
+            {"CHAT_GPT_CONVERSION": [(By.XPATH, "//article"), (By.CSS_SELECTOR, "article.turn")]},
+        )
+        self.assertEqual(elements.strategies("CHAT_GPT_CONVERSION")[0], (By.XPATH, "//article"))
+        self.assertEqual(elements.css("CHAT_GPT_CONVERSION"), "article.turn")
+
+
+class TestLoadLocatorOverrides(unittest.TestCase):
+    def test_reads_json_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "locators.json")
+            with open(path, "w", encoding="utf8") as file:
+                json.dump(
+                    {
+                        "MSG_BOX_INPUT": [["css selector", "div#prompt-textarea"], ["tag name", "textarea"]],
+                        "SEND_MSG_BTN": ["css selector", "button.send"],
+                    },
+                    file,
+                )
+            overrides = load_locator_overrides(path)
+        self.assertEqual(
+            overrides["MSG_BOX_INPUT"],
+            [("css selector", "div#prompt-textarea"), ("tag name", "textarea")],
+        )
+        self.assertEqual(overrides["SEND_MSG_BTN"], [("css selector", "button.send")])
+
+    def test_rejects_unknown_strategy(self):
+        with self.assertRaises(ValueError):
+            load_locator_overrides({"MSG_BOX_INPUT": [["css", "textarea"]]})
+        with self.assertRaises(ValueError):
+            load_locator_overrides({"MSG_BOX_INPUT": []})
+
+
+class TestAutomationLocators(unittest.TestCase):
+    def test_prompt_input_falls_back_and_is_not_looked_up_again(self):
+        automation = make_automation()
+        driver = automation.driver
+        textarea = FakeElement()
+        driver.set_elements(ChatGPTLocators.MSG_BOX_INPUT2, [textarea])
+        driver.set_elements(ChatGPTLocators.SEND_MSG_BTN, [FakeElement()])
+        driver.set_elements(ChatGPTLocators.CHAT_GPT_CONVERSION, [FakeElement("Hi", message_id="1")])
+
+        automation._submit_prompt("First")
+        lookups = automation.elements.stats()["lookups"]
+        automation._submit_prompt("Second")
+
+        self.assertEqual(len(textarea.sent_keys), 2)
+        # Only the turn count is looked up again, the input box and send button handles are reused
+        self.assertEqual(automation.elements.stats()["lookups"] - lookups, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,239 @@
+import os
+import stat
+import tempfile
+import unittest
+from unittest import mock
+from chatgpt_automation import scripts
+from chatgpt_automation.chatgpt_automation import ChatGPTLocators
+from chatgpt_automation.login import (
+    Credentials,
+    LoginRequired,
+    cookie_params,
+    load_session_state,
+    save_session_state,
+)
+from tests.fakes import FakeDriver, FakeElement, make_automation
+
+SESSION_COOKIE = {
+    "name": "session-token",
+    "value": "token",
+    "domain": "chat.openai.com",
+    "path": "/",
+    "expires": 4102444800,
+    "size": 18,
+    "httpOnly": True,
+    "secure": True,
+    "session": False,
+    "sameSite": "Lax",
+}
+
+
+class BrowserDriver(FakeDriver):
+    """
+    FakeDriver with a login state: the login button is shown until the session holds the session cookie.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.cookies = []
+        self.local_storage = {}
+        self.current_url = "https://chat.openai.com/"
+        self.cdp_commands = []
+        self.set_elements(ChatGPTLocators.MSG_BOX_INPUT, [FakeElement()])
+        self.script_handlers.append(self.run_script)
+
+    @property
+    def logged_in(self):
+        return any(cookie["name"] == "session-token" for cookie in self.cookies)
+
+    def get(self, url):
+        super().get(url)
+        self.current_url = url
+
+    def run_script(self, script, *args):
+        if script == scripts.LOGIN_VISIBLE:
+            return not self.logged_in
+        if script == "return document.readyState":
+            return "complete"
+        if script == scripts.READ_LOCAL_STORAGE:
+            return dict(self.local_storage)
+        if script == scripts.WRITE_LOCAL_STORAGE:
+            self.local_storage.update(args[0])
+            return len(args[0])
+        return None
+
+    def execute_cdp_cmd(self, command, params):
+        self.execute(command)
+        self.cdp_commands.append((command, params))
+        if command == "Network.getCookies":
+            return {"cookies": list(self.cookies)}
+        if command == "Network.setCookies":
+            self.cookies.extend(params["cookies"])
+        return {}
+
+
+class LoginTest(unittest.TestCase):
+    def setUp(self):
+        self.driver = BrowserDriver()
+        self.automation = make_automation(self.driver)
+        self.typed = {}
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        environ = mock.patch.dict(os.environ, {"CHATGPT_EMAIL": ""})
+        environ.start()
+        self.addCleanup(environ.stop)
+
+    def field(self, locator, name):
+        element = FakeElement()
+        self.driver.set_elements(locator, [element])
+        self.typed[name] = element
+        return element
+
+    def password_form(self):
+        """
+        Registers the login button, the email and password steps; the second Continue logs in.
+        """
+        self.driver.set_elements(ChatGPTLocators.LOGIN_BTN, [FakeElement()])
+        self.field(ChatGPTLocators.USERNAME_INPUT, "email")
+        self.field(ChatGPTLocators.PASSWORD_INPUT, "password")
+        clicks = []
+
+        def next_step():
+            clicks.append(1)
+            if len(clicks) == 2:
+                self.driver.cookies.append(dict(SESSION_COOKIE))
+
+        self.driver.set_elements(ChatGPTLocators.CONTINUE_BTN, [FakeElement(on_click=next_step)])
+        return clicks
+
+
+class TestLogin(LoginTest):
+    def test_check_login_page_is_one_round_trip(self):
+        self.assertTrue(self.automation.check_login_page())
+        self.assertEqual(self.driver.commands, 1)
+
+    def test_password_flow(self):
+        clicks = self.password_form()
+        self.assertTrue(self.automation.login(Credentials("user@example.com", "secret")))
+        self.assertEqual(self.typed["email"].sent_keys, ["user@example.com"])
+        self.assertEqual(self.typed["password"].sent_keys, ["secret"])
+        self.assertEqual(len(clicks), 2)
+        self.assertFalse(self.automation.check_login_page())
+
+    def test_already_logged_in(self):
+        self.driver.cookies.append(dict(SESSION_COOKIE))
+        self.assertFalse(self.automation.login(Credentials("user@example.com", "secret")))
+
+    def test_google_account_chooser(self):
+        self.driver.set_elements(ChatGPTLocators.LOGIN_BTN, [FakeElement()])
+        self.driver.set_elements(ChatGPTLocators.LOGIN_WITH_GMAIL_BTN, [FakeElement()])
+        by, value = ChatGPTLocators.GMAIL_BTN
+        self.driver.set_elements(
+            (by, value.format("user@gmail.com")),
+            [FakeElement(on_click=lambda: self.driver.cookies.append(dict(SESSION_COOKIE)))],
+        )
+        self.assertTrue(self.automation.login(Credentials("user@gmail.com", "secret", method="google")))
+        self.assertEqual(self.driver.find_elements(*ChatGPTLocators.GMAIL_PASSWORD_INPUT), [])
+
+    def test_google_sign_in_form(self):
+        self.driver.set_elements(ChatGPTLocators.LOGIN_BTN, [FakeElement()])
+        self.driver.set_elements(ChatGPTLocators.LOGIN_WITH_GMAIL_BTN, [FakeElement()])
+        self.field(ChatGPTLocators.GMAIL_INPUT, "email")
+        self.driver.set_elements(ChatGPTLocators.GMAIL_NEXT_BTN, [FakeElement()])
+        self.field(ChatGPTLocators.GMAIL_PASSWORD_INPUT, "password")
+        self.driver.set_elements(
+            ChatGPTLocators.GMAIL_PASSWORD_NEXT_BTN,
+            [FakeElement(on_click=lambda: self.driver.cookies.append(dict(SESSION_COOKIE)))],
+        )
+        self.assertTrue(self.automation.login(Credentials("user@gmail.com", "secret", method="google")))
+        self.assertEqual(self.typed["email"].sent_keys, ["user@gmail.com"])
+        self.assertEqual(self.typed["password"].sent_keys, ["secret"])
+
+    def test_missing_step_raises(self):
+        self.driver.set_elements(ChatGPTLocators.LOGIN_BTN, [FakeElement()])
+        self.automation.Timeouts = type("Timeouts", (self.automation.Timeouts,), {"LOGIN_STEP_TIMEOUT": 0})
+        with self.assertLogs(level="WARNING"), self.assertRaises(LoginRequired):
+            self.automation.login(Credentials("user@example.com", "secret"))
+
+    def test_no_credentials(self):
+        with self.assertRaises(LoginRequired):
+            self.automation.login()
+        with self.assertRaises(LoginRequired):
+            self.automation.login(Credentials("user@example.com"))
+
+
+class TestSessionState(LoginTest):
+    def test_ensure_logged_in_takes_the_fast_path(self):
+        self.driver.cookies.append(dict(SESSION_COOKIE))
+        self.assertEqual(self.automation.ensure_logged_in(), "session")
+        self.assertEqual(self.driver.commands, 1)
+
+    def test_login_then_restore_in_a_new_session(self):
+        path = os.path.join(self.directory.name, "state.json")
+        self.password_form()
+        self.driver.local_storage["user"] = "user@example.com"
+        credentials = Credentials("user@example.com", "secret")
+        self.assertEqual(self.automation.ensure_logged_in(credentials, path), "login")
+        state = load_session_state(path)
+        self.assertEqual(state["cookies"][0]["value"], "token")
+        self.assertEqual(state["local_storage"], {"user": "user@example.com"})
+
+        driver = BrowserDriver()
+        automation = make_automation(driver)
+        self.assertEqual(automation.ensure_logged_in(state_path=path), "restored")
+        self.assertEqual(driver.local_storage, {"user": "user@example.com"})
+        # Only the fields Network.setCookies accepts are sent back
+        self.assertNotIn("size", driver.cookies[0])
+
+    def test_stale_state_falls_back_to_login(self):
+        path = os.path.join(self.directory.name, "state.json")
+        save_session_state({"version": 1, "url": self.automation.url, "cookies": [], "local_storage": {}}, path)
+        self.password_form()
+        with self.assertLogs(level="WARNING"):
+            result = self.automation.ensure_logged_in(Credentials("user@example.com", "secret"), path)
+        self.assertEqual(result, "login")
+
+    def test_no_credentials_raises(self):
+        with self.assertRaises(LoginRequired):
+            self.automation.ensure_logged_in()
+
+    def test_credentials_from_env(self):
+        clicks = self.password_form()
+        with mock.patch.dict(os.environ, {"CHATGPT_EMAIL": "env@example.com", "CHATGPT_PASSWORD": "pw"}):
+            self.assertEqual(self.automation.ensure_logged_in(), "login")
+        self.assertEqual(self.typed["email"].sent_keys, ["env@example.com"])
+        self.assertEqual(len(clicks), 2)
+
+    @unittest.skipIf(os.name == "nt", "POSIX permissions")
+    def test_state_file_is_private(self):
+        path = os.path.join(self.directory.name, "state.json")
+        save_session_state({"version": 1, "cookies": []}, path)
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o600)
+
+    def test_unsupported_state(self):
+        path = os.path.join(self.directory.name, "state.json")
+        save_session_state({"version": 99}, path)
+        with self.assertRaises(ValueError):
+            load_session_state(path)
+
+
+class TestCredentials(unittest.TestCase):
+    def test_repr_hides_the_password(self):
+        self.assertNotIn("secret", repr(Credentials("user@example.com", "secret")))
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            Credentials("user@example.com", "secret", method="sms")
+
+    def test_cookie_params(self):
+        session = dict(SESSION_COOKIE, expires=-1, session=True)
+        expired = dict(SESSION_COOKIE, name="old", expires=1000)
+        params = cookie_params([SESSION_COOKIE, session, expired], now=2000)
+        self.assertEqual(len(params), 2)
+        self.assertEqual(params[0]["expires"], 4102444800)
+        self.assertNotIn("expires", params[1])
+        self.assertNotIn("size", params[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import io
+import os
+import sys
+import json
+import queue
+import logging
+import tempfile
+import unittest
+import subprocess
+from chatgpt_automation.logs import DroppingQueueHandler, configure_logging, stop_logging
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_PROBE = """
+import os, sys, json, logging
+import chatgpt_automation.chatgpt_automation, chatgpt_automation.session_pool, chatgpt_automation.batch
+print(json.dumps({
+    "webdriver": "selenium.webdriver" in sys.modules,
+    "root_handlers": len(logging.getLogger().handlers),
+    "log_file": os.path.exists("chatgpt_automation.log"),
+}))
+"""
+
+
+class TestImport(unittest.TestCase):
+    def test_import_has_no_side_effects(self):
+        with tempfile.TemporaryDirectory() as work_dir:
+            output = subprocess.run(
+                [sys.executable, "-c", IMPORT_PROBE],
+                cwd=work_dir,
+                env=dict(os.environ, PYTHONPATH=ROOT),
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+        self.assertEqual(json.loads(output), {"webdriver": False, "root_handlers": 0, "log_file": False})
+
+
+class TestConfigureLogging(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(stop_logging)
+        self.logger = logging.getLogger("chatgpt_automation.tests")
+
+    def test_records_reach_the_file(self):
+        with tempfile.TemporaryDirectory() as work_dir:
+            path = os.path.join(work_dir, "worker.log")
+            configure_logging(path, level=logging.WARNING)
+            self.logger.info("Not written")
+            self.logger.warning("Written")
+            stop_logging()
+            with open(path, encoding="utf8") as file:
+                lines = file.read().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertTrue(lines[0].endswith(":WARNING:Written"))
+
+    def test_application_handlers_stay_open(self):
+        stream = io.StringIO()
+        handler = logging.StreamHandler(stream)
+        configure_logging(handlers=[handler])
+        # Configuring again replaces the previous queue handler
+        configure_logging(handlers=[handler])
+        self.logger.info("Once")
+        stop_logging()
+        self.assertEqual(stream.getvalue(), "Once\n")
+        handlers = logging.getLogger("chatgpt_automation").handlers
+        self.assertFalse(any(isinstance(item, DroppingQueueHandler) for item in handlers))
+        handler.emit(logging.makeLogRecord({"msg": "Still open"}))
+
+    def test_full_queue_drops_records(self):
+        handler = DroppingQueueHandler(queue.Queue(1))
+        handler.emit(logging.makeLogRecord({"msg": "kept"}))
+        handler.emit(logging.makeLogRecord({"msg": "dropped"}))
+        self.assertEqual(handler.dropped, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
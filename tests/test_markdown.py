@@ -0,0 +1,154 @@
+import os
+import json
+import uuid
+import shutil
+import unittest
+import subprocess
+from html.parser import HTMLParser
+from chatgpt_automation import scripts
+from tests.fakes import make_automation
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "markdown")
+VOID_ELEMENTS = {"area", "br", "col", "hr", "img", "input", "meta", "source", "wbr"}
+
+# Minimal DOM over the parsed fixture, exposing the API used by toMarkdown().
+DOM_SHIM = """
+function build(data) {
+    if (data.type === 3) {
+        return {nodeType: 3, textContent: data.text, childNodes: []};
+    }
+    var node = {
+        nodeType: 1,
+        tagName: data.tag.toUpperCase(),
+        childNodes: data.children.map(build),
+        getAttribute: function (name) { return name in data.attrs ? data.attrs[name] : null; }
+    };
+    Object.defineProperty(node, "textContent", {
+        get: function () { return this.childNodes.map(function (c) { return c.textContent; }).join(""); }
+    });
+    return node;
+}
+var documents = JSON.parse(require("fs").readFileSync(0, "utf8"));
+var repeat = parseInt(process.argv[1] || "1", 10);
+var results = [], start = process.hrtime.bigint();
+documents.forEach(function (data) {
+    var root = build(data);
+    for (var i = 0; i < repeat; i++) {
+        var markdown = toMarkdown(root);
+    }
+    results.push(markdown);
+});
+var elapsed = Number(process.hrtime.bigint() - start) / 1e6;
+process.stdout.write(JSON.stringify({results: results, elapsed_ms: elapsed}));
+"""
+
+
+class TreeBuilder(HTMLParser):
+    """
+    Parses an HTML fragment into the JSON tree consumed by DOM_SHIM.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.root = {"type": 1, "tag": "div", "attrs": {}, "children": []}
+        self.stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        node = {"type": 1, "tag": tag, "attrs": {k: v or "" for k, v in attrs}, "children": []}
+        self.stack[-1]["children"].append(node)
+        if tag not in VOID_ELEMENTS:
+            self.stack.append(node)
+
+    def handle_endtag(self, tag):
+        for index in range(len(self.stack) - 1, 0, -1):
+            if self.stack[index]["tag"] == tag:
+                del self.stack[index:]
+                return
+
+    def handle_data(self, data):
+        self.stack[-1]["children"].append({"type": 3, "text": data})
+
+
+def parse_fragment(html):
+    builder = TreeBuilder()
+    builder.feed(html)
+    builder.close()
+    return builder.root
+
+
+def run_converter(fragments, repeat=1):
+    """
+    Runs toMarkdown() under node on every HTML fragment and returns (markdown list, elapsed ms).
+    """
+    documents = json.dumps([parse_fragment(html) for html in fragments])
+    output = subprocess.run(
+        ["node", "-e", scripts.MARKDOWN_CONVERTER + DOM_SHIM, str(repeat)],
+        input=documents,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    result = json.loads(output)
+    return result["results"], result["elapsed_ms"]
+
+
+def load_corpus():
+    names = sorted(f[:-5] for f in os.listdir(FIXTURES) if f.endswith(".html"))
+    corpus = []
+    for name in names:
+        with open(os.path.join(FIXTURES, name + ".html"), encoding="utf8") as file:
+            html = file.read()
+        with open(os.path.join(FIXTURES, name + ".md"), encoding="utf8") as file:
+            expected = file.read().strip()
+        corpus.append((name, html, expected))
+    return corpus
+
+
+class TestMarkdownConverter(unittest.TestCase):
+
+    @unittest.skipIf(shutil.which("node") is None, "node is required to run the converter outside a browser")
+    def test_corpus(self):
+        corpus = load_corpus()
+        results, _ = run_converter([html for _, html, _ in corpus])
+        for (name, _, expected), markdown in zip(corpus, results):
+            with self.subTest(fixture=name):
+                self.assertEqual(markdown, expected)
+
+    def test_return_last_response_md_uses_single_script(self):
+        automation = make_automation()
+        automation.driver.script_handlers.append(
+            lambda script, *args: "**bold**" if script == scripts.LAST_RESPONSE_MARKDOWN else None
+        )
+        self.assertEqual(automation.return_last_response_md(), "**bold**")
+        self.assertEqual(automation.driver.commands, 1)
+
+    def test_return_last_response_md_over_devtools(self):
+        class Channel:
+            def __init__(self):
+                self.calls = []
+
+            def call(self, script, *args):
+                self.calls.append(script)
+                return "**bold**"
+
+        automation = make_automation()
+        automation.cdp = Channel()
+        self.assertEqual(automation.return_last_response_md(), "**bold**")
+        self.assertEqual(automation.cdp.calls, [scripts.LAST_RESPONSE_MARKDOWN])
+        self.assertEqual(automation.driver.commands, 0)
+
+    def test_return_last_response_md_strips_the_sentinel(self):
+        automation = make_automation()
+        automation.sentinel = True
+        automation.uuid = uuid.uuid4()
+        automation.driver.script_handlers.append(
+            lambda script, *args: f"**bold** {automation.uuid}\n" if script == scripts.LAST_RESPONSE_MARKDOWN else None
+        )
+        self.assertEqual(automation.return_last_response_md(), "**bold**")
+
+    def test_return_last_response_md_without_response(self):
+        self.assertEqual(make_automation().return_last_response_md(), "No response found.")
+
+
+if __name__ == '__main__':
+    unittest.main()
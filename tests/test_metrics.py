@@ -0,0 +1,160 @@
+import json
+import os
+import tempfile
+import unittest
+import threading
+import urllib.request
+import uuid
+from chatgpt_automation import scripts
+from chatgpt_automation.chatgpt_automation import ChatGPTLocators
+from chatgpt_automation.metrics import Histogram, Metrics, timed_sleep
+from tests.fakes import FakeElement, make_automation
+
+
+class TestHistogram(unittest.TestCase):
+    def test_snapshot_and_percentiles(self):
+        histogram = Histogram((1, 2, 5, 10))
+        for value in (0.5, 1.5, 1.5, 3, 20):
+            histogram.observe(value)
+        snapshot = histogram.snapshot()
+        self.assertEqual(snapshot["count"], 5)
+        self.assertEqual(snapshot["min"], 0.5)
+        self.assertEqual(snapshot["max"], 20)
+        self.assertEqual(snapshot["p50"], 2)
+        self.assertEqual(snapshot["p99"], 20)
+
+    def test_cumulative_counts(self):
+        histogram = Histogram((1, 2))
+        for value in (0.5, 1, 3):
+            histogram.observe(value)
+        self.assertEqual(list(histogram.cumulative()), [(1, 2), (2, 2), ("+Inf", 3)])
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.metrics = Metrics()
+        self.automation = make_automation()
+        self.automation.metrics = self.metrics
+        self.metrics.instrument_driver(self.automation.driver)
+
+    def operation(self, name):
+        return self.metrics.stats()["operations"][name]
+
+    def test_counts_commands_of_nested_calls(self):
+        self.automation.check_response_status()
+        status = self.operation("check_response_status")
+        error = self.operation("check_error")
+        self.assertEqual(status["calls"], 1)
+        self.assertEqual(error["commands"]["sum"], 1)
+        # The enclosing call includes the command of check_error, plus the three send button strategies
+        self.assertEqual(status["commands"]["sum"], 4)
+        self.assertEqual(self.metrics.stats()["webdriver_commands"], 4)
+
+    def test_commands_of_concurrent_sessions_are_all_counted(self):
+        driver = self.automation.driver
+
+        def issue():
+            for _ in range(5000):
+                driver.execute("executeScript")
+
+        threads = [threading.Thread(target=issue) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.metrics.stats()["webdriver_commands"], 40000)
+
+    def test_sleep_is_charged_to_the_current_operation(self):
+        self.metrics.measure("nap", timed_sleep, 0.02)
+        nap = self.operation("nap")
+        self.assertGreaterEqual(nap["sleep"]["sum"], 0.02)
+        self.assertGreaterEqual(nap["wall"]["sum"], nap["sleep"]["sum"])
+
+    def test_errors_are_counted(self):
+        with self.assertRaises(FileNotFoundError):
+            self.automation.upload_file_for_prompt("missing-file.txt")
+        self.assertEqual(self.operation("upload_file_for_prompt")["errors"], 1)
+
+    def test_prompt_timings_and_generator_calls(self):
+        self.automation.driver.set_elements(
+            ChatGPTLocators.CHAT_GPT_CONVERSION, [FakeElement("Earlier turn", message_id="1")]
+        )
+        self.automation.sentinel = True
+        sentinel = uuid.uuid4()
+        states = [
+            {"text": "Hello" + "x" * 36, "done": False},
+            {"text": f"Hello world {sentinel}", "done": True},
+        ]
+
+        def send_prompt(prompt):
+            self.automation.uuid = sentinel
+            self.automation.prompt_sent_at = 0.0
+
+        self.automation.send_prompt_to_chatgpt = send_prompt
+        self.automation.driver.async_script_handlers.append(
+            lambda script, *args: states.pop(0) if script == scripts.STREAM_LAST_RESPONSE else None
+        )
+        self.assertEqual("".join(self.automation.iter_ask("Hi")), "Hello world")
+
+        stats = self.metrics.stats()
+        self.assertEqual(stats["prompts"]["first_token"]["count"], 1)
+        self.assertEqual(stats["prompts"]["completion"]["count"], 1)
+        iter_ask = stats["operations"]["iter_ask"]
+        self.assertEqual(iter_ask["errors"], 0)
+        # One find_elements and two stream reads
+        self.assertEqual(iter_ask["commands"]["sum"], 3)
+
+    def test_closing_a_generator_early_is_not_an_error(self):
+        self.automation.driver.set_elements(
+            ChatGPTLocators.CHAT_GPT_CONVERSION, [FakeElement("Hi", message_id="1")]
+        )
+
+        def send_prompt(prompt):
+            self.automation.uuid = uuid.uuid4()
+            self.automation.prompt_sent_at = 0.0
+
+        self.automation.send_prompt_to_chatgpt = send_prompt
+        self.automation.driver.async_script_handlers.append(
+            lambda script, *args: {"text": "x" * 100, "done": False}
+        )
+        deltas = self.automation.iter_ask("Hi")
+        next(deltas)
+        deltas.close()
+        self.assertEqual(self.operation("iter_ask")["errors"], 0)
+
+    def test_prometheus_and_json_exports(self):
+        self.automation.check_response_status()
+        text = self.metrics.prometheus()
+        self.assertIn(
+            'chatgpt_automation_operation_seconds_count{operation="check_response_status"} 1', text
+        )
+        self.assertIn(
+            'chatgpt_automation_operation_webdriver_commands_bucket{operation="check_error",le="1"} 1', text
+        )
+        self.assertIn("chatgpt_automation_webdriver_commands_total 4", text)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "metrics.json")
+            self.metrics.dump_json(path)
+            with open(path, encoding="utf8") as file:
+                self.assertEqual(json.load(file)["operations"]["check_error"]["calls"], 1)
+
+    def test_serve(self):
+        self.automation.check_error()
+        port = self.metrics.serve(0)
+        self.addCleanup(self.metrics.close)
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+            self.assertIn(b'operation="check_error"', response.read())
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/stats", timeout=5) as response:
+            self.assertEqual(json.load(response)["operations"]["check_error"]["calls"], 1)
+
+
+class TestDisabledMetrics(unittest.TestCase):
+    def test_methods_run_without_metrics(self):
+        automation = make_automation()
+        self.assertFalse(automation.check_response_status())
+        self.assertEqual(automation.driver.commands, 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+import json
+import re
+import unittest
+import urllib.request
+import urllib.error
+from tests.mock_chatgpt import MockChatGPTServer
+from tests.mock_chatgpt.server import ACCESS_TOKEN
+
+
+def fetch(url):
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return response.status, response.read().decode("utf8")
+
+
+def call(url, method="GET", body=None, token=ACCESS_TOKEN):
+    request = urllib.request.Request(
+        url,
+        method=method,
+        data=json.dumps(body).encode("utf8") if body is not None else None,
+        headers={"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return json.load(response)
+
+
+class TestMockChatGPTServer(unittest.TestCase):
+    def setUp(self):
+        self.server = MockChatGPTServer(stream_delay_ms=1).start()
+        self.addCleanup(self.server.stop)
+
+    def page_config(self, path="/"):
+        status, page = fetch(self.server.url + path)
+        self.assertEqual(status, 200)
+        return json.loads(re.search(r"window\.MOCK_CONFIG = (.*?);</script>", page).group(1))
+
+    def test_page_has_locator_targets(self):
+        _, page = fetch(self.server.url + "/")
+        for marker in (
+            'textarea id="prompt-textarea"',
+            'type="file" class="hidden"',
+            'button data-state="closed"',
+            'role="menuitem" class="text-red-500"',
+            'aria-haspopup="menu"',
+            "<div>GPT-4</div>",
+        ):
+            self.assertIn(marker, page)
+
+    def test_config_is_injected_and_reconfigurable(self):
+        self.assertEqual(self.page_config()["stream_delay_ms"], 1)
+        self.server.configure(error_rate=0.5)
+        config = self.page_config("/c/any-conversation")
+        self.assertEqual(config["error_rate"], 0.5)
+        self.assertEqual(config["stream_delay_ms"], 1)
+
+    def test_unknown_setting_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.server.configure(stream_speed=3)
+
+    def test_serves_script(self):
+        status, script = fetch(self.server.url + "/static/app.js")
+        self.assertEqual(status, 200)
+        self.assertIn("MOCK_CONFIG", script)
+
+    def test_chat_history(self):
+        old = self.server.add_conversations(3, title="Old", age=3600)
+        new = self.server.add_conversations(2, title="New")
+        session = call(self.server.url + "/api/auth/session")
+        self.assertEqual(session["accessToken"], ACCESS_TOKEN)
+        page = call(self.server.url + "/backend-api/conversations?offset=1&limit=2")
+        self.assertEqual(page["total"], 5)
+        self.assertEqual([item["id"] for item in page["items"]], [new[0], old[2]])
+
+        call(self.server.url + f"/backend-api/conversation/{old[1]}", "PATCH", {"is_visible": False})
+        self.assertEqual(len(self.server.visible_conversations()), 4)
+        call(self.server.url + "/backend-api/conversations", "PATCH", {"is_visible": False})
+        self.assertEqual(self.server.visible_conversations(), [])
+
+    def test_history_needs_the_token(self):
+        with self.assertRaises(urllib.error.HTTPError) as raised:
+            call(self.server.url + "/backend-api/conversations", token="wrong")
+        self.assertEqual(raised.exception.code, 401)
+
+    def test_login_sets_a_session_cookie(self):
+        self.server.configure(login_required=True)
+        config = self.page_config()
+        self.assertTrue(config["login_required"])
+        self.assertNotIn("login_password", config)
+        status, page = fetch(self.server.url + "/auth/login")
+        self.assertEqual(status, 200)
+        self.assertIn('id="username"', page)
+
+        with self.assertRaises(urllib.error.HTTPError) as raised:
+            call(self.server.url + "/auth/session", "POST", {"email": "user@example.com", "password": "wrong"})
+        self.assertEqual(raised.exception.code, 401)
+        request = urllib.request.Request(
+            self.server.url + "/auth/session",
+            method="POST",
+            data=json.dumps({"email": "user@example.com", "password": "secret"}).encode("utf8"),
+        )
+        with urllib.request.urlopen(request, timeout=5) as response:
+            cookie = response.headers["Set-Cookie"].split(";")[0]
+        self.assertEqual(self.server.logins, 1)
+
+        page_request = urllib.request.Request(self.server.url + "/", headers={"Cookie": cookie})
+        with urllib.request.urlopen(page_request, timeout=5) as response:
+            page = response.read().decode("utf8")
+        config = json.loads(re.search(r"window\.MOCK_CONFIG = (.*?);</script>", page).group(1))
+        self.assertFalse(config["login_required"])
+
+
+if __name__ == "__main__":
+    unittest.main()
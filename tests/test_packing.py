@@ -0,0 +1,115 @@
+import re
+import json
+import unittest
+from selenium.common.exceptions import WebDriverException
+from chatgpt_automation.packing import PromptPacker
+
+
+class PackingSession:
+    """
+    Answers packed prompts in their own format, leaving out the slots in `skip`, and single prompts in
+    upper case. Messages containing a prompt in `fail` raise.
+    """
+
+    def __init__(self, skip=(), fail=()):
+        self.skip = set(skip)
+        self.fail = set(fail)
+        self.asked = []
+
+    def ask(self, prompt, timeout=None, attachments=None):
+        self.asked.append(prompt)
+        if any(item in prompt for item in self.fail):
+            raise WebDriverException("error generating a response")
+        start = prompt.find('[{"id"')
+        if start >= 0:
+            slots = json.loads(prompt[start:])
+            answers = {slot["id"]: slot["prompt"].upper() for slot in slots if int(slot["id"]) not in self.skip}
+            return "```json\n" + json.dumps(answers) + "\n```"
+        slots = re.findall(r"^\[(\d+)\] (.*)$", prompt, re.MULTILINE)
+        if slots:
+            return "\n".join(f"**[{number}]** {text.upper()}" for number, text in slots if int(number) not in self.skip)
+        return prompt.upper()
+
+
+class TestRenderAndParse(unittest.TestCase):
+
+    def test_numbered_round_trip(self):
+        packer = PromptPacker()
+        message = packer.render(["first", "second"])
+        self.assertTrue(message.endswith("\n\n[1] first\n[2] second"))
+        self.assertIn("2 numbered prompts", message)
+        response = "Sure!\n**[1]** One\n- [2]: Two\nover two lines"
+        self.assertEqual(packer.parse(response, 2), ["One", "Two\nover two lines"])
+
+    def test_missing_and_repeated_slots(self):
+        packer = PromptPacker()
+        self.assertEqual(packer.parse("[1] One\n[1] Again\n[3]\n[7] Out of range", 3), ["One", None, None])
+
+    def test_json_round_trip(self):
+        packer = PromptPacker(fmt="json")
+        message = packer.render(["first", 'with "quotes"'])
+        slots = json.loads(message[message.index("["):])
+        self.assertEqual(slots, [{"id": "1", "prompt": "first"}, {"id": "2", "prompt": 'with "quotes"'}])
+        response = 'Here you go:\n```json\n{"1": "One", "2": {"label": "two"}}\n```'
+        self.assertEqual(packer.parse(response, 3), ["One", '{"label": "two"}', None])
+        self.assertEqual(packer.parse("No JSON here", 2), [None, None])
+
+    def test_single_prompt_is_sent_as_it_is(self):
+        packer = PromptPacker()
+        self.assertEqual(packer.render(["alone"]), "alone")
+        self.assertEqual(packer.parse("  [2] answer ", 1), ["[2] answer"])
+
+    def test_packs_respect_the_budget(self):
+        packer = PromptPacker(max_prompts=3, max_chars=len(PromptPacker().render(["a" * 100, "b" * 100])))
+        prompts = ["a" * 100, "b" * 100, "c" * 10, "d", "e", "f", "g" * 5000]
+        self.assertEqual(packer.packs(prompts), [[0, 1], [2, 3, 4], [5], [6]])
+        for group in packer.packs(prompts):
+            self.assertTrue(packer.fits([prompts[index] for index in group]))
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            PromptPacker(fmt="xml")
+
+
+class TestRun(unittest.TestCase):
+
+    def setUp(self):
+        self.prompts = [f"prompt {index}" for index in range(5)]
+
+    def test_answers_in_order_with_fewer_messages(self):
+        for fmt in ("numbered", "json"):
+            session = PackingSession()
+            packer = PromptPacker(max_prompts=3, fmt=fmt)
+            self.assertEqual(packer.run(session, self.prompts), [prompt.upper() for prompt in self.prompts])
+            self.assertEqual(len(session.asked), 2)
+            self.assertEqual(packer.stats()["packed"], 5)
+
+    def test_missing_slots_are_requeued_alone(self):
+        session = PackingSession(skip={2})
+        packer = PromptPacker(max_prompts=5)
+        self.assertEqual(packer.run(session, self.prompts), [prompt.upper() for prompt in self.prompts])
+        self.assertEqual(session.asked[1:], ["prompt 1"])
+        self.assertEqual((packer.packed, packer.requeued, packer.messages), (4, 1, 2))
+
+    def test_failed_pack_is_requeued_alone(self):
+        session = PackingSession(fail={"[1] prompt 0"})
+        packer = PromptPacker(max_prompts=3)
+        self.assertEqual(packer.run(session, self.prompts), [prompt.upper() for prompt in self.prompts])
+        self.assertEqual(session.asked[2:], ["prompt 0", "prompt 1", "prompt 2"])
+        self.assertEqual(packer.requeued, 3)
+
+    def test_failed_single_prompt_raises(self):
+        with self.assertRaises(WebDriverException):
+            PromptPacker().run(PackingSession(fail={"alone"}), ["alone"])
+
+    def test_stats(self):
+        ticks = iter([0.0, 30.0])
+        packer = PromptPacker(max_prompts=5, clock=lambda: next(ticks))
+        packer.run(PackingSession(), self.prompts)
+        stats = packer.stats()
+        self.assertEqual(stats["prompts_per_message"], 5.0)
+        self.assertEqual(stats["prompts_per_minute"], 10.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
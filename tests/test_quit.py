@@ -0,0 +1,56 @@
+import sys
+import subprocess
+import unittest
+from tests.fakes import make_automation
+
+# Stand-ins for the Chrome process: one that exits on SIGTERM, one that ignores it
+SLEEPER = "import time; print('ready', flush=True); time.sleep(60)"
+STUBBORN = "import signal, time; signal.signal(signal.SIGTERM, signal.SIG_IGN); print('ready', flush=True); time.sleep(60)"
+
+
+def launch(code):
+    process = subprocess.Popen([sys.executable, "-c", code], stdout=subprocess.PIPE, text=True)
+    process.stdout.readline()
+    return process
+
+
+class TestQuit(unittest.TestCase):
+    def setUp(self):
+        self.processes = []
+
+    def tearDown(self):
+        for process in self.processes:
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+            process.stdout.close()
+
+    def test_quit_stops_the_launched_chrome(self):
+        automation = make_automation()
+        automation.chrome_process = launch(SLEEPER)
+        self.processes.append(automation.chrome_process)
+        automation.quit()
+        self.assertIsNotNone(automation.chrome_process.poll())
+
+    @unittest.skipIf(sys.platform == "win32", "SIGTERM cannot be ignored on Windows")
+    def test_chrome_ignoring_terminate_is_killed(self):
+        automation = make_automation()
+
+        class Timeouts(automation.Timeouts):
+            CHROME_QUIT_TIMEOUT = 0.2
+
+        automation.Timeouts = Timeouts
+        automation.chrome_process = launch(STUBBORN)
+        self.processes.append(automation.chrome_process)
+        with self.assertLogs(level="WARNING"):
+            automation.quit()
+        self.assertIsNotNone(automation.chrome_process.poll())
+
+    def test_attached_chrome_is_left_running(self):
+        automation = make_automation()
+        automation.quit()
+        self.assertIsNone(automation.chrome_process)
+
+
+if __name__ == "__main__":
+    unittest.main()
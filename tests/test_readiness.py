@@ -0,0 +1,52 @@
+import time
+import unittest
+from selenium.common.exceptions import NoSuchElementException
+from chatgpt_automation.readiness import PollInterval, ReadinessTimeout, wait_until
+from chatgpt_automation.chatgpt_automation import ChatGPTAutomation
+
+
+class TestReadiness(unittest.TestCase):
+
+    def test_poll_interval_backs_off_to_maximum(self):
+        interval = PollInterval(initial=0.1, maximum=0.3, factor=2)
+        self.assertEqual([interval.next() for _ in range(4)], [0.1, 0.2, 0.3, 0.3])
+        interval.reset()
+        self.assertEqual(interval.next(), 0.1)
+
+    def test_wait_until_returns_as_soon_as_condition_holds(self):
+        calls = []
+
+        def condition():
+            calls.append(1)
+            return "ready" if len(calls) == 3 else None
+
+        start = time.monotonic()
+        self.assertEqual(wait_until(condition, timeout=5, initial_interval=0.01), "ready")
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(len(calls), 3)
+
+    def test_wait_until_ignores_missing_elements(self):
+        calls = []
+
+        def condition():
+            calls.append(1)
+            if len(calls) < 2:
+                raise NoSuchElementException("not yet")
+            return True
+
+        self.assertTrue(wait_until(condition, timeout=5, initial_interval=0.01))
+
+    def test_wait_until_raises_on_timeout(self):
+        with self.assertRaises(ReadinessTimeout):
+            wait_until(lambda: False, timeout=0.1, initial_interval=0.01)
+
+    def test_fixed_delay_compatibility_mode_skips_condition(self):
+        automation = ChatGPTAutomation.__new__(ChatGPTAutomation)
+        automation.use_fixed_delays = True
+        self.assertIsNone(
+            automation.wait_for(lambda: self.fail("condition evaluated"), delay=0, timeout=1)
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
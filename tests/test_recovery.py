@@ -0,0 +1,279 @@
+import time
+import uuid
+import unittest
+from unittest import mock
+from selenium.common.exceptions import (
+    InvalidSessionIdException,
+    NoSuchElementException,
+    StaleElementReferenceException,
+    WebDriverException,
+)
+from chatgpt_automation import scripts
+from chatgpt_automation.chatgpt_automation import ChatGPTLocators
+from chatgpt_automation.readiness import ReadinessTimeout
+from chatgpt_automation.recovery import (
+    CircuitBreaker,
+    CircuitOpen,
+    GenerationError,
+    RecoveryPolicy,
+    RetryBudget,
+    classify_failure,
+)
+from chatgpt_automation.throttle import RateLimited
+from tests.fakes import FakeElement, make_automation
+
+ERROR = "There was an error generating a response"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestClassifyFailure(unittest.TestCase):
+    def test_kinds(self):
+        self.assertEqual(classify_failure(GenerationError(ERROR)), "generation_error")
+        self.assertEqual(classify_failure(ReadinessTimeout("slow")), "timeout")
+        self.assertEqual(classify_failure(StaleElementReferenceException("gone")), "stale_dom")
+        self.assertEqual(classify_failure(InvalidSessionIdException("dead")), "tab_crash")
+        self.assertEqual(classify_failure(WebDriverException("unknown error: session deleted because of page crash")), "tab_crash")
+        self.assertEqual(classify_failure(WebDriverException("Error opening new chat: tab crashed")), "tab_crash")
+
+    def test_not_recoverable(self):
+        self.assertIsNone(classify_failure(RateLimited("Too many requests")))
+        self.assertIsNone(classify_failure(CircuitOpen("open")))
+        self.assertIsNone(classify_failure(WebDriverException("network banner: Network error")))
+        self.assertIsNone(classify_failure(ValueError("bad prompt")))
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60, clock=self.clock)
+
+    def test_opens_after_failures_in_a_row(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.assertTrue(self.breaker.allows())
+        self.assertTrue(self.breaker.record_failure())
+        self.assertEqual(self.breaker.state, "open")
+        with self.assertRaises(CircuitOpen) as raised:
+            self.breaker.check()
+        self.assertEqual(raised.exception.retry_in, 60)
+
+    def test_half_open_trial(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.clock.now += 60
+        self.assertEqual(self.breaker.state, "half_open")
+        self.breaker.check()
+        # One failure is enough to open it again
+        self.assertTrue(self.breaker.record_failure())
+        self.assertFalse(self.breaker.allows())
+        self.clock.now += 60
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.stats(), {"state": "closed", "failures": 0, "trips": 2})
+
+
+class TestRetryBudget(unittest.TestCase):
+    def test_reserve_then_ratio(self):
+        budget = RetryBudget(ratio=0.5, reserve=1)
+        self.assertTrue(budget.try_spend())
+        self.assertFalse(budget.try_spend())
+        budget.record_request()
+        budget.record_request()
+        self.assertTrue(budget.try_spend())
+        self.assertFalse(budget.try_spend())
+        self.assertEqual(budget.remaining(), 0)
+
+    def test_policy_validates_actions(self):
+        with self.assertRaises(ValueError):
+            RecoveryPolicy(actions={"timeout": ("reboot",)})
+        with self.assertRaises(ValueError):
+            RecoveryPolicy(actions={"crash": ("new_chat",)})
+
+
+class TestRecovery(unittest.TestCase):
+    def setUp(self):
+        self.automation = make_automation()
+        self.sentinel = uuid.UUID("12345678-1234-5678-1234-567812345678")
+        self.sent = []
+        self.new_chats = 0
+        self.regenerated = 0
+        self.states = []
+        self.stream_turns = []
+
+        def send_prompt(prompt):
+            self.sent.append(prompt)
+            self.automation.uuid = self.sentinel
+            # The prompt is the first turn, and a response has started after it
+            self.automation.prompt_turn_count = 0
+            self.automation.driver.set_elements(
+                ChatGPTLocators.CHAT_GPT_CONVERSION, [FakeElement("Prompt"), FakeElement("Half")]
+            )
+
+        def open_new_chat():
+            self.new_chats += 1
+
+        def regenerate():
+            self.regenerated += 1
+
+        def stream(script, *args):
+            if script == scripts.STREAM_LAST_RESPONSE:
+                self.stream_turns.append(args[5])
+                state = self.states.pop(0)
+                if isinstance(state, Exception):
+                    raise state
+                return state
+
+        self.automation.send_prompt_to_chatgpt = send_prompt
+        self.automation.open_new_chat = open_new_chat
+        self.automation.driver.async_script_handlers.append(stream)
+        self.automation.driver.set_elements(
+            ChatGPTLocators.REGENERATE_BTN, [FakeElement(on_click=regenerate)]
+        )
+        self.policy = RecoveryPolicy(max_retries=2, backoff=0, failure_threshold=3)
+        self.automation.recovery = self.policy
+        self.automation.breaker = self.policy.new_breaker()
+
+    def answer(self):
+        return {"text": f"Answer {self.sentinel}", "done": True}
+
+    def error(self):
+        return {"text": "Half", "done": False, "alert": ERROR, "baseline": ""}
+
+    def test_generation_error_is_regenerated(self):
+        self.states = [self.error(), self.answer()]
+        with self.assertLogs(level="WARNING"):
+            self.assertEqual(self.automation.ask("Question"), "Answer")
+        self.assertEqual(self.regenerated, 1)
+        self.assertEqual(len(self.sent), 1)
+        # The regenerated response is read from the turn of the failed one
+        self.assertEqual(self.stream_turns, [0, 0])
+
+    def test_regenerated_response_is_read_after_the_sent_prompt(self):
+        send = self.automation.send_prompt_to_chatgpt
+
+        def send_with_error_turn(prompt):
+            send(prompt)
+            # The failed response left an extra turn on the page
+            self.automation.driver.set_elements(
+                ChatGPTLocators.CHAT_GPT_CONVERSION, [FakeElement("Prompt"), FakeElement("Half"), FakeElement(ERROR)]
+            )
+
+        self.automation.send_prompt_to_chatgpt = send_with_error_turn
+        self.states = [self.error(), self.answer()]
+        with self.assertLogs(level="WARNING"):
+            self.assertEqual(self.automation.ask("Question"), "Answer")
+        self.assertEqual(self.stream_turns, [0, 0])
+
+    def test_retries_share_the_timeout(self):
+        clock = FakeClock()
+
+        def slow_error(script, *args):
+            if script == scripts.STREAM_LAST_RESPONSE:
+                clock.now += 60
+                return self.error()
+
+        self.automation.driver.async_script_handlers.insert(0, slow_error)
+        with mock.patch.object(time, "monotonic", clock):
+            with self.assertLogs(level="WARNING"), self.assertRaises(GenerationError):
+                self.automation.ask("Question", timeout=100)
+        # The second attempt ends past the deadline, so there is no third one
+        self.assertEqual(self.regenerated, 1)
+
+    def test_send_failures_keep_their_type(self):
+        automation = make_automation()
+        for error in (ReadinessTimeout("prompt accepted"), RateLimited("Too many requests")):
+            def start_prompt(prompt, admit=True):
+                raise error
+
+            automation._start_prompt = start_prompt
+            with self.assertLogs(level="ERROR"), self.assertRaises(type(error)):
+                automation.send_prompt_to_chatgpt("Question")
+
+    def test_actions_follow_the_policy(self):
+        self.automation.recovery = RecoveryPolicy(backoff=0, actions={"generation_error": ("resend", "new_chat")})
+        self.states = [self.error(), self.error(), self.answer()]
+        with self.assertLogs(level="WARNING"):
+            self.assertEqual(self.automation.ask("Question"), "Answer")
+        self.assertEqual(len(self.sent), 3)
+        self.assertEqual(self.new_chats, 1)
+        self.assertEqual(self.regenerated, 0)
+
+    def test_tab_crash_moves_to_a_new_chat(self):
+        self.states = [WebDriverException("unknown error: tab crashed"), self.answer()]
+        with self.assertLogs(level="WARNING"):
+            self.assertEqual(self.automation.ask("Question"), "Answer")
+        self.assertEqual(self.new_chats, 1)
+        self.assertEqual(len(self.sent), 2)
+
+    def test_gives_up_after_max_retries(self):
+        self.states = [self.error()] * 3
+        with self.assertLogs(level="WARNING"), self.assertRaises(GenerationError):
+            self.automation.ask("Question")
+        self.assertEqual(self.regenerated, 2)
+
+    def test_rate_limits_are_not_retried(self):
+        self.states = [{"text": "", "done": False, "alert": "Too many requests in 1 hour.", "baseline": ""}]
+        with self.assertRaises(RateLimited):
+            self.automation.ask("Question")
+        self.assertEqual(self.automation.breaker.failures, 0)
+
+    def test_retry_budget_is_shared(self):
+        self.policy.budget = RetryBudget(ratio=0, reserve=0)
+        self.states = [self.error()]
+        with self.assertLogs(level="WARNING"), self.assertRaises(GenerationError):
+            self.automation.ask("Question")
+        self.assertEqual(self.regenerated, 0)
+
+    def test_circuit_opens_and_fails_fast(self):
+        self.states = [self.error()] * 3
+        with self.assertLogs(level="WARNING"), self.assertRaises(GenerationError):
+            self.automation.ask("Question")
+        self.assertEqual(self.automation.breaker.state, "open")
+        commands = self.automation.driver.commands
+        with self.assertRaises(CircuitOpen):
+            self.automation.ask("Question")
+        with self.assertRaises(CircuitOpen):
+            list(self.automation.iter_ask("Question"))
+        self.assertEqual(self.automation.driver.commands, commands)
+
+    def test_check_error_regenerates(self):
+        self.automation.driver.script_handlers.append(
+            lambda script, *args: {"kind": "generation_error", "text": ERROR} if script == scripts.DETECT_BANNER else None
+        )
+        self.assertTrue(self.automation.check_error(regenerate=True))
+        self.assertEqual(self.regenerated, 1)
+
+        # A regeneration that cannot start is not reported as "no error"
+        self.automation.driver.set_elements(ChatGPTLocators.REGENERATE_BTN, [])
+        with self.assertRaises(NoSuchElementException):
+            self.automation.check_error(regenerate=True)
+
+    def test_regenerate_waits_for_the_new_response(self):
+        driver = self.automation.driver
+        failed = [FakeElement("Prompt", message_id="1", role="user"), FakeElement("Half", message_id="2")]
+        replaced = [failed[0], FakeElement("", message_id="3")]
+        driver.set_elements(ChatGPTLocators.CHAT_GPT_CONVERSION, failed)
+        driver.set_elements(
+            ChatGPTLocators.REGENERATE_BTN,
+            [FakeElement(on_click=lambda: driver.set_elements(ChatGPTLocators.CHAT_GPT_CONVERSION, replaced))],
+        )
+        self.automation.regenerate()
+        self.assertEqual(self.automation.conversation.last().id, "3")
+
+    def test_new_generation_error_next_to_a_stale_banner(self):
+        state = {"alert": "Too many requests\n" + ERROR, "baseline": "Too many requests"}
+        with self.assertRaises(GenerationError):
+            self.automation._raise_for_alert(state)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+from chatgpt_automation import scripts
+from chatgpt_automation.chatgpt_automation import ChatGPTLocators
+from chatgpt_automation.rotation import RotationPolicy
+from tests.fakes import FakeElement, make_automation
+
+
+class TestRotationPolicy(unittest.TestCase):
+    def test_reason(self):
+        policy = RotationPolicy(max_turns=10, max_dom_nodes=1000, max_heap_mb=None)
+        self.assertIsNone(policy.reason({"turns": 9, "dom_nodes": 999, "heap_mb": 4096.0}))
+        self.assertEqual(policy.reason({"turns": 10, "dom_nodes": 5, "heap_mb": None}), "turns 10 >= 10")
+        self.assertEqual(policy.reason({"turns": 2, "dom_nodes": 1500, "heap_mb": None}), "dom_nodes 1500 >= 1000")
+
+    def test_export_name(self):
+        policy = RotationPolicy(export_format="markdown", export_prefix="archive")
+        name = policy.export_name(3)
+        self.assertTrue(name.startswith("archive-"))
+        self.assertTrue(name.endswith("-3.md"))
+
+    def test_rejects_unknown_export_format(self):
+        with self.assertRaises(ValueError):
+            RotationPolicy(export_format="html")
+
+
+class TestAutomationRotation(unittest.TestCase):
+    def setUp(self):
+        self.automation = make_automation()
+        self.driver = self.automation.driver
+        self.footprint = {"turns": 0, "nodes": 100, "heap": 10 * 2 ** 20}
+        self.driver.script_handlers.append(
+            lambda script, *args: dict(self.footprint) if script == scripts.PAGE_FOOTPRINT else None
+        )
+        self.turns = []
+        self.driver.set_elements(ChatGPTLocators.MSG_BOX_INPUT, [FakeElement()])
+        self.driver.set_elements(
+            ChatGPTLocators.SEND_MSG_BTN, [FakeElement(on_click=lambda: self.turns.append(FakeElement("turn")))]
+        )
+        self.driver.elements[ChatGPTLocators.CHAT_GPT_CONVERSION] = self.turns
+        self.actions = []
+        self.automation.open_new_chat = lambda: self.actions.append("new chat")
+        self.automation.del_current_chat = lambda: self.actions.append("delete")
+        self.automation.save_conversation = lambda name, fmt: self.actions.append(("save", fmt))
+
+    def test_footprint(self):
+        self.footprint["heap"] = None
+        self.assertEqual(self.automation.page_footprint(), {"turns": 0, "dom_nodes": 100, "heap_mb": None})
+        self.footprint["heap"] = 3 * 2 ** 20
+        self.assertEqual(self.automation.page_footprint()["heap_mb"], 3.0)
+
+    def test_rotates_between_prompts_once_a_limit_is_crossed(self):
+        self.automation.rotation = RotationPolicy(max_turns=4, export_format="jsonl", delete=True)
+        self.automation.send_prompt_to_chatgpt("First")
+        self.assertEqual(self.actions, [])
+
+        self.footprint["turns"] = 4
+        self.automation.send_prompt_to_chatgpt("Second")
+        self.assertEqual(self.actions, [("save", "jsonl"), "delete", "new chat"])
+        self.assertEqual(self.automation.rotations, 1)
+
+    def test_heap_limit(self):
+        self.automation.rotation = RotationPolicy(max_heap_mb=8)
+        self.automation.send_prompt_to_chatgpt("Hi")
+        self.assertEqual(self.actions, ["new chat"])
+
+    def test_check_every(self):
+        self.automation.rotation = RotationPolicy(max_turns=1, check_every=3)
+        self.footprint["turns"] = 10
+        measured = []
+        self.driver.script_handlers.insert(
+            0, lambda script, *args: measured.append(True) if script == scripts.PAGE_FOOTPRINT else None
+        )
+        for index in range(3):
+            self.automation.send_prompt_to_chatgpt(f"Prompt {index}")
+        self.assertEqual(len(measured), 1)
+        self.assertEqual(self.actions, ["new chat"])
+
+    def test_ask_reads_the_response_in_the_new_chat(self):
+        def new_chat():
+            self.actions.append("new chat")
+            self.turns.clear()
+
+        def stream(script, *args):
+            if script == scripts.STREAM_LAST_RESPONSE:
+                # Like the page script: the response follows the prompt sent after the baseline
+                done = len(self.turns) >= args[5] + 1
+                return {"text": "Answer" if done else "", "done": done}
+
+        self.automation.open_new_chat = new_chat
+        self.driver.async_script_handlers.append(stream)
+        self.automation.rotation = RotationPolicy(max_turns=4)
+        self.turns.extend(FakeElement("turn") for _ in range(4))
+        self.footprint["turns"] = 4
+        self.assertEqual(self.automation.ask("After the rotation", timeout=2), "Answer")
+        self.assertEqual(self.actions, ["new chat"])
+        self.assertEqual(self.automation.prompt_turn_count, 0)
+
+    def test_no_rotation_with_pending_attachments(self):
+        self.automation.rotation = RotationPolicy(max_turns=1)
+        self.footprint["turns"] = 10
+        self.automation.pending_attachments = ["report.pdf"]
+        self.automation.send_prompt_to_chatgpt("Summarize the file")
+        self.assertEqual(self.actions, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
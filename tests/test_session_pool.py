@@ -0,0 +1,174 @@
+import sys
+import subprocess
+import threading
+from concurrent.futures import Future
+import unittest
+from selenium.common.exceptions import WebDriverException
+from chatgpt_automation.session_pool import ChatGPTSessionPool
+from chatgpt_automation.recovery import CircuitBreaker
+
+
+class FakeSession:
+
+    def __init__(self, user_data, crash_on=None):
+        self.user_data = user_data
+        self.crash_on = crash_on
+        self.asked = []
+        self.closed = False
+
+    def ask(self, prompt, timeout=None):
+        if prompt == self.crash_on:
+            self.crash_on = None
+            raise WebDriverException("chrome not reachable")
+        self.asked.append(prompt)
+        return f"{self.user_data['profile']}:{prompt}"
+
+    def quit(self):
+        self.closed = True
+
+
+class TestChatGPTSessionPool(unittest.TestCase):
+
+    def setUp(self):
+        self.profiles = [{"path": "/tmp/chrome", "profile": f"Profile {i}"} for i in range(3)]
+        self.created = []
+
+    def factory(self, user_data, crash_on=None):
+        session = FakeSession(user_data, crash_on)
+        self.created.append(session)
+        return session
+
+    def test_map_returns_responses_in_order(self):
+        with ChatGPTSessionPool(self.profiles, session_factory=self.factory) as pool:
+            prompts = [f"prompt {i}" for i in range(12)]
+            responses = list(pool.map(prompts))
+        self.assertEqual([r.split(":")[1] for r in responses], prompts)
+        self.assertEqual(sum(len(s.asked) for s in self.created), 12)
+        self.assertTrue(all(s.closed for s in self.created))
+
+    def test_submit_picks_least_outstanding_session(self):
+        gate = threading.Event()
+
+        class BlockingSession(FakeSession):
+            def ask(self, prompt, timeout=None):
+                gate.wait()
+                return super().ask(prompt)
+
+        pool = ChatGPTSessionPool(self.profiles, session_factory=BlockingSession)
+        futures = [pool.submit(f"prompt {i}") for i in range(6)]
+        self.assertEqual([s["outstanding"] for s in pool.stats()], [2, 2, 2])
+        gate.set()
+        profiles = sorted(f.result(5).split(":")[0] for f in futures)
+        self.assertEqual(profiles, sorted([p["profile"] for p in self.profiles] * 2))
+        pool.shutdown()
+        self.assertEqual(sum(s["completed"] for s in pool.stats()), 6)
+
+    def test_crashed_session_is_recycled_and_prompt_retried(self):
+        factory = lambda user_data: self.factory(
+            user_data, crash_on=None if self.created else "boom"
+        )
+        with ChatGPTSessionPool(self.profiles[:1], session_factory=factory) as pool:
+            self.assertEqual(pool.submit("boom").result(5), "Profile 0:boom")
+            stats = pool.stats()[0]
+        self.assertEqual(stats["recycled"], 1)
+        self.assertEqual(len(self.created), 2)
+        self.assertTrue(self.created[0].closed)
+
+    def test_failure_after_retries_is_set_on_future(self):
+        class AlwaysCrash(FakeSession):
+            def ask(self, prompt, timeout=None):
+                raise WebDriverException("tab crashed")
+
+        with ChatGPTSessionPool(self.profiles[:1], session_factory=AlwaysCrash, max_retries=2) as pool:
+            with self.assertRaises(WebDriverException):
+                pool.submit("prompt").result(5)
+            self.assertEqual(pool.stats()[0]["recycled"], 2)
+            self.assertEqual(pool.stats()[0]["failed"], 1)
+
+    def test_open_circuit_is_routed_around(self):
+        gate = threading.Event()
+        asking = {profile["profile"]: threading.Event() for profile in self.profiles}
+        clock = lambda: 0.0
+
+        class GuardedSession(FakeSession):
+            def __init__(self, user_data):
+                super().__init__(user_data)
+                self.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60, clock=clock)
+
+            def ask(self, prompt, timeout=None):
+                asking[self.user_data["profile"]].set()
+                gate.wait()
+                return super().ask(prompt)
+
+        pool = ChatGPTSessionPool(self.profiles[:2], session_factory=GuardedSession)
+        broken = pool.sessions[0]
+        # Queued behind a prompt in progress when the circuit opens
+        futures = [pool.submit(f"prompt {i}") for i in range(4)]
+        asking["Profile 0"].wait(5)
+        broken.automation.breaker.record_failure()
+        futures += [pool.submit(f"late {i}") for i in range(2)]
+        gate.set()
+        for future in futures:
+            future.result(5)
+        pool.shutdown()
+        stats = pool.stats()
+        self.assertEqual(stats[0]["circuit"], "open")
+        self.assertEqual(stats[0]["completed"], 1)
+        self.assertEqual(stats[0]["rerouted"], 1)
+        self.assertEqual(stats[1]["completed"], 5)
+
+    def test_prompts_are_queued_under_the_shutdown_check(self):
+        pool = ChatGPTSessionPool(self.profiles[:2], session_factory=self.factory)
+        unlocked = []
+
+        def checked(put):
+            def wrapper(item, *args, **kwargs):
+                # shutdown() queues its stop sentinel once the flag is set, so prompts must be queued with the check
+                if item is not None and not pool.lock.locked():
+                    unlocked.append(item)
+                put(item, *args, **kwargs)
+            return wrapper
+
+        for session in pool.sessions:
+            session.queue.put = checked(session.queue.put)
+        submitted = pool.submit("prompt")
+        moved = Future()
+        pool.sessions[0].outstanding += 1
+        self.assertTrue(pool._reroute(pool.sessions[0], ("moved", moved)))
+        pool.shutdown()
+        self.assertEqual(unlocked, [])
+        self.assertEqual(moved.result(5), "Profile 1:moved")
+        self.assertTrue(submitted.done())
+
+    def test_recycled_session_chrome_is_stopped_before_relaunch(self):
+        processes = []
+        running_at_launch = []
+
+        class ChromeSession(FakeSession):
+            def __init__(self, user_data):
+                super().__init__(user_data, crash_on=None if processes else "boom")
+                running_at_launch.append([process.poll() is None for process in processes])
+                # Stand-in for the Chrome process; quit() fails like it does on a crashed browser
+                self.chrome_process = subprocess.Popen(
+                    [sys.executable, "-c", "import time; time.sleep(60)"]
+                )
+                processes.append(self.chrome_process)
+
+            def quit(self):
+                raise WebDriverException("chrome not reachable")
+
+        try:
+            with self.assertLogs("chatgpt_automation.session_pool", level="WARNING"):
+                with ChatGPTSessionPool(self.profiles[:1], session_factory=ChromeSession) as pool:
+                    self.assertEqual(pool.submit("boom").result(5), "Profile 0:boom")
+            self.assertEqual(running_at_launch, [[], [False]])
+            self.assertTrue(all(process.poll() is not None for process in processes))
+        finally:
+            for process in processes:
+                if process.poll() is None:
+                    process.kill()
+                process.wait()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,207 @@
+import unittest
+from unittest import mock
+from chatgpt_automation import scripts
+from chatgpt_automation.cdp import CDPConnection
+from chatgpt_automation.chatgpt_automation import ChatGPTLocators
+from chatgpt_automation.lean import LeanProfile
+from chatgpt_automation.recovery import RecoveryPolicy
+from chatgpt_automation.tabs import TabMultiplexer
+from tests.fakes import FakeDriver, FakeElement, make_automation
+
+
+class TabDriver(FakeDriver):
+    """
+    FakeDriver emulating one chat page per window: clicking send adds a turn, and the response of a
+    window is complete after polls_until_done stream reads in that window.
+    """
+
+    def __init__(self, polls_until_done=2):
+        super().__init__()
+        self.polls_until_done = polls_until_done
+        self.cdp_commands = []
+        self.polls = {}
+        self.urls = {}
+        self.cleanups = []
+        self.generating = set()
+        self.max_generating = 0
+        self.script_handlers.append(
+            lambda script, *args: "complete" if "readyState" in script else None
+        )
+        self.async_script_handlers.append(self.stream)
+        self.async_script_handlers.append(self.clean)
+        self.load_page()
+
+    @property
+    def current_url(self):
+        return self.urls.get(self.current_window_handle, "https://chat.openai.com/")
+
+    def execute_cdp_cmd(self, command, params):
+        self.cdp_commands.append((self.current_window_handle, command))
+        return {}
+
+    def get(self, url):
+        super().get(url)
+        self.urls[self.current_window_handle] = url
+        self.load_page()
+
+    def load_page(self):
+        self.set_elements(ChatGPTLocators.MSG_BOX_INPUT, [FakeElement()])
+        self.set_elements(ChatGPTLocators.SEND_MSG_BTN, [FakeElement(on_click=self.submit)])
+        self.set_elements(ChatGPTLocators.CHAT_GPT_CONVERSION, [])
+
+    def submit(self):
+        handle = self.current_window_handle
+        self.elements[ChatGPTLocators.CHAT_GPT_CONVERSION].append(FakeElement("prompt"))
+        self.polls[handle] = 0
+        self.generating.add(handle)
+        self.max_generating = max(self.max_generating, len(self.generating))
+
+    def stream(self, script, *args):
+        if script != scripts.STREAM_LAST_RESPONSE:
+            return None
+        handle = self.current_window_handle
+        sentinel = args[2]
+        self.polls[handle] += 1
+        if self.polls[handle] < self.polls_until_done:
+            return {"text": f"Answer from {handle}"[: self.polls[handle] * 4], "done": False}
+        self.generating.discard(handle)
+        # The page follows the sentinel instruction in sentinel mode only
+        text = f"Answer from {handle} {sentinel}" if sentinel else f"Answer from {handle}"
+        return {"text": text, "done": True}
+
+
+    def clean(self, script, *args):
+        if script != scripts.CLEAN_CONVERSATIONS:
+            return None
+        self.cleanups.append((self.current_window_handle, args[6]))
+        return {"scanned": 0, "deleted": 0, "failed": 0}
+
+
+class FakeChannel:
+    def __init__(self, handle):
+        self.handle = handle
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestTabMultiplexer(unittest.TestCase):
+    def setUp(self):
+        self.driver = TabDriver()
+        self.automation = make_automation(self.driver)
+
+    def multiplexer(self, tabs=2, **kwargs):
+        multiplexer = TabMultiplexer(tabs=tabs, automation=self.automation, poll_interval=0.001, **kwargs)
+        self.addCleanup(multiplexer.shutdown)
+        return multiplexer
+
+    def test_opens_and_activates_tabs(self):
+        multiplexer = self.multiplexer(tabs=3)
+        self.assertEqual([tab.handle for tab in multiplexer.tabs], ["tab-0", "tab-1", "tab-2"])
+        self.assertEqual(
+            self.driver.visited, [("tab-1", "https://chat.openai.com/"), ("tab-2", "https://chat.openai.com/")]
+        )
+        # Every tab is kept out of background throttling
+        self.assertEqual(
+            {handle for handle, command in self.driver.cdp_commands if command == "Page.setWebLifecycleState"},
+            {"tab-0", "tab-1", "tab-2"},
+        )
+
+    def test_lean_profile_is_applied_to_new_tabs(self):
+        self.automation.lean = LeanProfile()
+        self.multiplexer(tabs=2)
+        self.assertIn(("tab-1", "Network.setBlockedURLs"), self.driver.cdp_commands)
+
+    def test_methods_run_in_their_own_tab(self):
+        first, second = self.multiplexer(tabs=2).tabs
+        first.send_prompt_to_chatgpt("Hi")
+        self.assertEqual(len(self.driver.windows["tab-0"][ChatGPTLocators.CHAT_GPT_CONVERSION]), 1)
+        self.assertEqual(len(self.driver.windows["tab-1"][ChatGPTLocators.CHAT_GPT_CONVERSION]), 0)
+
+        second.send_prompt_to_chatgpt("Hello")
+        second.send_prompt_to_chatgpt("Hello again")
+        self.assertEqual(self.driver.current_window_handle, "tab-1")
+        self.assertEqual(len(self.driver.windows["tab-1"][ChatGPTLocators.CHAT_GPT_CONVERSION]), 2)
+        self.assertEqual(first.return_last_response(), "prompt")
+        self.assertEqual(self.driver.current_window_handle, "tab-0")
+        self.assertNotEqual(first.uuid, second.uuid)
+
+    def test_window_is_switched_only_when_another_tab_is_driven(self):
+        multiplexer = self.multiplexer(tabs=2)
+        first, second = multiplexer.tabs
+        switches = multiplexer.switches
+        first.check_response_status()
+        first.check_response_status()
+        self.assertEqual(multiplexer.switches, switches + 1)
+        second.check_response_status()
+        self.assertEqual(multiplexer.switches, switches + 2)
+
+    def test_ask_on_a_tab(self):
+        tab = self.multiplexer(tabs=2).tabs[1]
+        self.assertEqual(tab.ask("Hi", timeout=5), "Answer from tab-1")
+
+    def test_scheduler_generates_in_every_tab_concurrently(self):
+        multiplexer = self.multiplexer(tabs=3)
+        responses = list(multiplexer.map([f"Prompt {index}" for index in range(6)], timeout=5))
+        self.assertEqual(sorted(set(responses)), ["Answer from tab-0", "Answer from tab-1", "Answer from tab-2"])
+        self.assertEqual(self.driver.max_generating, 3)
+
+        stats = multiplexer.stats()
+        self.assertEqual(stats["completed"], 6)
+        self.assertEqual([tab["completed"] for tab in stats["tabs"]], [2, 2, 2])
+
+    def test_failed_prompt_frees_the_tab(self):
+        multiplexer = self.multiplexer(tabs=1)
+        self.driver.set_elements(ChatGPTLocators.MSG_BOX_INPUT, [])
+        self.driver.set_elements(ChatGPTLocators.MSG_BOX_INPUT2, [])
+        with self.assertRaises(Exception):
+            multiplexer.submit("Hi").result(5)
+        self.driver.load_page()
+        self.assertEqual(multiplexer.submit("Hi again").result(5), "Answer from tab-0")
+        self.assertEqual(multiplexer.stats()["tabs"][0]["failed"], 1)
+
+    def test_close_tab_and_shutdown(self):
+        multiplexer = TabMultiplexer(tabs=3, automation=self.automation, poll_interval=0.001)
+        multiplexer.tabs[2].quit()
+        self.assertEqual(self.driver.window_handles, ["tab-0", "tab-1"])
+        self.assertEqual(self.driver.current_window_handle, "tab-0")
+        multiplexer.shutdown()
+        # The browser of a given automation is left open with its own tab
+        self.assertEqual(self.driver.window_handles, ["tab-0"])
+        with self.assertRaises(RuntimeError):
+            multiplexer.submit("Hi")
+
+    def test_tabs_take_the_session_options(self):
+        self.automation.recovery = RecoveryPolicy()
+        self.automation.credentials = object()
+        first, second = self.multiplexer(tabs=2).tabs
+        self.assertIs(second.recovery, self.automation.recovery)
+        self.assertIs(second.credentials, self.automation.credentials)
+        # Every tab has a circuit breaker of its own
+        self.assertIsNotNone(first.breaker)
+        self.assertIsNot(first.breaker, second.breaker)
+
+    def test_tabs_open_their_own_devtools_channel(self):
+        self.automation.cdp = FakeChannel("tab-0")
+        with mock.patch.object(CDPConnection, "attach", side_effect=lambda port, handle: FakeChannel(handle)):
+            multiplexer = TabMultiplexer(tabs=2, automation=self.automation, poll_interval=0.001)
+        channels = [tab.cdp for tab in multiplexer.tabs]
+        self.assertEqual([channel.handle for channel in channels], ["tab-0", "tab-1"])
+        multiplexer.shutdown()
+        self.assertTrue(all(channel.closed for channel in channels))
+        self.assertFalse(self.automation.cdp.closed)
+
+    def test_janitor_keeps_the_chat_open_in_every_tab(self):
+        first, second = self.multiplexer(tabs=2).tabs
+        self.driver.urls = {"tab-0": "https://chat.openai.com/c/first", "tab-1": "https://chat.openai.com/c/second?x=1"}
+        second.delete_chats(older_than=600)
+        self.assertEqual(self.driver.cleanups, [("tab-1", ["first", "second"])])
+
+    def test_requires_a_tab(self):
+        with self.assertRaises(ValueError):
+            TabMultiplexer(tabs=0, automation=self.automation)
+
+
+if __name__ == "__main__":
+    unittest.main()
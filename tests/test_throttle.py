@@ -0,0 +1,156 @@
+import unittest
+from chatgpt_automation import scripts
+from chatgpt_automation.throttle import RateLimiter, RateLimited, classify_banner, retry_after
+from tests.fakes import make_automation
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def limiter(clock, **kwargs):
+    kwargs.setdefault("jitter", 0)
+    return RateLimiter(clock=clock, sleep=clock.sleep, **kwargs)
+
+
+class TestBanners(unittest.TestCase):
+    def test_classify(self):
+        self.assertEqual(classify_banner("You've reached the current usage cap for GPT-4."), "usage_cap")
+        self.assertEqual(classify_banner("Too many requests in 1 hour. Try again later."), "rate_limit")
+        self.assertEqual(classify_banner("Network error"), "network")
+        self.assertIsNone(classify_banner("Upload failed"))
+        self.assertIsNone(classify_banner(None))
+
+    def test_retry_after(self):
+        self.assertEqual(retry_after("Please try again in 20 minutes."), 1200)
+        self.assertEqual(retry_after("Try again in 1 hour"), 3600)
+        self.assertIsNone(retry_after("Too many requests in 1 hour. Try again later."))
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_burst_then_rate(self):
+        throttle = limiter(self.clock, rate=60, per=60, burst=2)
+        self.assertEqual(throttle.acquire("a"), 0)
+        self.assertEqual(throttle.acquire("a"), 0)
+        self.assertAlmostEqual(throttle.acquire("a"), 1.0)
+        # Accounts have their own buckets
+        self.assertEqual(throttle.acquire("b"), 0)
+
+    def test_model_dimension(self):
+        throttle = limiter(self.clock, rate=600, per=60, burst=10, models={4: (1, 60)})
+        throttle.acquire("a", 4)
+        self.assertGreater(throttle.try_acquire("a", 4), 0)
+        self.assertEqual(throttle.try_acquire("a", 3.5), 0)
+        self.assertAlmostEqual(throttle.acquire("a", 4), 60.0)
+
+    def test_exponential_backoff(self):
+        throttle = limiter(self.clock, rate=600, per=60, backoff_base=30)
+        self.assertEqual(throttle.penalize("a", text="Too many requests"), 30)
+        # The same banner seen again while blocked does not extend the back-off
+        self.assertEqual(throttle.penalize("a"), 30)
+        self.assertAlmostEqual(throttle.acquire("a"), 30)
+        self.assertEqual(throttle.penalize("a"), 60)
+        self.clock.now += 60
+        throttle.succeeded("a")
+        self.assertEqual(throttle.penalize("a"), 30)
+
+    def test_jitter_shortens_the_backoff(self):
+        throttle = limiter(self.clock, backoff_base=100, jitter=0.5)
+        delay = throttle.penalize("a")
+        self.assertTrue(50 <= delay <= 100)
+
+    def test_banner_delay_wins(self):
+        throttle = limiter(self.clock, backoff_base=30)
+        self.assertEqual(throttle.penalize("a", kind="usage_cap", text="Try again in 2 hours"), 7200)
+
+    def test_usage_cap_blocks_only_the_model(self):
+        throttle = limiter(self.clock, rate=600, per=60, burst=10, models={4: (40, 3 * 3600)})
+        throttle.penalize("a", 4, kind="usage_cap")
+        self.assertGreater(throttle.try_acquire("a", 4), 0)
+        self.assertEqual(throttle.try_acquire("a", 3.5), 0)
+
+    def test_timeout(self):
+        throttle = limiter(self.clock, backoff_base=600)
+        throttle.penalize("a")
+        with self.assertRaises(RateLimited) as raised:
+            throttle.acquire("a", timeout=10)
+        self.assertEqual(raised.exception.retry_in, 600)
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_budget(self):
+        throttle = limiter(self.clock, rate=60, per=60, burst=5, models={4: (40, 3 * 3600)})
+        throttle.acquire("a", 4)
+        throttle.penalize("a", text="Too many requests")
+        budget = throttle.budget()
+        self.assertEqual(budget["a"]["tokens"], 0)
+        self.assertEqual(budget["a"]["blocked_for"], 30)
+        self.assertEqual(budget["a"]["strikes"], 1)
+        self.assertEqual(budget["a"]["last_banner"], "Too many requests")
+        self.assertEqual(budget["a"]["models"][4]["rate"], 40)
+        self.assertEqual(throttle.budget("b"), {})
+
+
+class TestAutomationThrottling(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.automation = make_automation()
+        self.automation.user_data = {"path": "/profiles", "profile": "Worker 1"}
+        self.automation.throttle = limiter(self.clock, rate=600, per=60)
+
+    def show(self, banner):
+        self.automation.driver.script_handlers.append(
+            lambda script, *args: banner if script == scripts.DETECT_BANNER else None
+        )
+
+    def test_check_error_backs_off_on_rate_limit(self):
+        self.show({"kind": "rate_limit", "text": "Too many requests in 1 hour."})
+        self.assertTrue(self.automation.check_error())
+        self.assertEqual(self.automation.throttle.budget()[self.automation._account()]["strikes"], 1)
+
+    def test_check_error_generation_error(self):
+        self.show({"kind": "generation_error", "text": "There was an error generating a response"})
+        self.assertTrue(self.automation.check_error())
+        self.assertEqual(self.automation.throttle.budget(), {})
+
+    def test_no_banner(self):
+        self.assertFalse(self.automation.check_error())
+
+    def test_stream_stops_on_rate_limit_alert(self):
+        alert = {"text": "", "done": False, "alert": "Too many requests in 1 hour.", "baseline": ""}
+        with self.assertRaises(RateLimited) as raised:
+            self.automation._raise_for_alert(alert)
+        self.assertEqual(raised.exception.kind, "rate_limit")
+        self.assertEqual(raised.exception.retry_in, 30)
+
+    def test_ask_stops_on_usage_cap(self):
+        self.automation.send_prompt_to_chatgpt = lambda prompt: None
+        self.automation.uuid = "sentinel"
+        self.automation.driver.async_script_handlers.append(
+            lambda script, *args: {
+                "text": "", "done": False, "alert": "You've reached the current usage cap for GPT-4", "baseline": ""
+            } if script == scripts.STREAM_LAST_RESPONSE else None
+        )
+        with self.assertRaises(RateLimited):
+            self.automation.ask("Hi", timeout=5)
+        self.assertGreater(self.automation.throttle.try_acquire(self.automation._account()), 0)
+
+    def test_stale_and_unknown_alerts_are_ignored(self):
+        self.automation._raise_for_alert({"alert": "Too many requests", "baseline": "Too many requests"})
+        self.automation._raise_for_alert({"alert": "Chat shared", "baseline": ""})
+        self.assertEqual(self.automation.throttle.budget(), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import os
+import shutil
+import tempfile
+import unittest
+from selenium.common.exceptions import WebDriverException
+from chatgpt_automation import scripts
+from chatgpt_automation.chatgpt_automation import ChatGPTLocators
+from tests.fakes import FakeDriver, FakeElement, make_automation
+
+
+class UploadDriver(FakeDriver):
+    """
+    FakeDriver emulating the file input and its upload chips. A chip is reported uploading on the first
+    poll after its file is sent and done (or failed, for the names in `failing`) from then on.
+    """
+
+    def __init__(self, failing=()):
+        super().__init__()
+        self.failing = set(failing)
+        self.sent = []
+        self.chips = []
+        self.file_input = FakeElement()
+        self.file_input.send_keys = self.send_files
+        self.set_elements(ChatGPTLocators.GPT4_FILE_INPUT, [self.file_input])
+        self.script_handlers.append(self.run)
+
+    def send_files(self, value):
+        self.sent.append(value.split("\n"))
+        for path in value.split("\n"):
+            self.chips.append({"name": os.path.basename(path), "state": "uploading"})
+        self.set_elements(ChatGPTLocators.FILE_CHIP, [FakeElement(chip["name"]) for chip in self.chips])
+
+    def run(self, script, *args):
+        if script != scripts.UPLOAD_STATUS:
+            return None
+        states = [dict(chip) for chip in self.chips[args[3]:]]
+        for chip in self.chips:
+            if chip["state"] == "uploading":
+                chip["state"] = "failed" if chip["name"] in self.failing else "done"
+        return states
+
+
+class TestUploadFiles(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.driver = UploadDriver(failing={"broken.txt"})
+        self.automation = make_automation(self.driver)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory, name)
+        with open(path, "w", encoding="utf8") as file:
+            file.write(content)
+        return path
+
+    def test_files_are_sent_in_one_interaction(self):
+        paths = [self.write("a.txt", "first"), self.write("b.txt", "second")]
+        results = self.automation.upload_files_for_prompt(paths)
+        self.assertEqual(self.driver.sent, [paths])
+        self.assertEqual(results, {paths[0]: "uploaded", paths[1]: "uploaded"})
+        self.assertEqual(self.automation.pending_attachments, paths)
+
+    def test_relative_names_resolve_against_the_working_directory(self):
+        self.write("report.txt", "content")
+        cwd = os.getcwd()
+        os.chdir(self.directory)
+        self.addCleanup(os.chdir, cwd)
+        self.automation.upload_file_for_prompt("report.txt")
+        self.assertEqual(self.driver.sent, [[os.path.join(os.getcwd(), "report.txt")]])
+
+    def test_content_already_attached_is_skipped(self):
+        first = self.write("a.txt", "same content")
+        copy = self.write("copy.txt", "same content")
+        other = self.write("b.txt", "other content")
+        self.automation.upload_files_for_prompt([first])
+        results = self.automation.upload_files_for_prompt([copy, other, other])
+        self.assertEqual(self.driver.sent, [[first], [other]])
+        self.assertEqual(results, {copy: "skipped", other: "uploaded"})
+
+    def test_nothing_to_send(self):
+        path = self.write("a.txt", "content")
+        self.automation.upload_files_for_prompt([path])
+        commands = self.driver.commands
+        self.assertEqual(self.automation.upload_files_for_prompt([path]), {path: "skipped"})
+        self.assertEqual(self.driver.commands, commands)
+
+    def test_new_chat_forgets_attachments(self):
+        path = self.write("a.txt", "content")
+        self.automation.upload_files_for_prompt([path])
+        self.driver.set_elements(ChatGPTLocators.MSG_BOX_INPUT, [FakeElement()])
+        self.driver.script_handlers.append(
+            lambda script, *args: "complete" if script == "return document.readyState" else None
+        )
+        self.automation.open_new_chat()
+        self.automation.upload_files_for_prompt([path])
+        self.assertEqual(len(self.driver.sent), 2)
+
+    def test_failed_upload_raises(self):
+        good = self.write("good.txt", "good")
+        broken = self.write("broken.txt", "broken")
+        with self.assertLogs(level="ERROR"), self.assertRaises(WebDriverException) as raised:
+            self.automation.upload_files_for_prompt([good, broken])
+        self.assertIn(broken, str(raised.exception))
+        self.assertEqual(self.automation.pending_attachments, [good])
+        # The file that failed can be sent again, the one that made it is not
+        self.driver.failing = set()
+        self.assertEqual(
+            self.automation.upload_files_for_prompt([good, broken]), {good: "skipped", broken: "uploaded"}
+        )
+
+    def test_missing_file_uploads_nothing(self):
+        path = self.write("a.txt", "content")
+        with self.assertLogs(level="ERROR"), self.assertRaises(FileNotFoundError):
+            self.automation.upload_files_for_prompt([path, os.path.join(self.directory, "missing.txt")])
+        self.assertEqual(self.driver.sent, [])
+
+
+if __name__ == "__main__":
+    unittest.main()